@@ -0,0 +1,65 @@
+"""
+Measures the cost of decoding API responses into SDK models, and into views with `response_mode="view"`.
+
+Usage: python benchmarks/decode.py
+"""
+
+import timeit
+import typing
+
+from multion.core.response_view import construct_response
+from multion.types import BrowseOutput, RetrieveOutput, SessionStepStreamChunk
+
+EVENT_CHUNK = {
+    "type": "event",
+    "session_id": "ff5ab1c7-46d8-4e7a-b3d3-5a5b1a2d7c9f",
+    "data": {"delta": {"content": "Clicking on the search bar", "url": "https://news.ycombinator.com/"}},
+}
+
+FINAL_CHUNK = {
+    "type": "final_event",
+    "session_id": "ff5ab1c7-46d8-4e7a-b3d3-5a5b1a2d7c9f",
+    "screenshot": "",
+    "data": {"delta": {"content": "Done", "url": "https://news.ycombinator.com/", "status": "DONE"}},
+}
+
+UNKNOWN_CHUNK = {**EVENT_CHUNK, "type": "heartbeat"}
+
+BROWSE_OUTPUT = {
+    "message": "The top post on Hackernews is ...",
+    "status": "DONE",
+    "url": "https://news.ycombinator.com/",
+    "screenshot": "",
+    "session_id": "ff5ab1c7-46d8-4e7a-b3d3-5a5b1a2d7c9f",
+    "metadata": {"step_count": 3, "processing_time": 12, "temperature": 0.2},
+}
+
+RETRIEVE_OUTPUT = {
+    "message": "Retrieved 100 items",
+    "url": "https://news.ycombinator.com/",
+    "status": "DONE",
+    "data": [{"title": f"Post {i}", "points": str(i * 10)} for i in range(100)],
+}
+
+CASES: typing.List[typing.Tuple[str, typing.Any, typing.Any]] = [
+    ("SessionStepStreamChunk (event)", SessionStepStreamChunk, EVENT_CHUNK),
+    ("SessionStepStreamChunk (final_event)", SessionStepStreamChunk, FINAL_CHUNK),
+    ("SessionStepStreamChunk (unknown type)", SessionStepStreamChunk, UNKNOWN_CHUNK),
+    ("BrowseOutput", BrowseOutput, BROWSE_OUTPUT),
+    ("RetrieveOutput (100 rows)", RetrieveOutput, RETRIEVE_OUTPUT),
+]
+
+
+def main() -> None:
+    for name, type_, object_ in CASES:
+        for response_mode in ("model", "view"):
+            timer = timeit.Timer(
+                lambda: construct_response(type_=type_, object_=object_, response_mode=response_mode)  # type: ignore
+            )
+            number, _ = timer.autorange()
+            best = min(timer.repeat(repeat=5, number=number)) / number
+            print(f"{name:<40} {response_mode:<6} {best * 1e6:>10.2f} us/decode")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Measures the cost of encoding the request bodies of `browse`, `retrieve` and `sessions.step`, comparing the
+`maybe_filter_request_body` of the extended HTTP client to the `jsonable_encoder(remove_omit_from_dict(...))`
+encoding of the generated one.
+
+Usage: python benchmarks/encode.py
+"""
+
+import timeit
+import typing
+
+from multion.core.extended_http_client import maybe_filter_request_body
+from multion.core.http_client import remove_omit_from_dict
+from multion.core.jsonable_encoder import jsonable_encoder
+from multion.sessions import SessionsStepRequestBrowserParams
+
+OMIT = typing.cast(typing.Any, ...)
+
+BROWSE_BODY = {
+    "cmd": "Find the top post on Hackernews",
+    "url": "https://news.ycombinator.com/",
+    "local": OMIT,
+    "session_id": OMIT,
+    "max_steps": 20,
+    "include_screenshot": False,
+    "temperature": OMIT,
+    "agent_id": OMIT,
+    "mode": "fast",
+    "use_proxy": OMIT,
+}
+
+RETRIEVE_BODY = {
+    "cmd": "Get the title and points of every post",
+    "url": "https://news.ycombinator.com/",
+    "session_id": OMIT,
+    "local": OMIT,
+    "fields": ["title", "points", "comments", "url"],
+    "format": "json",
+    "max_items": 100,
+    "full_page": True,
+    "render_js": True,
+    "scroll_to_bottom": OMIT,
+    "include_screenshot": OMIT,
+}
+
+STEP_BODY = {
+    "cmd": "Click on the first post",
+    "url": OMIT,
+    "browser_params": SessionsStepRequestBrowserParams(height=1080, width=1920),
+    "temperature": 0.2,
+    "agent_id": OMIT,
+    "mode": OMIT,
+    "include_screenshot": False,
+    "stream": False,
+}
+
+CASES: typing.List[typing.Tuple[str, typing.Dict[str, typing.Any]]] = [
+    ("browse", BROWSE_BODY),
+    ("retrieve", RETRIEVE_BODY),
+    ("sessions.step", STEP_BODY),
+]
+
+
+def _previous_encoding(body: typing.Dict[str, typing.Any]) -> typing.Any:
+    return {**jsonable_encoder(remove_omit_from_dict(body, OMIT)), **jsonable_encoder({})}
+
+
+def _time(function: typing.Callable[[], typing.Any]) -> float:
+    timer = timeit.Timer(function)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat=5, number=number)) / number
+
+
+def main() -> None:
+    for name, body in CASES:
+        assert _previous_encoding(body) == maybe_filter_request_body(body, None, OMIT)
+        previous = _time(lambda: _previous_encoding(body))
+        current = _time(lambda: maybe_filter_request_body(body, None, OMIT))
+        print(f"{name:<16} jsonable_encoder {previous * 1e6:>8.2f} us   fast path {current * 1e6:>8.2f} us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""
+Measures how long importing the SDK takes in a fresh interpreter, which optional integrations get imported, and the
+slowest modules reported by `python -X importtime -c "import multion"`.
+
+Usage: python benchmarks/import_time.py
+"""
+
+import subprocess
+import sys
+import typing
+
+MODULES = ["multion", "multion.client"]
+OPTIONAL_MODULES = ["agentops"]
+RUNS = 5
+SLOWEST_IMPORTS = 10
+
+_CODE = """
+import sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+print(elapsed, *[name for name in {optional_modules!r} if name in sys.modules])
+"""
+
+
+def _measure(module: str) -> typing.Tuple[float, typing.List[str]]:
+    best = float("inf")
+    imported: typing.List[str] = []
+    for _ in range(RUNS):
+        code = _CODE.format(module=module, optional_modules=OPTIONAL_MODULES)
+        output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout.split()
+        best = min(best, float(output[0]))
+        imported = output[1:]
+    return best, imported
+
+
+def _slowest_imports(module: str) -> typing.List[typing.Tuple[int, str]]:
+    stderr = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"], capture_output=True, text=True, check=True
+    ).stderr
+    timings: typing.List[typing.Tuple[int, str]] = []
+    for line in stderr.splitlines():
+        # import time: self [us] | cumulative | imported package
+        fields = line.split("|")
+        if len(fields) == 3 and fields[1].strip().isdigit():
+            timings.append((int(fields[1]), fields[2].rstrip()))
+    return sorted(timings, reverse=True)[:SLOWEST_IMPORTS]
+
+
+def main() -> None:
+    for module in MODULES:
+        best, imported = _measure(module)
+        print(f"import {module:<16} {best * 1e3:>8.1f} ms   optional modules imported: {', '.join(imported) or 'none'}")
+    print("\nslowest imports of multion (cumulative):")
+    for cumulative, name in _slowest_imports("multion"):
+        print(f"{cumulative / 1e3:>8.1f} ms {name}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+"""
+Compares the JSON codecs available in this environment on a `retrieve` response with 1000 rows.
+
+Usage: python benchmarks/json_codec.py
+"""
+
+import timeit
+import typing
+
+from multion.core.json_codec import JsonCodec, MsgspecCodec, OrjsonCodec
+
+RETRIEVE_OUTPUT = {
+    "message": "Retrieved 1000 items",
+    "url": "https://news.ycombinator.com/",
+    "status": "DONE",
+    "data": [
+        {"title": f"Post {i}", "points": str(i * 10), "url": f"https://example.com/{i}", "comments": i}
+        for i in range(1000)
+    ],
+}
+
+
+def _time(function: typing.Callable[[], typing.Any]) -> float:
+    timer = timeit.Timer(function)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat=5, number=number)) / number
+
+
+def main() -> None:
+    payload = JsonCodec().dumps(RETRIEVE_OUTPUT)
+    for codec_class in (JsonCodec, OrjsonCodec, MsgspecCodec):
+        try:
+            codec = codec_class()
+        except ImportError:
+            print(f"{codec_class.name:<8} not installed")
+            continue
+        dumps = _time(lambda: codec.dumps(RETRIEVE_OUTPUT))
+        loads = _time(lambda: codec.loads(payload))
+        print(f"{codec.name:<8} dumps {dumps * 1e6:>8.1f} us   loads {loads * 1e6:>8.1f} us")
+
+
+if __name__ == "__main__":
+    main()
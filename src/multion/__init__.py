@@ -1,54 +1,108 @@
 # This file was auto-generated by Fern from our API Definition.
 
-from .types import (
-    BadRequestResponse,
-    BrowseOutput,
-    Format,
-    HttpValidationError,
-    InternalServerErrorResponse,
-    Metadata,
-    Mode,
-    PaymentRequiredResponse,
-    RemoteValue,
-    RetrieveOutput,
-    SessionCreated,
-    SessionStepStreamChunk,
-    SessionStepStreamChunk_Event,
-    SessionStepStreamChunk_FinalEvent,
-    SessionStepSuccess,
-    SessionStepSuccessMetadata,
-    SessionStreamChunkEvent,
-    SessionStreamChunkEventData,
-    SessionStreamChunkEventDataDelta,
-    SessionStreamChunkFinalEvent,
-    SessionStreamChunkFinalEventData,
-    SessionStreamChunkFinalEventDataDelta,
-    UnauthorizedResponse,
-    ValidationError,
-    ValidationErrorLocItem,
-)
-from .errors import (
-    BadRequestError,
-    InternalServerError,
-    PaymentRequiredError,
-    UnauthorizedError,
-    UnprocessableEntityError,
-)
-from . import sessions
-from .environment import MultiOnEnvironment
-from .sessions import (
-    CreateSessionInputBrowserParams,
-    SessionsCloseResponse,
-    SessionsListResponse,
-    SessionsScreenshotResponse,
-    SessionsStepRequestBrowserParams,
-    SessionsStepStreamRequestBrowserParams,
-)
+import typing
+
+from .lazy_import import lazy_exports
 from .version import __version__
 
+if typing.TYPE_CHECKING:
+    from .types import (
+        BadRequestResponse,
+        BrowseOutput,
+        Format,
+        HttpValidationError,
+        InternalServerErrorResponse,
+        Metadata,
+        Mode,
+        PaymentRequiredResponse,
+        RemoteValue,
+        RetrieveOutput,
+        SessionCreated,
+        SessionStepStreamChunk,
+        SessionStepStreamChunk_Event,
+        SessionStepStreamChunk_FinalEvent,
+        SessionStepSuccess,
+        SessionStepSuccessMetadata,
+        SessionStreamChunkEvent,
+        SessionStreamChunkEventData,
+        SessionStreamChunkEventDataDelta,
+        SessionStreamChunkFinalEvent,
+        SessionStreamChunkFinalEventData,
+        SessionStreamChunkFinalEventDataDelta,
+        UnauthorizedResponse,
+        ValidationError,
+        ValidationErrorLocItem,
+    )
+    from .errors import (
+        BadRequestError,
+        InternalServerError,
+        PaymentRequiredError,
+        UnauthorizedError,
+        UnprocessableEntityError,
+    )
+    from . import sessions
+    from .batch import BatchResult, BrowseCommand, RetrievedRow
+    from .sessions import (
+        CreateSessionInputBrowserParams,
+        SessionsCloseResponse,
+        SessionsListResponse,
+        SessionsScreenshotResponse,
+        SessionsStepRequestBrowserParams,
+        SessionsStepStreamRequestBrowserParams,
+    )
+    from .environment import MultiOnEnvironment
+
+_dynamic_imports: typing.Dict[str, str] = {
+    "BadRequestError": ".errors",
+    "BadRequestResponse": ".types",
+    "BatchResult": ".batch",
+    "BrowseCommand": ".batch",
+    "BrowseOutput": ".types",
+    "CreateSessionInputBrowserParams": ".sessions",
+    "Format": ".types",
+    "HttpValidationError": ".types",
+    "InternalServerError": ".errors",
+    "InternalServerErrorResponse": ".types",
+    "Metadata": ".types",
+    "Mode": ".types",
+    "MultiOnEnvironment": ".environment",
+    "PaymentRequiredError": ".errors",
+    "PaymentRequiredResponse": ".types",
+    "RemoteValue": ".types",
+    "RetrieveOutput": ".types",
+    "RetrievedRow": ".batch",
+    "SessionCreated": ".types",
+    "SessionStepStreamChunk": ".types",
+    "SessionStepStreamChunk_Event": ".types",
+    "SessionStepStreamChunk_FinalEvent": ".types",
+    "SessionStepSuccess": ".types",
+    "SessionStepSuccessMetadata": ".types",
+    "SessionStreamChunkEvent": ".types",
+    "SessionStreamChunkEventData": ".types",
+    "SessionStreamChunkEventDataDelta": ".types",
+    "SessionStreamChunkFinalEvent": ".types",
+    "SessionStreamChunkFinalEventData": ".types",
+    "SessionStreamChunkFinalEventDataDelta": ".types",
+    "SessionsCloseResponse": ".sessions",
+    "SessionsListResponse": ".sessions",
+    "SessionsScreenshotResponse": ".sessions",
+    "SessionsStepRequestBrowserParams": ".sessions",
+    "SessionsStepStreamRequestBrowserParams": ".sessions",
+    "UnauthorizedError": ".errors",
+    "UnauthorizedResponse": ".types",
+    "UnprocessableEntityError": ".errors",
+    "ValidationError": ".types",
+    "ValidationErrorLocItem": ".types",
+    "sessions": ".sessions",
+}
+
+__getattr__, __dir__ = lazy_exports(__name__, globals(), _dynamic_imports)
+
 __all__ = [
     "BadRequestError",
     "BadRequestResponse",
+    "BatchResult",
+    "BrowseCommand",
     "BrowseOutput",
     "CreateSessionInputBrowserParams",
     "Format",
@@ -62,6 +116,7 @@ __all__ = [
     "PaymentRequiredResponse",
     "RemoteValue",
     "RetrieveOutput",
+    "RetrievedRow",
     "SessionCreated",
     "SessionStepStreamChunk",
     "SessionStepStreamChunk_Event",
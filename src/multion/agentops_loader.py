@@ -0,0 +1,14 @@
+import types
+
+
+def load_agentops() -> types.ModuleType:
+    """
+    Imports agentops on first use, so that clients created without an `agentops_api_key` never pay for importing it.
+    """
+    try:
+        import agentops  # type: ignore
+    except ImportError as e:
+        raise ImportError(
+            "Recording sessions to AgentOps requires the agentops package, install it with `pip install agentops`."
+        ) from e
+    return agentops
@@ -0,0 +1,298 @@
+import asyncio
+import typing
+from concurrent.futures import FIRST_COMPLETED, CancelledError, Future, ThreadPoolExecutor, wait
+
+from .columnar import get_rows
+from .core.extended_request_options import ExtendedRequestOptions
+from .core.request_options import RequestOptions
+from .errors.payment_required_error import PaymentRequiredError
+from .errors.unauthorized_error import UnauthorizedError
+from .types.mode import Mode
+
+try:
+    from typing import NotRequired  # type: ignore
+except ImportError:
+    from typing_extensions import NotRequired  # type: ignore
+
+T = typing.TypeVar("T")
+R = typing.TypeVar("R")
+
+FATAL_ERRORS: typing.Tuple[typing.Type[BaseException], ...] = (PaymentRequiredError, UnauthorizedError)
+"""
+Errors that no other item of a batch can recover from, which cancel the remaining work by default.
+"""
+
+
+class BrowseCommand(typing.TypedDict):
+    """
+    The arguments of one `browse` call of a batch, see `browse` for a description of each of them.
+
+    `request_options` replaces the request options shared by the whole batch for this command only.
+    """
+
+    cmd: str
+    url: NotRequired[str]
+    local: NotRequired[bool]
+    session_id: NotRequired[str]
+    max_steps: NotRequired[int]
+    include_screenshot: NotRequired[bool]
+    temperature: NotRequired[float]
+    agent_id: NotRequired[str]
+    mode: NotRequired[Mode]
+    use_proxy: NotRequired[bool]
+    request_options: NotRequired[RequestOptions]
+
+
+class BatchResult(typing.Generic[R]):
+    """
+    The outcome of one item of a batch: `index` is the position of the item in the input, and either `output`
+    holds its result or `error` holds the exception it raised.
+    """
+
+    __slots__ = ("index", "output", "error")
+
+    def __init__(self, index: int, output: typing.Optional[R] = None, error: typing.Optional[Exception] = None):
+        self.index = index
+        self.output = output
+        self.error = error
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+    def result(self) -> R:
+        """
+        Returns the output of the item, or raises the error it failed with.
+        """
+        if self.error is not None:
+            raise self.error
+        return typing.cast(R, self.output)
+
+    def __repr__(self) -> str:
+        if self.error is not None:
+            return f"BatchResult(index={self.index}, error={self.error!r})"
+        return f"BatchResult(index={self.index}, output={self.output!r})"
+
+
+class RetrievedRow:
+    """
+    One row of the data retrieved from `url`, the URL found at position `index` of the batch.
+    """
+
+    __slots__ = ("index", "url", "data")
+
+    def __init__(self, index: int, url: str, data: typing.Dict[str, typing.Any]):
+        self.index = index
+        self.url = url
+        self.data = data
+
+    def __repr__(self) -> str:
+        return f"RetrievedRow(index={self.index}, url={self.url!r}, data={self.data!r})"
+
+
+def browse_kwargs(
+    command: typing.Union[str, BrowseCommand], request_options: typing.Optional[RequestOptions]
+) -> typing.Dict[str, typing.Any]:
+    kwargs: typing.Dict[str, typing.Any] = {"cmd": command} if isinstance(command, str) else dict(command)
+    kwargs.setdefault("request_options", request_options)
+    return kwargs
+
+
+def retrieve_request_options(request_options: typing.Optional[RequestOptions]) -> ExtendedRequestOptions:
+    # Rows are handed out as the dicts found in the response, so building RetrieveOutput models is wasted work.
+    return typing.cast(ExtendedRequestOptions, {"response_mode": "raw", **(request_options or {})})
+
+
+class _UrlTracker:
+    """
+    Remembers the URLs of a batch until their result is consumed, so that URLs can be pulled lazily.
+    """
+
+    def __init__(self, urls: typing.Iterable[str]):
+        self._urls = urls
+        self._pending: typing.Dict[int, str] = {}
+
+    def __iter__(self) -> typing.Iterator[str]:
+        for index, url in enumerate(self._urls):
+            self._pending[index] = url
+            yield url
+
+    def rows(
+        self,
+        result: "BatchResult[typing.Any]",
+        on_error: typing.Optional[typing.Callable[[str, Exception], None]],
+    ) -> typing.Iterator[RetrievedRow]:
+        url = self._pending.pop(result.index)
+        if result.error is not None:
+            if on_error is None:
+                raise result.error
+            on_error(url, result.error)
+            return
+        for row in get_rows(result.output):
+            yield RetrievedRow(result.index, url, row)
+
+
+def retrieve_rows(
+    retrieve: typing.Callable[[str], typing.Any],
+    urls: typing.Iterable[str],
+    *,
+    concurrency: int,
+    fatal_errors: typing.Tuple[typing.Type[BaseException], ...] = FATAL_ERRORS,
+    on_error: typing.Optional[typing.Callable[[str, Exception], None]] = None,
+) -> typing.Iterator[RetrievedRow]:
+    """
+    Calls `retrieve` on every URL like `run_batch` does, and yields the rows of each response as soon as it arrives.
+
+    Failed URLs are passed to `on_error` when it is set, and otherwise stop the batch with their error.
+    """
+    tracker = _UrlTracker(urls)
+    results = run_batch(retrieve, tracker, concurrency=concurrency, fatal_errors=fatal_errors)
+    try:
+        for result in results:
+            yield from tracker.rows(result, on_error)
+    finally:
+        results.close()
+
+
+async def aretrieve_rows(
+    retrieve: typing.Callable[[str], typing.Awaitable[typing.Any]],
+    urls: typing.Iterable[str],
+    *,
+    concurrency: int,
+    fatal_errors: typing.Tuple[typing.Type[BaseException], ...] = FATAL_ERRORS,
+    on_error: typing.Optional[typing.Callable[[str, Exception], None]] = None,
+) -> typing.AsyncIterator[RetrievedRow]:
+    """
+    The asynchronous counterpart of `retrieve_rows`, backed by `arun_batch`.
+    """
+    tracker = _UrlTracker(urls)
+    results = arun_batch(retrieve, tracker, concurrency=concurrency, fatal_errors=fatal_errors)
+    try:
+        async for result in results:
+            for row in tracker.rows(result, on_error):
+                yield row
+    finally:
+        await results.aclose()
+
+
+def _check_concurrency(concurrency: int) -> None:
+    if concurrency < 1:
+        raise ValueError(f"concurrency must be at least 1, got {concurrency}")
+
+
+def _first_fatal_error(
+    completed: typing.Sequence[typing.Union["Future[R]", "asyncio.Future[R]"]],
+    fatal_errors: typing.Tuple[typing.Type[BaseException], ...],
+) -> typing.Optional[BaseException]:
+    for future in completed:
+        # The exception of a cancelled future is its cancellation, raised rather than returned.
+        if future.cancelled():
+            continue
+        error = future.exception()
+        if isinstance(error, fatal_errors):
+            return error
+    return None
+
+
+def run_batch(
+    function: typing.Callable[[T], R],
+    items: typing.Iterable[T],
+    *,
+    concurrency: int,
+    fatal_errors: typing.Tuple[typing.Type[BaseException], ...] = FATAL_ERRORS,
+) -> typing.Generator[BatchResult[R], None, None]:
+    """
+    Calls `function` on every item from a thread pool, with at most `concurrency` calls in flight, and yields the
+    results as they complete.
+
+    Items are pulled from `items` only when a worker is free, so arbitrarily long iterables are processed with a
+    bounded amount of memory. When an item raises one of `fatal_errors` no further item is started, the results of
+    the calls that completed along with it are yielded, and the error is raised. Threads cannot be interrupted, so
+    the calls still in flight run to completion before it is raised, and their results are discarded. Other errors
+    are yielded as results.
+    """
+    _check_concurrency(concurrency)
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        iterator = enumerate(items)
+        pending: typing.Dict["Future[R]", int] = {}
+
+        def submit_next() -> None:
+            for index, item in iterator:
+                pending[executor.submit(function, item)] = index
+                return
+
+        for _ in range(concurrency):
+            submit_next()
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            completed = sorted(done, key=pending.__getitem__)
+            fatal = _first_fatal_error(completed, fatal_errors)
+            for future in completed:
+                index = pending.pop(future)
+                try:
+                    output = future.result()
+                except fatal_errors:
+                    continue
+                except Exception as e:
+                    yield BatchResult(index, error=e)
+                else:
+                    yield BatchResult(index, output=output)
+                if fatal is None:
+                    submit_next()
+            if fatal is not None:
+                raise fatal
+
+
+async def arun_batch(
+    function: typing.Callable[[T], typing.Awaitable[R]],
+    items: typing.Iterable[T],
+    *,
+    concurrency: int,
+    fatal_errors: typing.Tuple[typing.Type[BaseException], ...] = FATAL_ERRORS,
+) -> typing.AsyncGenerator[BatchResult[R], None]:
+    """
+    Awaits `function` on every item from tasks, with at most `concurrency` of them running, and yields the results
+    as they complete.
+
+    Items are pulled lazily like in `run_batch`. When an item raises one of `fatal_errors` the results of the tasks
+    that completed along with it are yielded before it is raised, and the tasks still running are cancelled, as
+    they are when the iteration is stopped early. Items whose task gets cancelled otherwise are yielded with a
+    `concurrent.futures.CancelledError`, which unlike that of asyncio does not cancel the caller when raised.
+    """
+    _check_concurrency(concurrency)
+    iterator = enumerate(items)
+    pending: typing.Dict["asyncio.Future[R]", int] = {}
+
+    def submit_next() -> None:
+        for index, item in iterator:
+            pending[asyncio.ensure_future(function(item))] = index
+            return
+
+    try:
+        for _ in range(concurrency):
+            submit_next()
+        while pending:
+            done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            completed = sorted(done, key=pending.__getitem__)
+            fatal = _first_fatal_error(completed, fatal_errors)
+            for task in completed:
+                index = pending.pop(task)
+                try:
+                    output = task.result()
+                except fatal_errors:
+                    continue
+                except asyncio.CancelledError:
+                    yield BatchResult(index, error=CancelledError())
+                except Exception as e:
+                    yield BatchResult(index, error=e)
+                else:
+                    yield BatchResult(index, output=output)
+                if fatal is None:
+                    submit_next()
+            if fatal is not None:
+                raise fatal
+    finally:
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
@@ -1,21 +1,33 @@
 import typing
-from .base_client import AsyncBaseMultiOn, BaseMultiOn
+
+import httpx
+
+from .core.event_stream import StreamMetricsSink
+from .core.extended_http_client import RetryBudget, RetryPolicy
+from .core.extended_request_options import ResponseMode
+from .core.hooks import RequestHook
+from .core.json_codec import JsonCodec
+from .core.response_cache import ResponseCache
+from .core.tracing import Tracing
+from .environment import MultiOnEnvironment
+from .extended_client import AsyncExtendedMultiOn, ExtendedMultiOn
+from .extended_types import ExtendedRetrieveOutput
 from .sessions.wrapped_client import (
     WrappedAsyncSessionsClient,
     WrappedSessionsClient,
 )
-import agentops  # type: ignore
 import os
 
+from .agentops_loader import load_agentops
+from .telemetry import AsyncTelemetryQueue, TelemetryQueue, arecord_action, record_action
 from .wrappers import wraps_function
 from .types.browse_output import BrowseOutput
-from .types.retrieve_output import RetrieveOutput
 
 # this is used as the default value for optional parameters
 OMIT = typing.cast(typing.Any, ...)
 
 
-class MultiOn(BaseMultiOn):
+class MultiOn(ExtendedMultiOn):
     """
     Use this class to access the different functions within the SDK. You can instantiate any number of clients with different configuration that will propogate to these functions.
 
@@ -34,7 +46,37 @@ class MultiOn(BaseMultiOn):
 
         - follow_redirects: typing.Optional[bool]. Whether the default httpx client follows redirects or not, this is irrelevant if a custom httpx client is passed in.
 
+        - max_connections: typing.Optional[int]. The maximum number of concurrent connections of the default httpx client (Default: 100).
+
+        - max_keepalive_connections: typing.Optional[int]. The maximum number of idle connections kept alive by the default httpx client (Default: 20).
+
+        - keepalive_expiry: typing.Optional[float]. The number of seconds idle connections are kept alive by the default httpx client (Default: 5.0).
+
+        - http2: typing.Optional[bool]. Whether the default httpx client uses HTTP/2, requires `pip install httpx[http2]` (Default: False).
+
         - httpx_client: typing.Optional[httpx.Client]. The httpx client to use for making requests, a preconfigured client is used by default, however this is useful should you want to pass in any custom httpx configuration.
+
+        - retry_policy: typing.Optional[RetryPolicy]. Decides which responses are retried and how long to wait between attempts, by default 408, 409, 429 and 5XX responses are retried with exponential backoff.
+
+        - retry_budget: typing.Optional[RetryBudget]. A token bucket shared across all requests made by the client that caps how many retries can be issued relative to regular traffic (Default: a budget allowing retries for 20% of requests).
+
+        - response_mode: ResponseMode. Whether responses are returned as pydantic models ("model"), lightweight read-only views ("view") or the decoded JSON ("raw") (Default: "model"). The methods are annotated with the models, cast the results of the other modes to `ResponseView` or `dict`.
+
+        - json_codec: typing.Optional[JsonCodec]. Serializes request bodies and parses responses with the standard library `json` module by default, `OrjsonCodec` and `MsgspecCodec` are faster and `auto_codec()` returns whichever of them is installed.
+
+        - response_cache: typing.Optional[ResponseCache]. Caches the responses of `retrieve` calls that are not bound to a session, e.g. `MemoryCache(ttl=300)` or `SQLiteCache("cache.db")` (Default: None).
+
+        - coalesce_endpoints: typing.Collection[str]. The endpoints among "retrieve", "sessions.list" and "sessions.screenshot" whose identical concurrent requests share a single call (Default: none).
+
+        - track_sessions: bool. Whether the sessions created through the client are recorded by `session_tracker` until closed, and closed when the interpreter exits (Default: False).
+
+        - stream_metrics_sink: typing.Optional[StreamMetricsSink]. Called with the `StreamMetrics` of every `sessions.step_stream` stream once it ends, e.g. to export the time to first chunk (Default: None).
+
+        - hooks: typing.Sequence[RequestHook]. Called before each request is sent, with its response, when it is retried and when it fails, e.g. `MetricsCollector()` to keep latency histograms for each endpoint (Default: none).
+
+        - tracing: typing.Optional[Tracing]. Traces every call with OpenTelemetry and propagates the W3C trace context in request headers, e.g. `Tracing()` (Default: None).
+
+        - telemetry: typing.Optional[TelemetryQueue]. The queue AgentOps calls are made from in the background, bounded and sampled, when an `agentops_api_key` is set (Default: TelemetryQueue()).
     ---
     from multion.client import MultiOn
 
@@ -44,57 +86,99 @@ class MultiOn(BaseMultiOn):
     )
     """
 
-    @wraps_function(BaseMultiOn.__init__)  # type: ignore
+    sessions: WrappedSessionsClient
+
     def __init__(
         self,
-        *args,
+        *,
+        base_url: typing.Optional[str] = None,
+        environment: MultiOnEnvironment = MultiOnEnvironment.DEFAULT,
+        api_key: typing.Optional[str] = os.getenv("MULTION_API_KEY"),
         agentops_api_key: typing.Optional[str] = os.getenv("AGENTOPS_API_KEY"),
-        **kwargs
+        timeout: typing.Optional[float] = None,
+        follow_redirects: typing.Optional[bool] = True,
+        max_connections: typing.Optional[int] = 100,
+        max_keepalive_connections: typing.Optional[int] = 20,
+        keepalive_expiry: typing.Optional[float] = 5.0,
+        http2: typing.Optional[bool] = False,
+        httpx_client: typing.Optional[httpx.Client] = None,
+        retry_policy: typing.Optional[RetryPolicy] = None,
+        retry_budget: typing.Optional[RetryBudget] = None,
+        response_mode: ResponseMode = "model",
+        json_codec: typing.Optional[JsonCodec] = None,
+        response_cache: typing.Optional[ResponseCache] = None,
+        coalesce_endpoints: typing.Collection[str] = (),
+        track_sessions: bool = False,
+        stream_metrics_sink: typing.Optional[StreamMetricsSink] = None,
+        hooks: typing.Sequence[RequestHook] = (),
+        tracing: typing.Optional[Tracing] = None,
+        telemetry: typing.Optional[TelemetryQueue] = None
     ):
-
-        super().__init__(*args, **kwargs)
+        super().__init__(
+            base_url=base_url,
+            environment=environment,
+            api_key=api_key,
+            timeout=timeout,
+            follow_redirects=follow_redirects,
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry,
+            http2=http2,
+            httpx_client=httpx_client,
+            retry_policy=retry_policy,
+            retry_budget=retry_budget,
+            response_mode=response_mode,
+            json_codec=json_codec,
+            response_cache=response_cache,
+            coalesce_endpoints=coalesce_endpoints,
+            track_sessions=track_sessions,
+            stream_metrics_sink=stream_metrics_sink,
+            hooks=hooks,
+            tracing=tracing,
+        )
         self._agentops_api_key = agentops_api_key
-
-        self.sessions = WrappedSessionsClient(
-            client_wrapper=self._client_wrapper, use_agentops=self._agentops_api_key is not None)
+        self.telemetry: typing.Optional[TelemetryQueue] = None
 
         if self._agentops_api_key is not None:
+            agentops = load_agentops()
             agentops.init(
                 api_key=agentops_api_key,
                 parent_key=os.getenv("AGENTOPS_PARENT_KEY"),
                 auto_start_session=False,
             )
+            # Created after AgentOps registers its exit handlers, so that the calls queued run before they do.
+            self.telemetry = telemetry if telemetry is not None else TelemetryQueue()
+
+        self.sessions = WrappedSessionsClient(
+            client_wrapper=self._client_wrapper,
+            use_agentops=self._agentops_api_key is not None,
+            telemetry=self.telemetry,
+        )
 
-    @wraps_function(BaseMultiOn.browse)  # type: ignore
+    @wraps_function(ExtendedMultiOn.browse)  # type: ignore
     def _browse(self, *args, **kwargs) -> BrowseOutput:
         return super().browse(*args, **kwargs)
 
-    @wraps_function(BaseMultiOn.retrieve)  # type: ignore
-    def _retrieve(self, *args, **kwargs) -> RetrieveOutput:
+    @wraps_function(ExtendedMultiOn.retrieve)  # type: ignore
+    def _retrieve(self, *args, **kwargs) -> ExtendedRetrieveOutput:
         return super().retrieve(*args, **kwargs)
 
     def browse(self, *args, **kwargs) -> BrowseOutput:
-        if self._agentops_api_key is not None:
-            agentops.start_session(tags=["multion-sdk"])
-
-            @agentops.record_function(event_name="browse")
-            def wrapped_browse(*args, **kwargs):
-                return self._browse(*args, **kwargs)
-            return wrapped_browse(*args, **kwargs)
+        if self.telemetry is not None:
+            agentops = load_agentops()
+            self.telemetry.submit(agentops.start_session, tags=["multion-sdk"], sample=False)
+            return record_action(self.telemetry, agentops, "browse", self._browse, *args, **kwargs)
         return self._browse(*args, **kwargs)
 
-    def retrieve(self, *args, **kwargs) -> RetrieveOutput:
-        if self._agentops_api_key is not None:
-            agentops.start_session(tags=["multion-sdk"])
-
-            @agentops.record_function(event_name="retrieve")
-            def wrapped_retrieve(*args, **kwargs):
-                return self._retrieve(*args, **kwargs)
-            return wrapped_retrieve(*args, **kwargs)
+    def retrieve(self, *args, **kwargs) -> ExtendedRetrieveOutput:
+        if self.telemetry is not None:
+            agentops = load_agentops()
+            self.telemetry.submit(agentops.start_session, tags=["multion-sdk"], sample=False)
+            return record_action(self.telemetry, agentops, "retrieve", self._retrieve, *args, **kwargs)
         return self._retrieve(*args, **kwargs)
 
 
-class AsyncMultiOn(AsyncBaseMultiOn):
+class AsyncMultiOn(AsyncExtendedMultiOn):
     """
     Use this class to access the different functions within the SDK. You can instantiate any number of clients with different configuration that will propogate to these functions.
 
@@ -113,58 +197,131 @@ class AsyncMultiOn(AsyncBaseMultiOn):
 
         - follow_redirects: typing.Optional[bool]. Whether the default httpx client follows redirects or not, this is irrelevant if a custom httpx client is passed in.
 
+        - max_connections: typing.Optional[int]. The maximum number of concurrent connections of the default httpx client (Default: 100).
+
+        - max_keepalive_connections: typing.Optional[int]. The maximum number of idle connections kept alive by the default httpx client (Default: 20).
+
+        - keepalive_expiry: typing.Optional[float]. The number of seconds idle connections are kept alive by the default httpx client (Default: 5.0).
+
+        - http2: typing.Optional[bool]. Whether the default httpx client uses HTTP/2, requires `pip install httpx[http2]` (Default: False).
+
         - httpx_client: typing.Optional[httpx.AsyncClient]. The httpx client to use for making requests, a preconfigured client is used by default, however this is useful should you want to pass in any custom httpx configuration.
+
+        - retry_policy: typing.Optional[RetryPolicy]. Decides which responses are retried and how long to wait between attempts, by default 408, 409, 429 and 5XX responses are retried with exponential backoff.
+
+        - retry_budget: typing.Optional[RetryBudget]. A token bucket shared across all requests made by the client that caps how many retries can be issued relative to regular traffic (Default: a budget allowing retries for 20% of requests).
+
+        - response_mode: ResponseMode. Whether responses are returned as pydantic models ("model"), lightweight read-only views ("view") or the decoded JSON ("raw") (Default: "model"). The methods are annotated with the models, cast the results of the other modes to `ResponseView` or `dict`.
+
+        - json_codec: typing.Optional[JsonCodec]. Serializes request bodies and parses responses with the standard library `json` module by default, `OrjsonCodec` and `MsgspecCodec` are faster and `auto_codec()` returns whichever of them is installed.
+
+        - response_cache: typing.Optional[ResponseCache]. Caches the responses of `retrieve` calls that are not bound to a session, e.g. `MemoryCache(ttl=300)` or `SQLiteCache("cache.db")` (Default: None).
+
+        - coalesce_endpoints: typing.Collection[str]. The endpoints among "retrieve", "sessions.list" and "sessions.screenshot" whose identical concurrent requests share a single call (Default: none).
+
+        - track_sessions: bool. Whether the sessions created through the client are recorded by `session_tracker` until closed, and closed when the interpreter exits (Default: False).
+
+        - stream_metrics_sink: typing.Optional[StreamMetricsSink]. Called with the `StreamMetrics` of every `sessions.step_stream` stream once it ends, e.g. to export the time to first chunk (Default: None).
+
+        - hooks: typing.Sequence[RequestHook]. Called before each request is sent, with its response, when it is retried and when it fails, e.g. `MetricsCollector()` to keep latency histograms for each endpoint (Default: none).
+
+        - tracing: typing.Optional[Tracing]. Traces every call with OpenTelemetry and propagates the W3C trace context in request headers, e.g. `Tracing()` (Default: None).
+
+        - telemetry: typing.Optional[AsyncTelemetryQueue]. The queue AgentOps calls are made from in the background, bounded and sampled, when an `agentops_api_key` is set (Default: AsyncTelemetryQueue()).
     ---
     from multion.client import AsyncMultiOn
 
-    client = MultiOn(
+    client = AsyncMultiOn(
         api_key="YOUR_API_KEY",
         agentops_api_key="YOUR_AGENTOPS_API_KEY",
     )
     """
 
-    @wraps_function(AsyncBaseMultiOn.__init__)  # type: ignore
+    sessions: WrappedAsyncSessionsClient
+
     def __init__(
         self,
-        *args,
+        *,
+        base_url: typing.Optional[str] = None,
+        environment: MultiOnEnvironment = MultiOnEnvironment.DEFAULT,
+        api_key: typing.Optional[str] = os.getenv("MULTION_API_KEY"),
         agentops_api_key: typing.Optional[str] = os.getenv("AGENTOPS_API_KEY"),
-        **kwargs
+        timeout: typing.Optional[float] = None,
+        follow_redirects: typing.Optional[bool] = True,
+        max_connections: typing.Optional[int] = 100,
+        max_keepalive_connections: typing.Optional[int] = 20,
+        keepalive_expiry: typing.Optional[float] = 5.0,
+        http2: typing.Optional[bool] = False,
+        httpx_client: typing.Optional[httpx.AsyncClient] = None,
+        retry_policy: typing.Optional[RetryPolicy] = None,
+        retry_budget: typing.Optional[RetryBudget] = None,
+        response_mode: ResponseMode = "model",
+        json_codec: typing.Optional[JsonCodec] = None,
+        response_cache: typing.Optional[ResponseCache] = None,
+        coalesce_endpoints: typing.Collection[str] = (),
+        track_sessions: bool = False,
+        stream_metrics_sink: typing.Optional[StreamMetricsSink] = None,
+        hooks: typing.Sequence[RequestHook] = (),
+        tracing: typing.Optional[Tracing] = None,
+        telemetry: typing.Optional[AsyncTelemetryQueue] = None
     ):
-        super().__init__(*args, **kwargs)
+        super().__init__(
+            base_url=base_url,
+            environment=environment,
+            api_key=api_key,
+            timeout=timeout,
+            follow_redirects=follow_redirects,
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry,
+            http2=http2,
+            httpx_client=httpx_client,
+            retry_policy=retry_policy,
+            retry_budget=retry_budget,
+            response_mode=response_mode,
+            json_codec=json_codec,
+            response_cache=response_cache,
+            coalesce_endpoints=coalesce_endpoints,
+            track_sessions=track_sessions,
+            stream_metrics_sink=stream_metrics_sink,
+            hooks=hooks,
+            tracing=tracing,
+        )
         self._agentops_api_key = agentops_api_key
-        self.sessions = WrappedAsyncSessionsClient(client_wrapper=self._client_wrapper,
-                                                   use_agentops=self._agentops_api_key is not None)
+        self.telemetry: typing.Optional[AsyncTelemetryQueue] = None
         if agentops_api_key is not None:
+            agentops = load_agentops()
             agentops.init(
                 api_key=agentops_api_key,
                 parent_key=os.getenv("AGENTOPS_PARENT_KEY"),
                 auto_start_session=False,
             )
+            # Created after AgentOps registers its exit handlers, so that the calls queued run before they do.
+            self.telemetry = telemetry if telemetry is not None else AsyncTelemetryQueue()
+        self.sessions = WrappedAsyncSessionsClient(client_wrapper=self._client_wrapper,
+                                                   use_agentops=self._agentops_api_key is not None,
+                                                   telemetry=self.telemetry)
 
-    @wraps_function(AsyncBaseMultiOn.browse)  # type: ignore
+    @wraps_function(AsyncExtendedMultiOn.browse)  # type: ignore
     async def _browse(self, *args, **kwargs) -> BrowseOutput:
         return await super().browse(*args, **kwargs)
 
-    @wraps_function(BaseMultiOn.retrieve)  # type: ignore
-    async def _retrieve(self, *args, **kwargs) -> RetrieveOutput:
+    @wraps_function(AsyncExtendedMultiOn.retrieve)  # type: ignore
+    async def _retrieve(self, *args, **kwargs) -> ExtendedRetrieveOutput:
         return await super().retrieve(*args, **kwargs)
 
     async def browse(self, *args, **kwargs) -> BrowseOutput:
-        if self._agentops_api_key is not None:
-            agentops.start_session(tags=["multion-sdk"])
-
-            @agentops.record_function(event_name="browse")
-            async def wrapped_browse(*args, **kwargs):
-                return await self._browse(*args, **kwargs)
-            return await wrapped_browse(*args, **kwargs)
+        if self.telemetry is not None:
+            agentops = load_agentops()
+            self.telemetry.submit(agentops.start_session, tags=["multion-sdk"], sample=False)
+            return await arecord_action(self.telemetry, agentops, "browse", self._browse, *args, **kwargs)
         return await self._browse(*args, **kwargs)
 
-    async def retrieve(self, *args, **kwargs) -> RetrieveOutput:
-        if self._agentops_api_key is not None:
-            agentops.start_session(tags=["multion-sdk"])
-
-            @agentops.record_function(event_name="retrieve")
-            async def wrapped_retrieve(*args, **kwargs):
-                return await self._retrieve(*args, **kwargs)  # type: ignore
-            return await wrapped_retrieve(*args, **kwargs)
+    async def retrieve(self, *args, **kwargs) -> ExtendedRetrieveOutput:
+        if self.telemetry is not None:
+            agentops = load_agentops()
+            self.telemetry.submit(agentops.start_session, tags=["multion-sdk"], sample=False)
+            return await arecord_action(
+                self.telemetry, agentops, "retrieve", self._retrieve, *args, **kwargs  # type: ignore
+            )
         return await self._retrieve(*args, **kwargs)  # type: ignore
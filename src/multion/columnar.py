@@ -0,0 +1,236 @@
+"""
+Converts the rows returned by `retrieve` into columnar tables.
+
+NumPy and PyArrow are optional dependencies, imported only by the functions that need them: install them with
+`pip install numpy` and `pip install pyarrow`.
+"""
+
+import importlib
+import json
+import types
+import typing
+
+Row = typing.Dict[str, typing.Any]
+
+ColumnType = typing.Literal["null", "bool", "int", "float", "str", "object"]
+"""
+The type inferred for a column from its values, ignoring None: "null" when all values are None, "float" for a mix
+of ints and floats, "str" for a mix of strings and other scalars, and "object" when values cannot be unified.
+"""
+
+_SCALAR_TYPES: typing.Dict[type, ColumnType] = {bool: "bool", int: "int", float: "float", str: "str"}
+
+
+def _import(module: str, package: str) -> types.ModuleType:
+    try:
+        return importlib.import_module(module)
+    except ImportError as e:
+        raise ImportError(f"This conversion requires {package}, install it with `pip install {package}`.") from e
+
+
+def _merge_column_types(left: ColumnType, right: ColumnType) -> ColumnType:
+    if left == right or right == "null":
+        return left
+    if left == "null":
+        return right
+    if {left, right} == {"int", "float"}:
+        return "float"
+    if "object" in (left, right):
+        return "object"
+    if "str" in (left, right):
+        return "str"
+    return "object"
+
+
+def infer_column_type(values: typing.Iterable[typing.Any]) -> ColumnType:
+    column_type: ColumnType = "null"
+    for value in values:
+        if value is not None:
+            column_type = _merge_column_types(column_type, _SCALAR_TYPES.get(type(value), "object"))
+    return column_type
+
+
+def get_rows(output: typing.Any) -> typing.List[Row]:
+    """
+    Returns the rows of a `retrieve` response, whatever the response mode it was decoded with.
+    """
+    data = output.get("data") if isinstance(output, dict) else output.data
+    return data if data is not None else []
+
+
+def get_fields(rows: typing.Iterable[Row]) -> typing.List[str]:
+    """
+    Returns the keys found in `rows`, in the order they are first seen.
+    """
+    fields: typing.Dict[str, None] = {}
+    for row in rows:
+        for key in row:
+            fields.setdefault(key, None)
+    return list(fields)
+
+
+def to_columns(
+    rows: typing.Sequence[Row], fields: typing.Optional[typing.Sequence[str]] = None
+) -> typing.Dict[str, typing.List[typing.Any]]:
+    """
+    Pivots `rows` into one list of values per field. Fields default to all the keys of the rows, and values missing
+    from a row are None.
+    """
+    if fields is None:
+        fields = get_fields(rows)
+    return {field: [row.get(field) for row in rows] for field in fields}
+
+
+def to_numpy(
+    rows: typing.Sequence[Row], fields: typing.Optional[typing.Sequence[str]] = None
+) -> typing.Dict[str, typing.Any]:
+    """
+    Pivots `rows` into one NumPy array per field, typed after the inferred column type.
+
+    Integer columns with missing values become float arrays holding NaN, and strings are stored in object arrays.
+    """
+    np = _import("numpy", "numpy")
+    arrays: typing.Dict[str, typing.Any] = {}
+    for field, values in to_columns(rows, fields).items():
+        column_type = infer_column_type(values)
+        has_missing = any(value is None for value in values)
+        if column_type == "bool" and not has_missing:
+            arrays[field] = np.array(values, dtype=np.bool_)
+        elif column_type == "int" and not has_missing:
+            arrays[field] = np.array(values, dtype=np.int64)
+        elif column_type in ("int", "float", "null"):
+            arrays[field] = np.array([np.nan if value is None else value for value in values], dtype=np.float64)
+        else:
+            arrays[field] = np.array(values, dtype=object)
+    return arrays
+
+
+def _arrow_type(pa: types.ModuleType, column_type: ColumnType) -> typing.Any:
+    return {
+        "null": pa.null(),
+        "bool": pa.bool_(),
+        "int": pa.int64(),
+        "float": pa.float64(),
+        "str": pa.string(),
+        "object": pa.string(),
+    }[column_type]
+
+
+def _to_arrow_values(pa: types.ModuleType, values: typing.List[typing.Any], arrow_type: typing.Any) -> typing.Any:
+    if arrow_type == pa.string():
+        # Non-string values of string columns are stored as JSON, e.g. nested lists or dicts.
+        values = [value if value is None or type(value) is str else json.dumps(value) for value in values]
+    # Converting through the inferred type makes the cast below raise rather than truncate, e.g. floats in an int column.
+    return pa.array(values, type=_arrow_type(pa, infer_column_type(values))).cast(arrow_type)
+
+
+def to_arrow(
+    rows: typing.Sequence[Row],
+    fields: typing.Optional[typing.Sequence[str]] = None,
+    schema: typing.Optional[typing.Any] = None,
+) -> typing.Any:
+    """
+    Converts `rows` into a `pyarrow.Table`, with column types inferred from the values unless a `schema` is given.
+
+    Values that do not fit a string column, such as nested lists and dicts, are stored as JSON strings, and values
+    that cannot be converted to the type of their column without losing information raise `pyarrow.ArrowInvalid`.
+    """
+    pa = _import("pyarrow", "pyarrow")
+    if schema is not None:
+        fields = schema.names
+    columns = to_columns(rows, fields)
+    arrow_fields = [
+        schema.field(name) if schema is not None else pa.field(name, _arrow_type(pa, infer_column_type(values)))
+        for name, values in columns.items()
+    ]
+    arrays = [
+        _to_arrow_values(pa, values, arrow_field.type) for arrow_field, values in zip(arrow_fields, columns.values())
+    ]
+    return pa.Table.from_arrays(arrays, schema=pa.schema(arrow_fields))
+
+
+class ParquetWriter:
+    """
+    Writes rows from any number of `retrieve` responses to a Parquet file, a batch at a time, so that the rows never
+    need to be held in memory all at once.
+
+    The columns are the `fields` given, or the keys of the first batch of rows otherwise. Column types are inferred
+    from the first batch unless a `schema` is given, with columns that only hold None in that batch stored as strings.
+    Pass a `schema` when later batches may hold values that do not fit the types of the first one.
+    """
+
+    def __init__(
+        self,
+        where: typing.Any,
+        *,
+        fields: typing.Optional[typing.Sequence[str]] = None,
+        schema: typing.Optional[typing.Any] = None,
+        batch_size: int = 10_000,
+        **parquet_options: typing.Any,
+    ):
+        self._pa = _import("pyarrow", "pyarrow")
+        self._pq = _import("pyarrow.parquet", "pyarrow")
+        self._where = where
+        self._fields = list(fields) if fields is not None else None
+        self._schema = schema
+        self._batch_size = batch_size
+        self._parquet_options = parquet_options
+        self._writer: typing.Optional[typing.Any] = None
+        self._batch: typing.List[Row] = []
+        self.rows_written = 0
+
+    def write_rows(self, rows: typing.Iterable[Row]) -> None:
+        for row in rows:
+            self._batch.append(row)
+            if len(self._batch) >= self._batch_size:
+                self.flush()
+
+    def write_output(self, output: typing.Any) -> None:
+        """
+        Writes the rows of a `retrieve` response.
+        """
+        self.write_rows(get_rows(output))
+
+    def flush(self) -> None:
+        if not self._batch:
+            return
+        if self._schema is None:
+            arrow_fields = []
+            for field, values in to_columns(self._batch, self._fields).items():
+                column_type = infer_column_type(values)
+                # Columns without any value yet are stored as strings, as the null type could not hold later values.
+                arrow_type = _arrow_type(self._pa, "str" if column_type == "null" else column_type)
+                arrow_fields.append(self._pa.field(field, arrow_type))
+            self._schema = self._pa.schema(arrow_fields)
+        table = to_arrow(self._batch, schema=self._schema)
+        if self._writer is None:
+            self._writer = self._pq.ParquetWriter(self._where, self._schema, **self._parquet_options)
+        self._writer.write_table(table)
+        self.rows_written += len(self._batch)
+        self._batch = []
+
+    def close(self) -> None:
+        self.flush()
+        if self._writer is None and self._schema is not None:
+            self._writer = self._pq.ParquetWriter(self._where, self._schema, **self._parquet_options)
+        if self._writer is not None:
+            self._writer.close()
+
+    def __enter__(self) -> "ParquetWriter":
+        return self
+
+    def __exit__(self, *args: typing.Any) -> None:
+        self.close()
+
+
+def write_parquet(
+    rows: typing.Sequence[Row],
+    where: typing.Any,
+    fields: typing.Optional[typing.Sequence[str]] = None,
+    **parquet_options: typing.Any,
+) -> None:
+    """
+    Writes `rows` to a Parquet file in one go, `parquet_options` are passed to `pyarrow.parquet.write_table`.
+    """
+    pq = _import("pyarrow.parquet", "pyarrow")
+    pq.write_table(to_arrow(rows, fields), where, **parquet_options)
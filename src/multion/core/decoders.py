@@ -0,0 +1,341 @@
+import datetime as dt
+import functools
+import inspect
+import typing
+import uuid
+
+import typing_extensions
+
+from .pydantic_utilities import pydantic_v1
+from .unchecked_base_model import UncheckedBaseModel, UnionMetadata
+
+Model = typing.TypeVar("Model", bound=pydantic_v1.BaseModel)
+
+Decoder = typing.Callable[[typing.Any], typing.Any]
+
+
+class _ConstructPlan:
+    """
+    Everything `construct_model` needs to know about a model class, computed once per class.
+    """
+
+    def __init__(self, cls: typing.Type[pydantic_v1.BaseModel]) -> None:
+        self.allow_population_by_field_name: bool = cls.__config__.allow_population_by_field_name
+        self.fields: typing.List[typing.Tuple[str, typing.Optional[str], typing.Any, Decoder]] = [
+            (name, field.alias, field, _get_decoder(typing.cast(typing.Type, field.outer_type_)))  # type: ignore
+            for name, field in cls.__fields__.items()
+        ]
+        self.known_keys: typing.Set[typing.Any] = {field.alias for field in cls.__fields__.values()} | set(
+            cls.__fields__
+        )
+
+
+_construct_plans: typing.Dict[typing.Type[pydantic_v1.BaseModel], _ConstructPlan] = {}
+_decoders: typing.Dict[typing.Any, Decoder] = {}
+
+
+def _get_construct_plan(cls: typing.Type[pydantic_v1.BaseModel]) -> _ConstructPlan:
+    plan = _construct_plans.get(cls)
+    if plan is None:
+        plan = _construct_plans[cls] = _ConstructPlan(cls)
+    return plan
+
+
+def construct_model(
+    cls: typing.Type[Model], _fields_set: typing.Optional[typing.Set[str]] = None, **values: typing.Any
+) -> Model:
+    """
+    Does what `UncheckedBaseModel.construct` does, with the plan and decoders of `cls` computed once per class.
+    """
+    m = cls.__new__(cls)  # type: ignore
+    fields_values = {}
+
+    plan = _get_construct_plan(cls)
+
+    if _fields_set is None:
+        _fields_set = set(values.keys())
+
+    for name, alias, field, decoder in plan.fields:
+        # Key here is only used to pull data from the values dict
+        # you should always use the NAME of the field to for field_values, etc.
+        # because that's how the object is constructed from a pydantic perspective
+        key = alias
+        if key is None or (
+            key not in values and plan.allow_population_by_field_name
+        ):  # Added this to allow population by field name
+            key = name
+
+        if key in values:
+            fields_values[name] = decoder(values[key])
+            _fields_set.add(name)
+        else:
+            default = field.get_default()
+            fields_values[name] = default
+
+            # If the default values are non-null act like they've been set
+            # This effectively allows exclude_unset to work like exclude_none where
+            # the latter passes through intentionally set none values.
+            if default != None:
+                _fields_set.add(name)
+
+    # Add extras back in
+    for key, value in values.items():
+        if key not in plan.known_keys:
+            _fields_set.add(key)
+            fields_values[key] = value
+
+    object.__setattr__(m, "__dict__", fields_values)
+    m._init_private_attributes()
+    object.__setattr__(m, "__fields_set__", _fields_set)
+    return m
+
+
+def _get_decoder(type_: typing.Type[typing.Any]) -> Decoder:
+    """
+    Returns the decoder for `type_`, compiling it on first use.
+    """
+    try:
+        decoder = _decoders.get(type_)
+    except TypeError:
+        # Unhashable types (e.g. literals of unhashable values) cannot be cached
+        return _compile_decoder(type_)
+    if decoder is None:
+        decoder = _decoders[type_] = _compile_decoder(type_)
+    return decoder
+
+
+def _identity(object_: typing.Any) -> typing.Any:
+    return object_
+
+
+def _compile_undiscriminated_union_decoder(union_type: typing.Type[typing.Any]) -> Decoder:
+    inner_types = pydantic_v1.typing.get_args(union_type)
+    if typing.Any in inner_types:
+        return _identity
+
+    model_types = [
+        inner_type
+        for inner_type in inner_types
+        if inspect.isclass(inner_type) and issubclass(inner_type, pydantic_v1.BaseModel)
+    ]
+    inner_decoders = [_get_decoder(inner_type) for inner_type in inner_types]
+    is_optional = type(None) in inner_types
+
+    def decode(object_: typing.Any) -> typing.Any:
+        if object_ is None and is_optional:
+            return None
+
+        for model_type in model_types:
+            try:
+                # Attempt a validated parse until one works
+                return pydantic_v1.parse_obj_as(model_type, object_)
+            except Exception:
+                continue
+
+        # If none of the types work, just return the first successful cast
+        for inner_decoder in inner_decoders:
+            try:
+                return inner_decoder(object_)
+            except Exception:
+                continue
+        return None
+
+    return decode
+
+
+class _DiscriminantTable:
+    """
+    Maps every value of a union's discriminant to the decoder of the member it selects, built once per union so
+    that decoding a member is a single dict lookup.
+    """
+
+    def __init__(self, *, discriminant: str, union_type: typing.Type[typing.Any]) -> None:
+        self.discriminant = discriminant
+        self.decoders: typing.Dict[typing.Any, Decoder] = {}
+        # When every member's discriminant is a literal, no member validates against an unknown discriminant and
+        # our regular union handling always ends up constructing the first member, so we can do that directly.
+        self.unknown_decoder: typing.Optional[Decoder] = None
+
+        inner_types = pydantic_v1.typing.get_args(union_type)
+        all_literals = len(inner_types) > 0
+        for inner_type in inner_types:
+            try:
+                field = inner_type.__fields__[discriminant]
+            except Exception:
+                # Members past this one cannot be matched on the discriminant, which falls through to our regular
+                # union handling.
+                all_literals = False
+                break
+            self.decoders.setdefault(field.default, _get_decoder(inner_type))
+            all_literals = all_literals and pydantic_v1.typing.is_literal_type(field.outer_type_)
+        if all_literals:
+            self.unknown_decoder = _get_decoder(inner_types[0])
+
+
+def _compile_union_decoder(type_: typing.Type[typing.Any]) -> Decoder:
+    base_type = pydantic_v1.typing.get_origin(type_) or type_
+    union_type = type_
+    tables: typing.List[_DiscriminantTable] = []
+    if base_type == typing_extensions.Annotated:
+        union_type = pydantic_v1.typing.get_args(type_)[0]
+        annotated_metadata = pydantic_v1.typing.get_args(type_)[1:]
+        for metadata in annotated_metadata:
+            if isinstance(metadata, UnionMetadata):
+                tables.append(_DiscriminantTable(discriminant=metadata.discriminant, union_type=union_type))
+    fallback = _compile_undiscriminated_union_decoder(union_type)
+    if not tables:
+        return fallback
+
+    def decode(object_: typing.Any) -> typing.Any:
+        for table in tables:
+            try:
+                if isinstance(object_, dict):
+                    objects_discriminant = object_[table.discriminant]
+                else:
+                    try:
+                        objects_discriminant = getattr(object_, table.discriminant)
+                    except:
+                        objects_discriminant = object_[table.discriminant]
+                # Cast to the correct type, based on the discriminant
+                inner_decoder = table.decoders.get(objects_discriminant)
+                if inner_decoder is None and isinstance(object_, dict):
+                    inner_decoder = table.unknown_decoder
+                if inner_decoder is not None:
+                    return inner_decoder(object_)
+            except Exception:
+                # Allow to fall through to our regular union handling
+                pass
+        return fallback(object_)
+
+    return decode
+
+
+def _try_or_identity(convert: Decoder) -> Decoder:
+    def decode(object_: typing.Any) -> typing.Any:
+        try:
+            return convert(object_)
+        except Exception:
+            return object_
+
+    return decode
+
+
+def _decode_bool(object_: typing.Any) -> typing.Any:
+    if isinstance(object_, str):
+        stringified_object = object_.lower()
+        return stringified_object == "true" or stringified_object == "1"
+
+    return bool(object_)
+
+
+def _compile_decoder(type_: typing.Type[typing.Any]) -> Decoder:
+    """
+    Compiles the function that coerces objects to `type_`, inspecting the type only once so that decoding
+    responses does not pay for it again.
+    """
+    base_type = pydantic_v1.typing.get_origin(type_) or type_
+    is_annotated = base_type == typing_extensions.Annotated
+    maybe_annotation_members = pydantic_v1.typing.get_args(type_)
+    is_annotated_union = is_annotated and pydantic_v1.typing.is_union(
+        pydantic_v1.typing.get_origin(maybe_annotation_members[0])
+    )
+
+    if base_type == typing.Any:
+        return _identity
+
+    if base_type == dict:
+        type_args = pydantic_v1.typing.get_args(type_)
+        key_decoder = _get_decoder(type_args[0]) if type_args else _identity
+        item_decoder = _get_decoder(type_args[1]) if type_args else _identity
+
+        if key_decoder is _identity and item_decoder is _identity:
+
+            def decode_json_dict(object_: typing.Any) -> typing.Any:
+                if not isinstance(object_, typing.Mapping):
+                    return object_
+                return dict(object_)
+
+            return decode_json_dict
+
+        def decode_dict(object_: typing.Any) -> typing.Any:
+            if not isinstance(object_, typing.Mapping):
+                return object_
+            return {key_decoder(key): item_decoder(item) for key, item in object_.items()}
+
+        return decode_dict
+
+    if base_type == list:
+        inner_decoder = _get_decoder(pydantic_v1.typing.get_args(type_)[0])
+
+        if inner_decoder is _identity:
+
+            def decode_json_list(object_: typing.Any) -> typing.Any:
+                if not isinstance(object_, list):
+                    return object_
+                return list(object_)
+
+            return decode_json_list
+
+        def decode_list(object_: typing.Any) -> typing.Any:
+            if not isinstance(object_, list):
+                return object_
+            return [inner_decoder(entry) for entry in object_]
+
+        return decode_list
+
+    if base_type == set:
+        inner_decoder = _get_decoder(pydantic_v1.typing.get_args(type_)[0])
+
+        def decode_set(object_: typing.Any) -> typing.Any:
+            if not isinstance(object_, set) and not isinstance(object_, list):
+                return object_
+            return {inner_decoder(entry) for entry in object_}
+
+        return decode_set
+
+    if pydantic_v1.typing.is_union(base_type) or is_annotated_union:
+        return _compile_union_decoder(type_)
+
+    # Cannot do an `issubclass` with a literal type, let's also just confirm we have a class before this call
+    if not pydantic_v1.typing.is_literal_type(type_) and (
+        inspect.isclass(base_type) and issubclass(base_type, pydantic_v1.BaseModel)
+    ):
+        model_type = typing.cast(typing.Type[pydantic_v1.BaseModel], type_)
+        # Models of the SDK are built from their compiled plan, others by their own `construct`.
+        construct = (
+            functools.partial(construct_model, model_type)
+            if issubclass(base_type, UncheckedBaseModel)
+            else model_type.construct
+        )
+
+        def decode_model(object_: typing.Any) -> typing.Any:
+            if object_ is None:
+                return object_
+            return construct(**object_)
+
+        return decode_model
+
+    if base_type == dt.datetime:
+        return _try_or_identity(pydantic_v1.datetime_parse.parse_datetime)
+
+    if base_type == dt.date:
+        return _try_or_identity(pydantic_v1.datetime_parse.parse_date)
+
+    if base_type == uuid.UUID:
+        return _try_or_identity(uuid.UUID)
+
+    if base_type == int:
+        return _try_or_identity(int)
+
+    if base_type == bool:
+        return _try_or_identity(_decode_bool)
+
+    return _identity
+
+
+def decode(*, type_: typing.Type[typing.Any], object_: typing.Any) -> typing.Any:
+    """
+    Coerces `object_` to `type_` (recursively) like `construct_type`, with a decoder compiled once per type and
+    cached, so that repeated calls for the same type only pay for the coercion.
+    """
+    return _get_decoder(type_)(object_)
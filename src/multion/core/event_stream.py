@@ -0,0 +1,421 @@
+import asyncio
+import time
+import typing
+import warnings
+
+import httpx
+import httpx_sse
+
+from .extended_http_client import ExtendedAsyncHttpClient, ExtendedHttpClient, can_retry_within_deadline
+from .request_options import RequestOptions
+
+T = typing.TypeVar("T")
+
+
+class StreamMetrics:
+    """
+    Timings and counts of an event stream, available as `metrics` on the stream and reported to the
+    `stream_metrics_sink` of the client once the stream ends, whether it was exhausted, closed early or failed.
+
+    Times are in seconds since the request was sent, i.e. since the stream was first iterated. `connect_time` is None
+    when a kept-alive connection was reused, and both it and `headers_time` describe the first connection.
+    `event_gaps` holds the time elapsed between consecutive events, and `events` counts the events yielded, while
+    `skipped_events` counts the events replayed by the server after reconnecting, which are not yielded again.
+    """
+
+    __slots__ = (
+        "connect_time",
+        "headers_time",
+        "first_event_time",
+        "event_gaps",
+        "events",
+        "skipped_events",
+        "bytes",
+        "reconnects",
+        "duration",
+        "error",
+    )
+
+    def __init__(self) -> None:
+        self.connect_time: typing.Optional[float] = None
+        self.headers_time: typing.Optional[float] = None
+        self.first_event_time: typing.Optional[float] = None
+        self.event_gaps: typing.List[float] = []
+        self.events = 0
+        self.skipped_events = 0
+        self.bytes = 0
+        self.reconnects = 0
+        self.duration: typing.Optional[float] = None
+        self.error: typing.Optional[Exception] = None
+
+    @property
+    def max_event_gap(self) -> typing.Optional[float]:
+        return max(self.event_gaps) if self.event_gaps else None
+
+    def to_dict(self) -> typing.Dict[str, typing.Any]:
+        return {
+            "connect_time": self.connect_time,
+            "headers_time": self.headers_time,
+            "first_event_time": self.first_event_time,
+            "event_gaps": list(self.event_gaps),
+            "max_event_gap": self.max_event_gap,
+            "events": self.events,
+            "skipped_events": self.skipped_events,
+            "bytes": self.bytes,
+            "reconnects": self.reconnects,
+            "duration": self.duration,
+            "error": repr(self.error) if self.error is not None else None,
+        }
+
+    def __repr__(self) -> str:
+        return f"StreamMetrics({', '.join(f'{key}={value!r}' for key, value in self.to_dict().items())})"
+
+
+StreamMetricsSink = typing.Callable[[StreamMetrics], None]
+"""
+Receives the `StreamMetrics` of every event stream of a client when it ends. It is called on the thread, or event
+loop, iterating the stream, so it should hand the metrics off rather than block.
+"""
+
+
+class _EventStreamState(typing.Generic[T]):
+    """
+    Bookkeeping shared by the sync and async event streams to resume a dropped stream where it left off.
+
+    Events carrying an `id` are deduplicated by id, which is also sent back as the `Last-Event-ID` header when
+    reconnecting. Reconnecting sends the request again, so once a stream has started, it is only resumed when the
+    server assigned ids to its events: without them, the events replayed could not be told apart from new ones.
+    """
+
+    def __init__(
+        self,
+        *,
+        request: httpx.Request,
+        decode: typing.Callable[[httpx_sse.ServerSentEvent], T],
+        raise_for_status: typing.Callable[[httpx.Response], typing.NoReturn],
+        request_options: typing.Optional[RequestOptions],
+    ):
+        self.request = request
+        self.decode = decode
+        self.raise_for_status = raise_for_status
+        self.max_reconnects: int = request_options.get("max_retries", 0) if request_options is not None else 0
+        self.reconnects = 0
+        self.last_event_id: typing.Optional[str] = None
+        self.retry_delay: typing.Optional[float] = None
+        self._seen_ids: typing.Set[str] = set()
+        self._streaming = False
+        self.metrics = StreamMetrics()
+        self.done_callbacks: typing.List[typing.Callable[[StreamMetrics], None]] = []
+        self.done = False
+        self._started: typing.Optional[float] = None
+        self._last_event: typing.Optional[float] = None
+        self._response: typing.Optional[httpx.Response] = None
+
+    def on_connect(self) -> None:
+        if self._started is None:
+            self._started = time.monotonic()
+        self._count_bytes()
+        if self.last_event_id is not None:
+            self.request.headers["Last-Event-ID"] = self.last_event_id
+        self._streaming = False
+
+    def on_response(self, response: httpx.Response) -> None:
+        self._response = response
+        self._streaming = 200 <= response.status_code < 300
+        if self.metrics.headers_time is None:
+            self.metrics.headers_time = self._elapsed()
+
+    def trace(self, name: str, info: typing.Dict[str, typing.Any]) -> None:
+        """
+        The httpcore `trace` extension of the request, which reports when connections are established.
+        """
+        if self.reconnects == 0 and name.endswith((".connect_tcp.complete", ".start_tls.complete")):
+            self.metrics.connect_time = self._elapsed()
+
+    async def atrace(self, name: str, info: typing.Dict[str, typing.Any]) -> None:
+        self.trace(name, info)
+
+    def accept(self, sse: httpx_sse.ServerSentEvent) -> bool:
+        """
+        Records the event and returns whether it should be yielded, i.e. it was not yielded by a previous connection.
+        """
+        if sse.retry is not None:
+            self.retry_delay = sse.retry / 1000
+        if sse.id:
+            if sse.id in self._seen_ids:
+                self.metrics.skipped_events += 1
+                return False
+            self._seen_ids.add(sse.id)
+            self.last_event_id = sse.id
+        self._record_event()
+        return True
+
+    def _record_event(self) -> None:
+        now = time.monotonic()
+        if self._last_event is None:
+            self.metrics.first_event_time = self._elapsed(now)
+        else:
+            self.metrics.event_gaps.append(now - self._last_event)
+        self._last_event = now
+        self.metrics.events += 1
+
+    def can_reconnect(
+        self, http_client: typing.Union[ExtendedHttpClient, ExtendedAsyncHttpClient], delay: float
+    ) -> bool:
+        if self.reconnects >= self.max_reconnects:
+            return False
+        if self._streaming and self.last_event_id is None:
+            # The step started without event ids to resume it from, sending it again would run it twice.
+            return False
+        if not can_retry_within_deadline(delay):
+            return False
+        return http_client.retry_budget is None or http_client.retry_budget.try_withdraw()
+
+    def finish(
+        self,
+        http_client: typing.Union[ExtendedHttpClient, ExtendedAsyncHttpClient],
+        error: typing.Optional[Exception],
+    ) -> None:
+        self._count_bytes()
+        self.metrics.reconnects = self.reconnects
+        self.metrics.duration = self._elapsed()
+        self.metrics.error = error
+        self.done = True
+        sink = http_client.stream_metrics_sink
+        if sink is not None:
+            self.report(sink)
+        for callback in self.done_callbacks:
+            self.report(callback)
+
+    def report(self, callback: typing.Callable[[StreamMetrics], None]) -> None:
+        try:
+            callback(self.metrics)
+        except Exception as e:
+            # A failing callback must neither hide the error that ended the stream nor raise one of its own.
+            warnings.warn(f"{callback!r} raised {e!r} when reporting stream metrics", RuntimeWarning)
+
+    def _count_bytes(self) -> None:
+        if self._response is not None:
+            self.metrics.bytes += self._response.num_bytes_downloaded
+            self._response = None
+
+    def _elapsed(self, now: typing.Optional[float] = None) -> typing.Optional[float]:
+        if self._started is None:
+            return None
+        return (now if now is not None else time.monotonic()) - self._started
+
+
+class EventStream(typing.Generic[T]):
+    """
+    Iterates over the server-sent events of a streaming endpoint, decoding each of them.
+
+    When the `max_retries` request option is set, the request is sent again if it fails to connect or the server
+    answers with a retriable status. A stream dropped after it started is only reopened when the server assigned
+    ids to its events, in which case the events that were already yielded are skipped, otherwise the error is
+    raised and retrying the step is left to the caller. The number of reconnections is available as `reconnects`
+    once iteration is over, and its timings as `metrics`.
+    """
+
+    def __init__(
+        self,
+        *,
+        http_client: ExtendedHttpClient,
+        request: httpx.Request,
+        decode: typing.Callable[[httpx_sse.ServerSentEvent], T],
+        raise_for_status: typing.Callable[[httpx.Response], typing.NoReturn],
+        request_options: typing.Optional[RequestOptions] = None,
+    ):
+        self._http_client = http_client
+        self._state = _EventStreamState(
+            request=request, decode=decode, raise_for_status=raise_for_status, request_options=request_options
+        )
+        request.extensions["trace"] = self._state.trace
+        self._iterator: typing.Optional[typing.Generator[T, None, None]] = None
+
+    @property
+    def reconnects(self) -> int:
+        return self._state.reconnects
+
+    @property
+    def last_event_id(self) -> typing.Optional[str]:
+        return self._state.last_event_id
+
+    @property
+    def metrics(self) -> StreamMetrics:
+        return self._state.metrics
+
+    def add_done_callback(self, callback: typing.Callable[[StreamMetrics], None]) -> None:
+        """
+        Calls `callback` with the metrics of the stream once it ends, or right away if it already has.
+        """
+        if self._state.done:
+            self._state.report(callback)
+        else:
+            self._state.done_callbacks.append(callback)
+
+    def __iter__(self) -> "EventStream[T]":
+        return self
+
+    def __next__(self) -> T:
+        if self._iterator is None:
+            self._iterator = self._iter_events()
+        return next(self._iterator)
+
+    def __enter__(self) -> "EventStream[T]":
+        return self
+
+    def __exit__(self, *args: typing.Any) -> None:
+        self.close()
+
+    def close(self) -> None:
+        if self._iterator is not None:
+            self._iterator.close()
+
+    def _iter_events(self) -> typing.Generator[T, None, None]:
+        error: typing.Optional[Exception] = None
+        try:
+            yield from self._iter_connections()
+        except Exception as e:
+            error = e
+            raise
+        finally:
+            self._state.finish(self._http_client, error)
+
+    def _iter_connections(self) -> typing.Generator[T, None, None]:
+        state = self._state
+        retry_policy = self._http_client.retry_policy
+        while True:
+            state.on_connect()
+            try:
+                with self._http_client.stream_request(state.request) as _response:
+                    state.on_response(_response)
+                    if not 200 <= _response.status_code < 300:
+                        delay = retry_policy.retry_timeout(response=_response, retries=state.reconnects)
+                        if not (
+                            retry_policy.should_retry(_response) and state.can_reconnect(self._http_client, delay)
+                        ):
+                            _response.read()
+                            state.raise_for_status(_response)
+                    else:
+                        for _sse in httpx_sse.EventSource(_response).iter_sse():
+                            if state.accept(_sse):
+                                yield state.decode(_sse)
+                        return
+            except httpx.TransportError:
+                delay = (
+                    state.retry_delay
+                    if state.retry_delay is not None
+                    else retry_policy.reconnect_timeout(state.reconnects)
+                )
+                if not state.can_reconnect(self._http_client, delay):
+                    raise
+            time.sleep(delay)
+            state.reconnects += 1
+
+
+class AsyncEventStream(typing.Generic[T]):
+    """
+    Asynchronously iterates over the server-sent events of a streaming endpoint, decoding each of them.
+
+    Reconnects, deduplicates events and reports metrics the same way as `EventStream`.
+    """
+
+    def __init__(
+        self,
+        *,
+        http_client: ExtendedAsyncHttpClient,
+        request: httpx.Request,
+        decode: typing.Callable[[httpx_sse.ServerSentEvent], T],
+        raise_for_status: typing.Callable[[httpx.Response], typing.NoReturn],
+        request_options: typing.Optional[RequestOptions] = None,
+    ):
+        self._http_client = http_client
+        self._state = _EventStreamState(
+            request=request, decode=decode, raise_for_status=raise_for_status, request_options=request_options
+        )
+        request.extensions["trace"] = self._state.atrace
+        self._iterator: typing.Optional[typing.AsyncGenerator[T, None]] = None
+
+    @property
+    def reconnects(self) -> int:
+        return self._state.reconnects
+
+    @property
+    def last_event_id(self) -> typing.Optional[str]:
+        return self._state.last_event_id
+
+    @property
+    def metrics(self) -> StreamMetrics:
+        return self._state.metrics
+
+    def add_done_callback(self, callback: typing.Callable[[StreamMetrics], None]) -> None:
+        """
+        Calls `callback` with the metrics of the stream once it ends, or right away if it already has.
+        """
+        if self._state.done:
+            self._state.report(callback)
+        else:
+            self._state.done_callbacks.append(callback)
+
+    def __aiter__(self) -> "AsyncEventStream[T]":
+        return self
+
+    async def __anext__(self) -> T:
+        if self._iterator is None:
+            self._iterator = self._iter_events()
+        return await self._iterator.__anext__()
+
+    async def __aenter__(self) -> "AsyncEventStream[T]":
+        return self
+
+    async def __aexit__(self, *args: typing.Any) -> None:
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        if self._iterator is not None:
+            await self._iterator.aclose()
+
+    async def _iter_events(self) -> typing.AsyncGenerator[T, None]:
+        error: typing.Optional[Exception] = None
+        events = self._iter_connections()
+        try:
+            async for event in events:
+                yield event
+        except Exception as e:
+            error = e
+            raise
+        finally:
+            # Unlike `yield from`, `async for` leaves the inner generator, and its response, open when closed early.
+            await events.aclose()
+            self._state.finish(self._http_client, error)
+
+    async def _iter_connections(self) -> typing.AsyncGenerator[T, None]:
+        state = self._state
+        retry_policy = self._http_client.retry_policy
+        while True:
+            state.on_connect()
+            try:
+                async with self._http_client.stream_request(state.request) as _response:
+                    state.on_response(_response)
+                    if not 200 <= _response.status_code < 300:
+                        delay = retry_policy.retry_timeout(response=_response, retries=state.reconnects)
+                        if not (
+                            retry_policy.should_retry(_response) and state.can_reconnect(self._http_client, delay)
+                        ):
+                            await _response.aread()
+                            state.raise_for_status(_response)
+                    else:
+                        async for _sse in httpx_sse.EventSource(_response).aiter_sse():
+                            if state.accept(_sse):
+                                yield state.decode(_sse)
+                        return
+            except httpx.TransportError:
+                delay = (
+                    state.retry_delay
+                    if state.retry_delay is not None
+                    else retry_policy.reconnect_timeout(state.reconnects)
+                )
+                if not state.can_reconnect(self._http_client, delay):
+                    raise
+            await asyncio.sleep(delay)
+            state.reconnects += 1
@@ -0,0 +1,153 @@
+import typing
+
+import httpx
+
+from .client_wrapper import AsyncClientWrapper, SyncClientWrapper
+from .event_stream import StreamMetricsSink
+from .extended_http_client import ExtendedAsyncHttpClient, ExtendedHttpClient, RetryBudget, RetryPolicy
+from .extended_request_options import ResponseMode, get_response_mode
+from .hooks import RequestHook
+from .json_codec import JsonCodec
+from .request_options import RequestOptions
+from .response_cache import ResponseCache
+from .response_view import construct_response
+
+if typing.TYPE_CHECKING:
+    from ..sessions.tracker import BaseSessionTracker
+    from .tracing import Tracing
+
+COALESCIBLE_ENDPOINTS = frozenset({"retrieve", "sessions.list", "sessions.screenshot"})
+"""
+The idempotent endpoints whose concurrent identical requests can share a single call, see `coalesce_endpoints`.
+"""
+
+
+def _check_coalesce_endpoints(coalesce_endpoints: typing.Collection[str]) -> typing.Collection[str]:
+    unsupported = set(coalesce_endpoints) - COALESCIBLE_ENDPOINTS
+    if unsupported:
+        raise ValueError(
+            f"Requests to {sorted(unsupported)} cannot be coalesced, "
+            f"coalesce_endpoints must be a subset of {sorted(COALESCIBLE_ENDPOINTS)}."
+        )
+    return coalesce_endpoints
+
+
+class ExtendedClientWrapper:
+    """
+    What the extended wrappers add to the generated ones: how responses are decoded, the tracing of calls and the
+    session tracker, if any, of the client.
+    """
+
+    def __init__(
+        self,
+        *,
+        response_mode: ResponseMode = "model",
+        json_codec: typing.Optional[JsonCodec] = None,
+        tracing: typing.Optional["Tracing"] = None,
+    ):
+        self._response_mode = response_mode
+        self.json_codec = json_codec if json_codec is not None else JsonCodec()
+        self.session_tracker: typing.Optional["BaseSessionTracker"] = None
+        self.tracing = tracing
+
+    def get_response_mode(self, request_options: typing.Optional[RequestOptions] = None) -> ResponseMode:
+        response_mode = get_response_mode(request_options)
+        return response_mode if response_mode is not None else self._response_mode
+
+    def construct_response(
+        self, *, type_: typing.Type[typing.Any], object_: typing.Any, request_options: typing.Optional[RequestOptions]
+    ) -> typing.Any:
+        return construct_response(
+            type_=type_, object_=object_, response_mode=self.get_response_mode(request_options)
+        )
+
+    def session_created(self, object_: typing.Any) -> None:
+        """
+        Reports the session of a decoded `sessions.create` or `browse` response to the session tracker, if any.
+        """
+        if self.session_tracker is not None and isinstance(object_, dict) and object_.get("session_id"):
+            self.session_tracker.track(object_["session_id"])
+
+    def session_closed(self, session_id: str) -> None:
+        if self.session_tracker is not None:
+            self.session_tracker.forget(session_id)
+
+
+class ExtendedSyncClientWrapper(SyncClientWrapper, ExtendedClientWrapper):
+    httpx_client: ExtendedHttpClient
+
+    def __init__(
+        self,
+        *,
+        api_key: str,
+        base_url: str,
+        timeout: typing.Optional[float] = None,
+        httpx_client: httpx.Client,
+        retry_policy: typing.Optional[RetryPolicy] = None,
+        retry_budget: typing.Optional[RetryBudget] = None,
+        response_mode: ResponseMode = "model",
+        json_codec: typing.Optional[JsonCodec] = None,
+        response_cache: typing.Optional[ResponseCache] = None,
+        coalesce_endpoints: typing.Collection[str] = (),
+        stream_metrics_sink: typing.Optional[StreamMetricsSink] = None,
+        hooks: typing.Sequence[RequestHook] = (),
+        tracing: typing.Optional["Tracing"] = None,
+    ):
+        SyncClientWrapper.__init__(
+            self, api_key=api_key, base_url=base_url, timeout=timeout, httpx_client=httpx_client
+        )
+        ExtendedClientWrapper.__init__(self, response_mode=response_mode, json_codec=json_codec, tracing=tracing)
+        self.httpx_client = ExtendedHttpClient(
+            httpx_client=httpx_client,
+            base_headers=self.get_headers(),
+            base_timeout=self.get_timeout(),
+            base_url=self.get_base_url(),
+            retry_policy=retry_policy,
+            retry_budget=retry_budget if retry_budget is not None else RetryBudget(),
+            json_codec=self.json_codec,
+            response_cache=response_cache,
+            coalesce_endpoints=_check_coalesce_endpoints(coalesce_endpoints),
+            stream_metrics_sink=stream_metrics_sink,
+            hooks=hooks,
+            tracing=tracing,
+        )
+
+
+class ExtendedAsyncClientWrapper(AsyncClientWrapper, ExtendedClientWrapper):
+    httpx_client: ExtendedAsyncHttpClient
+
+    def __init__(
+        self,
+        *,
+        api_key: str,
+        base_url: str,
+        timeout: typing.Optional[float] = None,
+        httpx_client: httpx.AsyncClient,
+        retry_policy: typing.Optional[RetryPolicy] = None,
+        retry_budget: typing.Optional[RetryBudget] = None,
+        response_mode: ResponseMode = "model",
+        json_codec: typing.Optional[JsonCodec] = None,
+        response_cache: typing.Optional[ResponseCache] = None,
+        coalesce_endpoints: typing.Collection[str] = (),
+        stream_metrics_sink: typing.Optional[StreamMetricsSink] = None,
+        hooks: typing.Sequence[RequestHook] = (),
+        tracing: typing.Optional["Tracing"] = None,
+    ):
+        AsyncClientWrapper.__init__(
+            self, api_key=api_key, base_url=base_url, timeout=timeout, httpx_client=httpx_client
+        )
+        ExtendedClientWrapper.__init__(self, response_mode=response_mode, json_codec=json_codec, tracing=tracing)
+        self.httpx_client = ExtendedAsyncHttpClient(
+            httpx_client=httpx_client,
+            base_headers=self.get_headers(),
+            base_timeout=self.get_timeout(),
+            base_url=self.get_base_url(),
+            retry_policy=retry_policy,
+            retry_budget=retry_budget if retry_budget is not None else RetryBudget(),
+            json_codec=self.json_codec,
+            response_cache=response_cache,
+            coalesce_endpoints=_check_coalesce_endpoints(coalesce_endpoints),
+            stream_metrics_sink=stream_metrics_sink,
+            hooks=hooks,
+            tracing=tracing,
+        )
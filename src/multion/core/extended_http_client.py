@@ -0,0 +1,758 @@
+import asyncio
+import contextvars
+import threading
+import time
+import typing
+import urllib.parse
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager, contextmanager
+from random import random
+
+import httpx
+
+from .file import File, convert_file_dict_to_httpx_tuples
+from .hooks import HookChain, RequestHook
+from .http_client import (
+    INITIAL_RETRY_DELAY_SECONDS,
+    MAX_RETRY_DELAY_SECONDS,
+    AsyncHttpClient,
+    HttpClient,
+    _retry_timeout,
+    _should_retry,
+    remove_omit_from_dict,
+)
+from .json_codec import JsonCodec
+from .jsonable_encoder import jsonable_encoder
+from .query_encoder import encode_query
+from .remove_none_from_dict import remove_none_from_dict
+from .request_options import RequestOptions
+from .response_cache import ResponseCache, get_cache_key
+from .single_flight import AsyncSingleFlight, SingleFlight
+
+if typing.TYPE_CHECKING:
+    from .event_stream import StreamMetricsSink
+    from .tracing import Tracing
+
+
+def _backoff_timeout(retries: int) -> float:
+    # Apply exponential backoff, capped at MAX_RETRY_DELAY_SECONDS.
+    retry_delay = min(INITIAL_RETRY_DELAY_SECONDS * pow(2.0, retries), MAX_RETRY_DELAY_SECONDS)
+
+    # Add a randomness / jitter to the retry delay to avoid overwhelming the server with retries.
+    timeout = retry_delay * (1 - 0.25 * random())
+    return timeout if timeout >= 0 else 0
+
+
+class RetryPolicy:
+    """
+    Decides whether a response should be retried and how long to wait before retrying it.
+
+    The default policy retries 408, 409, 429 and 5XX responses with exponential backoff, honoring the
+    `Retry-After` headers. Subclass it and override either method to customize this behavior.
+    """
+
+    def should_retry(self, response: httpx.Response) -> bool:
+        return _should_retry(response=response)
+
+    def retry_timeout(self, response: httpx.Response, retries: int) -> float:
+        return _retry_timeout(response=response, retries=retries)
+
+    def reconnect_timeout(self, retries: int) -> float:
+        """
+        The amount of time to wait before reopening a stream whose connection dropped without a response.
+        """
+        return _backoff_timeout(retries)
+
+
+class RetryBudget:
+    """
+    A token bucket shared by every request made through a client, which caps retries to a fraction of traffic.
+
+    Each request deposits `ratio` tokens (up to `max_tokens`) and each retry withdraws a whole token, so during
+    an outage retries cannot exceed `ratio` times the request rate once the initial `max_tokens` are spent.
+    """
+
+    def __init__(self, *, ratio: float = 0.2, max_tokens: float = 10.0):
+        self.ratio = ratio
+        self.max_tokens = max_tokens
+        self._tokens = max_tokens
+        self._lock = threading.Lock()
+
+    @property
+    def tokens(self) -> float:
+        return self._tokens
+
+    def deposit(self) -> None:
+        with self._lock:
+            self._tokens = min(self._tokens + self.ratio, self.max_tokens)
+
+    def try_withdraw(self) -> bool:
+        with self._lock:
+            if self._tokens < 1:
+                return False
+            self._tokens -= 1
+            return True
+
+
+_retry_deadline: "contextvars.ContextVar[typing.Optional[float]]" = contextvars.ContextVar(
+    "multion_retry_deadline", default=None
+)
+
+
+@contextmanager
+def retry_deadline(expires_at: typing.Optional[float]) -> typing.Iterator[None]:
+    """
+    Within this block, requests are not retried, nor streams reopened, when the wait before doing so would end past
+    `expires_at`, a `time.monotonic()` timestamp. `sessions.run` uses it to keep retries within its deadline.
+    """
+    token = _retry_deadline.set(expires_at)
+    try:
+        yield
+    finally:
+        _retry_deadline.reset(token)
+
+
+def can_retry_within_deadline(delay: float) -> bool:
+    expires_at = _retry_deadline.get()
+    return expires_at is None or time.monotonic() + delay < expires_at
+
+
+def _max_connections(httpx_client: typing.Union[httpx.Client, httpx.AsyncClient]) -> typing.Optional[int]:
+    # The limits given to httpx are only kept by the connection pool of its default transport.
+    pool = getattr(getattr(httpx_client, "_transport", None), "_pool", None)
+    return getattr(pool, "_max_connections", None)
+
+
+def _is_replayable(content: typing.Optional[typing.Any]) -> bool:
+    # Iterators can only be consumed once, so requests streaming them cannot be sent again.
+    return content is None or isinstance(content, (bytes, str))
+
+
+def _cached_response(request: httpx.Request, content: bytes) -> httpx.Response:
+    return httpx.Response(200, content=content, headers={"Content-Type": "application/json"}, request=request)
+
+
+_JSON_NATIVE_SCALARS = frozenset((str, int, float, bool, type(None)))
+
+
+def _encode_json_native(obj: typing.Any) -> typing.Any:
+    # Exact type checks: subclasses such as str enums and dict subclasses go through jsonable_encoder.
+    type_ = type(obj)
+    if type_ in _JSON_NATIVE_SCALARS:
+        return obj
+    if type_ is dict:
+        return {
+            key if type(key) is str else jsonable_encoder(key): _encode_json_native(value) for key, value in obj.items()
+        }
+    if type_ is list:
+        return [_encode_json_native(item) for item in obj]
+    return jsonable_encoder(obj)
+
+
+def encode_request_body(obj: typing.Any, omit: typing.Optional[typing.Any] = None) -> typing.Any:
+    """
+    Encodes a request body like `jsonable_encoder`, in a single pass that also drops the top-level values that are `omit`.
+
+    JSON-native values (str, int, float, bool, None, list and dict) are copied as they are, and only the other values
+    (pydantic models, datetimes, enums, ...) are handed to `jsonable_encoder`.
+    """
+    if isinstance(obj, typing.Mapping):
+        return {
+            key if type(key) is str else jsonable_encoder(key): _encode_json_native(value)
+            for key, value in obj.items()
+            if omit is None or value is not omit
+        }
+    return _encode_json_native(obj)
+
+
+def maybe_filter_request_body(
+    data: typing.Optional[typing.Any],
+    request_options: typing.Optional[RequestOptions],
+    omit: typing.Optional[typing.Any],
+) -> typing.Optional[typing.Any]:
+    if data is None:
+        return (
+            encode_request_body(request_options.get("additional_body_parameters", {}))
+            if request_options is not None
+            else None
+        )
+    elif not isinstance(data, typing.Mapping):
+        data_content = encode_request_body(data)
+    else:
+        data_content = encode_request_body(data, omit)
+        if request_options is not None and request_options.get("additional_body_parameters"):
+            data_content.update(encode_request_body(request_options["additional_body_parameters"]))
+    return data_content
+
+
+class ExtendedHttpClient(HttpClient):
+    """
+    `HttpClient` with a retry policy and budget, response caching, request coalescing, hooks and tracing. Requests are
+    encoded once by `build_request`, and their JSON bodies serialized by the JSON codec of the client.
+    """
+
+    def __init__(
+        self,
+        *,
+        httpx_client: httpx.Client,
+        base_timeout: typing.Optional[float],
+        base_headers: typing.Dict[str, str],
+        base_url: typing.Optional[str] = None,
+        retry_policy: typing.Optional[RetryPolicy] = None,
+        retry_budget: typing.Optional[RetryBudget] = None,
+        json_codec: typing.Optional[JsonCodec] = None,
+        response_cache: typing.Optional[ResponseCache] = None,
+        coalesce_endpoints: typing.Collection[str] = (),
+        stream_metrics_sink: typing.Optional["StreamMetricsSink"] = None,
+        hooks: typing.Sequence[RequestHook] = (),
+        tracing: typing.Optional["Tracing"] = None,
+    ):
+        super().__init__(
+            httpx_client=httpx_client, base_timeout=base_timeout, base_headers=base_headers, base_url=base_url
+        )
+        self.retry_policy = retry_policy if retry_policy is not None else RetryPolicy()
+        self.retry_budget = retry_budget
+        self.json_codec = json_codec if json_codec is not None else JsonCodec()
+        self.response_cache = response_cache
+        self.coalesce_endpoints = frozenset(coalesce_endpoints)
+        self.stream_metrics_sink = stream_metrics_sink
+        self.tracing = tracing
+        if tracing is not None:
+            hooks = (*hooks, tracing)
+        # None rather than an empty chain, so that requests made without hooks skip them altogether.
+        self.hooks = HookChain(hooks) if hooks else None
+        self.single_flight = SingleFlight()
+
+    def warm_up(self, *, connections: int, base_url: typing.Optional[str] = None) -> int:
+        """
+        Sends `connections` concurrent HEAD requests to the base url, at most one per connection the pool allows, so
+        that the connections they open are kept alive in the pool. Returns the number of successful requests, which
+        can be more than the connections opened when a request reuses the connection of one that already completed.
+        """
+        url = f"{self.get_base_url(base_url)}/"
+
+        def _open_connection(_: int) -> bool:
+            try:
+                self.httpx_client.head(url)
+                return True
+            except httpx.HTTPError:
+                return False
+
+        max_connections = _max_connections(self.httpx_client)
+        if max_connections is not None:
+            connections = min(connections, max_connections)
+        if connections <= 0:
+            return 0
+        with ThreadPoolExecutor(max_workers=connections) as executor:
+            return sum(executor.map(_open_connection, range(connections)))
+
+    def build_request(
+        self,
+        path: typing.Optional[str] = None,
+        *,
+        method: str,
+        base_url: typing.Optional[str] = None,
+        params: typing.Optional[typing.Dict[str, typing.Any]] = None,
+        json: typing.Optional[typing.Any] = None,
+        data: typing.Optional[typing.Any] = None,
+        content: typing.Optional[typing.Union[bytes, typing.Iterator[bytes], typing.AsyncIterator[bytes]]] = None,
+        files: typing.Optional[typing.Dict[str, typing.Optional[typing.Union[File, typing.List[File]]]]] = None,
+        headers: typing.Optional[typing.Dict[str, typing.Any]] = None,
+        request_options: typing.Optional[RequestOptions] = None,
+        omit: typing.Optional[typing.Any] = None,
+    ) -> httpx.Request:
+        """
+        Encodes the request once, so that it can be sent (and re-sent on retries) without re-encoding it.
+        """
+        base_url = self.get_base_url(base_url)
+        timeout = (
+            request_options.get("timeout_in_seconds")
+            if request_options is not None and request_options.get("timeout_in_seconds") is not None
+            else self.base_timeout
+        )
+        if json is not None and content is not None:
+            raise ValueError("A request body can be given as json or as content, not both.")
+        # JSON bodies are serialized by the codec straight to bytes, rather than by httpx with the json module.
+        json_body = maybe_filter_request_body(json, request_options, omit)
+        if json_body is not None and content is None:
+            content = self.json_codec.dumps(json_body)
+            json_headers: typing.Dict[str, str] = {"Content-Type": "application/json"}
+        else:
+            json_headers = {}
+
+        return self.httpx_client.build_request(
+            method=method,
+            url=urllib.parse.urljoin(f"{base_url}/", path),
+            headers=jsonable_encoder(
+                remove_none_from_dict(
+                    {
+                        **json_headers,
+                        **self.base_headers,
+                        **(self.tracing.headers() if self.tracing is not None else {}),
+                        **(headers if headers is not None else {}),
+                        **(request_options.get("additional_headers", {}) if request_options is not None else {}),
+                    }
+                )
+            ),
+            params=encode_query(
+                jsonable_encoder(
+                    remove_none_from_dict(
+                        remove_omit_from_dict(
+                            {
+                                **(params if params is not None else {}),
+                                **(
+                                    request_options.get("additional_query_parameters", {})
+                                    if request_options is not None
+                                    else {}
+                                ),
+                            },
+                            omit,
+                        )
+                    )
+                )
+            ),
+            data=maybe_filter_request_body(data, request_options, omit),
+            content=content,
+            files=convert_file_dict_to_httpx_tuples(remove_none_from_dict(files)) if files is not None else None,
+            timeout=timeout,
+        )
+
+    def request(
+        self,
+        path: typing.Optional[str] = None,
+        *,
+        method: str,
+        base_url: typing.Optional[str] = None,
+        params: typing.Optional[typing.Dict[str, typing.Any]] = None,
+        json: typing.Optional[typing.Any] = None,
+        data: typing.Optional[typing.Any] = None,
+        content: typing.Optional[typing.Union[bytes, typing.Iterator[bytes], typing.AsyncIterator[bytes]]] = None,
+        files: typing.Optional[typing.Dict[str, typing.Optional[typing.Union[File, typing.List[File]]]]] = None,
+        headers: typing.Optional[typing.Dict[str, typing.Any]] = None,
+        request_options: typing.Optional[RequestOptions] = None,
+        retries: int = 0,
+        omit: typing.Optional[typing.Any] = None,
+        cache: bool = False,
+        endpoint: typing.Optional[str] = None,
+    ) -> httpx.Response:
+        """
+        Sends the request, retrying it as allowed by the retry policy and budget.
+
+        With `cache`, successful responses are stored in the response cache of this client, if it has one, and
+        returned for identical requests until they expire. When `endpoint` is one of the `coalesce_endpoints` of
+        this client, identical requests made while this one is in flight share its response.
+        """
+        request = self.build_request(
+            path,
+            method=method,
+            base_url=base_url,
+            params=params,
+            json=json,
+            data=data,
+            content=content,
+            files=files,
+            headers=headers,
+            request_options=request_options,
+            omit=omit,
+        )
+        response_cache = self.response_cache if cache else None
+        coalesce = endpoint is not None and endpoint in self.coalesce_endpoints
+        key = get_cache_key(request) if response_cache is not None or coalesce else None
+
+        def send() -> httpx.Response:
+            return self._send(
+                request,
+                request_options=request_options,
+                retries=retries,
+                replayable=_is_replayable(content),
+                response_cache=response_cache,
+                key=key,
+                endpoint=endpoint,
+            )
+
+        if coalesce and key is not None:
+            return self.single_flight.do(key, send)
+        return send()
+
+    def _send(
+        self,
+        request: httpx.Request,
+        *,
+        request_options: typing.Optional[RequestOptions],
+        retries: int,
+        replayable: bool,
+        response_cache: typing.Optional[ResponseCache],
+        key: typing.Optional[str],
+        endpoint: typing.Optional[str] = None,
+    ) -> httpx.Response:
+        if response_cache is not None and key is not None:
+            cached = response_cache.get(key)
+            if cached is not None:
+                return _cached_response(request, cached)
+
+        max_retries: int = request_options.get("max_retries", 0) if request_options is not None else 0
+        if self.retry_budget is not None:
+            self.retry_budget.deposit()
+
+        hooked = (
+            self.hooks.start(endpoint=endpoint or request.url.path, request=request, attempt=retries)
+            if self.hooks is not None
+            else None
+        )
+        while True:
+            if hooked is not None:
+                hooked.before_send()
+                try:
+                    response = self.httpx_client.send(request)
+                except Exception as e:
+                    hooked.on_error(e)
+                    raise
+                hooked.after_response(response)
+            else:
+                response = self.httpx_client.send(request)
+            if retries >= max_retries or not replayable or not self.retry_policy.should_retry(response):
+                break
+            delay = self.retry_policy.retry_timeout(response=response, retries=retries)
+            if not can_retry_within_deadline(delay) or (
+                self.retry_budget is not None and not self.retry_budget.try_withdraw()
+            ):
+                break
+            response.close()
+            if hooked is not None:
+                hooked.on_retry(response, delay)
+            time.sleep(delay)
+            retries += 1
+
+        if response_cache is not None and key is not None and 200 <= response.status_code < 300:
+            response_cache.set(key, response.content)
+        return response
+
+    @contextmanager
+    def stream(
+        self,
+        path: typing.Optional[str] = None,
+        *,
+        method: str,
+        base_url: typing.Optional[str] = None,
+        params: typing.Optional[typing.Dict[str, typing.Any]] = None,
+        json: typing.Optional[typing.Any] = None,
+        data: typing.Optional[typing.Any] = None,
+        content: typing.Optional[typing.Union[bytes, typing.Iterator[bytes], typing.AsyncIterator[bytes]]] = None,
+        files: typing.Optional[typing.Dict[str, typing.Optional[typing.Union[File, typing.List[File]]]]] = None,
+        headers: typing.Optional[typing.Dict[str, typing.Any]] = None,
+        request_options: typing.Optional[RequestOptions] = None,
+        retries: int = 0,
+        omit: typing.Optional[typing.Any] = None,
+    ) -> typing.Iterator[httpx.Response]:
+        request = self.build_request(
+            path,
+            method=method,
+            base_url=base_url,
+            params=params,
+            json=json,
+            data=data,
+            content=content,
+            files=files,
+            headers=headers,
+            request_options=request_options,
+            omit=omit,
+        )
+        with self.stream_request(request) as response:
+            yield response
+
+    @contextmanager
+    def stream_request(self, request: httpx.Request) -> typing.Iterator[httpx.Response]:
+        """
+        Sends a request built with `build_request` and streams its response, closing it on exit.
+        """
+        response = self.httpx_client.send(request, stream=True)
+        try:
+            yield response
+        finally:
+            response.close()
+
+
+class ExtendedAsyncHttpClient(AsyncHttpClient):
+    """
+    `AsyncHttpClient` with a retry policy and budget, response caching, request coalescing, hooks and tracing. Requests are
+    encoded once by `build_request`, and their JSON bodies serialized by the JSON codec of the client.
+    """
+
+    def __init__(
+        self,
+        *,
+        httpx_client: httpx.AsyncClient,
+        base_timeout: typing.Optional[float],
+        base_headers: typing.Dict[str, str],
+        base_url: typing.Optional[str] = None,
+        retry_policy: typing.Optional[RetryPolicy] = None,
+        retry_budget: typing.Optional[RetryBudget] = None,
+        json_codec: typing.Optional[JsonCodec] = None,
+        response_cache: typing.Optional[ResponseCache] = None,
+        coalesce_endpoints: typing.Collection[str] = (),
+        stream_metrics_sink: typing.Optional["StreamMetricsSink"] = None,
+        hooks: typing.Sequence[RequestHook] = (),
+        tracing: typing.Optional["Tracing"] = None,
+    ):
+        super().__init__(
+            httpx_client=httpx_client, base_timeout=base_timeout, base_headers=base_headers, base_url=base_url
+        )
+        self.retry_policy = retry_policy if retry_policy is not None else RetryPolicy()
+        self.retry_budget = retry_budget
+        self.json_codec = json_codec if json_codec is not None else JsonCodec()
+        self.response_cache = response_cache
+        self.coalesce_endpoints = frozenset(coalesce_endpoints)
+        self.stream_metrics_sink = stream_metrics_sink
+        self.tracing = tracing
+        if tracing is not None:
+            hooks = (*hooks, tracing)
+        # None rather than an empty chain, so that requests made without hooks skip them altogether.
+        self.hooks = HookChain(hooks) if hooks else None
+        self.single_flight = AsyncSingleFlight()
+
+    async def warm_up(self, *, connections: int, base_url: typing.Optional[str] = None) -> int:
+        """
+        Sends `connections` concurrent HEAD requests to the base url, at most one per connection the pool allows, so
+        that the connections they open are kept alive in the pool. Returns the number of successful requests, which
+        can be more than the connections opened when a request reuses the connection of one that already completed.
+        """
+        url = f"{self.get_base_url(base_url)}/"
+
+        async def _open_connection() -> bool:
+            try:
+                await self.httpx_client.head(url)
+                return True
+            except httpx.HTTPError:
+                return False
+
+        max_connections = _max_connections(self.httpx_client)
+        if max_connections is not None:
+            connections = min(connections, max_connections)
+        if connections <= 0:
+            return 0
+        return sum(await asyncio.gather(*(_open_connection() for _ in range(connections))))
+
+    def build_request(
+        self,
+        path: typing.Optional[str] = None,
+        *,
+        method: str,
+        base_url: typing.Optional[str] = None,
+        params: typing.Optional[typing.Dict[str, typing.Any]] = None,
+        json: typing.Optional[typing.Any] = None,
+        data: typing.Optional[typing.Any] = None,
+        content: typing.Optional[typing.Union[bytes, typing.Iterator[bytes], typing.AsyncIterator[bytes]]] = None,
+        files: typing.Optional[typing.Dict[str, typing.Optional[typing.Union[File, typing.List[File]]]]] = None,
+        headers: typing.Optional[typing.Dict[str, typing.Any]] = None,
+        request_options: typing.Optional[RequestOptions] = None,
+        omit: typing.Optional[typing.Any] = None,
+    ) -> httpx.Request:
+        """
+        Encodes the request once, so that it can be sent (and re-sent on retries) without re-encoding it.
+        """
+        base_url = self.get_base_url(base_url)
+        timeout = (
+            request_options.get("timeout_in_seconds")
+            if request_options is not None and request_options.get("timeout_in_seconds") is not None
+            else self.base_timeout
+        )
+        if json is not None and content is not None:
+            raise ValueError("A request body can be given as json or as content, not both.")
+        # JSON bodies are serialized by the codec straight to bytes, rather than by httpx with the json module.
+        json_body = maybe_filter_request_body(json, request_options, omit)
+        if json_body is not None and content is None:
+            content = self.json_codec.dumps(json_body)
+            json_headers: typing.Dict[str, str] = {"Content-Type": "application/json"}
+        else:
+            json_headers = {}
+
+        return self.httpx_client.build_request(
+            method=method,
+            url=urllib.parse.urljoin(f"{base_url}/", path),
+            headers=jsonable_encoder(
+                remove_none_from_dict(
+                    {
+                        **json_headers,
+                        **self.base_headers,
+                        **(self.tracing.headers() if self.tracing is not None else {}),
+                        **(headers if headers is not None else {}),
+                        **(request_options.get("additional_headers", {}) if request_options is not None else {}),
+                    }
+                )
+            ),
+            params=encode_query(
+                jsonable_encoder(
+                    remove_none_from_dict(
+                        remove_omit_from_dict(
+                            {
+                                **(params if params is not None else {}),
+                                **(
+                                    request_options.get("additional_query_parameters", {})
+                                    if request_options is not None
+                                    else {}
+                                ),
+                            },
+                            omit,
+                        )
+                    )
+                )
+            ),
+            data=maybe_filter_request_body(data, request_options, omit),
+            content=content,
+            files=convert_file_dict_to_httpx_tuples(remove_none_from_dict(files)) if files is not None else None,
+            timeout=timeout,
+        )
+
+    async def request(
+        self,
+        path: typing.Optional[str] = None,
+        *,
+        method: str,
+        base_url: typing.Optional[str] = None,
+        params: typing.Optional[typing.Dict[str, typing.Any]] = None,
+        json: typing.Optional[typing.Any] = None,
+        data: typing.Optional[typing.Any] = None,
+        content: typing.Optional[typing.Union[bytes, typing.Iterator[bytes], typing.AsyncIterator[bytes]]] = None,
+        files: typing.Optional[typing.Dict[str, typing.Optional[typing.Union[File, typing.List[File]]]]] = None,
+        headers: typing.Optional[typing.Dict[str, typing.Any]] = None,
+        request_options: typing.Optional[RequestOptions] = None,
+        retries: int = 0,
+        omit: typing.Optional[typing.Any] = None,
+        cache: bool = False,
+        endpoint: typing.Optional[str] = None,
+    ) -> httpx.Response:
+        """
+        Sends the request, retrying it as allowed by the retry policy and budget.
+
+        With `cache`, successful responses are stored in the response cache of this client, if it has one, and
+        returned for identical requests until they expire. When `endpoint` is one of the `coalesce_endpoints` of
+        this client, identical requests made while this one is in flight share its response.
+        """
+        request = self.build_request(
+            path,
+            method=method,
+            base_url=base_url,
+            params=params,
+            json=json,
+            data=data,
+            content=content,
+            files=files,
+            headers=headers,
+            request_options=request_options,
+            omit=omit,
+        )
+        response_cache = self.response_cache if cache else None
+        coalesce = endpoint is not None and endpoint in self.coalesce_endpoints
+        key = get_cache_key(request) if response_cache is not None or coalesce else None
+
+        async def send() -> httpx.Response:
+            return await self._send(
+                request,
+                request_options=request_options,
+                retries=retries,
+                replayable=_is_replayable(content),
+                response_cache=response_cache,
+                key=key,
+                endpoint=endpoint,
+            )
+
+        if coalesce and key is not None:
+            return await self.single_flight.do(key, send)
+        return await send()
+
+    async def _send(
+        self,
+        request: httpx.Request,
+        *,
+        request_options: typing.Optional[RequestOptions],
+        retries: int,
+        replayable: bool,
+        response_cache: typing.Optional[ResponseCache],
+        key: typing.Optional[str],
+        endpoint: typing.Optional[str] = None,
+    ) -> httpx.Response:
+        if response_cache is not None and key is not None:
+            cached = response_cache.get(key)
+            if cached is not None:
+                return _cached_response(request, cached)
+
+        max_retries: int = request_options.get("max_retries", 0) if request_options is not None else 0
+        if self.retry_budget is not None:
+            self.retry_budget.deposit()
+
+        hooked = (
+            self.hooks.start(endpoint=endpoint or request.url.path, request=request, attempt=retries)
+            if self.hooks is not None
+            else None
+        )
+        while True:
+            if hooked is not None:
+                hooked.before_send()
+                try:
+                    response = await self.httpx_client.send(request)
+                except Exception as e:
+                    hooked.on_error(e)
+                    raise
+                hooked.after_response(response)
+            else:
+                response = await self.httpx_client.send(request)
+            if retries >= max_retries or not replayable or not self.retry_policy.should_retry(response):
+                break
+            delay = self.retry_policy.retry_timeout(response=response, retries=retries)
+            if not can_retry_within_deadline(delay) or (
+                self.retry_budget is not None and not self.retry_budget.try_withdraw()
+            ):
+                break
+            await response.aclose()
+            if hooked is not None:
+                hooked.on_retry(response, delay)
+            await asyncio.sleep(delay)
+            retries += 1
+
+        if response_cache is not None and key is not None and 200 <= response.status_code < 300:
+            response_cache.set(key, response.content)
+        return response
+
+    @asynccontextmanager
+    async def stream(
+        self,
+        path: typing.Optional[str] = None,
+        *,
+        method: str,
+        base_url: typing.Optional[str] = None,
+        params: typing.Optional[typing.Dict[str, typing.Any]] = None,
+        json: typing.Optional[typing.Any] = None,
+        data: typing.Optional[typing.Any] = None,
+        content: typing.Optional[typing.Union[bytes, typing.Iterator[bytes], typing.AsyncIterator[bytes]]] = None,
+        files: typing.Optional[typing.Dict[str, typing.Optional[typing.Union[File, typing.List[File]]]]] = None,
+        headers: typing.Optional[typing.Dict[str, typing.Any]] = None,
+        request_options: typing.Optional[RequestOptions] = None,
+        retries: int = 0,
+        omit: typing.Optional[typing.Any] = None,
+    ) -> typing.AsyncIterator[httpx.Response]:
+        request = self.build_request(
+            path,
+            method=method,
+            base_url=base_url,
+            params=params,
+            json=json,
+            data=data,
+            content=content,
+            files=files,
+            headers=headers,
+            request_options=request_options,
+            omit=omit,
+        )
+        async with self.stream_request(request) as response:
+            yield response
+
+    @asynccontextmanager
+    async def stream_request(self, request: httpx.Request) -> typing.AsyncIterator[httpx.Response]:
+        """
+        Sends a request built with `build_request` and streams its response, closing it on exit.
+        """
+        response = await self.httpx_client.send(request, stream=True)
+        try:
+            yield response
+        finally:
+            await response.aclose()
@@ -0,0 +1,28 @@
+import typing
+
+try:
+    from typing import NotRequired  # type: ignore
+except ImportError:
+    from typing_extensions import NotRequired  # type: ignore
+
+from .request_options import RequestOptions
+
+ResponseMode = typing.Literal["model", "view", "raw"]
+
+
+class ExtendedRequestOptions(RequestOptions):
+    """
+    `RequestOptions` with the options understood by the clients of `multion.client`. They can be passed wherever
+    `RequestOptions` are expected.
+
+    Attributes:
+        - response_mode: ResponseMode. Overrides the client's response mode for this call: "model" returns pydantic models, "view" returns lightweight read-only views over the JSON and "raw" returns the decoded JSON. The methods are annotated with the models, cast the results of the other modes to `ResponseView` or `dict`.
+    """
+
+    response_mode: NotRequired[ResponseMode]
+
+
+def get_response_mode(request_options: typing.Optional[RequestOptions]) -> typing.Optional[ResponseMode]:
+    if request_options is None:
+        return None
+    return typing.cast(ExtendedRequestOptions, request_options).get("response_mode")
@@ -0,0 +1,103 @@
+import time
+import typing
+
+import httpx
+
+
+class RequestContext:
+    """
+    What the hooks of a client know about a request being sent: the endpoint it was made for, e.g. "browse" or
+    "sessions.step", the `httpx.Request` itself, which the `before_send` hooks may modify, and the attempt being
+    made, starting at 0. `state` is a dict the hooks can use to keep data from one call to the next.
+    """
+
+    __slots__ = ("endpoint", "request", "attempt", "started_at", "sent_at", "state")
+
+    def __init__(self, *, endpoint: str, request: httpx.Request, attempt: int = 0):
+        self.endpoint = endpoint
+        self.request = request
+        self.attempt = attempt
+        self.started_at = self.sent_at = time.monotonic()
+        self.state: typing.Dict[str, typing.Any] = {}
+
+    @property
+    def elapsed(self) -> float:
+        """
+        The number of seconds since the current attempt was sent.
+        """
+        return time.monotonic() - self.sent_at
+
+
+class RequestHook:
+    """
+    Called at each stage of the requests made by a client, see the `hooks` of the client. Subclass it and override
+    the methods needed, all of them do nothing by default.
+
+    Hooks are called in the order they were given, on the thread or event loop making the request, so they should
+    not block. An exception raised by a hook is raised to the caller and aborts the request. Streams opened by
+    `sessions.step_stream` report their timings to the `stream_metrics_sink` of the client instead.
+    """
+
+    def before_send(self, context: RequestContext) -> None:
+        """
+        Called before each attempt is sent, including retries.
+        """
+
+    def after_response(self, context: RequestContext, response: httpx.Response) -> None:
+        """
+        Called with the response of each attempt, including the attempts that are retried.
+        """
+
+    def on_retry(self, context: RequestContext, response: httpx.Response, delay: float) -> None:
+        """
+        Called when the response of an attempt is going to be retried after `delay` seconds.
+        """
+
+    def on_error(self, context: RequestContext, exception: Exception) -> None:
+        """
+        Called when an attempt fails without a response, e.g. on timeouts and connection errors.
+        """
+
+
+class HookChain:
+    """
+    Calls each of a sequence of hooks in turn.
+    """
+
+    __slots__ = ("hooks",)
+
+    def __init__(self, hooks: typing.Sequence[RequestHook]):
+        self.hooks = tuple(hooks)
+
+    def start(self, *, endpoint: str, request: httpx.Request, attempt: int) -> "HookedRequest":
+        return HookedRequest(self.hooks, RequestContext(endpoint=endpoint, request=request, attempt=attempt))
+
+
+class HookedRequest:
+    """
+    Calls the hooks of a client for each stage of one request.
+    """
+
+    __slots__ = ("hooks", "context")
+
+    def __init__(self, hooks: typing.Tuple[RequestHook, ...], context: RequestContext):
+        self.hooks = hooks
+        self.context = context
+
+    def before_send(self) -> None:
+        self.context.sent_at = time.monotonic()
+        for hook in self.hooks:
+            hook.before_send(self.context)
+
+    def after_response(self, response: httpx.Response) -> None:
+        for hook in self.hooks:
+            hook.after_response(self.context, response)
+
+    def on_retry(self, response: httpx.Response, delay: float) -> None:
+        for hook in self.hooks:
+            hook.on_retry(self.context, response, delay)
+        self.context.attempt += 1
+
+    def on_error(self, exception: Exception) -> None:
+        for hook in self.hooks:
+            hook.on_error(self.context, exception)
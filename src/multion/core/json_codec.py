@@ -0,0 +1,83 @@
+import json
+import typing
+from json.decoder import JSONDecodeError
+
+
+class JsonCodec:
+    """
+    Serializes request bodies to bytes and parses response bodies, using the standard library `json` module.
+
+    It is the codec of clients by default. Subclasses can plug in faster libraries, e.g. `OrjsonCodec` and
+    `MsgspecCodec`, or whichever of them `auto_codec` finds installed, given as the `json_codec` of a client: they must return `bytes` from `dumps`, accept both `bytes` and `str` in
+    `loads` and raise `json.JSONDecodeError` for malformed documents.
+    """
+
+    name = "json"
+
+    def dumps(self, obj: typing.Any) -> bytes:
+        return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+    def loads(self, data: typing.Union[bytes, str]) -> typing.Any:
+        return json.loads(data)
+
+
+class OrjsonCodec(JsonCodec):
+    """
+    A `JsonCodec` backed by orjson, which can be installed with `pip install orjson`.
+    """
+
+    name = "orjson"
+
+    def __init__(self) -> None:
+        try:
+            import orjson  # type: ignore
+        except ImportError as e:
+            raise ImportError("OrjsonCodec requires orjson, install it with `pip install orjson`.") from e
+        self._orjson = orjson
+
+    def dumps(self, obj: typing.Any) -> bytes:
+        return self._orjson.dumps(obj, option=self._orjson.OPT_NON_STR_KEYS)
+
+    def loads(self, data: typing.Union[bytes, str]) -> typing.Any:
+        # orjson.JSONDecodeError is a subclass of json.JSONDecodeError.
+        return self._orjson.loads(data)
+
+
+class MsgspecCodec(JsonCodec):
+    """
+    A `JsonCodec` backed by msgspec, which can be installed with `pip install msgspec`.
+    """
+
+    name = "msgspec"
+
+    def __init__(self) -> None:
+        try:
+            import msgspec  # type: ignore
+        except ImportError as e:
+            raise ImportError("MsgspecCodec requires msgspec, install it with `pip install msgspec`.") from e
+        self._decode_error = msgspec.DecodeError
+        self._encoder = msgspec.json.Encoder()
+        self._decoder = msgspec.json.Decoder()
+
+    def dumps(self, obj: typing.Any) -> bytes:
+        return self._encoder.encode(obj)
+
+    def loads(self, data: typing.Union[bytes, str]) -> typing.Any:
+        try:
+            return self._decoder.decode(data)
+        except self._decode_error as e:
+            document = data.decode("utf-8", errors="replace") if isinstance(data, bytes) else data
+            raise JSONDecodeError(str(e), document, 0) from e
+
+
+def auto_codec() -> JsonCodec:
+    """
+    Returns the fastest codec available: an `OrjsonCodec` when orjson is installed, a `MsgspecCodec` when msgspec is,
+    and a `JsonCodec` otherwise.
+    """
+    for codec_class in (OrjsonCodec, MsgspecCodec):
+        try:
+            return codec_class()
+        except ImportError:
+            pass
+    return JsonCodec()
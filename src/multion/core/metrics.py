@@ -0,0 +1,229 @@
+import threading
+import typing
+
+import httpx
+
+from .hooks import RequestContext, RequestHook
+
+DEFAULT_PROMETHEUS_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 180.0)
+"""
+The upper bounds, in seconds, of the buckets of the latency histograms exported to Prometheus.
+"""
+
+
+class LatencyHistogram:
+    """
+    A histogram of latencies in the manner of HdrHistogram: values are recorded in microseconds into buckets whose
+    width grows with the values, so that any value is known within a relative error of `2 ** -significant_bits`
+    (under 1% by default) while the memory used only grows with the logarithm of the range of values.
+
+    It is not thread safe, `MetricsCollector` records into it under a lock.
+    """
+
+    __slots__ = ("significant_bits", "count", "total", "min", "max", "_sub_buckets", "_counts")
+
+    def __init__(self, *, significant_bits: int = 7):
+        self.significant_bits = significant_bits
+        self.count = 0
+        self.total = 0.0
+        self.min: typing.Optional[float] = None
+        self.max: typing.Optional[float] = None
+        self._sub_buckets = 1 << significant_bits
+        self._counts: typing.Dict[int, int] = {}
+
+    def record(self, seconds: float) -> None:
+        index = self._index(max(int(seconds * 1_000_000), 0))
+        self._counts[index] = self._counts.get(index, 0) + 1
+        self.count += 1
+        self.total += seconds
+        self.min = seconds if self.min is None else min(self.min, seconds)
+        self.max = seconds if self.max is None else max(self.max, seconds)
+
+    @property
+    def mean(self) -> typing.Optional[float]:
+        return self.total / self.count if self.count else None
+
+    def percentile(self, percentile: float) -> typing.Optional[float]:
+        """
+        The latency, in seconds, under which `percentile` percent of the values recorded fall.
+        """
+        if not self.count:
+            return None
+        rank = max(percentile / 100 * self.count, 1)
+        seen = 0
+        for index in sorted(self._counts):
+            seen += self._counts[index]
+            if seen >= rank:
+                # The highest value of the bucket, bounded by the values actually recorded.
+                upper = (self._upper_bound(index) - 1) / 1_000_000
+                return min(max(upper, typing.cast(float, self.min)), typing.cast(float, self.max))
+        return self.max
+
+    def cumulative_counts(self, bounds: typing.Sequence[float]) -> typing.List[int]:
+        """
+        The number of values up to each of `bounds`, in seconds, within the precision of the histogram.
+        """
+        counts = [0] * len(bounds)
+        for index, count in self._counts.items():
+            value = self._lower_bound(index) / 1_000_000
+            for i, bound in enumerate(bounds):
+                if value <= bound:
+                    counts[i] += count
+        return counts
+
+    def to_dict(self) -> typing.Dict[str, typing.Any]:
+        return {
+            "count": self.count,
+            "sum": self.total,
+            "min": self.min,
+            "max": self.max,
+            "mean": self.mean,
+            "p50": self.percentile(50),
+            "p90": self.percentile(90),
+            "p99": self.percentile(99),
+            "p999": self.percentile(99.9),
+        }
+
+    def _index(self, value: int) -> int:
+        # Values below twice the number of sub-buckets are recorded exactly, larger ones keep their top bits.
+        shift = max(value.bit_length() - self.significant_bits - 1, 0)
+        return shift * self._sub_buckets + (value >> shift)
+
+    def _lower_bound(self, index: int) -> int:
+        shift = max(index // self._sub_buckets - 1, 0)
+        return (index - shift * self._sub_buckets) << shift
+
+    def _upper_bound(self, index: int) -> int:
+        shift = max(index // self._sub_buckets - 1, 0)
+        return (index - shift * self._sub_buckets + 1) << shift
+
+
+class EndpointMetrics:
+    """
+    The metrics a `MetricsCollector` keeps for one endpoint: the latency of each attempt, the number of attempts
+    answered with each status code, of retries and of attempts that failed without a response.
+    """
+
+    __slots__ = ("latency", "status_codes", "retries", "errors")
+
+    def __init__(self, *, significant_bits: int):
+        self.latency = LatencyHistogram(significant_bits=significant_bits)
+        self.status_codes: typing.Dict[int, int] = {}
+        self.retries = 0
+        self.errors = 0
+
+    @property
+    def requests(self) -> int:
+        return sum(self.status_codes.values()) + self.errors
+
+    def to_dict(self) -> typing.Dict[str, typing.Any]:
+        return {
+            "requests": self.requests,
+            "retries": self.retries,
+            "errors": self.errors,
+            "status_codes": dict(self.status_codes),
+            "latency": self.latency.to_dict(),
+        }
+
+
+class MetricsCollector(RequestHook):
+    """
+    A request hook keeping, for each endpoint, a histogram of the latency of the requests sent, and counts of
+    their status codes, retries and errors. The metrics can be exported as a dict with `to_dict`, or in the
+    Prometheus text format with `to_prometheus`, e.g. from the handler of a `/metrics` route.
+
+    Examples
+    --------
+    from multion.client import MultiOn
+    from multion.core.metrics import MetricsCollector
+
+    metrics = MetricsCollector()
+    client = MultiOn(api_key="YOUR_API_KEY", hooks=[metrics])
+    client.browse(cmd="Find the top post on Hacker News", url="https://news.ycombinator.com")
+    print(metrics.to_dict()["browse"]["latency"]["p99"])
+    """
+
+    def __init__(
+        self,
+        *,
+        significant_bits: int = 7,
+        prefix: str = "multion",
+        buckets: typing.Sequence[float] = DEFAULT_PROMETHEUS_BUCKETS,
+    ):
+        self.significant_bits = significant_bits
+        self.prefix = prefix
+        self.buckets = tuple(sorted(buckets))
+        self._endpoints: typing.Dict[str, EndpointMetrics] = {}
+        self._lock = threading.Lock()
+
+    def after_response(self, context: RequestContext, response: httpx.Response) -> None:
+        latency = context.elapsed
+        with self._lock:
+            metrics = self._endpoint(context.endpoint)
+            metrics.latency.record(latency)
+            metrics.status_codes[response.status_code] = metrics.status_codes.get(response.status_code, 0) + 1
+
+    def on_retry(self, context: RequestContext, response: httpx.Response, delay: float) -> None:
+        with self._lock:
+            self._endpoint(context.endpoint).retries += 1
+
+    def on_error(self, context: RequestContext, exception: Exception) -> None:
+        latency = context.elapsed
+        with self._lock:
+            metrics = self._endpoint(context.endpoint)
+            metrics.latency.record(latency)
+            metrics.errors += 1
+
+    def endpoint(self, endpoint: str) -> typing.Optional[EndpointMetrics]:
+        with self._lock:
+            return self._endpoints.get(endpoint)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._endpoints = {}
+
+    def to_dict(self) -> typing.Dict[str, typing.Dict[str, typing.Any]]:
+        with self._lock:
+            return {endpoint: metrics.to_dict() for endpoint, metrics in sorted(self._endpoints.items())}
+
+    def to_prometheus(self) -> str:
+        """
+        The metrics in the Prometheus text exposition format. Latencies are exported as histograms with the
+        `buckets` of this collector, counted within the precision of the underlying histograms.
+        """
+        prefix = self.prefix
+        lines = [
+            f"# HELP {prefix}_request_duration_seconds The latency of the requests sent to the MultiOn API.",
+            f"# TYPE {prefix}_request_duration_seconds histogram",
+        ]
+        with self._lock:
+            endpoints = sorted(self._endpoints.items())
+            for endpoint, metrics in endpoints:
+                label = f'endpoint="{endpoint}"'
+                counts = metrics.latency.cumulative_counts(self.buckets)
+                for bound, count in zip(self.buckets, counts):
+                    lines.append(f'{prefix}_request_duration_seconds_bucket{{{label},le="{bound}"}} {count}')
+                histogram = metrics.latency
+                lines.append(f'{prefix}_request_duration_seconds_bucket{{{label},le="+Inf"}} {histogram.count}')
+                lines.append(f"{prefix}_request_duration_seconds_sum{{{label}}} {histogram.total}")
+                lines.append(f"{prefix}_request_duration_seconds_count{{{label}}} {histogram.count}")
+            lines.append(f"# HELP {prefix}_responses_total The responses received, by status code.")
+            lines.append(f"# TYPE {prefix}_responses_total counter")
+            for endpoint, metrics in endpoints:
+                for status_code, count in sorted(metrics.status_codes.items()):
+                    lines.append(f'{prefix}_responses_total{{endpoint="{endpoint}",status="{status_code}"}} {count}')
+            lines.append(f"# HELP {prefix}_retries_total The requests retried.")
+            lines.append(f"# TYPE {prefix}_retries_total counter")
+            for endpoint, metrics in endpoints:
+                lines.append(f'{prefix}_retries_total{{endpoint="{endpoint}"}} {metrics.retries}')
+            lines.append(f"# HELP {prefix}_errors_total The requests that failed without a response.")
+            lines.append(f"# TYPE {prefix}_errors_total counter")
+            for endpoint, metrics in endpoints:
+                lines.append(f'{prefix}_errors_total{{endpoint="{endpoint}"}} {metrics.errors}')
+        return "\n".join(lines) + "\n"
+
+    def _endpoint(self, endpoint: str) -> EndpointMetrics:
+        metrics = self._endpoints.get(endpoint)
+        if metrics is None:
+            metrics = self._endpoints[endpoint] = EndpointMetrics(significant_bits=self.significant_bits)
+        return metrics
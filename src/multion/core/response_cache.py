@@ -0,0 +1,171 @@
+import abc
+import collections
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+import typing
+
+import httpx
+
+
+class ResponseCache(abc.ABC):
+    """
+    Stores the bodies of successful responses for `ttl` seconds, keyed by a hash of their request.
+
+    Subclasses implement `_load`, `_store` and `clear`. `hits` and `misses` count the lookups made through `get`.
+    """
+
+    def __init__(self, *, ttl: float = 300.0):
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._stats_lock = threading.Lock()
+
+    def get(self, key: str) -> typing.Optional[bytes]:
+        value = self._load(key, time.time())
+        with self._stats_lock:
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return value
+
+    def set(self, key: str, value: bytes) -> None:
+        self._store(key, value, time.time() + self.ttl)
+
+    @abc.abstractmethod
+    def _load(self, key: str, now: float) -> typing.Optional[bytes]:
+        """
+        Returns the value stored for `key` unless it expired by `now`.
+        """
+
+    @abc.abstractmethod
+    def _store(self, key: str, value: bytes, expires_at: float) -> None:
+        """
+        Stores `value` for `key` until `expires_at`.
+        """
+
+    @abc.abstractmethod
+    def clear(self) -> None:
+        """
+        Removes all the responses stored.
+        """
+
+
+class MemoryCache(ResponseCache):
+    """
+    A `ResponseCache` holding up to `max_entries` responses in memory, evicting the least recently used first.
+    """
+
+    def __init__(self, *, ttl: float = 300.0, max_entries: int = 1024):
+        super().__init__(ttl=ttl)
+        self.max_entries = max_entries
+        self._entries: "collections.OrderedDict[str, typing.Tuple[bytes, float]]" = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _load(self, key: str, now: float) -> typing.Optional[bytes]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at <= now:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def _store(self, key: str, value: bytes, expires_at: float) -> None:
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+class SQLiteCache(ResponseCache):
+    """
+    A `ResponseCache` stored in a SQLite database at `path`, which can be shared by all the processes of a host.
+
+    Expired responses are purged on writes, and the least recently used ones are evicted beyond `max_entries`.
+    """
+
+    def __init__(self, path: str, *, ttl: float = 300.0, max_entries: typing.Optional[int] = None):
+        super().__init__(ttl=ttl)
+        self.path = path
+        self.max_entries = max_entries
+        self._local = threading.local()
+        with self._connect() as connection:
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS responses "
+                "(key TEXT PRIMARY KEY, value BLOB NOT NULL, expires_at REAL NOT NULL, used_at REAL NOT NULL)"
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        # sqlite3 connections cannot be shared between threads, each thread opens its own.
+        connection: typing.Optional[sqlite3.Connection] = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=30)
+            connection.execute("PRAGMA journal_mode=WAL")
+            self._local.connection = connection
+        return connection
+
+    def _load(self, key: str, now: float) -> typing.Optional[bytes]:
+        with self._connect() as connection:
+            row = connection.execute(
+                "SELECT value FROM responses WHERE key = ? AND expires_at > ?", (key, now)
+            ).fetchone()
+            if row is None:
+                return None
+            connection.execute("UPDATE responses SET used_at = ? WHERE key = ?", (now, key))
+            return bytes(row[0])
+
+    def _store(self, key: str, value: bytes, expires_at: float) -> None:
+        now = time.time()
+        with self._connect() as connection:
+            connection.execute(
+                "INSERT OR REPLACE INTO responses (key, value, expires_at, used_at) VALUES (?, ?, ?, ?)",
+                (key, value, expires_at, now),
+            )
+            connection.execute("DELETE FROM responses WHERE expires_at <= ?", (now,))
+            if self.max_entries is not None:
+                connection.execute(
+                    "DELETE FROM responses WHERE key NOT IN "
+                    "(SELECT key FROM responses ORDER BY used_at DESC LIMIT ?)",
+                    (self.max_entries,),
+                )
+
+    def clear(self) -> None:
+        with self._connect() as connection:
+            connection.execute("DELETE FROM responses")
+
+
+CACHE_KEY_HEADERS = frozenset(["authorization", "x_multion_api_key", "accept", "content-type"])
+"""
+The headers a request is keyed on. The API key keeps responses from being shared between accounts, while the
+headers that vary from one call to the next, e.g. the `traceparent` of tracing or those set by hooks, are left out.
+"""
+
+
+def get_cache_key(request: httpx.Request) -> str:
+    """
+    Hashes the method, URL, `CACHE_KEY_HEADERS` and JSON body of `request`, with object keys sorted so that
+    equivalent bodies share a key.
+    """
+    body = request.content
+    canonical_body = json.dumps(json.loads(body), sort_keys=True, separators=(",", ":")) if body else ""
+    digest = hashlib.sha256()
+    headers = sorted(f"{name}:{value}" for name, value in request.headers.items() if name in CACHE_KEY_HEADERS)
+    for part in (request.method, str(request.url), canonical_body, *headers):
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
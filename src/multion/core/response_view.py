@@ -0,0 +1,167 @@
+import typing
+
+import typing_extensions
+
+from .decoders import decode
+from .extended_request_options import ResponseMode
+from .pydantic_utilities import pydantic_v1
+from .unchecked_base_model import UnionMetadata
+
+
+class ResponseView:
+    """
+    A read-only view exposing the fields of a decoded JSON object as attributes, without building a pydantic model.
+
+    Views are created per model type (e.g. `BrowseOutputView`): declared fields that are missing from the JSON read as
+    their default, nested objects are wrapped in views when accessed, and extra fields are available as attributes too.
+    `dict()` returns the underlying JSON object.
+    """
+
+    __slots__ = ("_data",)
+
+    def __init__(self, data: typing.Dict[str, typing.Any]):
+        object.__setattr__(self, "_data", data)
+
+    def __getattr__(self, name: str) -> typing.Any:
+        try:
+            return self._data[name]
+        except KeyError:
+            raise AttributeError(f"'{type(self).__name__}' object has no attribute '{name}'") from None
+
+    def __setattr__(self, name: str, value: typing.Any) -> None:
+        raise TypeError(f'"{type(self).__name__}" is immutable and does not support item assignment')
+
+    def __getitem__(self, key: str) -> typing.Any:
+        return self._data[key]
+
+    def __eq__(self, other: typing.Any) -> bool:
+        return isinstance(other, ResponseView) and self._data == other._data
+
+    def __hash__(self) -> int:
+        return hash(_freeze(self._data))
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self._data!r})"
+
+    def dict(self) -> typing.Dict[str, typing.Any]:
+        return self._data
+
+
+Wrapper = typing.Callable[[typing.Any], typing.Any]
+
+_view_classes: typing.Dict[typing.Type[pydantic_v1.BaseModel], typing.Type[ResponseView]] = {}
+_wrappers: typing.Dict[typing.Any, Wrapper] = {}
+
+
+def _freeze(object_: typing.Any) -> typing.Hashable:
+    # Views are immutable like the frozen models they stand for, so they hash their JSON data.
+    if isinstance(object_, dict):
+        return frozenset((key, _freeze(value)) for key, value in object_.items())
+    if isinstance(object_, list):
+        return tuple(_freeze(value) for value in object_)
+    return object_
+
+
+def _identity(object_: typing.Any) -> typing.Any:
+    return object_
+
+
+def _field_property(key: str, default: typing.Any, wrap: Wrapper) -> property:
+    def get(self: ResponseView) -> typing.Any:
+        return wrap(self._data.get(key, default))
+
+    return property(get)
+
+
+def _get_view_class(model_type: typing.Type[pydantic_v1.BaseModel]) -> typing.Type[ResponseView]:
+    view_class = _view_classes.get(model_type)
+    if view_class is None:
+        # Register the class before compiling its fields, so that self-referencing models terminate.
+        view_class = _view_classes[model_type] = typing.cast(
+            typing.Type[ResponseView],
+            type(f"{model_type.__name__}View", (ResponseView,), {"__slots__": ()}),
+        )
+        for name, field in model_type.__fields__.items():
+            setattr(
+                view_class,
+                name,
+                _field_property(field.alias or name, field.default, _get_wrapper(field.outer_type_)),
+            )
+    return view_class
+
+
+def _get_wrapper(type_: typing.Any) -> Wrapper:
+    try:
+        wrapper = _wrappers.get(type_)
+    except TypeError:
+        return _compile_wrapper(type_)
+    if wrapper is None:
+        wrapper = _wrappers[type_] = _compile_wrapper(type_)
+    return wrapper
+
+
+def _compile_wrapper(type_: typing.Any) -> Wrapper:
+    """
+    Compiles the function wrapping the JSON objects of `type_` in views, mirroring how `decode` builds their models.
+    """
+    base_type = pydantic_v1.typing.get_origin(type_) or type_
+    type_args = pydantic_v1.typing.get_args(type_)
+
+    if base_type == typing_extensions.Annotated:
+        union_type = type_args[0]
+        for metadata in type_args[1:]:
+            if isinstance(metadata, UnionMetadata):
+                return _compile_discriminated_wrapper(union_type, metadata.discriminant)
+        return _get_wrapper(union_type)
+
+    if base_type == list and type_args:
+        inner_wrapper = _get_wrapper(type_args[0])
+        if inner_wrapper is _identity:
+            return _identity
+        return lambda object_: (
+            [inner_wrapper(entry) for entry in object_] if isinstance(object_, list) else object_
+        )
+
+    if pydantic_v1.typing.is_union(base_type):
+        model_types = [
+            inner_type for inner_type in type_args if isinstance(inner_type, type) and issubclass(inner_type, pydantic_v1.BaseModel)
+        ]
+        # Only unions with a single model (e.g. optional models) can be told apart without validating the object.
+        if len(model_types) == 1:
+            return _get_wrapper(model_types[0])
+        return _identity
+
+    if isinstance(base_type, type) and issubclass(base_type, pydantic_v1.BaseModel):
+        view_class = _get_view_class(base_type)
+        return lambda object_: view_class(object_) if isinstance(object_, dict) else object_
+
+    return _identity
+
+
+def _compile_discriminated_wrapper(union_type: typing.Any, discriminant: str) -> Wrapper:
+    view_classes: typing.Dict[typing.Any, typing.Type[ResponseView]] = {}
+    for inner_type in pydantic_v1.typing.get_args(union_type):
+        view_classes.setdefault(inner_type.__fields__[discriminant].default, _get_view_class(inner_type))
+
+    def wrap(object_: typing.Any) -> typing.Any:
+        if not isinstance(object_, dict):
+            return object_
+        view_class = view_classes.get(object_.get(discriminant))
+        return view_class(object_) if view_class is not None else ResponseView(object_)
+
+    return wrap
+
+
+def construct_response(*, type_: typing.Any, object_: typing.Any, response_mode: ResponseMode) -> typing.Any:
+    """
+    Builds the value returned for a successful response of `type_` according to `response_mode`:
+    a pydantic model for "model", a `ResponseView` for "view" and the decoded JSON itself for "raw".
+
+    The endpoint methods cast the result to `type_`, which only holds in the "model" mode: callers using the other
+    modes get a `ResponseView` or the decoded JSON, and should cast the result accordingly.
+    """
+    if response_mode == "raw":
+        return object_
+    if response_mode == "view":
+        return _get_wrapper(type_)(object_)
+    return decode(type_=type_, object_=object_)
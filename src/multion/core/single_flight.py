@@ -0,0 +1,91 @@
+import asyncio
+import threading
+import typing
+
+import httpx
+
+
+def copy_response(response: httpx.Response) -> httpx.Response:
+    """
+    Returns a new response holding the status, headers and content of a response that was already read, so that
+    each caller sharing it gets a response of its own.
+    """
+    return httpx.Response(
+        response.status_code, headers=response.headers, content=response.content, request=response.request
+    )
+
+
+class _Call:
+    __slots__ = ("done", "response", "error")
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.response: typing.Optional[httpx.Response] = None
+        self.error: typing.Optional[BaseException] = None
+
+
+class SingleFlight:
+    """
+    Collapses identical requests made concurrently from several threads into a single call.
+
+    The first caller for a key makes the call, and the callers arriving while it is in flight wait for it and get a
+    copy of its response, or the error it raised. `shared` counts the calls that were answered this way.
+    """
+
+    def __init__(self) -> None:
+        self.shared = 0
+        self._calls: typing.Dict[str, _Call] = {}
+        self._lock = threading.Lock()
+
+    def do(self, key: str, send: typing.Callable[[], httpx.Response]) -> httpx.Response:
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if call is None:
+                call = self._calls[key] = _Call()
+            else:
+                self.shared += 1
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return copy_response(typing.cast(httpx.Response, call.response))
+        try:
+            call.response = send()
+            return call.response
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+
+class AsyncSingleFlight:
+    """
+    The asynchronous counterpart of `SingleFlight`, for requests made concurrently from several tasks.
+
+    The call runs in a task of its own, so that cancelling one of the callers does not cancel it for the others.
+    """
+
+    def __init__(self) -> None:
+        self.shared = 0
+        self._calls: "typing.Dict[str, asyncio.Future[httpx.Response]]" = {}
+
+    async def do(self, key: str, send: typing.Callable[[], typing.Awaitable[httpx.Response]]) -> httpx.Response:
+        call = self._calls.get(key)
+        if call is not None:
+            self.shared += 1
+            return copy_response(await asyncio.shield(call))
+
+        async def run() -> httpx.Response:
+            try:
+                return await send()
+            finally:
+                del self._calls[key]
+
+        call = self._calls[key] = asyncio.ensure_future(run())
+        # Marks the error as retrieved in case every caller was cancelled before the call completed.
+        call.add_done_callback(lambda future: future.cancelled() or future.exception())
+        return await asyncio.shield(call)
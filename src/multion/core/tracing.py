@@ -0,0 +1,174 @@
+import functools
+import inspect
+import typing
+
+import httpx
+
+from .api_error import ApiError
+from .event_stream import AsyncEventStream, EventStream, StreamMetrics
+from .hooks import RequestContext, RequestHook
+
+if typing.TYPE_CHECKING:
+    from .extended_client_wrapper import ExtendedClientWrapper
+
+F = typing.TypeVar("F", bound=typing.Callable[..., typing.Any])
+
+
+def _load_opentelemetry() -> typing.Tuple[typing.Any, typing.Any]:
+    try:
+        from opentelemetry import propagate, trace  # type: ignore
+    except ImportError as e:
+        raise ImportError(
+            "Tracing requires the OpenTelemetry API, install it with `pip install opentelemetry-api`."
+        ) from e
+    return trace, propagate
+
+
+def _field(obj: typing.Any, name: str) -> typing.Any:
+    return obj.get(name) if isinstance(obj, dict) else getattr(obj, name, None)
+
+
+class Tracing(RequestHook):
+    """
+    Traces the calls made by a client with OpenTelemetry, see the `tracing` of the client. Each call of `browse`,
+    `retrieve` and of the `sessions` methods is a span named after it, e.g. "multion.sessions.step", with the session
+    id, mode, status, step count and processing time among its attributes and an event for each retry. A stream
+    opened by `sessions.step_stream` is a span lasting until the stream ends.
+
+    The W3C trace context of the span is sent along with each request in the `traceparent` and `tracestate`
+    headers, unless `propagate` is False. Spans are created with the global tracer provider, unless a
+    `tracer_provider` is given.
+
+    Examples
+    --------
+    from multion.client import MultiOn
+    from multion.core.tracing import Tracing
+
+    client = MultiOn(api_key="YOUR_API_KEY", tracing=Tracing())
+    """
+
+    def __init__(self, *, tracer_provider: typing.Optional[typing.Any] = None, propagate: bool = True):
+        self._trace, self._propagate = _load_opentelemetry()
+        self.tracer = self._trace.get_tracer("multion", tracer_provider=tracer_provider)
+        self.propagate = propagate
+
+    def headers(self) -> typing.Dict[str, str]:
+        """
+        The trace context headers of the current span.
+        """
+        headers: typing.Dict[str, str] = {}
+        if self.propagate:
+            self._propagate.inject(headers)
+        return headers
+
+    def start_span(self, endpoint: str, session_id: typing.Optional[str], mode: typing.Any) -> typing.Any:
+        attributes: typing.Dict[str, typing.Any] = {"multion.endpoint": endpoint}
+        if session_id is not None:
+            attributes["multion.session_id"] = session_id
+        if isinstance(mode, str):
+            attributes["multion.mode"] = mode
+        return self.tracer.start_span(f"multion.{endpoint}", kind=self._trace.SpanKind.CLIENT, attributes=attributes)
+
+    def use_span(self, span: typing.Any) -> typing.ContextManager[typing.Any]:
+        return self._trace.use_span(span, end_on_exit=False, record_exception=False, set_status_on_exception=False)
+
+    def end_span(self, span: typing.Any, result: typing.Any) -> None:
+        """
+        Records the session id, status and metadata of the result of a call, and ends its span.
+        """
+        for name in ("session_id", "status"):
+            value = _field(result, name)
+            if isinstance(value, str):
+                span.set_attribute(f"multion.{name}", value)
+        metadata = _field(result, "metadata")
+        if metadata is not None:
+            for name in ("step_count", "processing_time"):
+                value = _field(metadata, name)
+                if isinstance(value, (int, float)):
+                    span.set_attribute(f"multion.{name}", value)
+        span.end()
+
+    def end_stream_span(self, span: typing.Any, metrics: StreamMetrics) -> None:
+        span.set_attribute("multion.events", metrics.events)
+        span.set_attribute("multion.reconnects", metrics.reconnects)
+        if metrics.first_event_time is not None:
+            span.set_attribute("multion.first_event_time", metrics.first_event_time)
+        if metrics.error is not None:
+            self.fail_span(span, metrics.error)
+        span.end()
+
+    def fail_span(self, span: typing.Any, exception: Exception) -> None:
+        if isinstance(exception, ApiError) and exception.status_code is not None:
+            span.set_attribute("http.response.status_code", exception.status_code)
+        span.record_exception(exception)
+        span.set_status(self._trace.Status(self._trace.StatusCode.ERROR, type(exception).__name__))
+
+    def after_response(self, context: RequestContext, response: httpx.Response) -> None:
+        self._trace.get_current_span().set_attribute("http.response.status_code", response.status_code)
+
+    def on_retry(self, context: RequestContext, response: httpx.Response, delay: float) -> None:
+        attributes = {"multion.attempt": context.attempt, "http.response.status_code": response.status_code}
+        self._trace.get_current_span().add_event("retry", {**attributes, "multion.delay": delay})
+
+    def on_error(self, context: RequestContext, exception: Exception) -> None:
+        self._trace.get_current_span().add_event(
+            "error", {"multion.attempt": context.attempt, "exception.type": type(exception).__name__}
+        )
+
+
+def traced(endpoint: str) -> typing.Callable[[F], F]:
+    """
+    Runs a method of a client in a span of the `Tracing` of its client wrapper, if it has one. Methods returning an
+    event stream are traced until the stream ends.
+    """
+
+    def decorator(method: F) -> F:
+        takes_session_id = "session_id" in list(inspect.signature(method).parameters)[1:2]
+
+        def session_id(args: typing.Tuple[typing.Any, ...], kwargs: typing.Dict[str, typing.Any]) -> typing.Any:
+            value = args[0] if takes_session_id and args else kwargs.get("session_id")
+            return value if isinstance(value, str) else None
+
+        if inspect.iscoroutinefunction(method):
+
+            @functools.wraps(method)
+            async def async_wrapper(self: typing.Any, *args: typing.Any, **kwargs: typing.Any) -> typing.Any:
+                tracing = typing.cast("ExtendedClientWrapper", self._client_wrapper).tracing
+                if tracing is None:
+                    return await method(self, *args, **kwargs)
+                span = tracing.start_span(endpoint, session_id(args, kwargs), kwargs.get("mode"))
+                with tracing.use_span(span):
+                    try:
+                        result = await method(self, *args, **kwargs)
+                    except Exception as e:
+                        tracing.fail_span(span, e)
+                        span.end()
+                        raise
+                tracing.end_span(span, result)
+                return result
+
+            return typing.cast(F, async_wrapper)
+
+        @functools.wraps(method)
+        def wrapper(self: typing.Any, *args: typing.Any, **kwargs: typing.Any) -> typing.Any:
+            tracing = typing.cast("ExtendedClientWrapper", self._client_wrapper).tracing
+            if tracing is None:
+                return method(self, *args, **kwargs)
+            span = tracing.start_span(endpoint, session_id(args, kwargs), kwargs.get("mode"))
+            with tracing.use_span(span):
+                try:
+                    result = method(self, *args, **kwargs)
+                except Exception as e:
+                    tracing.fail_span(span, e)
+                    span.end()
+                    raise
+            if isinstance(result, (EventStream, AsyncEventStream)):
+                # Event streams are only sent once iterated, their span ends with them.
+                result.add_done_callback(functools.partial(tracing.end_stream_span, span))
+            else:
+                tracing.end_span(span, result)
+            return result
+
+        return typing.cast(F, wrapper)
+
+    return decorator
@@ -1,10 +1,25 @@
 # This file was auto-generated by Fern from our API Definition.
 
-from .bad_request_error import BadRequestError
-from .internal_server_error import InternalServerError
-from .payment_required_error import PaymentRequiredError
-from .unauthorized_error import UnauthorizedError
-from .unprocessable_entity_error import UnprocessableEntityError
+import typing
+
+from ..lazy_import import lazy_exports
+
+if typing.TYPE_CHECKING:
+    from .bad_request_error import BadRequestError
+    from .internal_server_error import InternalServerError
+    from .payment_required_error import PaymentRequiredError
+    from .unauthorized_error import UnauthorizedError
+    from .unprocessable_entity_error import UnprocessableEntityError
+
+_dynamic_imports: typing.Dict[str, str] = {
+    "BadRequestError": ".bad_request_error",
+    "InternalServerError": ".internal_server_error",
+    "PaymentRequiredError": ".payment_required_error",
+    "UnauthorizedError": ".unauthorized_error",
+    "UnprocessableEntityError": ".unprocessable_entity_error",
+}
+
+__getattr__, __dir__ = lazy_exports(__name__, globals(), _dynamic_imports)
 
 __all__ = [
     "BadRequestError",
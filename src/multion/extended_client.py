@@ -0,0 +1,1163 @@
+import os
+import typing
+from json.decoder import JSONDecodeError
+
+import httpx
+
+from .batch import (
+    FATAL_ERRORS,
+    BatchResult,
+    BrowseCommand,
+    RetrievedRow,
+    aretrieve_rows,
+    arun_batch,
+    browse_kwargs,
+    retrieve_request_options,
+    retrieve_rows,
+    run_batch,
+)
+from .base_client import AsyncBaseMultiOn, BaseMultiOn
+from .core.api_error import ApiError
+from .core.event_stream import StreamMetricsSink
+from .core.extended_client_wrapper import ExtendedAsyncClientWrapper, ExtendedSyncClientWrapper
+from .core.extended_http_client import RetryBudget, RetryPolicy
+from .core.extended_request_options import ResponseMode
+from .core.hooks import RequestHook
+from .core.json_codec import JsonCodec
+from .core.request_options import RequestOptions
+from .core.response_cache import ResponseCache
+from .core.tracing import Tracing, traced
+from .core.unchecked_base_model import construct_type
+from .environment import MultiOnEnvironment
+from .errors.bad_request_error import BadRequestError
+from .errors.internal_server_error import InternalServerError
+from .errors.payment_required_error import PaymentRequiredError
+from .errors.unauthorized_error import UnauthorizedError
+from .errors.unprocessable_entity_error import UnprocessableEntityError
+from .extended_types import ExtendedRetrieveOutput
+from .sessions.extended_client import ExtendedAsyncSessionsClient, ExtendedSessionsClient
+from .sessions.tracker import AsyncSessionTracker, SessionTracker
+from .types.bad_request_response import BadRequestResponse
+from .types.browse_output import BrowseOutput
+from .types.format import Format
+from .types.http_validation_error import HttpValidationError
+from .types.internal_server_error_response import InternalServerErrorResponse
+from .types.mode import Mode
+from .types.payment_required_response import PaymentRequiredResponse
+from .types.unauthorized_response import UnauthorizedResponse
+
+# this is used as the default value for optional parameters
+OMIT = typing.cast(typing.Any, ...)
+
+
+class ExtendedMultiOn(BaseMultiOn):
+    """
+    `BaseMultiOn` with the performance and reliability extensions of the SDK: connection pooling limits, retry policies and budgets, response modes, caching and coalescing, session tracking, stream metrics, request hooks and tracing. `MultiOn` builds on it to report calls to AgentOps.
+
+    Parameters
+    ----------
+    base_url : typing.Optional[str]
+        The base url to use for requests from the client.
+
+    environment : MultiOnEnvironment
+        The environment to use for requests from the client. from .environment import MultiOnEnvironment
+
+
+
+        Defaults to MultiOnEnvironment.DEFAULT
+
+
+
+    api_key : typing.Optional[str]
+    timeout : typing.Optional[float]
+        The timeout to be used, in seconds, for requests. By default the timeout is 180 seconds, unless a custom httpx client is used, in which case this default is not enforced.
+
+    follow_redirects : typing.Optional[bool]
+        Whether the default httpx client follows redirects or not, this is irrelevant if a custom httpx client is passed in.
+
+    max_connections : typing.Optional[int]
+        The maximum number of concurrent connections the default httpx client may open, or None for no limit. (Default: 100) This is irrelevant if a custom httpx client is passed in.
+
+    max_keepalive_connections : typing.Optional[int]
+        The maximum number of idle connections the default httpx client keeps alive for reuse, or None for no limit. (Default: 20) This is irrelevant if a custom httpx client is passed in.
+
+    keepalive_expiry : typing.Optional[float]
+        The number of seconds an idle connection is kept alive by the default httpx client, or None to keep it forever. (Default: 5.0) This is irrelevant if a custom httpx client is passed in.
+
+    http2 : typing.Optional[bool]
+        Whether the default httpx client multiplexes requests over HTTP/2 connections (Default: False). Requires the `h2` package, which can be installed with `pip install httpx[http2]`. This is irrelevant if a custom httpx client is passed in.
+
+    httpx_client : typing.Optional[httpx.Client]
+        The httpx client to use for making requests, a preconfigured client is used by default, however this is useful should you want to pass in any custom httpx configuration.
+
+    retry_policy : typing.Optional[RetryPolicy]
+        Decides which responses are retried and how long to wait between attempts. By default 408, 409, 429 and 5XX responses are retried with exponential backoff.
+
+    retry_budget : typing.Optional[RetryBudget]
+        A token bucket shared across all requests made by this client that caps how many retries can be issued relative to regular traffic. A budget allowing retries for 20% of requests is used by default.
+
+    response_mode : ResponseMode
+        How successful responses are returned: "model" builds pydantic models, "view" returns lightweight read-only views exposing the same attributes without building models, and "raw" returns the decoded JSON. (Default: "model") This can be overridden per request with the `response_mode` request option. The methods are annotated with the models returned by default, the views and dicts returned by the other modes should be cast to `ResponseView` and `dict`.
+
+    json_codec : typing.Optional[JsonCodec]
+        Serializes request bodies and parses responses, with the standard library `json` module by default. `OrjsonCodec` and `MsgspecCodec` use the faster orjson and msgspec libraries, which must be installed, and `auto_codec()` returns whichever of them is installed.
+
+    response_cache : typing.Optional[ResponseCache]
+        Caches the responses of `retrieve` calls that are not bound to a session, so that identical calls are answered without a request until the cached response expires. `MemoryCache` keeps responses in memory and `SQLiteCache` shares them between processes. No cache is used by default.
+
+    coalesce_endpoints : typing.Collection[str]
+        The endpoints whose identical requests made concurrently share a single call and its response, among "retrieve", "sessions.list" and "sessions.screenshot". No requests are coalesced by default.
+
+    track_sessions : bool
+        Whether the sessions created by `sessions.create` and `browse` are recorded by `session_tracker` until they are closed, so that they can be closed all at once and are closed when the interpreter exits. (Default: False)
+
+    stream_metrics_sink : typing.Optional[StreamMetricsSink]
+        Called with the `StreamMetrics` of every `sessions.step_stream` stream once it ends: connect, headers and first event times, the gaps between events, and the events and bytes received. The metrics of a stream are also available as `metrics` on the stream. No sink is used by default.
+
+    hooks : typing.Sequence[RequestHook]
+        Called, in order, before each request is sent, with its response, when it is retried and when it fails without a response, e.g. to time requests or add headers to them. `MetricsCollector` is a hook keeping latency histograms and status code, retry and error counts for each endpoint. No hooks are used by default.
+
+    tracing : typing.Optional[Tracing]
+        Traces every call with OpenTelemetry, and sends the W3C trace context of its span along with its requests. Requires the `opentelemetry-api` package, which can be installed with `pip install opentelemetry-api`. Calls are not traced by default.
+
+    Examples
+    --------
+    from multion.client import MultiOn
+
+    client = MultiOn(
+        api_key="YOUR_API_KEY",
+    )
+    """
+
+    _client_wrapper: ExtendedSyncClientWrapper
+    sessions: ExtendedSessionsClient
+
+    def __init__(
+        self,
+        *,
+        base_url: typing.Optional[str] = None,
+        environment: MultiOnEnvironment = MultiOnEnvironment.DEFAULT,
+        api_key: typing.Optional[str] = os.getenv("MULTION_API_KEY"),
+        timeout: typing.Optional[float] = None,
+        follow_redirects: typing.Optional[bool] = True,
+        max_connections: typing.Optional[int] = 100,
+        max_keepalive_connections: typing.Optional[int] = 20,
+        keepalive_expiry: typing.Optional[float] = 5.0,
+        http2: typing.Optional[bool] = False,
+        httpx_client: typing.Optional[httpx.Client] = None,
+        retry_policy: typing.Optional[RetryPolicy] = None,
+        retry_budget: typing.Optional[RetryBudget] = None,
+        response_mode: ResponseMode = "model",
+        json_codec: typing.Optional[JsonCodec] = None,
+        response_cache: typing.Optional[ResponseCache] = None,
+        coalesce_endpoints: typing.Collection[str] = (),
+        track_sessions: bool = False,
+        stream_metrics_sink: typing.Optional[StreamMetricsSink] = None,
+        hooks: typing.Sequence[RequestHook] = (),
+        tracing: typing.Optional[Tracing] = None
+    ):
+        _defaulted_timeout = timeout if timeout is not None else 180 if httpx_client is None else None
+        if httpx_client is None:
+            _limits = httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_keepalive_connections,
+                keepalive_expiry=keepalive_expiry,
+            )
+            httpx_client = (
+                httpx.Client(
+                    timeout=_defaulted_timeout, follow_redirects=follow_redirects, limits=_limits, http2=bool(http2)
+                )
+                if follow_redirects is not None
+                else httpx.Client(timeout=_defaulted_timeout, limits=_limits, http2=bool(http2))
+            )
+        super().__init__(
+            base_url=base_url,
+            environment=environment,
+            api_key=api_key,
+            timeout=_defaulted_timeout,
+            httpx_client=httpx_client,
+        )
+        self._client_wrapper = ExtendedSyncClientWrapper(
+            base_url=self._client_wrapper.get_base_url(),
+            api_key=self._client_wrapper.api_key,
+            httpx_client=httpx_client,
+            timeout=_defaulted_timeout,
+            retry_policy=retry_policy,
+            retry_budget=retry_budget,
+            response_mode=response_mode,
+            json_codec=json_codec,
+            response_cache=response_cache,
+            coalesce_endpoints=coalesce_endpoints,
+            stream_metrics_sink=stream_metrics_sink,
+            hooks=hooks,
+            tracing=tracing,
+        )
+        self.sessions = ExtendedSessionsClient(client_wrapper=self._client_wrapper)
+        self.session_tracker = SessionTracker(self.sessions) if track_sessions else None
+        self._client_wrapper.session_tracker = self.session_tracker
+
+    def warm_up(self, *, connections: int = 1) -> int:
+        """
+        Opens keep-alive connections to the API ahead of time, so that the first requests made by this client do not pay for the TCP and TLS handshakes.
+
+        Connections stay in the pool for `keepalive_expiry` seconds of inactivity, and at most `max_keepalive_connections` of them are kept. A single connection is enough when HTTP/2 is enabled, since requests are multiplexed over it.
+
+        Parameters
+        ----------
+        connections : int
+            The number of connections to open concurrently, capped to `max_connections`.
+
+        Returns
+        -------
+        int
+            The number of successful requests sent to open the connections.
+
+        Examples
+        --------
+        from multion.client import MultiOn
+
+        client = MultiOn(
+            api_key="YOUR_API_KEY",
+            max_keepalive_connections=50,
+            keepalive_expiry=60,
+        )
+        client.warm_up(connections=50)
+        """
+        return self._client_wrapper.httpx_client.warm_up(connections=connections)
+
+    @traced("browse")
+    def browse(
+        self,
+        *,
+        cmd: str,
+        url: typing.Optional[str] = OMIT,
+        local: typing.Optional[bool] = OMIT,
+        session_id: typing.Optional[str] = OMIT,
+        max_steps: typing.Optional[int] = OMIT,
+        include_screenshot: typing.Optional[bool] = OMIT,
+        temperature: typing.Optional[float] = OMIT,
+        agent_id: typing.Optional[str] = OMIT,
+        mode: typing.Optional[Mode] = OMIT,
+        use_proxy: typing.Optional[bool] = OMIT,
+        request_options: typing.Optional[RequestOptions] = None
+    ) -> BrowseOutput:
+        """
+        Allows for browsing the web using detailed natural language commands.
+
+        The function supports multi-step command execution based on the `CONTINUE` status of the Agent.
+
+        Parameters
+        ----------
+        cmd : str
+            A specific natural language instruction for the agent to execute
+
+        url : typing.Optional[str]
+            The URL to start or continue browsing from. (Default: google.com)
+
+        local : typing.Optional[bool]
+            Boolean flag to indicate if session to be run locally or in the cloud (Default: False). If set to true, the session will be run locally via your chrome extension. If set to false, the session will be run in the cloud.
+
+        session_id : typing.Optional[str]
+            Continues the session with session_id if provided.
+
+        max_steps : typing.Optional[int]
+            Maximum number of steps to execute. (Default: 20)
+
+        include_screenshot : typing.Optional[bool]
+            Boolean flag to include a screenshot of the final page. (Default: False)
+
+        temperature : typing.Optional[float]
+            The temperature of model
+
+        agent_id : typing.Optional[str]
+            The agent id to use for the session.
+
+        mode : typing.Optional[Mode]
+
+        use_proxy : typing.Optional[bool]
+            Boolean flag to use a proxy for the session (Default: False). Each Session gets a new Residential IP.
+
+        request_options : typing.Optional[RequestOptions]
+            Request-specific configuration.
+
+        Returns
+        -------
+        BrowseOutput
+            Successful Response
+
+        Examples
+        --------
+        from multion.client import MultiOn
+
+        client = MultiOn(
+            api_key="YOUR_API_KEY",
+        )
+        client.browse(
+            cmd="Find the top post on Hackernews.",
+            url="https://news.ycombinator.com/",
+        )
+        """
+        _response = self._client_wrapper.httpx_client.request(
+            "browse",
+            method="POST",
+            json={
+                "cmd": cmd,
+                "url": url,
+                "local": local,
+                "session_id": session_id,
+                "max_steps": max_steps,
+                "include_screenshot": include_screenshot,
+                "temperature": temperature,
+                "agent_id": agent_id,
+                "mode": mode,
+                "use_proxy": use_proxy,
+            },
+            request_options=request_options,
+            omit=OMIT,
+            endpoint="browse",
+        )
+        try:
+            if 200 <= _response.status_code < 300:
+                _object = self._client_wrapper.json_codec.loads(_response.content)
+                self._client_wrapper.session_created(_object)
+                return typing.cast(BrowseOutput, self._client_wrapper.construct_response(type_=BrowseOutput, object_=_object, request_options=request_options))  # type: ignore
+            if _response.status_code == 400:
+                raise BadRequestError(
+                    typing.cast(BadRequestResponse, construct_type(type_=BadRequestResponse, object_=_response.json()))  # type: ignore
+                )
+            if _response.status_code == 401:
+                raise UnauthorizedError(
+                    typing.cast(UnauthorizedResponse, construct_type(type_=UnauthorizedResponse, object_=_response.json()))  # type: ignore
+                )
+            if _response.status_code == 402:
+                raise PaymentRequiredError(
+                    typing.cast(PaymentRequiredResponse, construct_type(type_=PaymentRequiredResponse, object_=_response.json()))  # type: ignore
+                )
+            if _response.status_code == 422:
+                raise UnprocessableEntityError(
+                    typing.cast(HttpValidationError, construct_type(type_=HttpValidationError, object_=_response.json()))  # type: ignore
+                )
+            if _response.status_code == 500:
+                raise InternalServerError(
+                    typing.cast(InternalServerErrorResponse, construct_type(type_=InternalServerErrorResponse, object_=_response.json()))  # type: ignore
+                )
+            _response_json = _response.json()
+        except JSONDecodeError:
+            raise ApiError(status_code=_response.status_code, body=_response.text)
+        raise ApiError(status_code=_response.status_code, body=_response_json)
+
+    def browse_many(
+        self,
+        commands: typing.Iterable[typing.Union[str, BrowseCommand]],
+        *,
+        concurrency: int = 8,
+        fatal_errors: typing.Tuple[typing.Type[BaseException], ...] = FATAL_ERRORS,
+        request_options: typing.Optional[RequestOptions] = None,
+    ) -> typing.Iterator[BatchResult[BrowseOutput]]:
+        """
+        Runs many `browse` commands from a thread pool and yields their results as they complete.
+
+        Parameters
+        ----------
+        commands : typing.Iterable[typing.Union[str, BrowseCommand]]
+            The commands to run, either as a `cmd` string or as the arguments of `browse`. Commands are pulled from the iterable only when a worker is free.
+
+        concurrency : int
+            The maximum number of commands running at once. Connections beyond `max_connections` wait for a free connection.
+
+        fatal_errors : typing.Tuple[typing.Type[BaseException], ...]
+            Errors that stop the batch: no further command is started, and the error is raised once the commands still running have completed. By default `PaymentRequiredError` and `UnauthorizedError`.
+
+        request_options : typing.Optional[RequestOptions]
+            Request-specific configuration, used for the commands that do not set their own `request_options`.
+
+        Returns
+        -------
+        typing.Iterator[BatchResult[BrowseOutput]]
+            The result of every command in completion order. `index` is the position of the command in `commands`, and any error other than `fatal_errors` is reported in `error`.
+
+        Examples
+        --------
+        from multion.client import MultiOn
+
+        client = MultiOn(
+            api_key="YOUR_API_KEY",
+        )
+        for result in client.browse_many(
+            ["Find the top post on Hackernews", {"cmd": "Find the top comment", "url": "https://news.ycombinator.com/"}],
+            concurrency=2,
+        ):
+            print(result.index, result.result().message)
+        """
+        return run_batch(
+            lambda command: self.browse(**browse_kwargs(command, request_options)),
+            commands,
+            concurrency=concurrency,
+            fatal_errors=fatal_errors,
+        )
+
+    @traced("retrieve")
+    def retrieve(
+        self,
+        *,
+        cmd: str,
+        url: typing.Optional[str] = OMIT,
+        session_id: typing.Optional[str] = OMIT,
+        local: typing.Optional[bool] = OMIT,
+        fields: typing.Optional[typing.Sequence[str]] = OMIT,
+        format: typing.Optional[Format] = OMIT,
+        max_items: typing.Optional[float] = OMIT,
+        full_page: typing.Optional[bool] = OMIT,
+        render_js: typing.Optional[bool] = OMIT,
+        scroll_to_bottom: typing.Optional[bool] = OMIT,
+        include_screenshot: typing.Optional[bool] = OMIT,
+        request_options: typing.Optional[RequestOptions] = None
+    ) -> ExtendedRetrieveOutput:
+        """
+        Retrieve data from webpage based on a url and natural language command that guides agents data extraction process.
+
+        The function can create a new session or be used as part of a session.
+
+        Parameters
+        ----------
+        cmd : str
+            A specific natural language instruction on data the agent should extract.
+
+        url : typing.Optional[str]
+            The URL to create or continue session from.
+
+        session_id : typing.Optional[str]
+            Continues the session with session_id if provided.
+
+        local : typing.Optional[bool]
+            Boolean flag to indicate if session to be run locally or in the cloud (Default: False). If set to true, the session will be run locally via your chrome extension. If set to false, the session will be run in the cloud.
+
+        fields : typing.Optional[typing.Sequence[str]]
+            List of fields (columns) to be outputted in data.
+
+        format : typing.Optional[Format]
+
+        max_items : typing.Optional[float]
+            Maximum number of data items to retrieve. (Default: 100)
+
+        full_page : typing.Optional[bool]
+            Flag to retrieve full page (Default: True). If set to false, the data will only be retrieved from the current session viewport.
+
+        render_js : typing.Optional[bool]
+            Flag to include rich JS and ARIA elements in data retrieved. (Default: False)
+
+        scroll_to_bottom : typing.Optional[bool]
+            Flag to scroll to the bottom of the page (Default: False). If set to true, the page will be scrolled to the bottom for a maximum of 5 seconds before data is retrieved.
+
+        include_screenshot : typing.Optional[bool]
+            Flag to include a screenshot with the response. (Default: False)
+
+        request_options : typing.Optional[RequestOptions]
+            Request-specific configuration.
+
+        Returns
+        -------
+        ExtendedRetrieveOutput
+            Successful Response
+
+        Examples
+        --------
+        from multion.client import MultiOn
+
+        client = MultiOn(
+            api_key="YOUR_API_KEY",
+        )
+        client.retrieve(
+            cmd="Find the top post on Hackernews and get its title and points.",
+            url="https://news.ycombinator.com/",
+            fields=["title", "points"],
+        )
+        """
+        _response = self._client_wrapper.httpx_client.request(
+            "retrieve",
+            method="POST",
+            json={
+                "cmd": cmd,
+                "url": url,
+                "session_id": session_id,
+                "local": local,
+                "fields": fields,
+                "format": format,
+                "max_items": max_items,
+                "full_page": full_page,
+                "render_js": render_js,
+                "scroll_to_bottom": scroll_to_bottom,
+                "include_screenshot": include_screenshot,
+            },
+            request_options=request_options,
+            omit=OMIT,
+            # Retrieving from a session depends on the state of its page, so only stateless calls are cached.
+            cache=session_id is OMIT or session_id is None,
+            endpoint="retrieve",
+        )
+        try:
+            if 200 <= _response.status_code < 300:
+                return typing.cast(ExtendedRetrieveOutput, self._client_wrapper.construct_response(type_=ExtendedRetrieveOutput, object_=self._client_wrapper.json_codec.loads(_response.content), request_options=request_options))  # type: ignore
+            if _response.status_code == 422:
+                raise UnprocessableEntityError(
+                    typing.cast(HttpValidationError, construct_type(type_=HttpValidationError, object_=_response.json()))  # type: ignore
+                )
+            _response_json = _response.json()
+        except JSONDecodeError:
+            raise ApiError(status_code=_response.status_code, body=_response.text)
+        raise ApiError(status_code=_response.status_code, body=_response_json)
+
+    def retrieve_many(
+        self,
+        *,
+        cmd: str,
+        urls: typing.Iterable[str],
+        local: typing.Optional[bool] = OMIT,
+        fields: typing.Optional[typing.Sequence[str]] = OMIT,
+        format: typing.Optional[Format] = OMIT,
+        max_items: typing.Optional[float] = OMIT,
+        full_page: typing.Optional[bool] = OMIT,
+        render_js: typing.Optional[bool] = OMIT,
+        scroll_to_bottom: typing.Optional[bool] = OMIT,
+        concurrency: int = 8,
+        on_error: typing.Optional[typing.Callable[[str, Exception], None]] = None,
+        fatal_errors: typing.Tuple[typing.Type[BaseException], ...] = FATAL_ERRORS,
+        request_options: typing.Optional[RequestOptions] = None,
+    ) -> typing.Iterator[RetrievedRow]:
+        """
+        Runs `retrieve` with the same command on many URLs from a thread pool, and yields the retrieved rows one by one as each response arrives, so that memory use does not grow with the number of URLs.
+
+        Parameters
+        ----------
+        cmd : str
+            A specific natural language instruction on data the agent should extract.
+
+        urls : typing.Iterable[str]
+            The URLs to retrieve data from. URLs are pulled from the iterable only when a retrieval can start.
+
+        local : typing.Optional[bool]
+            Boolean flag to indicate if sessions are run locally or in the cloud (Default: False).
+
+        fields : typing.Optional[typing.Sequence[str]]
+            List of fields (columns) to be outputted in data.
+
+        format : typing.Optional[Format]
+
+        max_items : typing.Optional[float]
+            Maximum number of data items to retrieve per URL. (Default: 100)
+
+        full_page : typing.Optional[bool]
+            Flag to retrieve full pages (Default: True).
+
+        render_js : typing.Optional[bool]
+            Flag to include rich JS and ARIA elements in data retrieved. (Default: False)
+
+        scroll_to_bottom : typing.Optional[bool]
+            Flag to scroll to the bottom of pages before data is retrieved (Default: False).
+
+        concurrency : int
+            The maximum number of retrievals running at once.
+
+        on_error : typing.Optional[typing.Callable[[str, Exception], None]]
+            Called with the URL and the error of every failed retrieval, which is then skipped. When not set, the first failure stops the batch and is raised.
+
+        fatal_errors : typing.Tuple[typing.Type[BaseException], ...]
+            Errors that always stop the batch. By default `PaymentRequiredError` and `UnauthorizedError`.
+
+        request_options : typing.Optional[RequestOptions]
+            Request-specific configuration. Responses are decoded with the "raw" response mode unless `response_mode` is set.
+
+        Returns
+        -------
+        typing.Iterator[RetrievedRow]
+            Every row retrieved, tagged with the URL it comes from and the position of that URL in `urls`. Rows of a URL are contiguous, and URLs come in completion order.
+
+        Examples
+        --------
+        from multion.client import MultiOn
+
+        client = MultiOn(
+            api_key="YOUR_API_KEY",
+        )
+        for row in client.retrieve_many(
+            cmd="Get the name and price of every product",
+            urls=["https://example.com/catalog?page=1", "https://example.com/catalog?page=2"],
+            fields=["name", "price"],
+        ):
+            print(row.url, row.data)
+        """
+        return retrieve_rows(
+            lambda url: self.retrieve(
+                cmd=cmd,
+                url=url,
+                local=local,
+                fields=fields,
+                format=format,
+                max_items=max_items,
+                full_page=full_page,
+                render_js=render_js,
+                scroll_to_bottom=scroll_to_bottom,
+                request_options=retrieve_request_options(request_options),
+            ),
+            urls,
+            concurrency=concurrency,
+            fatal_errors=fatal_errors,
+            on_error=on_error,
+        )
+
+
+class AsyncExtendedMultiOn(AsyncBaseMultiOn):
+    """
+    `AsyncBaseMultiOn` with the performance and reliability extensions of the SDK: connection pooling limits, retry policies and budgets, response modes, caching and coalescing, session tracking, stream metrics, request hooks and tracing. `AsyncMultiOn` builds on it to report calls to AgentOps.
+
+    Parameters
+    ----------
+    base_url : typing.Optional[str]
+        The base url to use for requests from the client.
+
+    environment : MultiOnEnvironment
+        The environment to use for requests from the client. from .environment import MultiOnEnvironment
+
+
+
+        Defaults to MultiOnEnvironment.DEFAULT
+
+
+
+    api_key : typing.Optional[str]
+    timeout : typing.Optional[float]
+        The timeout to be used, in seconds, for requests. By default the timeout is 180 seconds, unless a custom httpx client is used, in which case this default is not enforced.
+
+    follow_redirects : typing.Optional[bool]
+        Whether the default httpx client follows redirects or not, this is irrelevant if a custom httpx client is passed in.
+
+    max_connections : typing.Optional[int]
+        The maximum number of concurrent connections the default httpx client may open, or None for no limit. (Default: 100) This is irrelevant if a custom httpx client is passed in.
+
+    max_keepalive_connections : typing.Optional[int]
+        The maximum number of idle connections the default httpx client keeps alive for reuse, or None for no limit. (Default: 20) This is irrelevant if a custom httpx client is passed in.
+
+    keepalive_expiry : typing.Optional[float]
+        The number of seconds an idle connection is kept alive by the default httpx client, or None to keep it forever. (Default: 5.0) This is irrelevant if a custom httpx client is passed in.
+
+    http2 : typing.Optional[bool]
+        Whether the default httpx client multiplexes requests over HTTP/2 connections (Default: False). Requires the `h2` package, which can be installed with `pip install httpx[http2]`. This is irrelevant if a custom httpx client is passed in.
+
+    httpx_client : typing.Optional[httpx.AsyncClient]
+        The httpx client to use for making requests, a preconfigured client is used by default, however this is useful should you want to pass in any custom httpx configuration.
+
+    retry_policy : typing.Optional[RetryPolicy]
+        Decides which responses are retried and how long to wait between attempts. By default 408, 409, 429 and 5XX responses are retried with exponential backoff.
+
+    retry_budget : typing.Optional[RetryBudget]
+        A token bucket shared across all requests made by this client that caps how many retries can be issued relative to regular traffic. A budget allowing retries for 20% of requests is used by default.
+
+    response_mode : ResponseMode
+        How successful responses are returned: "model" builds pydantic models, "view" returns lightweight read-only views exposing the same attributes without building models, and "raw" returns the decoded JSON. (Default: "model") This can be overridden per request with the `response_mode` request option. The methods are annotated with the models returned by default, the views and dicts returned by the other modes should be cast to `ResponseView` and `dict`.
+
+    json_codec : typing.Optional[JsonCodec]
+        Serializes request bodies and parses responses, with the standard library `json` module by default. `OrjsonCodec` and `MsgspecCodec` use the faster orjson and msgspec libraries, which must be installed, and `auto_codec()` returns whichever of them is installed.
+
+    response_cache : typing.Optional[ResponseCache]
+        Caches the responses of `retrieve` calls that are not bound to a session, so that identical calls are answered without a request until the cached response expires. `MemoryCache` keeps responses in memory and `SQLiteCache` shares them between processes. No cache is used by default.
+
+    coalesce_endpoints : typing.Collection[str]
+        The endpoints whose identical requests made concurrently share a single call and its response, among "retrieve", "sessions.list" and "sessions.screenshot". No requests are coalesced by default.
+
+    track_sessions : bool
+        Whether the sessions created by `sessions.create` and `browse` are recorded by `session_tracker` until they are closed, so that they can be closed all at once and are closed when the interpreter exits. (Default: False)
+
+    stream_metrics_sink : typing.Optional[StreamMetricsSink]
+        Called with the `StreamMetrics` of every `sessions.step_stream` stream once it ends: connect, headers and first event times, the gaps between events, and the events and bytes received. The metrics of a stream are also available as `metrics` on the stream. No sink is used by default.
+
+    hooks : typing.Sequence[RequestHook]
+        Called, in order, before each request is sent, with its response, when it is retried and when it fails without a response, e.g. to time requests or add headers to them. `MetricsCollector` is a hook keeping latency histograms and status code, retry and error counts for each endpoint. No hooks are used by default.
+
+    tracing : typing.Optional[Tracing]
+        Traces every call with OpenTelemetry, and sends the W3C trace context of its span along with its requests. Requires the `opentelemetry-api` package, which can be installed with `pip install opentelemetry-api`. Calls are not traced by default.
+
+    Examples
+    --------
+    from multion.client import AsyncMultiOn
+
+    client = AsyncMultiOn(
+        api_key="YOUR_API_KEY",
+    )
+    """
+
+    _client_wrapper: ExtendedAsyncClientWrapper
+    sessions: ExtendedAsyncSessionsClient
+
+    def __init__(
+        self,
+        *,
+        base_url: typing.Optional[str] = None,
+        environment: MultiOnEnvironment = MultiOnEnvironment.DEFAULT,
+        api_key: typing.Optional[str] = os.getenv("MULTION_API_KEY"),
+        timeout: typing.Optional[float] = None,
+        follow_redirects: typing.Optional[bool] = True,
+        max_connections: typing.Optional[int] = 100,
+        max_keepalive_connections: typing.Optional[int] = 20,
+        keepalive_expiry: typing.Optional[float] = 5.0,
+        http2: typing.Optional[bool] = False,
+        httpx_client: typing.Optional[httpx.AsyncClient] = None,
+        retry_policy: typing.Optional[RetryPolicy] = None,
+        retry_budget: typing.Optional[RetryBudget] = None,
+        response_mode: ResponseMode = "model",
+        json_codec: typing.Optional[JsonCodec] = None,
+        response_cache: typing.Optional[ResponseCache] = None,
+        coalesce_endpoints: typing.Collection[str] = (),
+        track_sessions: bool = False,
+        stream_metrics_sink: typing.Optional[StreamMetricsSink] = None,
+        hooks: typing.Sequence[RequestHook] = (),
+        tracing: typing.Optional[Tracing] = None
+    ):
+        _defaulted_timeout = timeout if timeout is not None else 180 if httpx_client is None else None
+        if httpx_client is None:
+            _limits = httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_keepalive_connections,
+                keepalive_expiry=keepalive_expiry,
+            )
+            httpx_client = (
+                httpx.AsyncClient(
+                    timeout=_defaulted_timeout, follow_redirects=follow_redirects, limits=_limits, http2=bool(http2)
+                )
+                if follow_redirects is not None
+                else httpx.AsyncClient(timeout=_defaulted_timeout, limits=_limits, http2=bool(http2))
+            )
+        super().__init__(
+            base_url=base_url,
+            environment=environment,
+            api_key=api_key,
+            timeout=_defaulted_timeout,
+            httpx_client=httpx_client,
+        )
+        self._client_wrapper = ExtendedAsyncClientWrapper(
+            base_url=self._client_wrapper.get_base_url(),
+            api_key=self._client_wrapper.api_key,
+            httpx_client=httpx_client,
+            timeout=_defaulted_timeout,
+            retry_policy=retry_policy,
+            retry_budget=retry_budget,
+            response_mode=response_mode,
+            json_codec=json_codec,
+            response_cache=response_cache,
+            coalesce_endpoints=coalesce_endpoints,
+            stream_metrics_sink=stream_metrics_sink,
+            hooks=hooks,
+            tracing=tracing,
+        )
+        self.sessions = ExtendedAsyncSessionsClient(client_wrapper=self._client_wrapper)
+        self.session_tracker = AsyncSessionTracker(self.sessions) if track_sessions else None
+        self._client_wrapper.session_tracker = self.session_tracker
+
+    async def warm_up(self, *, connections: int = 1) -> int:
+        """
+        Opens keep-alive connections to the API ahead of time, so that the first requests made by this client do not pay for the TCP and TLS handshakes.
+
+        Connections stay in the pool for `keepalive_expiry` seconds of inactivity, and at most `max_keepalive_connections` of them are kept. A single connection is enough when HTTP/2 is enabled, since requests are multiplexed over it.
+
+        Parameters
+        ----------
+        connections : int
+            The number of connections to open concurrently, capped to `max_connections`.
+
+        Returns
+        -------
+        int
+            The number of successful requests sent to open the connections.
+
+        Examples
+        --------
+        from multion.client import AsyncMultiOn
+
+        client = AsyncMultiOn(
+            api_key="YOUR_API_KEY",
+            max_keepalive_connections=50,
+            keepalive_expiry=60,
+        )
+        await client.warm_up(connections=50)
+        """
+        return await self._client_wrapper.httpx_client.warm_up(connections=connections)
+
+    @traced("browse")
+    async def browse(
+        self,
+        *,
+        cmd: str,
+        url: typing.Optional[str] = OMIT,
+        local: typing.Optional[bool] = OMIT,
+        session_id: typing.Optional[str] = OMIT,
+        max_steps: typing.Optional[int] = OMIT,
+        include_screenshot: typing.Optional[bool] = OMIT,
+        temperature: typing.Optional[float] = OMIT,
+        agent_id: typing.Optional[str] = OMIT,
+        mode: typing.Optional[Mode] = OMIT,
+        use_proxy: typing.Optional[bool] = OMIT,
+        request_options: typing.Optional[RequestOptions] = None
+    ) -> BrowseOutput:
+        """
+        Allows for browsing the web using detailed natural language commands.
+
+        The function supports multi-step command execution based on the `CONTINUE` status of the Agent.
+
+        Parameters
+        ----------
+        cmd : str
+            A specific natural language instruction for the agent to execute
+
+        url : typing.Optional[str]
+            The URL to start or continue browsing from. (Default: google.com)
+
+        local : typing.Optional[bool]
+            Boolean flag to indicate if session to be run locally or in the cloud (Default: False). If set to true, the session will be run locally via your chrome extension. If set to false, the session will be run in the cloud.
+
+        session_id : typing.Optional[str]
+            Continues the session with session_id if provided.
+
+        max_steps : typing.Optional[int]
+            Maximum number of steps to execute. (Default: 20)
+
+        include_screenshot : typing.Optional[bool]
+            Boolean flag to include a screenshot of the final page. (Default: False)
+
+        temperature : typing.Optional[float]
+            The temperature of model
+
+        agent_id : typing.Optional[str]
+            The agent id to use for the session.
+
+        mode : typing.Optional[Mode]
+
+        use_proxy : typing.Optional[bool]
+            Boolean flag to use a proxy for the session (Default: False). Each Session gets a new Residential IP.
+
+        request_options : typing.Optional[RequestOptions]
+            Request-specific configuration.
+
+        Returns
+        -------
+        BrowseOutput
+            Successful Response
+
+        Examples
+        --------
+        from multion.client import AsyncMultiOn
+
+        client = AsyncMultiOn(
+            api_key="YOUR_API_KEY",
+        )
+        await client.browse(
+            cmd="Find the top post on Hackernews.",
+            url="https://news.ycombinator.com/",
+        )
+        """
+        _response = await self._client_wrapper.httpx_client.request(
+            "browse",
+            method="POST",
+            json={
+                "cmd": cmd,
+                "url": url,
+                "local": local,
+                "session_id": session_id,
+                "max_steps": max_steps,
+                "include_screenshot": include_screenshot,
+                "temperature": temperature,
+                "agent_id": agent_id,
+                "mode": mode,
+                "use_proxy": use_proxy,
+            },
+            request_options=request_options,
+            omit=OMIT,
+            endpoint="browse",
+        )
+        try:
+            if 200 <= _response.status_code < 300:
+                _object = self._client_wrapper.json_codec.loads(_response.content)
+                self._client_wrapper.session_created(_object)
+                return typing.cast(BrowseOutput, self._client_wrapper.construct_response(type_=BrowseOutput, object_=_object, request_options=request_options))  # type: ignore
+            if _response.status_code == 400:
+                raise BadRequestError(
+                    typing.cast(BadRequestResponse, construct_type(type_=BadRequestResponse, object_=_response.json()))  # type: ignore
+                )
+            if _response.status_code == 401:
+                raise UnauthorizedError(
+                    typing.cast(UnauthorizedResponse, construct_type(type_=UnauthorizedResponse, object_=_response.json()))  # type: ignore
+                )
+            if _response.status_code == 402:
+                raise PaymentRequiredError(
+                    typing.cast(PaymentRequiredResponse, construct_type(type_=PaymentRequiredResponse, object_=_response.json()))  # type: ignore
+                )
+            if _response.status_code == 422:
+                raise UnprocessableEntityError(
+                    typing.cast(HttpValidationError, construct_type(type_=HttpValidationError, object_=_response.json()))  # type: ignore
+                )
+            if _response.status_code == 500:
+                raise InternalServerError(
+                    typing.cast(InternalServerErrorResponse, construct_type(type_=InternalServerErrorResponse, object_=_response.json()))  # type: ignore
+                )
+            _response_json = _response.json()
+        except JSONDecodeError:
+            raise ApiError(status_code=_response.status_code, body=_response.text)
+        raise ApiError(status_code=_response.status_code, body=_response_json)
+
+    def browse_many(
+        self,
+        commands: typing.Iterable[typing.Union[str, BrowseCommand]],
+        *,
+        concurrency: int = 8,
+        fatal_errors: typing.Tuple[typing.Type[BaseException], ...] = FATAL_ERRORS,
+        request_options: typing.Optional[RequestOptions] = None,
+    ) -> typing.AsyncIterator[BatchResult[BrowseOutput]]:
+        """
+        Runs many `browse` commands concurrently and yields their results as they complete.
+
+        Parameters
+        ----------
+        commands : typing.Iterable[typing.Union[str, BrowseCommand]]
+            The commands to run, either as a `cmd` string or as the arguments of `browse`. Commands are pulled from the iterable only when a slot is free.
+
+        concurrency : int
+            The maximum number of commands running at once. Connections beyond `max_connections` wait for a free connection.
+
+        fatal_errors : typing.Tuple[typing.Type[BaseException], ...]
+            Errors that stop the batch: the commands still running are cancelled and the error is raised. By default `PaymentRequiredError` and `UnauthorizedError`.
+
+        request_options : typing.Optional[RequestOptions]
+            Request-specific configuration, used for the commands that do not set their own `request_options`.
+
+        Returns
+        -------
+        typing.AsyncIterator[BatchResult[BrowseOutput]]
+            The result of every command in completion order. `index` is the position of the command in `commands`, and any error other than `fatal_errors` is reported in `error`. Stopping the iteration early cancels the commands still running.
+
+        Examples
+        --------
+        from multion.client import AsyncMultiOn
+
+        client = AsyncMultiOn(
+            api_key="YOUR_API_KEY",
+        )
+        async for result in client.browse_many(
+            ["Find the top post on Hackernews", {"cmd": "Find the top comment", "url": "https://news.ycombinator.com/"}],
+            concurrency=2,
+        ):
+            print(result.index, result.result().message)
+        """
+        return arun_batch(
+            lambda command: self.browse(**browse_kwargs(command, request_options)),
+            commands,
+            concurrency=concurrency,
+            fatal_errors=fatal_errors,
+        )
+
+    @traced("retrieve")
+    async def retrieve(
+        self,
+        *,
+        cmd: str,
+        url: typing.Optional[str] = OMIT,
+        session_id: typing.Optional[str] = OMIT,
+        local: typing.Optional[bool] = OMIT,
+        fields: typing.Optional[typing.Sequence[str]] = OMIT,
+        format: typing.Optional[Format] = OMIT,
+        max_items: typing.Optional[float] = OMIT,
+        full_page: typing.Optional[bool] = OMIT,
+        render_js: typing.Optional[bool] = OMIT,
+        scroll_to_bottom: typing.Optional[bool] = OMIT,
+        include_screenshot: typing.Optional[bool] = OMIT,
+        request_options: typing.Optional[RequestOptions] = None
+    ) -> ExtendedRetrieveOutput:
+        """
+        Retrieve data from webpage based on a url and natural language command that guides agents data extraction process.
+
+        The function can create a new session or be used as part of a session.
+
+        Parameters
+        ----------
+        cmd : str
+            A specific natural language instruction on data the agent should extract.
+
+        url : typing.Optional[str]
+            The URL to create or continue session from.
+
+        session_id : typing.Optional[str]
+            Continues the session with session_id if provided.
+
+        local : typing.Optional[bool]
+            Boolean flag to indicate if session to be run locally or in the cloud (Default: False). If set to true, the session will be run locally via your chrome extension. If set to false, the session will be run in the cloud.
+
+        fields : typing.Optional[typing.Sequence[str]]
+            List of fields (columns) to be outputted in data.
+
+        format : typing.Optional[Format]
+
+        max_items : typing.Optional[float]
+            Maximum number of data items to retrieve. (Default: 100)
+
+        full_page : typing.Optional[bool]
+            Flag to retrieve full page (Default: True). If set to false, the data will only be retrieved from the current session viewport.
+
+        render_js : typing.Optional[bool]
+            Flag to include rich JS and ARIA elements in data retrieved. (Default: False)
+
+        scroll_to_bottom : typing.Optional[bool]
+            Flag to scroll to the bottom of the page (Default: False). If set to true, the page will be scrolled to the bottom for a maximum of 5 seconds before data is retrieved.
+
+        include_screenshot : typing.Optional[bool]
+            Flag to include a screenshot with the response. (Default: False)
+
+        request_options : typing.Optional[RequestOptions]
+            Request-specific configuration.
+
+        Returns
+        -------
+        ExtendedRetrieveOutput
+            Successful Response
+
+        Examples
+        --------
+        from multion.client import AsyncMultiOn
+
+        client = AsyncMultiOn(
+            api_key="YOUR_API_KEY",
+        )
+        await client.retrieve(
+            cmd="Find the top post on Hackernews and get its title and points.",
+            url="https://news.ycombinator.com/",
+            fields=["title", "points"],
+        )
+        """
+        _response = await self._client_wrapper.httpx_client.request(
+            "retrieve",
+            method="POST",
+            json={
+                "cmd": cmd,
+                "url": url,
+                "session_id": session_id,
+                "local": local,
+                "fields": fields,
+                "format": format,
+                "max_items": max_items,
+                "full_page": full_page,
+                "render_js": render_js,
+                "scroll_to_bottom": scroll_to_bottom,
+                "include_screenshot": include_screenshot,
+            },
+            request_options=request_options,
+            omit=OMIT,
+            # Retrieving from a session depends on the state of its page, so only stateless calls are cached.
+            cache=session_id is OMIT or session_id is None,
+            endpoint="retrieve",
+        )
+        try:
+            if 200 <= _response.status_code < 300:
+                return typing.cast(ExtendedRetrieveOutput, self._client_wrapper.construct_response(type_=ExtendedRetrieveOutput, object_=self._client_wrapper.json_codec.loads(_response.content), request_options=request_options))  # type: ignore
+            if _response.status_code == 422:
+                raise UnprocessableEntityError(
+                    typing.cast(HttpValidationError, construct_type(type_=HttpValidationError, object_=_response.json()))  # type: ignore
+                )
+            _response_json = _response.json()
+        except JSONDecodeError:
+            raise ApiError(status_code=_response.status_code, body=_response.text)
+        raise ApiError(status_code=_response.status_code, body=_response_json)
+
+    def retrieve_many(
+        self,
+        *,
+        cmd: str,
+        urls: typing.Iterable[str],
+        local: typing.Optional[bool] = OMIT,
+        fields: typing.Optional[typing.Sequence[str]] = OMIT,
+        format: typing.Optional[Format] = OMIT,
+        max_items: typing.Optional[float] = OMIT,
+        full_page: typing.Optional[bool] = OMIT,
+        render_js: typing.Optional[bool] = OMIT,
+        scroll_to_bottom: typing.Optional[bool] = OMIT,
+        concurrency: int = 8,
+        on_error: typing.Optional[typing.Callable[[str, Exception], None]] = None,
+        fatal_errors: typing.Tuple[typing.Type[BaseException], ...] = FATAL_ERRORS,
+        request_options: typing.Optional[RequestOptions] = None,
+    ) -> typing.AsyncIterator[RetrievedRow]:
+        """
+        Runs `retrieve` with the same command on many URLs concurrently, and yields the retrieved rows one by one as each response arrives, so that memory use does not grow with the number of URLs.
+
+        Parameters
+        ----------
+        cmd : str
+            A specific natural language instruction on data the agent should extract.
+
+        urls : typing.Iterable[str]
+            The URLs to retrieve data from. URLs are pulled from the iterable only when a retrieval can start.
+
+        local : typing.Optional[bool]
+            Boolean flag to indicate if sessions are run locally or in the cloud (Default: False).
+
+        fields : typing.Optional[typing.Sequence[str]]
+            List of fields (columns) to be outputted in data.
+
+        format : typing.Optional[Format]
+
+        max_items : typing.Optional[float]
+            Maximum number of data items to retrieve per URL. (Default: 100)
+
+        full_page : typing.Optional[bool]
+            Flag to retrieve full pages (Default: True).
+
+        render_js : typing.Optional[bool]
+            Flag to include rich JS and ARIA elements in data retrieved. (Default: False)
+
+        scroll_to_bottom : typing.Optional[bool]
+            Flag to scroll to the bottom of pages before data is retrieved (Default: False).
+
+        concurrency : int
+            The maximum number of retrievals running at once.
+
+        on_error : typing.Optional[typing.Callable[[str, Exception], None]]
+            Called with the URL and the error of every failed retrieval, which is then skipped. When not set, the first failure stops the batch and is raised.
+
+        fatal_errors : typing.Tuple[typing.Type[BaseException], ...]
+            Errors that always stop the batch. By default `PaymentRequiredError` and `UnauthorizedError`.
+
+        request_options : typing.Optional[RequestOptions]
+            Request-specific configuration. Responses are decoded with the "raw" response mode unless `response_mode` is set.
+
+        Returns
+        -------
+        typing.AsyncIterator[RetrievedRow]
+            Every row retrieved, tagged with the URL it comes from and the position of that URL in `urls`. Rows of a URL are contiguous, and URLs come in completion order. Stopping the iteration early cancels the retrievals still running.
+
+        Examples
+        --------
+        from multion.client import AsyncMultiOn
+
+        client = AsyncMultiOn(
+            api_key="YOUR_API_KEY",
+        )
+        async for row in client.retrieve_many(
+            cmd="Get the name and price of every product",
+            urls=["https://example.com/catalog?page=1", "https://example.com/catalog?page=2"],
+            fields=["name", "price"],
+        ):
+            print(row.url, row.data)
+        """
+        return aretrieve_rows(
+            lambda url: self.retrieve(
+                cmd=cmd,
+                url=url,
+                local=local,
+                fields=fields,
+                format=format,
+                max_items=max_items,
+                full_page=full_page,
+                render_js=render_js,
+                scroll_to_bottom=scroll_to_bottom,
+                request_options=retrieve_request_options(request_options),
+            ),
+            urls,
+            concurrency=concurrency,
+            fatal_errors=fatal_errors,
+            on_error=on_error,
+        )
+
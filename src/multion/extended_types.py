@@ -0,0 +1,39 @@
+import typing
+
+from . import columnar
+from .types.retrieve_output import RetrieveOutput
+
+
+class ExtendedRetrieveOutput(RetrieveOutput):
+    """
+    The `RetrieveOutput` returned by the `retrieve` methods of the clients of `multion.client`, which can export its
+    rows to columns, NumPy arrays, Arrow tables and Parquet files.
+    """
+
+    def to_columns(
+        self, fields: typing.Optional[typing.Sequence[str]] = None
+    ) -> typing.Dict[str, typing.List[typing.Any]]:
+        """
+        Pivots `data` into one list of values per field, see `multion.columnar.to_columns`.
+        """
+        return columnar.to_columns(self.data, fields)
+
+    def to_numpy(self, fields: typing.Optional[typing.Sequence[str]] = None) -> typing.Dict[str, typing.Any]:
+        """
+        Pivots `data` into one NumPy array per field, see `multion.columnar.to_numpy`. Requires numpy.
+        """
+        return columnar.to_numpy(self.data, fields)
+
+    def to_arrow(self, fields: typing.Optional[typing.Sequence[str]] = None) -> typing.Any:
+        """
+        Converts `data` into a `pyarrow.Table`, see `multion.columnar.to_arrow`. Requires pyarrow.
+        """
+        return columnar.to_arrow(self.data, fields)
+
+    def write_parquet(
+        self, where: typing.Any, fields: typing.Optional[typing.Sequence[str]] = None, **parquet_options: typing.Any
+    ) -> None:
+        """
+        Writes `data` to a Parquet file. Requires pyarrow, use `multion.columnar.ParquetWriter` to write many responses to the same file.
+        """
+        columnar.write_parquet(self.data, where, fields, **parquet_options)
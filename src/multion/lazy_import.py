@@ -0,0 +1,29 @@
+import typing
+from importlib import import_module
+
+
+def lazy_exports(
+    package: str, namespace: typing.Dict[str, typing.Any], dynamic_imports: typing.Dict[str, str]
+) -> typing.Tuple[typing.Callable[[str], typing.Any], typing.Callable[[], typing.List[str]]]:
+    """
+    Returns the module `__getattr__` and `__dir__` of `package`, which import the names of `dynamic_imports` from
+    the module they are mapped to, relative to `package`, when first accessed. A name mapped to the module of the
+    same name, e.g. `"sessions": ".sessions"`, is that module. Names are stored in `namespace`, the globals of
+    `package`, once imported.
+
+    It lives outside of `multion.core`, whose `__init__` imports httpx and pydantic.
+    """
+
+    def __getattr__(attr_name: str) -> typing.Any:
+        module_name = dynamic_imports.get(attr_name)
+        if module_name is None:
+            raise AttributeError(f"module {package!r} has no attribute {attr_name!r}")
+        module = import_module(module_name, package)
+        result = module if module_name == f".{attr_name}" else getattr(module, attr_name)
+        namespace[attr_name] = result
+        return result
+
+    def __dir__() -> typing.List[str]:
+        return sorted({*namespace.get("__all__", ()), *dynamic_imports})
+
+    return __getattr__, __dir__
@@ -1,13 +1,29 @@
 # This file was auto-generated by Fern from our API Definition.
 
-from .types import (
-    CreateSessionInputBrowserParams,
-    SessionsCloseResponse,
-    SessionsListResponse,
-    SessionsScreenshotResponse,
-    SessionsStepRequestBrowserParams,
-    SessionsStepStreamRequestBrowserParams,
-)
+import typing
+
+from ..lazy_import import lazy_exports
+
+if typing.TYPE_CHECKING:
+    from .types import (
+        CreateSessionInputBrowserParams,
+        SessionsCloseResponse,
+        SessionsListResponse,
+        SessionsScreenshotResponse,
+        SessionsStepRequestBrowserParams,
+        SessionsStepStreamRequestBrowserParams,
+    )
+
+_dynamic_imports: typing.Dict[str, str] = {
+    "CreateSessionInputBrowserParams": ".types",
+    "SessionsCloseResponse": ".types",
+    "SessionsListResponse": ".types",
+    "SessionsScreenshotResponse": ".types",
+    "SessionsStepRequestBrowserParams": ".types",
+    "SessionsStepStreamRequestBrowserParams": ".types",
+}
+
+__getattr__, __dir__ = lazy_exports(__name__, globals(), _dynamic_imports)
 
 __all__ = [
     "CreateSessionInputBrowserParams",
@@ -0,0 +1,223 @@
+import abc
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+import typing
+import urllib.parse
+
+from ..core.jsonable_encoder import jsonable_encoder
+from ..core.response_view import ResponseView
+
+
+class Checkpoint:
+    """
+    The progress of a `sessions.run` workflow, saved after each step so that it can be resumed with
+    `sessions.resume` by another process: the session being driven, the number of steps taken, the status and output
+    of the last step as decoded JSON, the command to send next (None when the workflow is finished or waits for an
+    answer to "ASK_USER"), and the step parameters of the run.
+    """
+
+    __slots__ = ("key", "session_id", "cmd", "status", "steps", "output", "params", "updated_at")
+
+    def __init__(
+        self,
+        *,
+        key: str,
+        session_id: str,
+        cmd: typing.Optional[str],
+        status: typing.Optional[str],
+        steps: int,
+        output: typing.Optional[typing.Dict[str, typing.Any]],
+        params: typing.Dict[str, typing.Any],
+        updated_at: float,
+    ):
+        self.key = key
+        self.session_id = session_id
+        self.cmd = cmd
+        self.status = status
+        self.steps = steps
+        self.output = output
+        self.params = params
+        self.updated_at = updated_at
+
+    @property
+    def finished(self) -> bool:
+        return self.status is not None and self.status not in ("CONTINUE", "ASK_USER")
+
+    def to_dict(self) -> typing.Dict[str, typing.Any]:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    @classmethod
+    def from_dict(cls, data: typing.Dict[str, typing.Any]) -> "Checkpoint":
+        return cls(**{name: data[name] for name in cls.__slots__})
+
+    def __eq__(self, other: typing.Any) -> bool:
+        return isinstance(other, Checkpoint) and self.to_dict() == other.to_dict()
+
+    def __hash__(self) -> int:
+        return hash((self.key, self.session_id, self.cmd, self.status, self.steps, self.updated_at))
+
+    def __repr__(self) -> str:
+        return (
+            f"Checkpoint(key={self.key!r}, session_id={self.session_id!r}, status={self.status!r}, steps={self.steps})"
+        )
+
+
+class CheckpointStore(abc.ABC):
+    """
+    Persists checkpoints by key. Subclasses implement `load`, `save`, `delete` and `checkpoints`.
+    """
+
+    @abc.abstractmethod
+    def load(self, key: str) -> typing.Optional[Checkpoint]:
+        """
+        Returns the checkpoint saved under `key`, if any.
+        """
+
+    @abc.abstractmethod
+    def save(self, checkpoint: Checkpoint) -> None:
+        """
+        Saves `checkpoint` under its key, replacing the previous one.
+        """
+
+    @abc.abstractmethod
+    def delete(self, key: str) -> None:
+        """
+        Deletes the checkpoint saved under `key`, if any.
+        """
+
+    @abc.abstractmethod
+    def checkpoints(self) -> typing.List[Checkpoint]:
+        """
+        Returns every checkpoint of the store, e.g. to find the workflows left unfinished by workers that died.
+        """
+
+
+class FileCheckpointStore(CheckpointStore):
+    """
+    A `CheckpointStore` keeping each checkpoint in a JSON file of `directory`, replaced atomically on save.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, urllib.parse.quote(key, safe="") + ".json")
+
+    def load(self, key: str) -> typing.Optional[Checkpoint]:
+        try:
+            with open(self._path(key), encoding="utf-8") as file:
+                return Checkpoint.from_dict(json.load(file))
+        except FileNotFoundError:
+            return None
+
+    def save(self, checkpoint: Checkpoint) -> None:
+        # Written to a temporary file first, so that a process dying mid-write leaves the previous checkpoint intact.
+        fd, temporary_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as file:
+                json.dump(checkpoint.to_dict(), file)
+            os.replace(temporary_path, self._path(checkpoint.key))
+        except BaseException:
+            os.unlink(temporary_path)
+            raise
+
+    def delete(self, key: str) -> None:
+        try:
+            os.unlink(self._path(key))
+        except FileNotFoundError:
+            pass
+
+    def checkpoints(self) -> typing.List[Checkpoint]:
+        checkpoints = []
+        for name in sorted(os.listdir(self.directory)):
+            if name.endswith(".json"):
+                checkpoint = self.load(urllib.parse.unquote(name[: -len(".json")]))
+                if checkpoint is not None:
+                    checkpoints.append(checkpoint)
+        return checkpoints
+
+
+class SQLiteCheckpointStore(CheckpointStore):
+    """
+    A `CheckpointStore` stored in a SQLite database at `path`, which can be shared by all the processes of a host.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+        with self._connect() as connection:
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS checkpoints (key TEXT PRIMARY KEY, checkpoint TEXT NOT NULL)"
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        # sqlite3 connections cannot be shared between threads, each thread opens its own.
+        connection: typing.Optional[sqlite3.Connection] = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=30)
+            connection.execute("PRAGMA journal_mode=WAL")
+            self._local.connection = connection
+        return connection
+
+    def load(self, key: str) -> typing.Optional[Checkpoint]:
+        with self._connect() as connection:
+            row = connection.execute("SELECT checkpoint FROM checkpoints WHERE key = ?", (key,)).fetchone()
+        return None if row is None else Checkpoint.from_dict(json.loads(row[0]))
+
+    def save(self, checkpoint: Checkpoint) -> None:
+        with self._connect() as connection:
+            connection.execute(
+                "INSERT OR REPLACE INTO checkpoints (key, checkpoint) VALUES (?, ?)",
+                (checkpoint.key, json.dumps(checkpoint.to_dict())),
+            )
+
+    def delete(self, key: str) -> None:
+        with self._connect() as connection:
+            connection.execute("DELETE FROM checkpoints WHERE key = ?", (key,))
+
+    def checkpoints(self) -> typing.List[Checkpoint]:
+        with self._connect() as connection:
+            rows = connection.execute("SELECT checkpoint FROM checkpoints ORDER BY key").fetchall()
+        return [Checkpoint.from_dict(json.loads(row[0])) for row in rows]
+
+
+class Checkpointer:
+    """
+    Saves the checkpoints of one run to `store` under `key`.
+    """
+
+    def __init__(self, store: CheckpointStore, *, key: str, session_id: str, params: typing.Dict[str, typing.Any]):
+        self.store = store
+        self.key = key
+        self.session_id = session_id
+        self.params = params
+
+    def save(
+        self, *, cmd: typing.Optional[str], status: typing.Optional[str], steps: int, output: typing.Any
+    ) -> None:
+        self.store.save(
+            Checkpoint(
+                key=self.key,
+                session_id=self.session_id,
+                cmd=cmd,
+                status=status,
+                steps=steps,
+                output=to_json(output),
+                params=self.params,
+                updated_at=time.time(),
+            )
+        )
+
+
+def to_json(value: typing.Any) -> typing.Any:
+    """
+    Converts a response, whatever the response mode it was decoded with, to JSON-compatible values.
+    """
+    if isinstance(value, ResponseView):
+        return value.dict()
+    return jsonable_encoder(value)
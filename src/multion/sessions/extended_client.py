@@ -0,0 +1,1630 @@
+import typing
+from json.decoder import JSONDecodeError
+
+import httpx
+import httpx_sse
+
+from ..batch import BatchResult, arun_batch, run_batch
+from ..core.api_error import ApiError
+from ..core.extended_client_wrapper import ExtendedAsyncClientWrapper, ExtendedSyncClientWrapper
+from ..core.event_stream import AsyncEventStream, EventStream
+from ..core.jsonable_encoder import jsonable_encoder
+from ..core.request_options import RequestOptions
+from ..core.tracing import traced
+from ..core.unchecked_base_model import construct_type
+from ..errors.unprocessable_entity_error import UnprocessableEntityError
+from ..types.http_validation_error import HttpValidationError
+from ..types.mode import Mode
+from ..types.session_created import SessionCreated
+from ..types.session_step_stream_chunk import SessionStepStreamChunk
+from ..types.session_step_success import SessionStepSuccess
+from .checkpoint import Checkpoint, Checkpointer, CheckpointStore, to_json
+from .client import AsyncSessionsClient, SessionsClient
+from .runner import (
+    DEFAULT_MAX_STEPS,
+    OnAskUser,
+    RunResult,
+    StepRecord,
+    _maybe_await,
+    arun_steps,
+    is_final_chunk,
+    resumed_result,
+    run_steps,
+)
+from .types.create_session_input_browser_params import CreateSessionInputBrowserParams
+from .types.sessions_close_response import SessionsCloseResponse
+from .types.sessions_list_response import SessionsListResponse
+from .types.sessions_screenshot_response import SessionsScreenshotResponse
+from .types.sessions_step_request_browser_params import SessionsStepRequestBrowserParams
+from .types.sessions_step_stream_request_browser_params import SessionsStepStreamRequestBrowserParams
+
+# this is used as the default value for optional parameters
+OMIT = typing.cast(typing.Any, ...)
+
+
+def _step_stream_chunk_decoder(
+    client_wrapper: typing.Union[ExtendedSyncClientWrapper, ExtendedAsyncClientWrapper],
+    request_options: typing.Optional[RequestOptions],
+) -> typing.Callable[[httpx_sse.ServerSentEvent], SessionStepStreamChunk]:
+    def decode(_sse: httpx_sse.ServerSentEvent) -> SessionStepStreamChunk:
+        return typing.cast(SessionStepStreamChunk, client_wrapper.construct_response(type_=SessionStepStreamChunk, object_=client_wrapper.json_codec.loads(_sse.data), request_options=request_options))  # type: ignore
+
+    return decode
+
+
+def _raise_step_stream_error(_response: httpx.Response) -> typing.NoReturn:
+    try:
+        if _response.status_code == 422:
+            raise UnprocessableEntityError(
+                typing.cast(HttpValidationError, construct_type(type_=HttpValidationError, object_=_response.json()))  # type: ignore
+            )
+        _response_json = _response.json()
+    except JSONDecodeError:
+        raise ApiError(status_code=_response.status_code, body=_response.text)
+    raise ApiError(status_code=_response.status_code, body=_response_json)
+
+
+def _session_ids(response: typing.Any) -> typing.List[str]:
+    # `list` may return a model, a view or the decoded JSON depending on the response mode.
+    return list(response["session_ids"] if isinstance(response, dict) else response.session_ids)
+
+
+def _by_session_id(
+    session_ids: typing.List[str], results: typing.Iterable[BatchResult[SessionsCloseResponse]]
+) -> typing.Dict[str, BatchResult[SessionsCloseResponse]]:
+    by_index = {result.index: result for result in results}
+    return {session_ids[index]: by_index[index] for index in sorted(by_index)}
+
+
+def _checkpoint_output(
+    client_wrapper: typing.Union[ExtendedSyncClientWrapper, ExtendedAsyncClientWrapper],
+    checkpoint: Checkpoint,
+    request_options: typing.Optional[RequestOptions],
+) -> typing.Any:
+    if checkpoint.output is None:
+        return None
+    type_: typing.Any = SessionStepStreamChunk if is_final_chunk(checkpoint.output) else SessionStepSuccess
+    return client_wrapper.construct_response(type_=type_, object_=checkpoint.output, request_options=request_options)
+
+
+class ExtendedSessionsClient(SessionsClient):
+    """
+    `SessionsClient` whose calls go through the extensions of the client: responses are decoded according to its
+    response mode, created sessions are tracked and calls are traced. It adds batch closing, and running and resuming
+    sessions step by step.
+    """
+
+    _client_wrapper: ExtendedSyncClientWrapper
+
+    def __init__(self, *, client_wrapper: ExtendedSyncClientWrapper):
+        super().__init__(client_wrapper=client_wrapper)
+
+    @traced("sessions.create")
+    def create(
+        self,
+        *,
+        url: str,
+        local: typing.Optional[bool] = OMIT,
+        agent_id: typing.Optional[str] = OMIT,
+        mode: typing.Optional[Mode] = OMIT,
+        use_proxy: typing.Optional[bool] = OMIT,
+        browser_params: typing.Optional[CreateSessionInputBrowserParams] = OMIT,
+        include_screenshot: typing.Optional[bool] = OMIT,
+        request_options: typing.Optional[RequestOptions] = None,
+    ) -> SessionCreated:
+        """
+        Creates a new session and returns session details including a unique session ID. A session remains active for 10 minutes of inactivity.
+
+        Parameters
+        ----------
+        url : str
+            The URL to create or continue session from.
+
+        local : typing.Optional[bool]
+            Boolean flag to indicate if session to be run locally or in the cloud (Default: False). If set to true, the session will be run locally via your chrome extension. If set to false, the session will be run in the cloud.
+
+        agent_id : typing.Optional[str]
+            The agent id to use for the session.
+
+        mode : typing.Optional[Mode]
+
+        use_proxy : typing.Optional[bool]
+            Boolean flag to use a proxy for the session (Default: False). Each Session gets a new Residential IP.
+
+        browser_params : typing.Optional[CreateSessionInputBrowserParams]
+            Object containing height and width for the browser screen size.
+
+        include_screenshot : typing.Optional[bool]
+
+        request_options : typing.Optional[RequestOptions]
+            Request-specific configuration.
+
+        Returns
+        -------
+        SessionCreated
+            Session successfully created
+
+        Examples
+        --------
+        from multion.client import MultiOn
+
+        client = MultiOn(
+            api_key="YOUR_API_KEY",
+        )
+        client.sessions.create(
+            url="url",
+        )
+        """
+        _response = self._client_wrapper.httpx_client.request(
+            "session",
+            method="POST",
+            json={
+                "url": url,
+                "local": local,
+                "agent_id": agent_id,
+                "mode": mode,
+                "use_proxy": use_proxy,
+                "browser_params": browser_params,
+                "include_screenshot": include_screenshot,
+            },
+            request_options=request_options,
+            omit=OMIT,
+            endpoint="sessions.create",
+        )
+        try:
+            if 200 <= _response.status_code < 300:
+                _object = self._client_wrapper.json_codec.loads(_response.content)
+                self._client_wrapper.session_created(_object)
+                return typing.cast(SessionCreated, self._client_wrapper.construct_response(type_=SessionCreated, object_=_object, request_options=request_options))  # type: ignore
+            if _response.status_code == 422:
+                raise UnprocessableEntityError(
+                    typing.cast(HttpValidationError, construct_type(type_=HttpValidationError, object_=_response.json()))  # type: ignore
+                )
+            _response_json = _response.json()
+        except JSONDecodeError:
+            raise ApiError(status_code=_response.status_code, body=_response.text)
+        raise ApiError(status_code=_response.status_code, body=_response_json)
+
+    @traced("sessions.step_stream")
+    def step_stream(
+        self,
+        session_id: str,
+        *,
+        cmd: str,
+        url: typing.Optional[str] = OMIT,
+        browser_params: typing.Optional[SessionsStepStreamRequestBrowserParams] = OMIT,
+        temperature: typing.Optional[float] = OMIT,
+        agent_id: typing.Optional[str] = OMIT,
+        mode: typing.Optional[Mode] = OMIT,
+        include_screenshot: typing.Optional[bool] = OMIT,
+        request_options: typing.Optional[RequestOptions] = None,
+    ) -> EventStream[SessionStepStreamChunk]:
+        """
+        Allows for browsing the web using detailed natural language instructions in a step mode for a session with a given session ID
+
+        Parameters
+        ----------
+        session_id : str
+
+        cmd : str
+            A specific natural language instruction for the next step.
+
+        url : typing.Optional[str]
+            The URL to create or continue session from.
+
+        browser_params : typing.Optional[SessionsStepStreamRequestBrowserParams]
+            Object containing height and width for the browser screen size.
+
+        temperature : typing.Optional[float]
+            The temperature of model
+
+        agent_id : typing.Optional[str]
+            The agent id to use for the session.
+
+        mode : typing.Optional[Mode]
+
+        include_screenshot : typing.Optional[bool]
+
+        request_options : typing.Optional[RequestOptions]
+            Request-specific configuration.
+
+        Returns
+        -------
+        EventStream[SessionStepStreamChunk]
+            An iterator over the chunks of the step. When the `max_retries` request option is set, the stream is resumed if the connection drops, skipping chunks that were already yielded, provided the server assigned ids to them. Otherwise the error is raised, since reconnecting sends the step again. `reconnects` holds the number of reconnections.
+
+        Examples
+        --------
+        from multion import SessionsStepStreamRequestBrowserParams
+        from multion.client import MultiOn
+
+        client = MultiOn(
+            api_key="YOUR_API_KEY",
+        )
+        response = client.sessions.step_stream(
+            session_id="string",
+            cmd="string",
+            url="string",
+            browser_params=SessionsStepStreamRequestBrowserParams(
+                height=1.1,
+                width=1.1,
+            ),
+            temperature=1.1,
+            agent_id="string",
+            mode="fast",
+            include_screenshot=True,
+        )
+        for chunk in response:
+            yield chunk
+        """
+        return EventStream(
+            http_client=self._client_wrapper.httpx_client,
+            request=self._client_wrapper.httpx_client.build_request(
+                f"session/{jsonable_encoder(session_id)}",
+                method="POST",
+                json={
+                    "cmd": cmd,
+                    "url": url,
+                    "browser_params": browser_params,
+                    "temperature": temperature,
+                    "agent_id": agent_id,
+                    "mode": mode,
+                    "include_screenshot": include_screenshot,
+                    "stream": True,
+                },
+                request_options=request_options,
+                omit=OMIT,
+            ),
+            decode=_step_stream_chunk_decoder(self._client_wrapper, request_options),
+            raise_for_status=_raise_step_stream_error,
+            request_options=request_options,
+        )
+
+    @traced("sessions.step")
+    def step(
+        self,
+        session_id: str,
+        *,
+        cmd: str,
+        url: typing.Optional[str] = OMIT,
+        browser_params: typing.Optional[SessionsStepRequestBrowserParams] = OMIT,
+        temperature: typing.Optional[float] = OMIT,
+        agent_id: typing.Optional[str] = OMIT,
+        mode: typing.Optional[Mode] = OMIT,
+        include_screenshot: typing.Optional[bool] = OMIT,
+        request_options: typing.Optional[RequestOptions] = None,
+    ) -> SessionStepSuccess:
+        """
+        Allows for browsing the web using detailed natural language instructions in a step mode for a session with a given session ID
+
+        Parameters
+        ----------
+        session_id : str
+
+        cmd : str
+            A specific natural language instruction for the next step.
+
+        url : typing.Optional[str]
+            The URL to create or continue session from.
+
+        browser_params : typing.Optional[SessionsStepRequestBrowserParams]
+            Object containing height and width for the browser screen size.
+
+        temperature : typing.Optional[float]
+            The temperature of model
+
+        agent_id : typing.Optional[str]
+            The agent id to use for the session.
+
+        mode : typing.Optional[Mode]
+
+        include_screenshot : typing.Optional[bool]
+
+        request_options : typing.Optional[RequestOptions]
+            Request-specific configuration.
+
+        Returns
+        -------
+        SessionStepSuccess
+
+
+        Examples
+        --------
+        from multion.client import MultiOn
+
+        client = MultiOn(
+            api_key="YOUR_API_KEY",
+        )
+        client.sessions.step(
+            session_id="session_id",
+            cmd="cmd",
+        )
+        """
+        _response = self._client_wrapper.httpx_client.request(
+            f"session/{jsonable_encoder(session_id)}",
+            method="POST",
+            json={
+                "cmd": cmd,
+                "url": url,
+                "browser_params": browser_params,
+                "temperature": temperature,
+                "agent_id": agent_id,
+                "mode": mode,
+                "include_screenshot": include_screenshot,
+                "stream": False,
+            },
+            request_options=request_options,
+            omit=OMIT,
+            endpoint="sessions.step",
+        )
+        try:
+            if 200 <= _response.status_code < 300:
+                return typing.cast(SessionStepSuccess, self._client_wrapper.construct_response(type_=SessionStepSuccess, object_=self._client_wrapper.json_codec.loads(_response.content), request_options=request_options))  # type: ignore
+            if _response.status_code == 422:
+                raise UnprocessableEntityError(
+                    typing.cast(HttpValidationError, construct_type(type_=HttpValidationError, object_=_response.json()))  # type: ignore
+                )
+            _response_json = _response.json()
+        except JSONDecodeError:
+            raise ApiError(status_code=_response.status_code, body=_response.text)
+        raise ApiError(status_code=_response.status_code, body=_response_json)
+
+    @traced("sessions.close")
+    def close(
+        self, session_id: str, *, request_options: typing.Optional[RequestOptions] = None
+    ) -> SessionsCloseResponse:
+        """
+        Closes the session.
+
+        Parameters
+        ----------
+        session_id : str
+
+        request_options : typing.Optional[RequestOptions]
+            Request-specific configuration.
+
+        Returns
+        -------
+        SessionsCloseResponse
+            Successful Response
+
+        Examples
+        --------
+        from multion.client import MultiOn
+
+        client = MultiOn(
+            api_key="YOUR_API_KEY",
+        )
+        client.sessions.close(
+            session_id="session_id",
+        )
+        """
+        _response = self._client_wrapper.httpx_client.request(
+            f"session/{jsonable_encoder(session_id)}",
+            method="DELETE",
+            request_options=request_options,
+            endpoint="sessions.close",
+        )
+        try:
+            if 200 <= _response.status_code < 300:
+                self._client_wrapper.session_closed(session_id)
+                return typing.cast(SessionsCloseResponse, self._client_wrapper.construct_response(type_=SessionsCloseResponse, object_=self._client_wrapper.json_codec.loads(_response.content), request_options=request_options))  # type: ignore
+            if _response.status_code == 422:
+                raise UnprocessableEntityError(
+                    typing.cast(HttpValidationError, construct_type(type_=HttpValidationError, object_=_response.json()))  # type: ignore
+                )
+            _response_json = _response.json()
+        except JSONDecodeError:
+            raise ApiError(status_code=_response.status_code, body=_response.text)
+        raise ApiError(status_code=_response.status_code, body=_response_json)
+
+    @traced("sessions.screenshot")
+    def screenshot(
+        self, session_id: str, *, request_options: typing.Optional[RequestOptions] = None
+    ) -> SessionsScreenshotResponse:
+        """
+        Retrieve the screenshot of the session.
+
+        Parameters
+        ----------
+        session_id : str
+
+        request_options : typing.Optional[RequestOptions]
+            Request-specific configuration.
+
+        Returns
+        -------
+        SessionsScreenshotResponse
+            Successful Response
+
+        Examples
+        --------
+        from multion.client import MultiOn
+
+        client = MultiOn(
+            api_key="YOUR_API_KEY",
+        )
+        client.sessions.screenshot(
+            session_id="session_id",
+        )
+        """
+        _response = self._client_wrapper.httpx_client.request(
+            f"screenshot/{jsonable_encoder(session_id)}",
+            method="GET",
+            request_options=request_options,
+            endpoint="sessions.screenshot",
+        )
+        try:
+            if 200 <= _response.status_code < 300:
+                return typing.cast(SessionsScreenshotResponse, self._client_wrapper.construct_response(type_=SessionsScreenshotResponse, object_=self._client_wrapper.json_codec.loads(_response.content), request_options=request_options))  # type: ignore
+            if _response.status_code == 422:
+                raise UnprocessableEntityError(
+                    typing.cast(HttpValidationError, construct_type(type_=HttpValidationError, object_=_response.json()))  # type: ignore
+                )
+            _response_json = _response.json()
+        except JSONDecodeError:
+            raise ApiError(status_code=_response.status_code, body=_response.text)
+        raise ApiError(status_code=_response.status_code, body=_response_json)
+
+    @traced("sessions.list")
+    def list(self, *, request_options: typing.Optional[RequestOptions] = None) -> SessionsListResponse:
+        """
+        Retrieve a list of active session IDs.
+
+        Parameters
+        ----------
+        request_options : typing.Optional[RequestOptions]
+            Request-specific configuration.
+
+        Returns
+        -------
+        SessionsListResponse
+            Successful Response
+
+        Examples
+        --------
+        from multion.client import MultiOn
+
+        client = MultiOn(
+            api_key="YOUR_API_KEY",
+        )
+        client.sessions.list()
+        """
+        _response = self._client_wrapper.httpx_client.request(
+            "sessions", method="GET", request_options=request_options, endpoint="sessions.list"
+        )
+        try:
+            if 200 <= _response.status_code < 300:
+                return typing.cast(SessionsListResponse, self._client_wrapper.construct_response(type_=SessionsListResponse, object_=self._client_wrapper.json_codec.loads(_response.content), request_options=request_options))  # type: ignore
+            _response_json = _response.json()
+        except JSONDecodeError:
+            raise ApiError(status_code=_response.status_code, body=_response.text)
+        raise ApiError(status_code=_response.status_code, body=_response_json)
+
+    def close_many(
+        self,
+        session_ids: typing.Iterable[str],
+        *,
+        concurrency: int = 16,
+        fatal_errors: typing.Tuple[typing.Type[BaseException], ...] = (),
+        request_options: typing.Optional[RequestOptions] = None,
+    ) -> typing.Dict[str, BatchResult[SessionsCloseResponse]]:
+        """
+        Closes many sessions from a thread pool, with their requests sharing the connection pool of the client.
+
+        Parameters
+        ----------
+        session_ids : typing.Iterable[str]
+
+        concurrency : int
+            The maximum number of sessions being closed at once.
+
+        fatal_errors : typing.Tuple[typing.Type[BaseException], ...]
+            Errors that stop closing sessions and are raised, e.g. `(ApiError,)`. By default errors are only reported in the results.
+
+        request_options : typing.Optional[RequestOptions]
+            Request-specific configuration.
+
+        Returns
+        -------
+        typing.Dict[str, BatchResult[SessionsCloseResponse]]
+            The result of closing each session, by session id in the order of `session_ids`: either the `output` of `close` or the `error` it raised.
+
+        Examples
+        --------
+        from multion.client import MultiOn
+
+        client = MultiOn(
+            api_key="YOUR_API_KEY",
+        )
+        results = client.sessions.close_many(["session_id_1", "session_id_2"])
+        failed = [session_id for session_id, result in results.items() if not result.ok]
+        """
+        session_ids = list(session_ids)
+        results = run_batch(
+            lambda session_id: self.close(session_id, request_options=request_options),
+            session_ids,
+            concurrency=concurrency,
+            fatal_errors=fatal_errors,
+        )
+        return _by_session_id(session_ids, results)
+
+    def close_all(
+        self, *, concurrency: int = 16, request_options: typing.Optional[RequestOptions] = None
+    ) -> typing.Dict[str, BatchResult[SessionsCloseResponse]]:
+        """
+        Closes every active session returned by `list`, see `close_many`.
+
+        Parameters
+        ----------
+        concurrency : int
+            The maximum number of sessions being closed at once.
+
+        request_options : typing.Optional[RequestOptions]
+            Request-specific configuration.
+
+        Returns
+        -------
+        typing.Dict[str, BatchResult[SessionsCloseResponse]]
+            The result of closing each session, by session id.
+
+        Examples
+        --------
+        from multion.client import MultiOn
+
+        client = MultiOn(
+            api_key="YOUR_API_KEY",
+        )
+        client.sessions.close_all()
+        """
+        return self.close_many(
+            _session_ids(self.list(request_options=request_options)),
+            concurrency=concurrency,
+            request_options=request_options,
+        )
+
+    def run(
+        self,
+        session_id: str,
+        *,
+        cmd: str,
+        url: typing.Optional[str] = OMIT,
+        browser_params: typing.Optional[SessionsStepRequestBrowserParams] = OMIT,
+        temperature: typing.Optional[float] = OMIT,
+        agent_id: typing.Optional[str] = OMIT,
+        mode: typing.Optional[Mode] = OMIT,
+        include_screenshot: typing.Optional[bool] = OMIT,
+        max_steps: int = DEFAULT_MAX_STEPS,
+        timeout: typing.Optional[float] = None,
+        stream: bool = False,
+        on_chunk: typing.Optional[typing.Callable[[SessionStepStreamChunk], None]] = None,
+        on_step: typing.Optional[typing.Callable[[StepRecord], None]] = None,
+        on_ask_user: typing.Optional[OnAskUser] = None,
+        checkpoint: typing.Optional[CheckpointStore] = None,
+        checkpoint_key: typing.Optional[str] = None,
+        request_options: typing.Optional[RequestOptions] = None,
+    ) -> RunResult:
+        """
+        Steps a session with the same command until it stops returning "CONTINUE", the step budget is spent or the deadline passes. Only the steps themselves are requested.
+
+        Parameters
+        ----------
+        session_id : str
+
+        cmd : str
+            A specific natural language instruction, repeated for each step.
+
+        url : typing.Optional[str]
+            The URL to continue session from, sent with the first step only.
+
+        browser_params : typing.Optional[SessionsStepRequestBrowserParams]
+            Object containing height and width for the browser screen size.
+
+        temperature : typing.Optional[float]
+            The temperature of model
+
+        agent_id : typing.Optional[str]
+            The agent id to use for the session.
+
+        mode : typing.Optional[Mode]
+
+        include_screenshot : typing.Optional[bool]
+
+        max_steps : int
+            The maximum number of steps taken.
+
+        timeout : typing.Optional[float]
+            The number of seconds after which no step is started. The deadline is best-effort: the step in progress is
+            cut short by a request timeout capped to the time left, and between its chunks when streamed.
+
+        stream : bool
+            Whether to take the steps with `step_stream`, passing each chunk to `on_chunk`. The output of a step is then its final chunk.
+
+        on_chunk : typing.Optional[typing.Callable[[SessionStepStreamChunk], None]]
+            Called with each chunk of the steps when streaming.
+
+        on_step : typing.Optional[typing.Callable[[StepRecord], None]]
+            Called after each step with its status, output and timings.
+
+        on_ask_user : typing.Optional[OnAskUser]
+            Called with the output of a step returning "ASK_USER", and returns the command answering it to keep going, or None to stop.
+
+        checkpoint : typing.Optional[CheckpointStore]
+            Where to save the progress of the run after each step, so that it can be continued with `resume` if the process dies.
+
+        checkpoint_key : typing.Optional[str]
+            The key the progress is saved under, the session ID by default.
+
+        request_options : typing.Optional[RequestOptions]
+            Request-specific configuration, used for every step.
+
+        Returns
+        -------
+        RunResult
+            The status of the last step, why the run stopped ("done", "ask_user", "max_steps" or "deadline") and the steps taken.
+
+        Examples
+        --------
+        from multion.client import MultiOn
+
+        client = MultiOn(
+            api_key="YOUR_API_KEY",
+        )
+        result = client.sessions.run(
+            session_id="session_id",
+            cmd="Find the cheapest flight to Paris",
+            max_steps=10,
+            timeout=300,
+            on_ask_user=lambda output: input(output.message) or None,
+        )
+        print(result.reason, result.output.message)
+        """
+        params = {
+            name: value
+            for name, value in dict(
+                browser_params=browser_params,
+                temperature=temperature,
+                agent_id=agent_id,
+                mode=mode,
+                include_screenshot=include_screenshot,
+            ).items()
+            if value is not OMIT
+        }
+        checkpointer = None
+        if checkpoint is not None:
+            checkpointer = Checkpointer(
+                checkpoint, key=checkpoint_key or session_id, session_id=session_id, params=to_json(params)
+            )
+        return self._run(
+            session_id,
+            cmd=cmd,
+            url=url,
+            params=params,
+            max_steps=max_steps,
+            timeout=timeout,
+            stream=stream,
+            on_chunk=on_chunk,
+            on_step=on_step,
+            on_ask_user=on_ask_user,
+            request_options=request_options,
+            checkpointer=checkpointer,
+        )
+
+    def resume(
+        self,
+        checkpoint_key: str,
+        *,
+        checkpoint: CheckpointStore,
+        max_steps: int = DEFAULT_MAX_STEPS,
+        timeout: typing.Optional[float] = None,
+        stream: bool = False,
+        on_chunk: typing.Optional[typing.Callable[[SessionStepStreamChunk], None]] = None,
+        on_step: typing.Optional[typing.Callable[[StepRecord], None]] = None,
+        on_ask_user: typing.Optional[OnAskUser] = None,
+        request_options: typing.Optional[RequestOptions] = None,
+    ) -> RunResult:
+        """
+        Resumes a run saved to `checkpoint`, e.g. by a worker that died, on the session it was driving instead of a new one. The session is checked to still be active with `list`, then stepped with the pending command and the step parameters of the run, and the checkpoint keeps being saved after each step.
+
+        Parameters
+        ----------
+        checkpoint_key : str
+            The key the run was saved under, the session ID unless `run` was given a `checkpoint_key`.
+
+        checkpoint : CheckpointStore
+            The store the run was saved to.
+
+        max_steps : int
+            The maximum number of steps of the whole run, including the steps taken before the checkpoint.
+
+        timeout : typing.Optional[float]
+            The number of seconds after which no step is started. The deadline is best-effort: the step in progress is
+            cut short by a request timeout capped to the time left, and between its chunks when streamed.
+
+        stream : bool
+            Whether to take the steps with `step_stream`, see `run`.
+
+        on_chunk : typing.Optional[typing.Callable[[SessionStepStreamChunk], None]]
+            Called with each chunk of the steps when streaming.
+
+        on_step : typing.Optional[typing.Callable[[StepRecord], None]]
+            Called after each step with its status, output and timings.
+
+        on_ask_user : typing.Optional[OnAskUser]
+            Called with the output of a step returning "ASK_USER", including the last step of the checkpoint if it was not answered, and returns the command answering it to keep going, or None to stop.
+
+        request_options : typing.Optional[RequestOptions]
+            Request-specific configuration, used for every request.
+
+        Returns
+        -------
+        RunResult
+            The result of the run, whose steps are numbered after the ones of the checkpoint. Finished runs, and runs waiting for an answer that is not given, are returned without taking a step.
+
+        Raises
+        ------
+        LookupError
+            When no checkpoint is saved under `checkpoint_key`, or its session is no longer active.
+
+        Examples
+        --------
+        from multion.client import MultiOn
+        from multion.sessions.checkpoint import SQLiteCheckpointStore
+
+        client = MultiOn(
+            api_key="YOUR_API_KEY",
+        )
+        checkpoints = SQLiteCheckpointStore("checkpoints.db")
+        for saved in checkpoints.checkpoints():
+            if not saved.finished:
+                client.sessions.resume(saved.key, checkpoint=checkpoints, max_steps=40)
+        """
+        saved = checkpoint.load(checkpoint_key)
+        if saved is None:
+            raise LookupError(f"No checkpoint is saved under {checkpoint_key!r}")
+        output = _checkpoint_output(self._client_wrapper, saved, request_options)
+        if saved.finished or (saved.cmd is None and on_ask_user is None):
+            return resumed_result(saved, output)
+        if saved.session_id not in _session_ids(self.list(request_options=request_options)):
+            raise LookupError(f"The session {saved.session_id} of checkpoint {checkpoint_key!r} is no longer active")
+        checkpointer = Checkpointer(checkpoint, key=checkpoint_key, session_id=saved.session_id, params=saved.params)
+        cmd = saved.cmd
+        if cmd is None:
+            cmd = on_ask_user(output)  # type: ignore
+            if cmd is None:
+                return resumed_result(saved, output)
+            checkpointer.save(cmd=cmd, status=saved.status, steps=saved.steps, output=saved.output)
+        return self._run(
+            saved.session_id,
+            cmd=cmd,
+            url=OMIT,
+            params=saved.params,
+            max_steps=max_steps,
+            timeout=timeout,
+            stream=stream,
+            on_chunk=on_chunk,
+            on_step=on_step,
+            on_ask_user=on_ask_user,
+            request_options=request_options,
+            checkpointer=checkpointer,
+            steps_taken=saved.steps,
+            status=saved.status,
+            output=output,
+        )
+
+    def _run(
+        self,
+        session_id: str,
+        *,
+        cmd: str,
+        url: typing.Optional[str],
+        params: typing.Dict[str, typing.Any],
+        max_steps: int,
+        timeout: typing.Optional[float],
+        stream: bool,
+        on_chunk: typing.Optional[typing.Callable[[SessionStepStreamChunk], None]],
+        on_step: typing.Optional[typing.Callable[[StepRecord], None]],
+        on_ask_user: typing.Optional[OnAskUser],
+        request_options: typing.Optional[RequestOptions],
+        checkpointer: typing.Optional[Checkpointer],
+        steps_taken: int = 0,
+        status: typing.Optional[str] = None,
+        output: typing.Any = None,
+    ) -> RunResult:
+        def step(cmd: str, first: bool, request_options: typing.Optional[RequestOptions]) -> SessionStepSuccess:
+            return self.step(session_id, cmd=cmd, url=url if first else OMIT, request_options=request_options, **params)
+
+        def stream_step(
+            cmd: str, first: bool, request_options: typing.Optional[RequestOptions]
+        ) -> EventStream[SessionStepStreamChunk]:
+            return self.step_stream(
+                session_id, cmd=cmd, url=url if first else OMIT, request_options=request_options, **params
+            )
+
+        return run_steps(
+            step,
+            stream_step if stream else None,
+            session_id=session_id,
+            cmd=cmd,
+            max_steps=max_steps,
+            timeout=timeout,
+            on_chunk=on_chunk,
+            on_step=on_step,
+            on_ask_user=on_ask_user,
+            request_options=request_options,
+            checkpointer=checkpointer,
+            steps_taken=steps_taken,
+            status=status,
+            output=output,
+        )
+
+
+class ExtendedAsyncSessionsClient(AsyncSessionsClient):
+    """
+    `AsyncSessionsClient` whose calls go through the extensions of the client: responses are decoded according to its
+    response mode, created sessions are tracked and calls are traced. It adds batch closing, and running and resuming
+    sessions step by step.
+    """
+
+    _client_wrapper: ExtendedAsyncClientWrapper
+
+    def __init__(self, *, client_wrapper: ExtendedAsyncClientWrapper):
+        super().__init__(client_wrapper=client_wrapper)
+
+    @traced("sessions.create")
+    async def create(
+        self,
+        *,
+        url: str,
+        local: typing.Optional[bool] = OMIT,
+        agent_id: typing.Optional[str] = OMIT,
+        mode: typing.Optional[Mode] = OMIT,
+        use_proxy: typing.Optional[bool] = OMIT,
+        browser_params: typing.Optional[CreateSessionInputBrowserParams] = OMIT,
+        include_screenshot: typing.Optional[bool] = OMIT,
+        request_options: typing.Optional[RequestOptions] = None,
+    ) -> SessionCreated:
+        """
+        Creates a new session and returns session details including a unique session ID. A session remains active for 10 minutes of inactivity.
+
+        Parameters
+        ----------
+        url : str
+            The URL to create or continue session from.
+
+        local : typing.Optional[bool]
+            Boolean flag to indicate if session to be run locally or in the cloud (Default: False). If set to true, the session will be run locally via your chrome extension. If set to false, the session will be run in the cloud.
+
+        agent_id : typing.Optional[str]
+            The agent id to use for the session.
+
+        mode : typing.Optional[Mode]
+
+        use_proxy : typing.Optional[bool]
+            Boolean flag to use a proxy for the session (Default: False). Each Session gets a new Residential IP.
+
+        browser_params : typing.Optional[CreateSessionInputBrowserParams]
+            Object containing height and width for the browser screen size.
+
+        include_screenshot : typing.Optional[bool]
+
+        request_options : typing.Optional[RequestOptions]
+            Request-specific configuration.
+
+        Returns
+        -------
+        SessionCreated
+            Session successfully created
+
+        Examples
+        --------
+        from multion.client import AsyncMultiOn
+
+        client = AsyncMultiOn(
+            api_key="YOUR_API_KEY",
+        )
+        await client.sessions.create(
+            url="url",
+        )
+        """
+        _response = await self._client_wrapper.httpx_client.request(
+            "session",
+            method="POST",
+            json={
+                "url": url,
+                "local": local,
+                "agent_id": agent_id,
+                "mode": mode,
+                "use_proxy": use_proxy,
+                "browser_params": browser_params,
+                "include_screenshot": include_screenshot,
+            },
+            request_options=request_options,
+            omit=OMIT,
+            endpoint="sessions.create",
+        )
+        try:
+            if 200 <= _response.status_code < 300:
+                _object = self._client_wrapper.json_codec.loads(_response.content)
+                self._client_wrapper.session_created(_object)
+                return typing.cast(SessionCreated, self._client_wrapper.construct_response(type_=SessionCreated, object_=_object, request_options=request_options))  # type: ignore
+            if _response.status_code == 422:
+                raise UnprocessableEntityError(
+                    typing.cast(HttpValidationError, construct_type(type_=HttpValidationError, object_=_response.json()))  # type: ignore
+                )
+            _response_json = _response.json()
+        except JSONDecodeError:
+            raise ApiError(status_code=_response.status_code, body=_response.text)
+        raise ApiError(status_code=_response.status_code, body=_response_json)
+
+    @traced("sessions.step_stream")
+    def step_stream(
+        self,
+        session_id: str,
+        *,
+        cmd: str,
+        url: typing.Optional[str] = OMIT,
+        browser_params: typing.Optional[SessionsStepStreamRequestBrowserParams] = OMIT,
+        temperature: typing.Optional[float] = OMIT,
+        agent_id: typing.Optional[str] = OMIT,
+        mode: typing.Optional[Mode] = OMIT,
+        include_screenshot: typing.Optional[bool] = OMIT,
+        request_options: typing.Optional[RequestOptions] = None,
+    ) -> AsyncEventStream[SessionStepStreamChunk]:
+        """
+        Allows for browsing the web using detailed natural language instructions in a step mode for a session with a given session ID
+
+        Parameters
+        ----------
+        session_id : str
+
+        cmd : str
+            A specific natural language instruction for the next step.
+
+        url : typing.Optional[str]
+            The URL to create or continue session from.
+
+        browser_params : typing.Optional[SessionsStepStreamRequestBrowserParams]
+            Object containing height and width for the browser screen size.
+
+        temperature : typing.Optional[float]
+            The temperature of model
+
+        agent_id : typing.Optional[str]
+            The agent id to use for the session.
+
+        mode : typing.Optional[Mode]
+
+        include_screenshot : typing.Optional[bool]
+
+        request_options : typing.Optional[RequestOptions]
+            Request-specific configuration.
+
+        Returns
+        -------
+        AsyncEventStream[SessionStepStreamChunk]
+            An iterator over the chunks of the step. When the `max_retries` request option is set, the stream is resumed if the connection drops, skipping chunks that were already yielded, provided the server assigned ids to them. Otherwise the error is raised, since reconnecting sends the step again. `reconnects` holds the number of reconnections.
+
+        Examples
+        --------
+        from multion import SessionsStepStreamRequestBrowserParams
+        from multion.client import AsyncMultiOn
+
+        client = AsyncMultiOn(
+            api_key="YOUR_API_KEY",
+        )
+        response = client.sessions.step_stream(
+            session_id="string",
+            cmd="string",
+            url="string",
+            browser_params=SessionsStepStreamRequestBrowserParams(
+                height=1.1,
+                width=1.1,
+            ),
+            temperature=1.1,
+            agent_id="string",
+            mode="fast",
+            include_screenshot=True,
+        )
+        async for chunk in response:
+            yield chunk
+        """
+        return AsyncEventStream(
+            http_client=self._client_wrapper.httpx_client,
+            request=self._client_wrapper.httpx_client.build_request(
+                f"session/{jsonable_encoder(session_id)}",
+                method="POST",
+                json={
+                    "cmd": cmd,
+                    "url": url,
+                    "browser_params": browser_params,
+                    "temperature": temperature,
+                    "agent_id": agent_id,
+                    "mode": mode,
+                    "include_screenshot": include_screenshot,
+                    "stream": True,
+                },
+                request_options=request_options,
+                omit=OMIT,
+            ),
+            decode=_step_stream_chunk_decoder(self._client_wrapper, request_options),
+            raise_for_status=_raise_step_stream_error,
+            request_options=request_options,
+        )
+
+    @traced("sessions.step")
+    async def step(
+        self,
+        session_id: str,
+        *,
+        cmd: str,
+        url: typing.Optional[str] = OMIT,
+        browser_params: typing.Optional[SessionsStepRequestBrowserParams] = OMIT,
+        temperature: typing.Optional[float] = OMIT,
+        agent_id: typing.Optional[str] = OMIT,
+        mode: typing.Optional[Mode] = OMIT,
+        include_screenshot: typing.Optional[bool] = OMIT,
+        request_options: typing.Optional[RequestOptions] = None,
+    ) -> SessionStepSuccess:
+        """
+        Allows for browsing the web using detailed natural language instructions in a step mode for a session with a given session ID
+
+        Parameters
+        ----------
+        session_id : str
+
+        cmd : str
+            A specific natural language instruction for the next step.
+
+        url : typing.Optional[str]
+            The URL to create or continue session from.
+
+        browser_params : typing.Optional[SessionsStepRequestBrowserParams]
+            Object containing height and width for the browser screen size.
+
+        temperature : typing.Optional[float]
+            The temperature of model
+
+        agent_id : typing.Optional[str]
+            The agent id to use for the session.
+
+        mode : typing.Optional[Mode]
+
+        include_screenshot : typing.Optional[bool]
+
+        request_options : typing.Optional[RequestOptions]
+            Request-specific configuration.
+
+        Returns
+        -------
+        SessionStepSuccess
+
+
+        Examples
+        --------
+        from multion.client import AsyncMultiOn
+
+        client = AsyncMultiOn(
+            api_key="YOUR_API_KEY",
+        )
+        await client.sessions.step(
+            session_id="session_id",
+            cmd="cmd",
+        )
+        """
+        _response = await self._client_wrapper.httpx_client.request(
+            f"session/{jsonable_encoder(session_id)}",
+            method="POST",
+            json={
+                "cmd": cmd,
+                "url": url,
+                "browser_params": browser_params,
+                "temperature": temperature,
+                "agent_id": agent_id,
+                "mode": mode,
+                "include_screenshot": include_screenshot,
+                "stream": False,
+            },
+            request_options=request_options,
+            omit=OMIT,
+            endpoint="sessions.step",
+        )
+        try:
+            if 200 <= _response.status_code < 300:
+                return typing.cast(SessionStepSuccess, self._client_wrapper.construct_response(type_=SessionStepSuccess, object_=self._client_wrapper.json_codec.loads(_response.content), request_options=request_options))  # type: ignore
+            if _response.status_code == 422:
+                raise UnprocessableEntityError(
+                    typing.cast(HttpValidationError, construct_type(type_=HttpValidationError, object_=_response.json()))  # type: ignore
+                )
+            _response_json = _response.json()
+        except JSONDecodeError:
+            raise ApiError(status_code=_response.status_code, body=_response.text)
+        raise ApiError(status_code=_response.status_code, body=_response_json)
+
+    @traced("sessions.close")
+    async def close(
+        self, session_id: str, *, request_options: typing.Optional[RequestOptions] = None
+    ) -> SessionsCloseResponse:
+        """
+        Closes the session.
+
+        Parameters
+        ----------
+        session_id : str
+
+        request_options : typing.Optional[RequestOptions]
+            Request-specific configuration.
+
+        Returns
+        -------
+        SessionsCloseResponse
+            Successful Response
+
+        Examples
+        --------
+        from multion.client import AsyncMultiOn
+
+        client = AsyncMultiOn(
+            api_key="YOUR_API_KEY",
+        )
+        await client.sessions.close(
+            session_id="session_id",
+        )
+        """
+        _response = await self._client_wrapper.httpx_client.request(
+            f"session/{jsonable_encoder(session_id)}",
+            method="DELETE",
+            request_options=request_options,
+            endpoint="sessions.close",
+        )
+        try:
+            if 200 <= _response.status_code < 300:
+                self._client_wrapper.session_closed(session_id)
+                return typing.cast(SessionsCloseResponse, self._client_wrapper.construct_response(type_=SessionsCloseResponse, object_=self._client_wrapper.json_codec.loads(_response.content), request_options=request_options))  # type: ignore
+            if _response.status_code == 422:
+                raise UnprocessableEntityError(
+                    typing.cast(HttpValidationError, construct_type(type_=HttpValidationError, object_=_response.json()))  # type: ignore
+                )
+            _response_json = _response.json()
+        except JSONDecodeError:
+            raise ApiError(status_code=_response.status_code, body=_response.text)
+        raise ApiError(status_code=_response.status_code, body=_response_json)
+
+    @traced("sessions.screenshot")
+    async def screenshot(
+        self, session_id: str, *, request_options: typing.Optional[RequestOptions] = None
+    ) -> SessionsScreenshotResponse:
+        """
+        Retrieve the screenshot of the session.
+
+        Parameters
+        ----------
+        session_id : str
+
+        request_options : typing.Optional[RequestOptions]
+            Request-specific configuration.
+
+        Returns
+        -------
+        SessionsScreenshotResponse
+            Successful Response
+
+        Examples
+        --------
+        from multion.client import AsyncMultiOn
+
+        client = AsyncMultiOn(
+            api_key="YOUR_API_KEY",
+        )
+        await client.sessions.screenshot(
+            session_id="session_id",
+        )
+        """
+        _response = await self._client_wrapper.httpx_client.request(
+            f"screenshot/{jsonable_encoder(session_id)}",
+            method="GET",
+            request_options=request_options,
+            endpoint="sessions.screenshot",
+        )
+        try:
+            if 200 <= _response.status_code < 300:
+                return typing.cast(SessionsScreenshotResponse, self._client_wrapper.construct_response(type_=SessionsScreenshotResponse, object_=self._client_wrapper.json_codec.loads(_response.content), request_options=request_options))  # type: ignore
+            if _response.status_code == 422:
+                raise UnprocessableEntityError(
+                    typing.cast(HttpValidationError, construct_type(type_=HttpValidationError, object_=_response.json()))  # type: ignore
+                )
+            _response_json = _response.json()
+        except JSONDecodeError:
+            raise ApiError(status_code=_response.status_code, body=_response.text)
+        raise ApiError(status_code=_response.status_code, body=_response_json)
+
+    @traced("sessions.list")
+    async def list(self, *, request_options: typing.Optional[RequestOptions] = None) -> SessionsListResponse:
+        """
+        Retrieve a list of active session IDs.
+
+        Parameters
+        ----------
+        request_options : typing.Optional[RequestOptions]
+            Request-specific configuration.
+
+        Returns
+        -------
+        SessionsListResponse
+            Successful Response
+
+        Examples
+        --------
+        from multion.client import AsyncMultiOn
+
+        client = AsyncMultiOn(
+            api_key="YOUR_API_KEY",
+        )
+        await client.sessions.list()
+        """
+        _response = await self._client_wrapper.httpx_client.request(
+            "sessions", method="GET", request_options=request_options, endpoint="sessions.list"
+        )
+        try:
+            if 200 <= _response.status_code < 300:
+                return typing.cast(SessionsListResponse, self._client_wrapper.construct_response(type_=SessionsListResponse, object_=self._client_wrapper.json_codec.loads(_response.content), request_options=request_options))  # type: ignore
+            _response_json = _response.json()
+        except JSONDecodeError:
+            raise ApiError(status_code=_response.status_code, body=_response.text)
+        raise ApiError(status_code=_response.status_code, body=_response_json)
+
+    async def close_many(
+        self,
+        session_ids: typing.Iterable[str],
+        *,
+        concurrency: int = 16,
+        fatal_errors: typing.Tuple[typing.Type[BaseException], ...] = (),
+        request_options: typing.Optional[RequestOptions] = None,
+    ) -> typing.Dict[str, BatchResult[SessionsCloseResponse]]:
+        """
+        Closes many sessions concurrently, with their requests sharing the connection pool of the client.
+
+        Parameters
+        ----------
+        session_ids : typing.Iterable[str]
+
+        concurrency : int
+            The maximum number of sessions being closed at once.
+
+        fatal_errors : typing.Tuple[typing.Type[BaseException], ...]
+            Errors that stop closing sessions and are raised, cancelling the requests in flight, e.g. `(ApiError,)`. By default errors are only reported in the results.
+
+        request_options : typing.Optional[RequestOptions]
+            Request-specific configuration.
+
+        Returns
+        -------
+        typing.Dict[str, BatchResult[SessionsCloseResponse]]
+            The result of closing each session, by session id in the order of `session_ids`: either the `output` of `close` or the `error` it raised.
+
+        Examples
+        --------
+        from multion.client import AsyncMultiOn
+
+        client = AsyncMultiOn(
+            api_key="YOUR_API_KEY",
+        )
+        results = await client.sessions.close_many(["session_id_1", "session_id_2"])
+        failed = [session_id for session_id, result in results.items() if not result.ok]
+        """
+        session_ids = list(session_ids)
+        results = arun_batch(
+            lambda session_id: self.close(session_id, request_options=request_options),
+            session_ids,
+            concurrency=concurrency,
+            fatal_errors=fatal_errors,
+        )
+        return _by_session_id(session_ids, [result async for result in results])
+
+    async def close_all(
+        self, *, concurrency: int = 16, request_options: typing.Optional[RequestOptions] = None
+    ) -> typing.Dict[str, BatchResult[SessionsCloseResponse]]:
+        """
+        Closes every active session returned by `list`, see `close_many`.
+
+        Parameters
+        ----------
+        concurrency : int
+            The maximum number of sessions being closed at once.
+
+        request_options : typing.Optional[RequestOptions]
+            Request-specific configuration.
+
+        Returns
+        -------
+        typing.Dict[str, BatchResult[SessionsCloseResponse]]
+            The result of closing each session, by session id.
+
+        Examples
+        --------
+        from multion.client import AsyncMultiOn
+
+        client = AsyncMultiOn(
+            api_key="YOUR_API_KEY",
+        )
+        await client.sessions.close_all()
+        """
+        return await self.close_many(
+            _session_ids(await self.list(request_options=request_options)),
+            concurrency=concurrency,
+            request_options=request_options,
+        )
+
+    async def run(
+        self,
+        session_id: str,
+        *,
+        cmd: str,
+        url: typing.Optional[str] = OMIT,
+        browser_params: typing.Optional[SessionsStepRequestBrowserParams] = OMIT,
+        temperature: typing.Optional[float] = OMIT,
+        agent_id: typing.Optional[str] = OMIT,
+        mode: typing.Optional[Mode] = OMIT,
+        include_screenshot: typing.Optional[bool] = OMIT,
+        max_steps: int = DEFAULT_MAX_STEPS,
+        timeout: typing.Optional[float] = None,
+        stream: bool = False,
+        on_chunk: typing.Optional[typing.Callable[[SessionStepStreamChunk], typing.Any]] = None,
+        on_step: typing.Optional[typing.Callable[[StepRecord], typing.Any]] = None,
+        on_ask_user: typing.Optional[typing.Callable[[typing.Any], typing.Any]] = None,
+        checkpoint: typing.Optional[CheckpointStore] = None,
+        checkpoint_key: typing.Optional[str] = None,
+        request_options: typing.Optional[RequestOptions] = None,
+    ) -> RunResult:
+        """
+        Steps a session with the same command until it stops returning "CONTINUE", the step budget is spent or the deadline passes. Only the steps themselves are requested.
+
+        Parameters
+        ----------
+        session_id : str
+
+        cmd : str
+            A specific natural language instruction, repeated for each step.
+
+        url : typing.Optional[str]
+            The URL to continue session from, sent with the first step only.
+
+        browser_params : typing.Optional[SessionsStepRequestBrowserParams]
+            Object containing height and width for the browser screen size.
+
+        temperature : typing.Optional[float]
+            The temperature of model
+
+        agent_id : typing.Optional[str]
+            The agent id to use for the session.
+
+        mode : typing.Optional[Mode]
+
+        include_screenshot : typing.Optional[bool]
+
+        max_steps : int
+            The maximum number of steps taken.
+
+        timeout : typing.Optional[float]
+            The number of seconds after which no step is started. The deadline is best-effort: the step in progress is
+            cut short by a request timeout capped to the time left, and between its chunks when streamed.
+
+        stream : bool
+            Whether to take the steps with `step_stream`, passing each chunk to `on_chunk`. The output of a step is then its final chunk.
+
+        on_chunk : typing.Optional[typing.Callable[[SessionStepStreamChunk], typing.Any]]
+            Called with each chunk of the steps when streaming, and awaited if it returns an awaitable.
+
+        on_step : typing.Optional[typing.Callable[[StepRecord], typing.Any]]
+            Called after each step with its status, output and timings, and awaited if it returns an awaitable.
+
+        on_ask_user : typing.Optional[typing.Callable[[typing.Any], typing.Any]]
+            Called with the output of a step returning "ASK_USER", and returns (or resolves to) the command answering it to keep going, or None to stop.
+
+        checkpoint : typing.Optional[CheckpointStore]
+            Where to save the progress of the run after each step, so that it can be continued with `resume` if the process dies.
+
+        checkpoint_key : typing.Optional[str]
+            The key the progress is saved under, the session ID by default.
+
+        request_options : typing.Optional[RequestOptions]
+            Request-specific configuration, used for every step.
+
+        Returns
+        -------
+        RunResult
+            The status of the last step, why the run stopped ("done", "ask_user", "max_steps" or "deadline") and the steps taken.
+
+        Examples
+        --------
+        from multion.client import AsyncMultiOn
+
+        client = AsyncMultiOn(
+            api_key="YOUR_API_KEY",
+        )
+        result = await client.sessions.run(
+            session_id="session_id",
+            cmd="Find the cheapest flight to Paris",
+            max_steps=10,
+            timeout=300,
+        )
+        print(result.reason, result.output.message)
+        """
+        params = {
+            name: value
+            for name, value in dict(
+                browser_params=browser_params,
+                temperature=temperature,
+                agent_id=agent_id,
+                mode=mode,
+                include_screenshot=include_screenshot,
+            ).items()
+            if value is not OMIT
+        }
+        checkpointer = None
+        if checkpoint is not None:
+            checkpointer = Checkpointer(
+                checkpoint, key=checkpoint_key or session_id, session_id=session_id, params=to_json(params)
+            )
+        return await self._run(
+            session_id,
+            cmd=cmd,
+            url=url,
+            params=params,
+            max_steps=max_steps,
+            timeout=timeout,
+            stream=stream,
+            on_chunk=on_chunk,
+            on_step=on_step,
+            on_ask_user=on_ask_user,
+            request_options=request_options,
+            checkpointer=checkpointer,
+        )
+
+    async def resume(
+        self,
+        checkpoint_key: str,
+        *,
+        checkpoint: CheckpointStore,
+        max_steps: int = DEFAULT_MAX_STEPS,
+        timeout: typing.Optional[float] = None,
+        stream: bool = False,
+        on_chunk: typing.Optional[typing.Callable[[SessionStepStreamChunk], typing.Any]] = None,
+        on_step: typing.Optional[typing.Callable[[StepRecord], typing.Any]] = None,
+        on_ask_user: typing.Optional[typing.Callable[[typing.Any], typing.Any]] = None,
+        request_options: typing.Optional[RequestOptions] = None,
+    ) -> RunResult:
+        """
+        Resumes a run saved to `checkpoint`, e.g. by a worker that died, on the session it was driving instead of a new one. The session is checked to still be active with `list`, then stepped with the pending command and the step parameters of the run, and the checkpoint keeps being saved after each step.
+
+        Parameters
+        ----------
+        checkpoint_key : str
+            The key the run was saved under, the session ID unless `run` was given a `checkpoint_key`.
+
+        checkpoint : CheckpointStore
+            The store the run was saved to.
+
+        max_steps : int
+            The maximum number of steps of the whole run, including the steps taken before the checkpoint.
+
+        timeout : typing.Optional[float]
+            The number of seconds after which no step is started. The deadline is best-effort: the step in progress is
+            cut short by a request timeout capped to the time left, and between its chunks when streamed.
+
+        stream : bool
+            Whether to take the steps with `step_stream`, see `run`.
+
+        on_chunk : typing.Optional[typing.Callable[[SessionStepStreamChunk], typing.Any]]
+            Called with each chunk of the steps when streaming, and awaited if it returns an awaitable.
+
+        on_step : typing.Optional[typing.Callable[[StepRecord], typing.Any]]
+            Called after each step with its status, output and timings, and awaited if it returns an awaitable.
+
+        on_ask_user : typing.Optional[typing.Callable[[typing.Any], typing.Any]]
+            Called with the output of a step returning "ASK_USER", including the last step of the checkpoint if it was not answered, and returns (or resolves to) the command answering it to keep going, or None to stop.
+
+        request_options : typing.Optional[RequestOptions]
+            Request-specific configuration, used for every request.
+
+        Returns
+        -------
+        RunResult
+            The result of the run, whose steps are numbered after the ones of the checkpoint. Finished runs, and runs waiting for an answer that is not given, are returned without taking a step.
+
+        Raises
+        ------
+        LookupError
+            When no checkpoint is saved under `checkpoint_key`, or its session is no longer active.
+
+        Examples
+        --------
+        from multion.client import AsyncMultiOn
+        from multion.sessions.checkpoint import SQLiteCheckpointStore
+
+        client = AsyncMultiOn(
+            api_key="YOUR_API_KEY",
+        )
+        checkpoints = SQLiteCheckpointStore("checkpoints.db")
+        for saved in checkpoints.checkpoints():
+            if not saved.finished:
+                await client.sessions.resume(saved.key, checkpoint=checkpoints, max_steps=40)
+        """
+        saved = checkpoint.load(checkpoint_key)
+        if saved is None:
+            raise LookupError(f"No checkpoint is saved under {checkpoint_key!r}")
+        output = _checkpoint_output(self._client_wrapper, saved, request_options)
+        if saved.finished or (saved.cmd is None and on_ask_user is None):
+            return resumed_result(saved, output)
+        if saved.session_id not in _session_ids(await self.list(request_options=request_options)):
+            raise LookupError(f"The session {saved.session_id} of checkpoint {checkpoint_key!r} is no longer active")
+        checkpointer = Checkpointer(checkpoint, key=checkpoint_key, session_id=saved.session_id, params=saved.params)
+        cmd = saved.cmd
+        if cmd is None:
+            cmd = await _maybe_await(on_ask_user(output))  # type: ignore
+            if cmd is None:
+                return resumed_result(saved, output)
+            checkpointer.save(cmd=cmd, status=saved.status, steps=saved.steps, output=saved.output)
+        return await self._run(
+            saved.session_id,
+            cmd=cmd,
+            url=OMIT,
+            params=saved.params,
+            max_steps=max_steps,
+            timeout=timeout,
+            stream=stream,
+            on_chunk=on_chunk,
+            on_step=on_step,
+            on_ask_user=on_ask_user,
+            request_options=request_options,
+            checkpointer=checkpointer,
+            steps_taken=saved.steps,
+            status=saved.status,
+            output=output,
+        )
+
+    async def _run(
+        self,
+        session_id: str,
+        *,
+        cmd: str,
+        url: typing.Optional[str],
+        params: typing.Dict[str, typing.Any],
+        max_steps: int,
+        timeout: typing.Optional[float],
+        stream: bool,
+        on_chunk: typing.Optional[typing.Callable[[SessionStepStreamChunk], typing.Any]],
+        on_step: typing.Optional[typing.Callable[[StepRecord], typing.Any]],
+        on_ask_user: typing.Optional[typing.Callable[[typing.Any], typing.Any]],
+        request_options: typing.Optional[RequestOptions],
+        checkpointer: typing.Optional[Checkpointer],
+        steps_taken: int = 0,
+        status: typing.Optional[str] = None,
+        output: typing.Any = None,
+    ) -> RunResult:
+        async def step(cmd: str, first: bool, request_options: typing.Optional[RequestOptions]) -> SessionStepSuccess:
+            return await self.step(session_id, cmd=cmd, url=url if first else OMIT, request_options=request_options, **params)
+
+        def stream_step(
+            cmd: str, first: bool, request_options: typing.Optional[RequestOptions]
+        ) -> AsyncEventStream[SessionStepStreamChunk]:
+            return self.step_stream(
+                session_id, cmd=cmd, url=url if first else OMIT, request_options=request_options, **params
+            )
+
+        return await arun_steps(
+            step,
+            stream_step if stream else None,
+            session_id=session_id,
+            cmd=cmd,
+            max_steps=max_steps,
+            timeout=timeout,
+            on_chunk=on_chunk,
+            on_step=on_step,
+            on_ask_user=on_ask_user,
+            request_options=request_options,
+            checkpointer=checkpointer,
+            steps_taken=steps_taken,
+            status=status,
+            output=output,
+        )
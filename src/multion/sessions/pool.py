@@ -0,0 +1,504 @@
+import asyncio
+import collections
+import json
+import threading
+import time
+import typing
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import asynccontextmanager, contextmanager
+
+from ..core.extended_request_options import ExtendedRequestOptions
+from ..core.jsonable_encoder import jsonable_encoder
+from ..core.request_options import RequestOptions
+from ..types.mode import Mode
+from .extended_client import ExtendedAsyncSessionsClient, ExtendedSessionsClient
+from .types.create_session_input_browser_params import CreateSessionInputBrowserParams
+
+SessionKey = typing.Tuple[str, typing.Optional[str], typing.Optional[str], typing.Optional[bool]]
+"""
+The url, mode, browser parameters (as JSON) and proxy flag sessions were created with, only sessions created with
+the same ones are interchangeable.
+"""
+
+DEFAULT_MAX_IDLE_SECONDS = 540.0
+"""
+Sessions are closed by the API after 10 minutes of inactivity, idle sessions are dropped a minute before that.
+"""
+
+DEFAULT_HEALTH_CHECK_AFTER_SECONDS = 60.0
+"""
+Sessions idle for less than this are handed out without a health check, since they were created or used recently.
+"""
+
+
+class PooledSession:
+    """
+    A session checked out of a `SessionPool`, which counts the steps taken in it to recycle it after `max_steps`.
+
+    Call `step` to take steps in the session, or increment `steps` when calling `sessions.step` directly. Call
+    `discard` when the session should not be reused, e.g. after navigating away from the pooled url.
+    """
+
+    __slots__ = ("session_id", "key", "steps", "created_at", "last_used_at", "discarded", "_sessions")
+
+    def __init__(self, session_id: str, key: SessionKey, sessions: typing.Any):
+        self.session_id = session_id
+        self.key = key
+        self.steps = 0
+        self.created_at = self.last_used_at = time.monotonic()
+        self.discarded = False
+        self._sessions = sessions
+
+    def step(self, **kwargs: typing.Any) -> typing.Any:
+        """
+        Calls `sessions.step` for this session with `kwargs`, which is awaitable with an `AsyncSessionPool`.
+        """
+        self.steps += 1
+        return self._sessions.step(self.session_id, **kwargs)
+
+    def discard(self) -> None:
+        self.discarded = True
+
+    def __repr__(self) -> str:
+        return f"PooledSession(session_id={self.session_id!r}, steps={self.steps})"
+
+
+def _session_key(
+    url: str,
+    mode: typing.Optional[Mode],
+    browser_params: typing.Optional[CreateSessionInputBrowserParams],
+    use_proxy: typing.Optional[bool],
+) -> SessionKey:
+    params = json.dumps(jsonable_encoder(browser_params), sort_keys=True) if browser_params is not None else None
+    return (url, mode, params, use_proxy)
+
+
+class _BaseSessionPool:
+    def __init__(
+        self,
+        *,
+        size: int,
+        max_steps: typing.Optional[int],
+        max_age: typing.Optional[float],
+        max_idle: float,
+        health_check: bool,
+        health_check_after: float,
+        request_options: typing.Optional[RequestOptions],
+    ):
+        if size < 0:
+            raise ValueError(f"size must be at least 0, got {size}")
+        self.size = size
+        self.max_steps = max_steps
+        self.max_age = max_age
+        self.max_idle = max_idle
+        self.health_check = health_check
+        self.health_check_after = health_check_after
+        # Session ids are read from the decoded JSON, whatever the response mode of the client.
+        self._request_options = typing.cast(ExtendedRequestOptions, {**(request_options or {}), "response_mode": "raw"})
+        self._idle: typing.DefaultDict[SessionKey, typing.Deque[PooledSession]] = collections.defaultdict(
+            collections.deque
+        )
+        self._creating: typing.DefaultDict[SessionKey, int] = collections.defaultdict(int)
+        self._closed = False
+
+    @property
+    def idle(self) -> int:
+        """
+        The number of sessions waiting in the pool.
+        """
+        return sum(len(sessions) for sessions in self._idle.values())
+
+    def _create_kwargs(self, key: SessionKey) -> typing.Dict[str, typing.Any]:
+        url, mode, params, use_proxy = key
+        kwargs: typing.Dict[str, typing.Any] = {"url": url, "request_options": self._request_options}
+        if mode is not None:
+            kwargs["mode"] = mode
+        if params is not None:
+            kwargs["browser_params"] = json.loads(params)
+        if use_proxy is not None:
+            kwargs["use_proxy"] = use_proxy
+        return kwargs
+
+    def _is_stale(self, session: PooledSession, now: float) -> bool:
+        return (
+            session.discarded
+            or (self.max_steps is not None and session.steps >= self.max_steps)
+            or (self.max_age is not None and now - session.created_at >= self.max_age)
+        )
+
+    def _needs_health_check(self, session: PooledSession) -> bool:
+        return self.health_check and time.monotonic() - session.last_used_at >= self.health_check_after
+
+    def _pop_idle(self, key: SessionKey) -> typing.Tuple[typing.Optional[PooledSession], typing.List[PooledSession]]:
+        """
+        Returns the most recently used idle session for `key`, along with the expired sessions skipped to find it.
+        """
+        now = time.monotonic()
+        expired: typing.List[PooledSession] = []
+        idle = self._idle[key]
+        while idle:
+            session = idle.pop()
+            if now - session.last_used_at < self.max_idle and not self._is_stale(session, now):
+                return session, expired
+            expired.append(session)
+        return None, expired
+
+    def _check_open(self) -> None:
+        if self._closed:
+            raise RuntimeError("Sessions cannot be checked out of a closed pool.")
+
+    def _missing(self, key: SessionKey) -> int:
+        if self._closed:
+            return 0
+        missing = self.size - len(self._idle[key]) - self._creating[key]
+        if missing > 0:
+            self._creating[key] += missing
+        return max(missing, 0)
+
+    def _put_back(self, session: PooledSession) -> typing.List[PooledSession]:
+        """
+        Returns a session to the idle sessions, and returns the sessions to close: the session itself when it should
+        not be reused, or the least recently used idle session when there are more than `size` of them.
+        """
+        session.last_used_at = time.monotonic()
+        if self._closed or self._is_stale(session, session.last_used_at):
+            return [session]
+        idle = self._idle[session.key]
+        idle.append(session)
+        evicted: typing.List[PooledSession] = []
+        while len(idle) > self.size:
+            evicted.append(idle.popleft())
+        return evicted
+
+    def _add_created(self, session: PooledSession) -> bool:
+        """
+        Adds a session created in the background to the idle sessions, unless the pool is closed or already full.
+        """
+        idle = self._idle[session.key]
+        if self._closed or len(idle) >= self.size:
+            return False
+        idle.append(session)
+        return True
+
+    def _drain(self) -> typing.List[PooledSession]:
+        self._closed = True
+        sessions = [session for idle in self._idle.values() for session in idle]
+        self._idle.clear()
+        return sessions
+
+
+class SessionPool(_BaseSessionPool):
+    """
+    Keeps sessions created ahead of time, so that tasks do not wait for a browser to start.
+
+    Up to `size` idle sessions are kept for each combination of url, mode, browser parameters and proxy flag, and
+    are created again in the background as they are checked out. Sessions are closed rather than reused after
+    `max_steps` steps, `max_age` seconds since their creation, or when they fail, and idle sessions are dropped
+    after `max_idle` seconds as the API expires them. With `health_check`, sessions idle for `health_check_after`
+    seconds or more are checked to still be active with `sessions.list` before being handed out.
+
+    Examples
+    --------
+    from multion.client import MultiOn
+    from multion.sessions.pool import SessionPool
+
+    client = MultiOn(api_key="YOUR_API_KEY")
+    with SessionPool(client.sessions, size=4, max_steps=20) as pool:
+        pool.warm(url="https://example.com")
+        with pool.session(url="https://example.com") as session:
+            session.step(cmd="Search for shoes")
+    """
+
+    def __init__(
+        self,
+        sessions: ExtendedSessionsClient,
+        *,
+        size: int = 1,
+        max_steps: typing.Optional[int] = None,
+        max_age: typing.Optional[float] = None,
+        max_idle: float = DEFAULT_MAX_IDLE_SECONDS,
+        health_check: bool = True,
+        health_check_after: float = DEFAULT_HEALTH_CHECK_AFTER_SECONDS,
+        request_options: typing.Optional[RequestOptions] = None,
+    ):
+        super().__init__(
+            size=size,
+            max_steps=max_steps,
+            max_age=max_age,
+            max_idle=max_idle,
+            health_check=health_check,
+            health_check_after=health_check_after,
+            request_options=request_options,
+        )
+        self._sessions = sessions
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max(size, 1), thread_name_prefix="multion-session-pool")
+
+    def warm(
+        self,
+        *,
+        url: str,
+        mode: typing.Optional[Mode] = None,
+        browser_params: typing.Optional[CreateSessionInputBrowserParams] = None,
+        use_proxy: typing.Optional[bool] = None,
+        wait: bool = False,
+    ) -> None:
+        """
+        Creates sessions in the background until `size` of them are idle for these parameters, and waits for them
+        to be created with `wait`.
+        """
+        futures = self._refill(_session_key(url, mode, browser_params, use_proxy))
+        if wait:
+            for future in futures:
+                future.result()
+
+    @contextmanager
+    def session(
+        self,
+        *,
+        url: str,
+        mode: typing.Optional[Mode] = None,
+        browser_params: typing.Optional[CreateSessionInputBrowserParams] = None,
+        use_proxy: typing.Optional[bool] = None,
+    ) -> typing.Iterator[PooledSession]:
+        """
+        Checks out an idle session created with these parameters, or creates one when none is idle, and returns it
+        to the pool on exit. Sessions are discarded when the block raises, since the state of their page is unknown.
+        """
+        key = _session_key(url, mode, browser_params, use_proxy)
+        session = self._acquire(key)
+        self._refill(key)
+        try:
+            yield session
+        except BaseException:
+            session.discard()
+            raise
+        finally:
+            with self._lock:
+                evicted = self._put_back(session)
+            self._close_later(evicted)
+
+    def close(self) -> None:
+        """
+        Closes the idle sessions, after waiting for the sessions being created. Sessions still checked out are
+        closed when they are returned.
+        """
+        with self._lock:
+            self._closed = True
+        self._executor.shutdown(wait=True)
+        with self._lock:
+            sessions = self._drain()
+        # Sessions may have already expired, closing them is best effort.
+        self._sessions.close_many(
+            [session.session_id for session in sessions], fatal_errors=(), request_options=self._request_options
+        )
+
+    def __enter__(self) -> "SessionPool":
+        return self
+
+    def __exit__(self, *args: typing.Any) -> None:
+        self.close()
+
+    def _acquire(self, key: SessionKey) -> PooledSession:
+        self._check_open()
+        while True:
+            with self._lock:
+                session, expired = self._pop_idle(key)
+            self._close_later(expired)
+            if session is None:
+                return self._create(key)
+            if not self._needs_health_check(session) or session.session_id in self._active_session_ids():
+                return session
+
+    def _active_session_ids(self) -> typing.Set[str]:
+        response = self._sessions.list(request_options=self._request_options)
+        return set(typing.cast(typing.Dict[str, typing.Any], response)["session_ids"])
+
+    def _create(self, key: SessionKey) -> PooledSession:
+        response = self._sessions.create(**self._create_kwargs(key))
+        return PooledSession(typing.cast(typing.Dict[str, typing.Any], response)["session_id"], key, self._sessions)
+
+    def _refill(self, key: SessionKey) -> typing.List["Future[None]"]:
+        with self._lock:
+            missing = self._missing(key)
+        return [self._executor.submit(self._create_idle, key) for _ in range(missing)]
+
+    def _create_idle(self, key: SessionKey) -> None:
+        session: typing.Optional[PooledSession] = None
+        try:
+            session = self._create(key)
+        except Exception:
+            # The pool is only an optimization, sessions that failed to be created are created on checkout instead.
+            pass
+        finally:
+            # Also when the creation is interrupted, otherwise the pool would never refill these sessions again.
+            with self._lock:
+                self._creating[key] -= 1
+                added = session is not None and self._add_created(session)
+        if session is not None and not added:
+            self._close_session(session)
+
+    def _close_later(self, sessions: typing.List[PooledSession]) -> None:
+        for session in sessions:
+            try:
+                self._executor.submit(self._close_session, session)
+            except RuntimeError:
+                # The pool was closed, the executor no longer accepts work.
+                self._close_session(session)
+
+    def _close_session(self, session: PooledSession) -> None:
+        try:
+            self._sessions.close(session.session_id, request_options=self._request_options)
+        except Exception:
+            # Sessions may have already expired, closing them is best effort.
+            pass
+
+
+class AsyncSessionPool(_BaseSessionPool):
+    """
+    The asynchronous counterpart of `SessionPool`, which creates and closes sessions from background tasks.
+
+    Examples
+    --------
+    from multion.client import AsyncMultiOn
+    from multion.sessions.pool import AsyncSessionPool
+
+    client = AsyncMultiOn(api_key="YOUR_API_KEY")
+    async with AsyncSessionPool(client.sessions, size=4, max_steps=20) as pool:
+        async with pool.session(url="https://example.com") as session:
+            await session.step(cmd="Search for shoes")
+    """
+
+    def __init__(
+        self,
+        sessions: ExtendedAsyncSessionsClient,
+        *,
+        size: int = 1,
+        max_steps: typing.Optional[int] = None,
+        max_age: typing.Optional[float] = None,
+        max_idle: float = DEFAULT_MAX_IDLE_SECONDS,
+        health_check: bool = True,
+        health_check_after: float = DEFAULT_HEALTH_CHECK_AFTER_SECONDS,
+        request_options: typing.Optional[RequestOptions] = None,
+    ):
+        super().__init__(
+            size=size,
+            max_steps=max_steps,
+            max_age=max_age,
+            max_idle=max_idle,
+            health_check=health_check,
+            health_check_after=health_check_after,
+            request_options=request_options,
+        )
+        self._sessions = sessions
+        self._tasks: "typing.Set[asyncio.Task[None]]" = set()
+
+    async def warm(
+        self,
+        *,
+        url: str,
+        mode: typing.Optional[Mode] = None,
+        browser_params: typing.Optional[CreateSessionInputBrowserParams] = None,
+        use_proxy: typing.Optional[bool] = None,
+        wait: bool = False,
+    ) -> None:
+        """
+        Creates sessions in background tasks until `size` of them are idle for these parameters, and waits for them
+        to be created with `wait`.
+        """
+        tasks = self._refill(_session_key(url, mode, browser_params, use_proxy))
+        if wait and tasks:
+            await asyncio.gather(*tasks)
+
+    @asynccontextmanager
+    async def session(
+        self,
+        *,
+        url: str,
+        mode: typing.Optional[Mode] = None,
+        browser_params: typing.Optional[CreateSessionInputBrowserParams] = None,
+        use_proxy: typing.Optional[bool] = None,
+    ) -> typing.AsyncIterator[PooledSession]:
+        """
+        Checks out an idle session created with these parameters, or creates one when none is idle, and returns it
+        to the pool on exit. Sessions are discarded when the block raises, since the state of their page is unknown.
+        """
+        key = _session_key(url, mode, browser_params, use_proxy)
+        session = await self._acquire(key)
+        self._refill(key)
+        try:
+            yield session
+        except BaseException:
+            session.discard()
+            raise
+        finally:
+            for evicted in self._put_back(session):
+                self._spawn(self._close_session(evicted))
+
+    async def close(self) -> None:
+        """
+        Closes the idle sessions, after waiting for the background tasks of the pool. Sessions still checked out are
+        closed when they are returned.
+        """
+        self._closed = True
+        while self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+        # Sessions may have already expired, closing them is best effort.
+        await self._sessions.close_many(
+            [session.session_id for session in self._drain()], fatal_errors=(), request_options=self._request_options
+        )
+
+    async def __aenter__(self) -> "AsyncSessionPool":
+        return self
+
+    async def __aexit__(self, *args: typing.Any) -> None:
+        await self.close()
+
+    async def _acquire(self, key: SessionKey) -> PooledSession:
+        self._check_open()
+        while True:
+            session, expired = self._pop_idle(key)
+            for stale in expired:
+                self._spawn(self._close_session(stale))
+            if session is None:
+                return await self._create(key)
+            if not self._needs_health_check(session) or session.session_id in await self._active_session_ids():
+                return session
+
+    async def _active_session_ids(self) -> typing.Set[str]:
+        response = await self._sessions.list(request_options=self._request_options)
+        return set(typing.cast(typing.Dict[str, typing.Any], response)["session_ids"])
+
+    async def _create(self, key: SessionKey) -> PooledSession:
+        response = await self._sessions.create(**self._create_kwargs(key))
+        return PooledSession(typing.cast(typing.Dict[str, typing.Any], response)["session_id"], key, self._sessions)
+
+    def _spawn(self, coroutine: typing.Coroutine[typing.Any, typing.Any, None]) -> "asyncio.Task[None]":
+        task = asyncio.ensure_future(coroutine)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+    def _refill(self, key: SessionKey) -> typing.List["asyncio.Task[None]"]:
+        return [self._spawn(self._create_idle(key)) for _ in range(self._missing(key))]
+
+    async def _create_idle(self, key: SessionKey) -> None:
+        session: typing.Optional[PooledSession] = None
+        try:
+            session = await self._create(key)
+        except Exception:
+            # The pool is only an optimization, sessions that failed to be created are created on checkout instead.
+            pass
+        finally:
+            # Also when the creation is cancelled, otherwise the pool would never refill these sessions again.
+            self._creating[key] -= 1
+            added = session is not None and self._add_created(session)
+        if session is not None and not added:
+            await self._close_session(session)
+
+    async def _close_session(self, session: PooledSession) -> None:
+        try:
+            await self._sessions.close(session.session_id, request_options=self._request_options)
+        except Exception:
+            # Sessions may have already expired, closing them is best effort.
+            pass
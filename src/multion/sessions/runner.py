@@ -0,0 +1,404 @@
+import inspect
+import time
+import typing
+
+import httpx
+
+from ..core.api_error import ApiError
+from ..core.extended_http_client import retry_deadline
+from ..core.request_options import RequestOptions
+from .checkpoint import Checkpoint, Checkpointer
+
+DEFAULT_MAX_STEPS = 20
+
+StopReason = typing.Literal["done", "ask_user", "max_steps", "deadline"]
+"""
+Why a run stopped: "done" when a step returned a status other than "CONTINUE" or "ASK_USER" (normally "DONE"),
+"ask_user" when a step asked for input that `on_ask_user` did not provide, "max_steps" when the step budget was
+spent, and "deadline" when the run timed out.
+"""
+
+OnAskUser = typing.Callable[[typing.Any], typing.Optional[str]]
+"""
+Called with the output of a step returning "ASK_USER": returns the command answering it to keep going, or None to
+stop the run.
+"""
+
+
+class StepRecord:
+    """
+    One step of a run: the command sent, the status and output of the step (a `SessionStepSuccess`, or the final
+    chunk when streaming), when it started (as a Unix timestamp), how long it took, and with streaming how long the
+    first chunk took to arrive, all in seconds.
+    """
+
+    __slots__ = ("index", "cmd", "status", "output", "started_at", "duration", "first_chunk_after")
+
+    def __init__(
+        self,
+        *,
+        index: int,
+        cmd: str,
+        status: str,
+        output: typing.Any,
+        started_at: float,
+        duration: float,
+        first_chunk_after: typing.Optional[float],
+    ):
+        self.index = index
+        self.cmd = cmd
+        self.status = status
+        self.output = output
+        self.started_at = started_at
+        self.duration = duration
+        self.first_chunk_after = first_chunk_after
+
+    def __repr__(self) -> str:
+        return f"StepRecord(index={self.index}, status={self.status!r}, duration={self.duration:.3f})"
+
+
+class RunResult:
+    """
+    The outcome of `sessions.run`: the status and output of the last step, why the run stopped and the steps taken.
+    The last step of a resumed run that took no step is the one of its checkpoint.
+    """
+
+    __slots__ = ("session_id", "status", "reason", "steps", "duration", "output")
+
+    def __init__(
+        self,
+        *,
+        session_id: str,
+        status: typing.Optional[str],
+        reason: StopReason,
+        steps: typing.List[StepRecord],
+        duration: float,
+        output: typing.Any,
+    ):
+        self.session_id = session_id
+        self.status = status
+        self.reason = reason
+        self.steps = steps
+        self.duration = duration
+        self.output = output
+
+    @property
+    def done(self) -> bool:
+        return self.status == "DONE"
+
+    def __repr__(self) -> str:
+        return f"RunResult(status={self.status!r}, reason={self.reason!r}, steps={len(self.steps)})"
+
+
+def _field(value: typing.Any, name: str) -> typing.Any:
+    # Outputs are models, views or dicts depending on the response mode of the client.
+    return value[name] if isinstance(value, dict) else getattr(value, name)
+
+
+def get_status(output: typing.Any) -> str:
+    """
+    Returns the status of a step output, or of the final chunk of a step stream.
+    """
+    if is_final_chunk(output):
+        return _field(_field(_field(output, "data"), "delta"), "status")
+    return _field(output, "status")
+
+
+def is_final_chunk(chunk: typing.Any) -> bool:
+    type_ = chunk.get("type") if isinstance(chunk, dict) else getattr(chunk, "type", None)
+    return type_ == "final_event"
+
+
+class _Run:
+    """
+    The state of a run shared by the synchronous and asynchronous drivers.
+    """
+
+    def __init__(
+        self,
+        *,
+        session_id: str,
+        cmd: str,
+        max_steps: int,
+        timeout: typing.Optional[float],
+        request_options: typing.Optional[RequestOptions],
+        checkpointer: typing.Optional[Checkpointer],
+        steps_taken: int,
+        status: typing.Optional[str],
+        output: typing.Any,
+    ):
+        if max_steps < 1:
+            raise ValueError(f"max_steps must be at least 1, got {max_steps}")
+        self.session_id = session_id
+        self.cmd = cmd
+        self.max_steps = max_steps
+        self.request_options = request_options
+        self.checkpointer = checkpointer
+        # Steps taken by the runs this one resumes, which count against the step budget.
+        self.steps_taken = steps_taken
+        self.status = status
+        self.output = output
+        self.steps: typing.List[StepRecord] = []
+        self.started = time.monotonic()
+        self.expires_at = None if timeout is None else self.started + timeout
+        self.step_started = self.started
+        self.step_started_at = time.time()
+
+    def stop_reason(self) -> typing.Optional[StopReason]:
+        if self.steps_taken + len(self.steps) >= self.max_steps:
+            return "max_steps"
+        if self.expired():
+            return "deadline"
+        return None
+
+    def expired(self) -> bool:
+        return self.expires_at is not None and time.monotonic() >= self.expires_at
+
+    def is_timeout(self, error: Exception) -> bool:
+        # Steps are cut short by the deadline with a request timeout, which ends the run rather than failing it.
+        return isinstance(error, httpx.TimeoutException) and self.stop_reason() == "deadline"
+
+    def step_request_options(self) -> typing.Optional[RequestOptions]:
+        self.step_started = time.monotonic()
+        self.step_started_at = time.time()
+        if self.expires_at is None:
+            return self.request_options
+        remaining = max(self.expires_at - self.step_started, 0.0)
+        timeout = (self.request_options or {}).get("timeout_in_seconds")
+        return {
+            **(self.request_options or {}),  # type: ignore
+            "timeout_in_seconds": remaining if timeout is None else min(timeout, remaining),
+        }
+
+    def record(self, output: typing.Any, first_chunk_after: typing.Optional[float]) -> StepRecord:
+        step = StepRecord(
+            index=self.steps_taken + len(self.steps),
+            cmd=self.cmd,
+            status=get_status(output),
+            output=output,
+            started_at=self.step_started_at,
+            duration=time.monotonic() - self.step_started,
+            first_chunk_after=first_chunk_after,
+        )
+        self.steps.append(step)
+        self.status = step.status
+        self.output = output
+        self.save(step.status, step.cmd if step.status == "CONTINUE" else None)
+        return step
+
+    def answer(self, cmd: str) -> None:
+        self.cmd = cmd
+        self.save("ASK_USER", cmd)
+
+    def save(self, status: str, cmd: typing.Optional[str]) -> None:
+        if self.checkpointer is not None:
+            self.checkpointer.save(
+                cmd=cmd, status=status, steps=self.steps_taken + len(self.steps), output=self.output
+            )
+
+    def result(self, reason: StopReason) -> RunResult:
+        return RunResult(
+            session_id=self.session_id,
+            status=self.status,
+            reason=reason,
+            steps=self.steps,
+            duration=time.monotonic() - self.started,
+            output=self.output,
+        )
+
+
+def resumed_result(checkpoint: Checkpoint, output: typing.Any) -> RunResult:
+    """
+    The result of resuming a run that is finished, or waits for an answer that is not given, without taking a step.
+    """
+    return RunResult(
+        session_id=checkpoint.session_id,
+        status=checkpoint.status,
+        reason="done" if checkpoint.finished else "ask_user",
+        steps=[],
+        duration=0.0,
+        output=output,
+    )
+
+
+def _missing_final_chunk() -> ApiError:
+    return ApiError(body="The step stream ended without a final event.")
+
+
+def run_steps(
+    step: typing.Callable[[str, bool, typing.Optional[RequestOptions]], typing.Any],
+    stream_step: typing.Optional[
+        typing.Callable[[str, bool, typing.Optional[RequestOptions]], typing.Iterable[typing.Any]]
+    ],
+    *,
+    session_id: str,
+    cmd: str,
+    max_steps: int,
+    timeout: typing.Optional[float],
+    on_chunk: typing.Optional[typing.Callable[[typing.Any], None]],
+    on_step: typing.Optional[typing.Callable[[StepRecord], None]],
+    on_ask_user: typing.Optional[OnAskUser],
+    request_options: typing.Optional[RequestOptions],
+    checkpointer: typing.Optional[Checkpointer] = None,
+    steps_taken: int = 0,
+    status: typing.Optional[str] = None,
+    output: typing.Any = None,
+) -> RunResult:
+    """
+    Takes steps with `step(cmd, first, request_options)`, or `stream_step` when given, until the session stops
+    returning "CONTINUE", the step budget is spent or the deadline passes.
+
+    The deadline is best-effort: it is checked before each step and between the chunks of streamed steps, the
+    request timeout of each step is capped to the time left and no retry is made that would wait past it. httpx
+    applies that timeout to each network operation rather than to the whole request, so a step that keeps
+    receiving data can still overrun the deadline.
+
+    With a `checkpointer` the progress is saved after each step. When resuming, `steps_taken`, `status` and `output`
+    describe the steps already taken, which count against `max_steps`.
+    """
+    run = _Run(
+        session_id=session_id,
+        cmd=cmd,
+        max_steps=max_steps,
+        timeout=timeout,
+        request_options=request_options,
+        checkpointer=checkpointer,
+        steps_taken=steps_taken,
+        status=status,
+        output=output,
+    )
+    while True:
+        reason = run.stop_reason()
+        if reason is not None:
+            return run.result(reason)
+        first = not run.steps
+        try:
+            options = run.step_request_options()
+            first_chunk_after: typing.Optional[float] = None
+            with retry_deadline(run.expires_at):
+                if stream_step is None:
+                    output = step(run.cmd, first, options)
+                else:
+                    output = None
+                    chunks = stream_step(run.cmd, first, options)
+                    try:
+                        for chunk in chunks:
+                            if first_chunk_after is None:
+                                first_chunk_after = time.monotonic() - run.step_started
+                            if on_chunk is not None:
+                                on_chunk(chunk)
+                            if is_final_chunk(chunk):
+                                output = chunk
+                            elif run.expired():
+                                break
+                    finally:
+                        close = getattr(chunks, "close", None)
+                        if close is not None:
+                            close()
+            if output is None:
+                if run.expired():
+                    return run.result("deadline")
+                raise _missing_final_chunk()
+        except Exception as e:
+            if run.is_timeout(e):
+                return run.result("deadline")
+            raise
+        record = run.record(output, first_chunk_after)
+        if on_step is not None:
+            on_step(record)
+        if record.status == "CONTINUE":
+            continue
+        if record.status == "ASK_USER":
+            reply = on_ask_user(output) if on_ask_user is not None else None
+            if reply is None:
+                return run.result("ask_user")
+            run.answer(reply)
+            continue
+        return run.result("done")
+
+
+async def arun_steps(
+    step: typing.Callable[[str, bool, typing.Optional[RequestOptions]], typing.Awaitable[typing.Any]],
+    stream_step: typing.Optional[
+        typing.Callable[[str, bool, typing.Optional[RequestOptions]], typing.AsyncIterable[typing.Any]]
+    ],
+    *,
+    session_id: str,
+    cmd: str,
+    max_steps: int,
+    timeout: typing.Optional[float],
+    on_chunk: typing.Optional[typing.Callable[[typing.Any], typing.Any]],
+    on_step: typing.Optional[typing.Callable[[StepRecord], typing.Any]],
+    on_ask_user: typing.Optional[typing.Callable[[typing.Any], typing.Any]],
+    request_options: typing.Optional[RequestOptions],
+    checkpointer: typing.Optional[Checkpointer] = None,
+    steps_taken: int = 0,
+    status: typing.Optional[str] = None,
+    output: typing.Any = None,
+) -> RunResult:
+    """
+    The asynchronous counterpart of `run_steps`, whose callbacks may be coroutine functions.
+    """
+    run = _Run(
+        session_id=session_id,
+        cmd=cmd,
+        max_steps=max_steps,
+        timeout=timeout,
+        request_options=request_options,
+        checkpointer=checkpointer,
+        steps_taken=steps_taken,
+        status=status,
+        output=output,
+    )
+    while True:
+        reason = run.stop_reason()
+        if reason is not None:
+            return run.result(reason)
+        first = not run.steps
+        try:
+            options = run.step_request_options()
+            first_chunk_after: typing.Optional[float] = None
+            with retry_deadline(run.expires_at):
+                if stream_step is None:
+                    output = await step(run.cmd, first, options)
+                else:
+                    output = None
+                    chunks = stream_step(run.cmd, first, options)
+                    try:
+                        async for chunk in chunks:
+                            if first_chunk_after is None:
+                                first_chunk_after = time.monotonic() - run.step_started
+                            if on_chunk is not None:
+                                await _maybe_await(on_chunk(chunk))
+                            if is_final_chunk(chunk):
+                                output = chunk
+                            elif run.expired():
+                                break
+                    finally:
+                        aclose = getattr(chunks, "aclose", None)
+                        if aclose is not None:
+                            await aclose()
+            if output is None:
+                if run.expired():
+                    return run.result("deadline")
+                raise _missing_final_chunk()
+        except Exception as e:
+            if run.is_timeout(e):
+                return run.result("deadline")
+            raise
+        record = run.record(output, first_chunk_after)
+        if on_step is not None:
+            await _maybe_await(on_step(record))
+        if record.status == "CONTINUE":
+            continue
+        if record.status == "ASK_USER":
+            reply = await _maybe_await(on_ask_user(output)) if on_ask_user is not None else None
+            if reply is None:
+                return run.result("ask_user")
+            run.answer(reply)
+            continue
+        return run.result("done")
+
+
+async def _maybe_await(value: typing.Any) -> typing.Any:
+    return await value if inspect.isawaitable(value) else value
@@ -0,0 +1,257 @@
+import atexit
+import threading
+import typing
+import warnings
+import weakref
+from contextlib import asynccontextmanager, contextmanager
+
+import httpx
+
+from ..core.extended_client_wrapper import ExtendedAsyncClientWrapper, ExtendedSyncClientWrapper
+from ..core.extended_request_options import ExtendedRequestOptions
+from ..types.session_created import SessionCreated
+from .extended_client import ExtendedAsyncSessionsClient, ExtendedSessionsClient, _session_ids
+
+DEFAULT_CLOSE_CONCURRENCY = 16
+
+
+class BaseSessionTracker:
+    """
+    Records the ids of the sessions created through a client until they are closed through it.
+
+    The client reports every session returned by `sessions.create` and `browse`, and every session closed with
+    `sessions.close`, so that the sessions left open can be closed all at once. With `close_at_exit`, sessions still
+    open when the interpreter exits are reported with a `ResourceWarning` and closed.
+    """
+
+    def __init__(
+        self,
+        client_wrapper: typing.Union[ExtendedSyncClientWrapper, ExtendedAsyncClientWrapper],
+        *,
+        close_at_exit: bool,
+        concurrency: int,
+    ):
+        self.concurrency = concurrency
+        self._client_wrapper = client_wrapper
+        self._session_ids: typing.Dict[str, None] = {}
+        self._in_use: typing.Dict[str, int] = {}
+        self._lock = threading.Lock()
+        if close_at_exit:
+            atexit.register(_close_at_exit, weakref.ref(self))
+
+    @property
+    def session_ids(self) -> typing.List[str]:
+        """
+        The ids of the sessions created and not closed yet, oldest first.
+        """
+        with self._lock:
+            return list(self._session_ids)
+
+    def track(self, session_id: str) -> None:
+        with self._lock:
+            self._session_ids[session_id] = None
+
+    def forget(self, session_id: str) -> None:
+        with self._lock:
+            self._session_ids.pop(session_id, None)
+
+    def _hold(self, session_id: str) -> None:
+        with self._lock:
+            self._in_use[session_id] = self._in_use.get(session_id, 0) + 1
+
+    def _release(self, session_id: str) -> None:
+        with self._lock:
+            if self._in_use[session_id] == 1:
+                del self._in_use[session_id]
+            else:
+                self._in_use[session_id] -= 1
+
+    def _forget_inactive(self, active: typing.Collection[str]) -> typing.List[str]:
+        active = set(active)
+        with self._lock:
+            inactive = [session_id for session_id in self._session_ids if session_id not in active]
+            for session_id in inactive:
+                del self._session_ids[session_id]
+        return inactive
+
+    def _orphans(self, active: typing.Iterable[str], keep: typing.Collection[str]) -> typing.List[str]:
+        with self._lock:
+            return [session_id for session_id in active if session_id not in keep and session_id not in self._in_use]
+
+
+def _close_at_exit(tracker_ref: "weakref.ReferenceType[BaseSessionTracker]") -> None:
+    tracker = tracker_ref()
+    if tracker is None:
+        return
+    session_ids = tracker.session_ids
+    if not session_ids:
+        return
+    warnings.warn(
+        f"{len(session_ids)} MultiOn session(s) were never closed and are closed at exit: {', '.join(session_ids)}",
+        ResourceWarning,
+    )
+    # The client may already be closed, or bound to an event loop that no longer runs, so a new client is used.
+    wrapper = tracker._client_wrapper
+    with httpx.Client(timeout=wrapper.get_timeout()) as httpx_client:
+        sessions = ExtendedSessionsClient(
+            client_wrapper=ExtendedSyncClientWrapper(
+                api_key=wrapper.api_key,
+                base_url=wrapper.get_base_url(),
+                timeout=wrapper.get_timeout(),
+                httpx_client=httpx_client,
+                json_codec=wrapper.json_codec,
+            )
+        )
+        sessions.close_many(session_ids, concurrency=tracker.concurrency, fatal_errors=())
+
+
+class SessionTracker(BaseSessionTracker):
+    """
+    Tracks the sessions of a `MultiOn` client created with `track_sessions=True`, see `BaseSessionTracker`.
+
+    Examples
+    --------
+    from multion.client import MultiOn
+
+    client = MultiOn(api_key="YOUR_API_KEY", track_sessions=True)
+    with client.session_tracker.session(url="https://example.com") as session:
+        client.sessions.step(session.session_id, cmd="Search for shoes")
+    client.browse(cmd="Find the weather in Paris")
+    client.session_tracker.close_all()
+    """
+
+    def __init__(
+        self,
+        sessions: ExtendedSessionsClient,
+        *,
+        close_at_exit: bool = True,
+        concurrency: int = DEFAULT_CLOSE_CONCURRENCY,
+    ):
+        super().__init__(sessions._client_wrapper, close_at_exit=close_at_exit, concurrency=concurrency)
+        self._sessions = sessions
+
+    @contextmanager
+    def session(self, **kwargs: typing.Any) -> typing.Iterator[SessionCreated]:
+        """
+        Creates a session with the `sessions.create` arguments given, and closes it on exit.
+        """
+        session = self._sessions.create(**kwargs)
+        session_id = _session_id(session)
+        self._hold(session_id)
+        try:
+            yield session
+        finally:
+            self._release(session_id)
+            self._close([session_id])
+
+    def close_all(self) -> typing.Dict[str, Exception]:
+        """
+        Closes the tracked sessions concurrently, and returns the errors of the sessions that could not be closed,
+        which stay tracked.
+        """
+        return self._close(self.session_ids)
+
+    def reconcile(self) -> typing.List[str]:
+        """
+        Forgets the tracked sessions that are no longer active, e.g. expired after 10 minutes of inactivity, and
+        returns their ids.
+        """
+        return self._forget_inactive(self._active_session_ids())
+
+    def reap(self, *, keep: typing.Collection[str] = ()) -> typing.Dict[str, typing.Optional[Exception]]:
+        """
+        Closes every active session of the account, except the ones in `keep` and the ones open in a `session`
+        block, and returns the outcome of each of them: None when closed, or the error raised otherwise.
+
+        This closes the sessions of other clients using the same API key too, e.g. to clean up the sessions leaked
+        by workers that crashed.
+        """
+        orphans = self._orphans(self._active_session_ids(), keep)
+        errors = self._close(orphans)
+        return {session_id: errors.get(session_id) for session_id in orphans}
+
+    def _active_session_ids(self) -> typing.List[str]:
+        return _session_ids(self._sessions.list(request_options=_RAW))
+
+    def _close(self, session_ids: typing.List[str]) -> typing.Dict[str, Exception]:
+        results = self._sessions.close_many(
+            session_ids, concurrency=self.concurrency, fatal_errors=(), request_options=_RAW
+        )
+        return {session_id: result.error for session_id, result in results.items() if result.error is not None}
+
+
+class AsyncSessionTracker(BaseSessionTracker):
+    """
+    Tracks the sessions of an `AsyncMultiOn` client created with `track_sessions=True`, see `BaseSessionTracker`.
+
+    Examples
+    --------
+    from multion.client import AsyncMultiOn
+
+    client = AsyncMultiOn(api_key="YOUR_API_KEY", track_sessions=True)
+    async with client.session_tracker.session(url="https://example.com") as session:
+        await client.sessions.step(session.session_id, cmd="Search for shoes")
+    await client.session_tracker.close_all()
+    """
+
+    def __init__(
+        self,
+        sessions: ExtendedAsyncSessionsClient,
+        *,
+        close_at_exit: bool = True,
+        concurrency: int = DEFAULT_CLOSE_CONCURRENCY,
+    ):
+        super().__init__(sessions._client_wrapper, close_at_exit=close_at_exit, concurrency=concurrency)
+        self._sessions = sessions
+
+    @asynccontextmanager
+    async def session(self, **kwargs: typing.Any) -> typing.AsyncIterator[SessionCreated]:
+        """
+        Creates a session with the `sessions.create` arguments given, and closes it on exit.
+        """
+        session = await self._sessions.create(**kwargs)
+        session_id = _session_id(session)
+        self._hold(session_id)
+        try:
+            yield session
+        finally:
+            self._release(session_id)
+            await self._close([session_id])
+
+    async def close_all(self) -> typing.Dict[str, Exception]:
+        """
+        Closes the tracked sessions concurrently, and returns the errors of the sessions that could not be closed,
+        which stay tracked.
+        """
+        return await self._close(self.session_ids)
+
+    async def reconcile(self) -> typing.List[str]:
+        """
+        Forgets the tracked sessions that are no longer active and returns their ids, see `SessionTracker.reconcile`.
+        """
+        return self._forget_inactive(await self._active_session_ids())
+
+    async def reap(self, *, keep: typing.Collection[str] = ()) -> typing.Dict[str, typing.Optional[Exception]]:
+        """
+        Closes every active session of the account except the ones in use, see `SessionTracker.reap`.
+        """
+        orphans = self._orphans(await self._active_session_ids(), keep)
+        errors = await self._close(orphans)
+        return {session_id: errors.get(session_id) for session_id in orphans}
+
+    async def _active_session_ids(self) -> typing.List[str]:
+        return _session_ids(await self._sessions.list(request_options=_RAW))
+
+    async def _close(self, session_ids: typing.List[str]) -> typing.Dict[str, Exception]:
+        results = await self._sessions.close_many(
+            session_ids, concurrency=self.concurrency, fatal_errors=(), request_options=_RAW
+        )
+        return {session_id: result.error for session_id, result in results.items() if result.error is not None}
+
+
+# Session ids are read from the decoded JSON, whatever the response mode of the client.
+_RAW = ExtendedRequestOptions(response_mode="raw")
+
+
+def _session_id(session: typing.Any) -> str:
+    return session["session_id"] if isinstance(session, dict) else session.session_id
@@ -1,11 +1,27 @@
 # This file was auto-generated by Fern from our API Definition.
 
-from .create_session_input_browser_params import CreateSessionInputBrowserParams
-from .sessions_close_response import SessionsCloseResponse
-from .sessions_list_response import SessionsListResponse
-from .sessions_screenshot_response import SessionsScreenshotResponse
-from .sessions_step_request_browser_params import SessionsStepRequestBrowserParams
-from .sessions_step_stream_request_browser_params import SessionsStepStreamRequestBrowserParams
+import typing
+
+from ...lazy_import import lazy_exports
+
+if typing.TYPE_CHECKING:
+    from .create_session_input_browser_params import CreateSessionInputBrowserParams
+    from .sessions_close_response import SessionsCloseResponse
+    from .sessions_list_response import SessionsListResponse
+    from .sessions_screenshot_response import SessionsScreenshotResponse
+    from .sessions_step_request_browser_params import SessionsStepRequestBrowserParams
+    from .sessions_step_stream_request_browser_params import SessionsStepStreamRequestBrowserParams
+
+_dynamic_imports: typing.Dict[str, str] = {
+    "CreateSessionInputBrowserParams": ".create_session_input_browser_params",
+    "SessionsCloseResponse": ".sessions_close_response",
+    "SessionsListResponse": ".sessions_list_response",
+    "SessionsScreenshotResponse": ".sessions_screenshot_response",
+    "SessionsStepRequestBrowserParams": ".sessions_step_request_browser_params",
+    "SessionsStepStreamRequestBrowserParams": ".sessions_step_stream_request_browser_params",
+}
+
+__getattr__, __dir__ = lazy_exports(__name__, globals(), _dynamic_imports)
 
 __all__ = [
     "CreateSessionInputBrowserParams",
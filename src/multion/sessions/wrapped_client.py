@@ -1,8 +1,11 @@
+from ..agentops_loader import load_agentops
+from ..core.extended_client_wrapper import ExtendedAsyncClientWrapper, ExtendedSyncClientWrapper
+from ..core.event_stream import AsyncEventStream, EventStream
+from ..telemetry import AsyncTelemetryQueue, BaseTelemetryQueue, TelemetryQueue, arecord_action, record_action
 from ..wrappers import wraps_function
-from multion.sessions.client import AsyncSessionsClient, SessionsClient
-import agentops  # type: ignore
-from agentops import ActionEvent, LLMEvent, ErrorEvent  # type: ignore
+from multion.sessions.extended_client import ExtendedAsyncSessionsClient, ExtendedSessionsClient
 
+import types
 import typing
 from ..types.session_created import SessionCreated
 from ..types.session_step_stream_chunk import SessionStepStreamChunk
@@ -13,120 +16,265 @@ from .types.sessions_close_response import SessionsCloseResponse
 OMIT = typing.cast(typing.Any, ...)
 
 
-class WrappedSessionsClient(SessionsClient):
-    def __init__(self, use_agentops: bool = False, *args, **kwargs):
-        super().__init__(*args, **kwargs)
+def _field(response: typing.Any, name: str) -> typing.Any:
+    # Responses are plain dicts when the client is configured with response_mode="raw".
+    if isinstance(response, dict):
+        return response.get(name)
+    return getattr(response, name)
+
+
+class _StepRecorder:
+    """
+    Records the AgentOps events of a streamed step: an `ActionEvent` returning the content of the step, joined once
+    its final chunk arrives, and an `LLMEvent` prompted with it.
+    """
+
+    def __init__(
+        self, *, agentops: types.ModuleType, telemetry: BaseTelemetryQueue, params: typing.Dict[str, typing.Any]
+    ):
+        self._agentops = agentops
+        self._telemetry = telemetry
+        self._action_event = agentops.ActionEvent(action_type="step_stream", params=params)
+        self._contents: typing.List[str] = []
+
+    def chunk(self, chunk: typing.Any) -> None:
+        content = _field(_field(_field(chunk, "data"), "delta"), "content")
+        if content:
+            self._contents.append(content)
+        if _field(chunk, "type") == "final_event":
+            self._action_event.screenshot = _field(chunk, "screenshot")
+            self._action_event.returns = "".join(self._contents)
+            llm_event = self._agentops.LLMEvent()
+            llm_event.prompt = self._action_event.returns
+            self._telemetry.submit(self._agentops.record, self._action_event)
+            self._telemetry.submit(self._agentops.record, llm_event)
+
+    def error(self, exception: Exception) -> None:
+        self._telemetry.submit(
+            self._agentops.record, self._agentops.ErrorEvent(trigger_event=self._action_event, exception=exception)
+        )
+
+
+class RecordedStepStream:
+    """
+    Yields the chunks of a step stream as they arrive, recording the step to AgentOps along the way. Other attributes,
+    e.g. `reconnects`, are the ones of the stream.
+    """
+
+    def __init__(
+        self,
+        stream: EventStream[SessionStepStreamChunk],
+        *,
+        agentops: types.ModuleType,
+        telemetry: BaseTelemetryQueue,
+        params: typing.Dict[str, typing.Any],
+    ):
+        self._stream = stream
+        self._recorder = _StepRecorder(agentops=agentops, telemetry=telemetry, params=params)
+        self._iterator: typing.Optional[typing.Iterator[SessionStepStreamChunk]] = None
+
+    def __getattr__(self, name: str) -> typing.Any:
+        return getattr(self._stream, name)
+
+    def __iter__(self) -> "RecordedStepStream":
+        return self
+
+    def __next__(self) -> SessionStepStreamChunk:
+        if self._iterator is None:
+            self._iterator = self._chunks()
+        return next(self._iterator)
+
+    def __enter__(self) -> "RecordedStepStream":
+        return self
+
+    def __exit__(self, *args: typing.Any) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._stream.close()
+
+    def _chunks(self) -> typing.Iterator[SessionStepStreamChunk]:
+        try:
+            for chunk in self._stream:
+                self._recorder.chunk(chunk)
+                yield chunk
+        except Exception as e:
+            self._recorder.error(e)
+            raise
+
+
+class AsyncRecordedStepStream:
+    """
+    The asynchronous counterpart of `RecordedStepStream`.
+    """
+
+    def __init__(
+        self,
+        stream: AsyncEventStream[SessionStepStreamChunk],
+        *,
+        agentops: types.ModuleType,
+        telemetry: BaseTelemetryQueue,
+        params: typing.Dict[str, typing.Any],
+    ):
+        self._stream = stream
+        self._recorder = _StepRecorder(agentops=agentops, telemetry=telemetry, params=params)
+        self._iterator: typing.Optional[typing.AsyncIterator[SessionStepStreamChunk]] = None
+
+    def __getattr__(self, name: str) -> typing.Any:
+        return getattr(self._stream, name)
+
+    def __aiter__(self) -> "AsyncRecordedStepStream":
+        return self
+
+    async def __anext__(self) -> SessionStepStreamChunk:
+        if self._iterator is None:
+            self._iterator = self._chunks()
+        return await self._iterator.__anext__()
+
+    async def __aenter__(self) -> "AsyncRecordedStepStream":
+        return self
+
+    async def __aexit__(self, *args: typing.Any) -> None:
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        await self._stream.aclose()
+
+    async def _chunks(self) -> typing.AsyncIterator[SessionStepStreamChunk]:
+        try:
+            async for chunk in self._stream:
+                self._recorder.chunk(chunk)
+                yield chunk
+        except Exception as e:
+            self._recorder.error(e)
+            raise
+
+
+class WrappedSessionsClient(ExtendedSessionsClient):
+    def __init__(
+        self,
+        *,
+        client_wrapper: ExtendedSyncClientWrapper,
+        use_agentops: bool = False,
+        telemetry: typing.Optional[TelemetryQueue] = None,
+    ):
+        super().__init__(client_wrapper=client_wrapper)
         self.use_agentops = use_agentops
+        if telemetry is None and use_agentops:
+            telemetry = TelemetryQueue()
+        # AgentOps calls are queued rather than made on the request path.
+        self.telemetry = telemetry
 
-    @wraps_function(SessionsClient.create)  # type: ignore
+    @wraps_function(ExtendedSessionsClient.create)  # type: ignore
     def create(self, *args, **kwargs) -> SessionCreated:
-        if self.use_agentops:
-            agentops.start_session(tags=["multion-sdk"])
+        if not self.use_agentops:
+            return super().create(*args, **kwargs)
+        agentops = load_agentops()
+        telemetry = typing.cast(BaseTelemetryQueue, self.telemetry)
+        telemetry.submit(agentops.start_session, tags=["multion-sdk"], sample=False)
         try:
             return super().create(*args, **kwargs)
         except Exception as e:
-            error_event = ErrorEvent(exception=e)
-            agentops.record(error_event)
+            error_event = agentops.ErrorEvent(exception=e)
+            telemetry.submit(agentops.record, error_event)
             raise e
 
-    @wraps_function(SessionsClient.step_stream)  # type: ignore
+    @wraps_function(ExtendedSessionsClient.step_stream)  # type: ignore
     def step_stream(self, *args, **kwargs) -> typing.Iterator[SessionStepStreamChunk]:
-        action_event = ActionEvent(action_type="step_stream", params=kwargs)
-        action_event.returns = ""
-        llm_event = LLMEvent()
-        step_stream_response = super().step_stream(*args, **kwargs)
-
-        def generator():
-            for chunk in step_stream_response:
-                if chunk.type == "final_event":
-                    action_event.screenshot = chunk.screenshot
-                    try:
-                        agentops.record(action_event)
-                        llm_event.prompt = action_event.returns
-                        agentops.record(llm_event)
-                    except Exception as e:
-                        error_event = ErrorEvent(
-                            trigger_event=action_event, exception=e
-                        )
-                        agentops.record(error_event)
-                else:
-                    action_event.returns += chunk.delta["content"]
-                yield chunk
-
-        return generator()
+        if not self.use_agentops:
+            return super().step_stream(*args, **kwargs)
+        return RecordedStepStream(
+            super().step_stream(*args, **kwargs),
+            agentops=load_agentops(),
+            telemetry=typing.cast(BaseTelemetryQueue, self.telemetry),
+            params=kwargs,
+        )
 
-    @agentops.record_function(event_name="step")  # type: ignore
-    @wraps_function(SessionsClient.step)
+    @wraps_function(ExtendedSessionsClient.step)  # type: ignore
     def step(self, *args, **kwargs) -> SessionStepSuccess:
-        llm_event = LLMEvent()
+        if not self.use_agentops:
+            return super().step(*args, **kwargs)
+        agentops = load_agentops()
+        return record_action(
+            typing.cast(BaseTelemetryQueue, self.telemetry), agentops, "step", self._record_step, *args, **kwargs
+        )
+
+    def _record_step(self, *args, **kwargs) -> SessionStepSuccess:
+        agentops = load_agentops()
+        llm_event = agentops.LLMEvent()
         step_response = super().step(*args, **kwargs)
-        llm_event.prompt = step_response.message
-        agentops.record(llm_event)
+        llm_event.prompt = _field(step_response, "message")
+        typing.cast(BaseTelemetryQueue, self.telemetry).submit(agentops.record, llm_event)
         return step_response
 
-    @wraps_function(SessionsClient.close)  # type: ignore
+    @wraps_function(ExtendedSessionsClient.close)  # type: ignore
     def close(self, *args, **kwargs) -> SessionsCloseResponse:
         close_response = super().close(*args, **kwargs)
-        agentops.end_session("Success")
+        if self.use_agentops:
+            typing.cast(BaseTelemetryQueue, self.telemetry).submit(load_agentops().end_session, "Success", sample=False)
         return close_response
 
 
-class WrappedAsyncSessionsClient(AsyncSessionsClient):
-    def __init__(self, use_agentops: bool = False, *args, **kwargs):
-        super().__init__(*args, **kwargs)
+class WrappedAsyncSessionsClient(ExtendedAsyncSessionsClient):
+    def __init__(
+        self,
+        *,
+        client_wrapper: ExtendedAsyncClientWrapper,
+        use_agentops: bool = False,
+        telemetry: typing.Optional[AsyncTelemetryQueue] = None,
+    ):
+        super().__init__(client_wrapper=client_wrapper)
         self.use_agentops = use_agentops
+        if telemetry is None and use_agentops:
+            telemetry = AsyncTelemetryQueue()
+        # AgentOps calls are queued rather than made on the request path.
+        self.telemetry = telemetry
 
-    @wraps_function(AsyncSessionsClient.create)  # type: ignore
+    @wraps_function(ExtendedAsyncSessionsClient.create)  # type: ignore
     async def create(self, *args, **kwargs) -> SessionCreated:
-        if self.use_agentops:
-            agentops.start_session(tags=["multion-sdk"])
+        if not self.use_agentops:
+            return await super().create(*args, **kwargs)
+        agentops = load_agentops()
+        telemetry = typing.cast(BaseTelemetryQueue, self.telemetry)
+        telemetry.submit(agentops.start_session, tags=["multion-sdk"], sample=False)
         try:
             return await super().create(*args, **kwargs)
         except Exception as e:
-            error_event = ErrorEvent(exception=e)
-            agentops.record(error_event)
+            error_event = agentops.ErrorEvent(exception=e)
+            telemetry.submit(agentops.record, error_event)
             raise e
 
-    @agentops.record_function(event_name="step_stream")  # type: ignore
-    @wraps_function(AsyncSessionsClient.step_stream)
-    async def step_stream(
-        self, *args, **kwargs
-    ) -> typing.AsyncIterator[SessionStepStreamChunk]:
-        action_event = ActionEvent(action_type="step_stream", params=kwargs)
-        action_event.returns = ""
-        llm_event = LLMEvent()
-        step_stream_response = super().step_stream(*args, **kwargs)
-
-        def generator():
-            for chunk in step_stream_response:
-                if chunk.type == "final_event":
-                    action_event.screenshot = chunk.screenshot
-                    try:
-                        agentops.record(action_event)
-                        llm_event.prompt = action_event.returns
-                        agentops.record(llm_event)
-                    except Exception as e:
-                        error_event = ErrorEvent(
-                            trigger_event=action_event, exception=e
-                        )
-                        agentops.record(error_event)
-                else:
-                    action_event.returns += chunk.delta["content"]
-                yield chunk
-
-        return generator()
+    @wraps_function(ExtendedAsyncSessionsClient.step_stream)  # type: ignore
+    def step_stream(self, *args, **kwargs) -> typing.AsyncIterator[SessionStepStreamChunk]:
+        if not self.use_agentops:
+            return super().step_stream(*args, **kwargs)
+        return AsyncRecordedStepStream(
+            super().step_stream(*args, **kwargs),
+            agentops=load_agentops(),
+            telemetry=typing.cast(BaseTelemetryQueue, self.telemetry),
+            params=kwargs,
+        )
 
-    @agentops.record_function(event_name="step")  # type: ignore
-    @wraps_function(AsyncSessionsClient.step)
+    @wraps_function(ExtendedAsyncSessionsClient.step)  # type: ignore
     async def step(self, *args, **kwargs) -> SessionStepSuccess:
-        llm_event = LLMEvent()
+        if not self.use_agentops:
+            return await super().step(*args, **kwargs)
+        agentops = load_agentops()
+        return await arecord_action(
+            typing.cast(BaseTelemetryQueue, self.telemetry), agentops, "step", self._record_step, *args, **kwargs
+        )
+
+    async def _record_step(self, *args, **kwargs) -> SessionStepSuccess:
+        agentops = load_agentops()
+        llm_event = agentops.LLMEvent()
         step_response = await super().step(*args, **kwargs)
-        llm_event.prompt = step_response.message
-        agentops.record(llm_event)
+        llm_event.prompt = _field(step_response, "message")
+        typing.cast(BaseTelemetryQueue, self.telemetry).submit(agentops.record, llm_event)
         return step_response
 
-    @wraps_function(AsyncSessionsClient.close)  # type: ignore
+    @wraps_function(ExtendedAsyncSessionsClient.close)  # type: ignore
     async def close(self, *args, **kwargs) -> SessionsCloseResponse:
         close_response = await super().close(*args, **kwargs)
-        agentops.end_session("Success")
+        if self.use_agentops:
+            typing.cast(BaseTelemetryQueue, self.telemetry).submit(load_agentops().end_session, "Success", sample=False)
         return close_response
@@ -0,0 +1,358 @@
+import abc
+import asyncio
+import atexit
+import collections
+import datetime
+import random
+import threading
+import types
+import typing
+import weakref
+
+# A queued call: the function, its arguments, and whether it may be sampled out or dropped.
+_Call = typing.Tuple[
+    typing.Callable[..., typing.Any], typing.Tuple[typing.Any, ...], typing.Dict[str, typing.Any], bool
+]
+
+T = typing.TypeVar("T")
+
+
+class BaseTelemetryQueue(abc.ABC):
+    """
+    Takes telemetry calls, e.g. `agentops.record(event)`, off the request path: calls are buffered in a bounded
+    in-process queue and run in batches in the background, in the order they were submitted.
+
+    When the queue holds `max_size` calls the oldest one submitted with `sample=True` is dropped to make room, calls
+    submitted with `sample=False` are never dropped. With a `sample_rate` below 1, only that fraction of the calls
+    submitted with `sample=True` are queued. The calls queued, dropped, sampled out, run
+    and failed are counted. Calls still queued when the interpreter exits are run then.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_size: int = 1024,
+        batch_size: int = 64,
+        flush_interval: float = 1.0,
+        sample_rate: float = 1.0,
+    ):
+        if not 0 <= sample_rate <= 1:
+            raise ValueError(f"sample_rate must be between 0 and 1, got {sample_rate}")
+        self.max_size = max_size
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.sample_rate = sample_rate
+        self.queued = 0
+        self.dropped = 0
+        self.sampled_out = 0
+        self.sent = 0
+        self.failed = 0
+        self.last_error: typing.Optional[Exception] = None
+        self._calls: typing.Deque[_Call] = collections.deque()
+        # The number of calls queued or running, which `flush` waits for.
+        self._unfinished = 0
+        self._closed = False
+        self._lock = threading.Lock()
+        self._done = threading.Condition(self._lock)
+        atexit.register(_drain_at_exit, weakref.ref(self))
+
+    @property
+    def pending(self) -> int:
+        """
+        The number of calls waiting in the queue.
+        """
+        with self._lock:
+            return len(self._calls)
+
+    def submit(
+        self, fn: typing.Callable[..., typing.Any], *args: typing.Any, sample: bool = True, **kwargs: typing.Any
+    ) -> bool:
+        """
+        Queues `fn(*args, **kwargs)`, and returns whether it was queued rather than sampled out or dropped. Calls that
+        must be neither, e.g. starting and ending sessions, are submitted with `sample=False`.
+        """
+        if sample and self.sample_rate < 1 and random.random() >= self.sample_rate:
+            with self._lock:
+                self.sampled_out += 1
+            return False
+        with self._lock:
+            if self._closed:
+                self.dropped += 1
+                return False
+            if len(self._calls) >= self.max_size and not self._drop_oldest_sampled() and sample:
+                # The queue is full of calls that cannot be dropped.
+                self.dropped += 1
+                return False
+            self._calls.append((fn, args, kwargs, sample))
+            self.queued += 1
+            self._unfinished += 1
+            pending = len(self._calls)
+        self._wake(pending >= self.batch_size)
+        return True
+
+    def _drop_oldest_sampled(self) -> bool:
+        for i, (_, _, _, sample) in enumerate(self._calls):
+            if sample:
+                del self._calls[i]
+                self.dropped += 1
+                self._unfinished -= 1
+                return True
+        return False
+
+    @abc.abstractmethod
+    def _wake(self, full: bool) -> None:
+        """
+        Called when a call was queued, with whether `batch_size` calls are waiting, to start flushing the queue.
+        """
+
+    def _take_batch(self) -> typing.List[_Call]:
+        with self._lock:
+            return [self._calls.popleft() for _ in range(min(self.batch_size, len(self._calls)))]
+
+    def _run_batch(self, batch: typing.List[_Call]) -> None:
+        sent = failed = 0
+        for fn, args, kwargs, _ in batch:
+            try:
+                fn(*args, **kwargs)
+                sent += 1
+            except Exception as e:
+                # Telemetry failures are counted, never raised to the code making requests.
+                failed += 1
+                self.last_error = e
+        with self._lock:
+            self.sent += sent
+            self.failed += failed
+            self._unfinished -= len(batch)
+            self._done.notify_all()
+
+    def _drain(self) -> None:
+        while True:
+            batch = self._take_batch()
+            if not batch:
+                return
+            self._run_batch(batch)
+
+
+def _drain_at_exit(queue_ref: "weakref.ReferenceType[BaseTelemetryQueue]") -> None:
+    queue = queue_ref()
+    if queue is None:
+        return
+    with queue._lock:
+        queue._closed = True
+    if isinstance(queue, TelemetryQueue):
+        queue._stop(timeout=5.0)
+    # The background task of an `AsyncTelemetryQueue` died with its event loop, the calls left are run here.
+    queue._drain()
+
+
+class TelemetryQueue(BaseTelemetryQueue):
+    """
+    A telemetry queue flushed by a background thread, see `BaseTelemetryQueue`. The thread runs a batch every
+    `flush_interval` seconds, or as soon as `batch_size` calls are queued.
+
+    Examples
+    --------
+    from multion.client import MultiOn
+    from multion.telemetry import TelemetryQueue
+
+    client = MultiOn(
+        api_key="YOUR_API_KEY",
+        agentops_api_key="YOUR_AGENTOPS_API_KEY",
+        telemetry=TelemetryQueue(max_size=10_000, sample_rate=0.1),
+    )
+    """
+
+    def __init__(
+        self,
+        *,
+        max_size: int = 1024,
+        batch_size: int = 64,
+        flush_interval: float = 1.0,
+        sample_rate: float = 1.0,
+    ):
+        super().__init__(
+            max_size=max_size, batch_size=batch_size, flush_interval=flush_interval, sample_rate=sample_rate
+        )
+        self._wakeup = threading.Event()
+        self._thread: typing.Optional[threading.Thread] = None
+
+    def _wake(self, full: bool) -> None:
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._work, name="multion-telemetry", daemon=True)
+                    self._thread.start()
+        if full:
+            self._wakeup.set()
+
+    def _work(self) -> None:
+        while True:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            self._drain()
+            if self._closed:
+                return
+
+    def flush(self, timeout: typing.Optional[float] = None) -> bool:
+        """
+        Waits for the calls queued to have run, and returns whether they did within `timeout` seconds.
+        """
+        self._wakeup.set()
+        with self._done:
+            return self._done.wait_for(lambda: self._unfinished == 0, timeout)
+
+    def close(self, timeout: typing.Optional[float] = None) -> None:
+        """
+        Runs the calls queued and stops the background thread. Calls submitted afterwards are dropped.
+        """
+        with self._lock:
+            self._closed = True
+        self._stop(timeout)
+        self._drain()
+
+    def _stop(self, timeout: typing.Optional[float]) -> None:
+        self._wakeup.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout)
+
+
+class AsyncTelemetryQueue(BaseTelemetryQueue):
+    """
+    A telemetry queue flushed by a background task of the running event loop, see `BaseTelemetryQueue`. The calls are
+    run in the default executor of the loop, so that blocking telemetry clients do not block it.
+
+    Examples
+    --------
+    from multion.client import AsyncMultiOn
+    from multion.telemetry import AsyncTelemetryQueue
+
+    client = AsyncMultiOn(
+        api_key="YOUR_API_KEY",
+        agentops_api_key="YOUR_AGENTOPS_API_KEY",
+        telemetry=AsyncTelemetryQueue(sample_rate=0.1),
+    )
+    """
+
+    def __init__(
+        self,
+        *,
+        max_size: int = 1024,
+        batch_size: int = 64,
+        flush_interval: float = 1.0,
+        sample_rate: float = 1.0,
+    ):
+        super().__init__(
+            max_size=max_size, batch_size=batch_size, flush_interval=flush_interval, sample_rate=sample_rate
+        )
+        self._task: typing.Optional["asyncio.Task[None]"] = None
+        self._wakeup: typing.Optional[asyncio.Event] = None
+        self._batch_lock: typing.Optional[asyncio.Lock] = None
+        self._loop: typing.Optional[asyncio.AbstractEventLoop] = None
+
+    def _wake(self, full: bool) -> None:
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # Without a running loop the calls wait for `flush`, or for the interpreter to exit.
+            return
+        if self._task is None or self._task.done() or self._loop is not loop:
+            self._loop = loop
+            self._wakeup = asyncio.Event()
+            self._batch_lock = asyncio.Lock()
+            self._task = loop.create_task(self._work())
+        if full:
+            typing.cast(asyncio.Event, self._wakeup).set()
+
+    async def _work(self) -> None:
+        wakeup = typing.cast(asyncio.Event, self._wakeup)
+        while not self._closed:
+            try:
+                await asyncio.wait_for(wakeup.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            wakeup.clear()
+            await self._run_batches()
+
+    async def _run_batches(self) -> None:
+        if self._batch_lock is None or self._loop is not asyncio.get_running_loop():
+            self._loop = asyncio.get_running_loop()
+            self._batch_lock = asyncio.Lock()
+        # Batches run one at a time, so that calls run in the order they were submitted.
+        async with self._batch_lock:
+            while True:
+                batch = self._take_batch()
+                if not batch:
+                    return
+                await self._loop.run_in_executor(None, self._run_batch, batch)
+
+    async def flush(self) -> None:
+        """
+        Runs the calls queued, and waits for them to have run.
+        """
+        await self._run_batches()
+
+    async def aclose(self) -> None:
+        """
+        Runs the calls queued and stops the background task. Calls submitted afterwards are dropped.
+        """
+        with self._lock:
+            self._closed = True
+        await self._run_batches()
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+
+
+def record_action(
+    telemetry: BaseTelemetryQueue,
+    agentops: types.ModuleType,
+    event_name: str,
+    fn: typing.Callable[..., T],
+    *args: typing.Any,
+    **kwargs: typing.Any,
+) -> T:
+    """
+    Calls `fn` and queues an AgentOps `ActionEvent` recording its arguments, result and timing, or an `ErrorEvent`
+    when it raises, as `agentops.record_function` does inline.
+    """
+    event = agentops.ActionEvent(action_type=event_name, params=kwargs)
+    try:
+        returns = fn(*args, **kwargs)
+    except Exception as e:
+        telemetry.submit(agentops.record, agentops.ErrorEvent(trigger_event=event, exception=e))
+        raise
+    _end_action(event, returns)
+    telemetry.submit(agentops.record, event)
+    return returns
+
+
+async def arecord_action(
+    telemetry: BaseTelemetryQueue,
+    agentops: types.ModuleType,
+    event_name: str,
+    fn: typing.Callable[..., typing.Awaitable[T]],
+    *args: typing.Any,
+    **kwargs: typing.Any,
+) -> T:
+    """
+    The asynchronous counterpart of `record_action`.
+    """
+    event = agentops.ActionEvent(action_type=event_name, params=kwargs)
+    try:
+        returns = await fn(*args, **kwargs)
+    except Exception as e:
+        telemetry.submit(agentops.record, agentops.ErrorEvent(trigger_event=event, exception=e))
+        raise
+    _end_action(event, returns)
+    telemetry.submit(agentops.record, event)
+    return returns
+
+
+def _end_action(event: typing.Any, returns: typing.Any) -> None:
+    event.returns = returns
+    screenshot = returns.get("screenshot") if isinstance(returns, dict) else getattr(returns, "screenshot", None)
+    if screenshot is not None:
+        event.screenshot = screenshot
+    # The timestamp format of AgentOps events.
+    event.end_timestamp = (
+        datetime.datetime.now(datetime.timezone.utc).replace(tzinfo=None).isoformat(timespec="milliseconds") + "Z"
+    )
@@ -1,32 +1,67 @@
 # This file was auto-generated by Fern from our API Definition.
 
-from .bad_request_response import BadRequestResponse
-from .browse_output import BrowseOutput
-from .format import Format
-from .http_validation_error import HttpValidationError
-from .internal_server_error_response import InternalServerErrorResponse
-from .metadata import Metadata
-from .mode import Mode
-from .payment_required_response import PaymentRequiredResponse
-from .remote_value import RemoteValue
-from .retrieve_output import RetrieveOutput
-from .session_created import SessionCreated
-from .session_step_stream_chunk import (
-    SessionStepStreamChunk,
-    SessionStepStreamChunk_Event,
-    SessionStepStreamChunk_FinalEvent,
-)
-from .session_step_success import SessionStepSuccess
-from .session_step_success_metadata import SessionStepSuccessMetadata
-from .session_stream_chunk_event import SessionStreamChunkEvent
-from .session_stream_chunk_event_data import SessionStreamChunkEventData
-from .session_stream_chunk_event_data_delta import SessionStreamChunkEventDataDelta
-from .session_stream_chunk_final_event import SessionStreamChunkFinalEvent
-from .session_stream_chunk_final_event_data import SessionStreamChunkFinalEventData
-from .session_stream_chunk_final_event_data_delta import SessionStreamChunkFinalEventDataDelta
-from .unauthorized_response import UnauthorizedResponse
-from .validation_error import ValidationError
-from .validation_error_loc_item import ValidationErrorLocItem
+import typing
+
+from ..lazy_import import lazy_exports
+
+if typing.TYPE_CHECKING:
+    from .bad_request_response import BadRequestResponse
+    from .browse_output import BrowseOutput
+    from .format import Format
+    from .http_validation_error import HttpValidationError
+    from .internal_server_error_response import InternalServerErrorResponse
+    from .metadata import Metadata
+    from .mode import Mode
+    from .payment_required_response import PaymentRequiredResponse
+    from .remote_value import RemoteValue
+    from .retrieve_output import RetrieveOutput
+    from .session_created import SessionCreated
+    from .session_step_stream_chunk import (
+        SessionStepStreamChunk,
+        SessionStepStreamChunk_Event,
+        SessionStepStreamChunk_FinalEvent,
+    )
+    from .session_step_success import SessionStepSuccess
+    from .session_step_success_metadata import SessionStepSuccessMetadata
+    from .session_stream_chunk_event import SessionStreamChunkEvent
+    from .session_stream_chunk_event_data import SessionStreamChunkEventData
+    from .session_stream_chunk_event_data_delta import SessionStreamChunkEventDataDelta
+    from .session_stream_chunk_final_event import SessionStreamChunkFinalEvent
+    from .session_stream_chunk_final_event_data import SessionStreamChunkFinalEventData
+    from .session_stream_chunk_final_event_data_delta import SessionStreamChunkFinalEventDataDelta
+    from .unauthorized_response import UnauthorizedResponse
+    from .validation_error import ValidationError
+    from .validation_error_loc_item import ValidationErrorLocItem
+
+_dynamic_imports: typing.Dict[str, str] = {
+    "BadRequestResponse": ".bad_request_response",
+    "BrowseOutput": ".browse_output",
+    "Format": ".format",
+    "HttpValidationError": ".http_validation_error",
+    "InternalServerErrorResponse": ".internal_server_error_response",
+    "Metadata": ".metadata",
+    "Mode": ".mode",
+    "PaymentRequiredResponse": ".payment_required_response",
+    "RemoteValue": ".remote_value",
+    "RetrieveOutput": ".retrieve_output",
+    "SessionCreated": ".session_created",
+    "SessionStepStreamChunk": ".session_step_stream_chunk",
+    "SessionStepStreamChunk_Event": ".session_step_stream_chunk",
+    "SessionStepStreamChunk_FinalEvent": ".session_step_stream_chunk",
+    "SessionStepSuccess": ".session_step_success",
+    "SessionStepSuccessMetadata": ".session_step_success_metadata",
+    "SessionStreamChunkEvent": ".session_stream_chunk_event",
+    "SessionStreamChunkEventData": ".session_stream_chunk_event_data",
+    "SessionStreamChunkEventDataDelta": ".session_stream_chunk_event_data_delta",
+    "SessionStreamChunkFinalEvent": ".session_stream_chunk_final_event",
+    "SessionStreamChunkFinalEventData": ".session_stream_chunk_final_event_data",
+    "SessionStreamChunkFinalEventDataDelta": ".session_stream_chunk_final_event_data_delta",
+    "UnauthorizedResponse": ".unauthorized_response",
+    "ValidationError": ".validation_error",
+    "ValidationErrorLocItem": ".validation_error_loc_item",
+}
+
+__getattr__, __dir__ = lazy_exports(__name__, globals(), _dynamic_imports)
 
 __all__ = [
     "BadRequestResponse",
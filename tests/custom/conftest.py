@@ -0,0 +1,25 @@
+import typing
+
+import pytest
+
+import multion.client
+import multion.sessions.wrapped_client
+
+from .fake_agentops import SlowAgentOps
+from .sse_server import SseServer
+
+
+@pytest.fixture
+def sse_server() -> typing.Iterator[SseServer]:
+    server = SseServer()
+    server.start()
+    yield server
+    server.stop()
+
+
+@pytest.fixture
+def agentops(monkeypatch: pytest.MonkeyPatch) -> SlowAgentOps:
+    agentops = SlowAgentOps(delay=0.2)
+    monkeypatch.setattr(multion.client, "load_agentops", lambda: agentops)
+    monkeypatch.setattr(multion.sessions.wrapped_client, "load_agentops", lambda: agentops)
+    return agentops
@@ -0,0 +1,38 @@
+import threading
+import time
+import typing
+
+
+class Event:
+    def __init__(self, **kwargs: typing.Any) -> None:
+        self.returns: typing.Any = None
+        self.screenshot: typing.Any = None
+        self.end_timestamp: typing.Any = None
+        self.__dict__.update(kwargs)
+
+
+class SlowAgentOps:
+    """
+    Stands in for the agentops module, taking `delay` seconds to record each event.
+    """
+
+    ActionEvent = LLMEvent = ErrorEvent = Event
+
+    def __init__(self, delay: float) -> None:
+        self.delay = delay
+        self.calls: typing.List[typing.Tuple[str, typing.Any]] = []
+        self.threads: typing.Set[threading.Thread] = set()
+
+    def init(self, **kwargs: typing.Any) -> None:
+        pass
+
+    def start_session(self, tags: typing.List[str]) -> None:
+        self.calls.append(("start_session", tags))
+
+    def end_session(self, end_state: str) -> None:
+        self.calls.append(("end_session", end_state))
+
+    def record(self, event: Event) -> None:
+        time.sleep(self.delay)
+        self.threads.add(threading.current_thread())
+        self.calls.append(("record", event))
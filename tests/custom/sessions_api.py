@@ -0,0 +1,67 @@
+import json
+import threading
+import typing
+
+import httpx
+
+
+class SessionsApi:
+    """
+    An in-memory implementation of the sessions endpoints, to be served through `httpx.MockTransport`.
+
+    Steps answer with the statuses queued in `step_statuses`, and "CONTINUE" once the queue is empty.
+    """
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.active: typing.List[str] = []
+        self.created: typing.List[typing.Dict[str, typing.Any]] = []
+        self.closed: typing.List[str] = []
+        self.steps: typing.List[typing.Tuple[str, typing.Dict[str, typing.Any]]] = []
+        self.step_statuses: typing.List[str] = []
+        self.list_calls = 0
+
+    def expire(self, session_id: str) -> None:
+        with self.lock:
+            self.active.remove(session_id)
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        path = request.url.path[len("/v1/web/") :]
+        with self.lock:
+            if request.method == "POST" and path == "session":
+                session_id = f"session-{len(self.created)}"
+                self.created.append(json.loads(request.content))
+                self.active.append(session_id)
+                return httpx.Response(
+                    200,
+                    json={"status": "CONTINUE", "message": "", "session_id": session_id, "url": "", "screenshot": ""},
+                )
+            if request.method == "GET" and path == "sessions":
+                self.list_calls += 1
+                return httpx.Response(200, json={"session_ids": list(self.active)})
+            session_id = path.split("/")[-1]
+            if request.method == "DELETE":
+                self.closed.append(session_id)
+                if session_id not in self.active:
+                    return httpx.Response(422, json={"detail": [{"loc": [], "msg": "unknown session", "type": ""}]})
+                self.active.remove(session_id)
+                return httpx.Response(200, json={"status": "closed", "session_id": session_id})
+            if request.method == "POST" and path.startswith("session/"):
+                body = json.loads(request.content)
+                self.steps.append((session_id, body))
+                status = self.step_statuses.pop(0) if self.step_statuses else "CONTINUE"
+                return httpx.Response(
+                    200,
+                    json={
+                        "status": status,
+                        "message": f"{status.lower()}: {body['cmd']}",
+                        "session_id": session_id,
+                        "url": "",
+                        "screenshot": "",
+                    },
+                )
+        return httpx.Response(404, json={"detail": "not found"})
+
+    async def handle_async(self, request: httpx.Request) -> httpx.Response:
+        await request.aread()
+        return self(request)
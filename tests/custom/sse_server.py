@@ -0,0 +1,104 @@
+import json
+import threading
+import time
+import typing
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class SseScript:
+    """
+    What the stand-in server sends back for one request: a list of `(delay_in_seconds, event)` pairs, optionally
+    followed by an abrupt disconnect in the middle of the chunked body.
+    """
+
+    def __init__(
+        self,
+        events: typing.List[typing.Tuple[float, str]],
+        *,
+        drop: bool = False,
+        status_code: int = 200,
+    ):
+        self.events = events
+        self.drop = drop
+        self.status_code = status_code
+
+
+class SseServer:
+    def __init__(self) -> None:
+        self.scripts: typing.List[SseScript] = []
+        self.requests: typing.List[typing.Dict[str, typing.Any]] = []
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self._server.server_address[1]}"
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _handler(self) -> typing.Type[BaseHTTPRequestHandler]:
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args: typing.Any) -> None:
+                pass
+
+            def do_HEAD(self) -> None:
+                # Slow enough that concurrent requests each need a connection of their own.
+                time.sleep(0.1)
+                self.send_response(200)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+
+            def do_POST(self) -> None:
+                body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                server.requests.append({"path": self.path, "headers": dict(self.headers), "body": json.loads(body)})
+                script = server.scripts.pop(0) if server.scripts else SseScript([])
+
+                self.send_response(script.status_code)
+                if script.status_code != 200:
+                    self.send_header("Content-Type", "application/json")
+                    self.send_header("Content-Length", "2")
+                    self.end_headers()
+                    self.wfile.write(b"{}")
+                    return
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+                for delay, event in script.events:
+                    time.sleep(delay)
+                    payload = event.encode()
+                    self.wfile.write(b"%x\r\n%s\r\n" % (len(payload), payload))
+                    self.wfile.flush()
+                if script.drop:
+                    self.close_connection = True
+                    return
+                self.wfile.write(b"0\r\n\r\n")
+                self.wfile.flush()
+
+        return Handler
+
+
+def sse_event(data: typing.Dict[str, typing.Any], *, event_id: typing.Optional[str] = None) -> str:
+    lines = [] if event_id is None else [f"id: {event_id}"]
+    lines.append(f"data: {json.dumps(data)}")
+    return "\n".join(lines) + "\n\n"
+
+
+def chunk_event(content: str) -> typing.Dict[str, typing.Any]:
+    return {"type": "event", "session_id": "session-1", "data": {"delta": {"content": content, "url": "url"}}}
+
+
+def final_event(content: str) -> typing.Dict[str, typing.Any]:
+    return {
+        "type": "final_event",
+        "session_id": "session-1",
+        "data": {"delta": {"content": content, "url": "url", "status": "DONE"}},
+    }
@@ -0,0 +1,27 @@
+import subprocess
+import sys
+
+import httpx
+
+from multion.client import MultiOn
+
+SESSION_STEP_SUCCESS = {"message": "done", "status": "DONE", "url": "url", "screenshot": "", "session_id": "session-1"}
+
+
+def test_importing_the_client_does_not_import_agentops() -> None:
+    code = "import sys, multion, multion.client; print('agentops' in sys.modules)"
+
+    output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout
+
+    assert output.strip() == "False"
+
+
+def test_clients_without_an_agentops_api_key_do_not_record_sessions() -> None:
+    transport = httpx.MockTransport(lambda request: httpx.Response(200, json=SESSION_STEP_SUCCESS))
+    client = MultiOn(api_key="key", agentops_api_key=None, httpx_client=httpx.Client(transport=transport))
+
+    response = client.sessions.step("session-1", cmd="go")
+    client.sessions.close("session-1")
+
+    assert response.message == "done"
+    assert client.sessions.use_agentops is False
@@ -0,0 +1,233 @@
+import asyncio
+import concurrent.futures
+import json
+import threading
+import time
+import typing
+
+import httpx
+import pytest
+
+from multion.batch import BatchResult, arun_batch, run_batch
+from multion.core.api_error import ApiError
+from multion.errors import PaymentRequiredError
+from multion.extended_client import AsyncExtendedMultiOn, ExtendedMultiOn
+from multion.types import PaymentRequiredResponse
+
+PAYMENT_REQUIRED = {"detail": "payment required"}
+
+
+def _browse_output(cmd: str) -> typing.Dict[str, typing.Any]:
+    return {"message": cmd, "status": "DONE", "url": "url", "screenshot": "", "session_id": "session-1"}
+
+
+class BrowseHandler:
+    """
+    Answers `browse` requests after the delay encoded in the command, e.g. "0.05:a", and records the peak concurrency.
+    """
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.in_flight = 0
+        self.peak = 0
+        self.requests: typing.List[httpx.Request] = []
+
+    def _start(self, request: httpx.Request) -> typing.Tuple[float, str]:
+        with self.lock:
+            self.requests.append(request)
+            self.in_flight += 1
+            self.peak = max(self.peak, self.in_flight)
+        cmd = json.loads(request.content)["cmd"]
+        delay, _ = cmd.split(":")
+        return float(delay), cmd
+
+    def _finish(self, cmd: str) -> httpx.Response:
+        with self.lock:
+            self.in_flight -= 1
+        if cmd.endswith(":pay"):
+            return httpx.Response(402, json=PAYMENT_REQUIRED)
+        if cmd.endswith(":fail"):
+            return httpx.Response(500, json={"detail": "boom"})
+        return httpx.Response(200, json=_browse_output(cmd))
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        delay, cmd = self._start(request)
+        time.sleep(delay)
+        return self._finish(cmd)
+
+    async def handle_async(self, request: httpx.Request) -> httpx.Response:
+        await request.aread()
+        delay, cmd = self._start(request)
+        await asyncio.sleep(delay)
+        return self._finish(cmd)
+
+
+def test_browse_many_yields_results_as_they_complete() -> None:
+    handler = BrowseHandler()
+    client = ExtendedMultiOn(api_key="key", httpx_client=httpx.Client(transport=httpx.MockTransport(handler)))
+
+    results = list(client.browse_many(["0.2:a", "0.01:b", {"cmd": "0.1:c"}, "0.01:fail"], concurrency=3))
+
+    # The failing command only starts once "b" completes, and still completes before "c".
+    assert [result.index for result in results] == [1, 3, 2, 0]
+    assert [result.output.message for result in results if result.ok] == ["0.01:b", "0.1:c", "0.2:a"]  # type: ignore
+    assert results[1].error is not None and not results[1].ok
+    assert handler.peak == 3
+
+
+def test_browse_many_applies_per_command_request_options() -> None:
+    handler = BrowseHandler()
+    client = ExtendedMultiOn(api_key="key", httpx_client=httpx.Client(transport=httpx.MockTransport(handler)))
+
+    list(
+        client.browse_many(
+            ["0:a", {"cmd": "0:b", "request_options": {"additional_headers": {"X-Item": "b"}}}],
+            concurrency=1,
+            request_options={"additional_headers": {"X-Item": "shared"}},
+        )
+    )
+
+    assert [request.headers["X-Item"] for request in handler.requests] == ["shared", "b"]
+
+
+def test_browse_many_stops_on_fatal_errors() -> None:
+    handler = BrowseHandler()
+    client = ExtendedMultiOn(api_key="key", httpx_client=httpx.Client(transport=httpx.MockTransport(handler)))
+
+    with pytest.raises(PaymentRequiredError):
+        list(client.browse_many(["0:pay"] + ["0:a"] * 10, concurrency=2))
+    assert len(handler.requests) == 2
+
+
+def test_run_batch_yields_the_results_completed_with_a_fatal_error() -> None:
+    finished: typing.List[str] = []
+
+    def call(item: str) -> str:
+        if item == "pay":
+            raise PaymentRequiredError(PaymentRequiredResponse(message="payment required"))
+        time.sleep(0.2 if item == "slow" else 0)
+        finished.append(item)
+        return item
+
+    def items() -> typing.Iterator[str]:
+        yield "pay"
+        yield "ok"
+        # Both calls complete before the batch waits for the first of them.
+        time.sleep(0.1)
+        yield "slow"
+        yield "never"
+
+    results: typing.List[BatchResult[str]] = []
+    with pytest.raises(PaymentRequiredError):
+        for result in run_batch(call, items(), concurrency=3):
+            results.append(result)
+
+    assert [(result.index, result.output) for result in results] == [(1, "ok")]
+    # The call in flight when the error was raised ran to completion, and no further item was started.
+    assert finished == ["ok", "slow"]
+
+
+async def test_arun_batch_reports_cancelled_items_and_goes_on() -> None:
+    async def call(item: str) -> str:
+        if item == "cancelled":
+            raise asyncio.CancelledError()
+        await asyncio.sleep(0.05 if item == "slow" else 0)
+        return item
+
+    results = [result async for result in arun_batch(call, ["ok", "cancelled", "slow", "after"], concurrency=2)]
+
+    assert sorted((result.index, result.output) for result in results if result.ok) == [
+        (0, "ok"),
+        (2, "slow"),
+        (3, "after"),
+    ]
+    (cancelled,) = [result for result in results if not result.ok]
+    assert cancelled.index == 1 and isinstance(cancelled.error, concurrent.futures.CancelledError)
+
+
+async def test_async_browse_many_cancels_remaining_commands_on_fatal_errors() -> None:
+    handler = BrowseHandler()
+    client = AsyncExtendedMultiOn(
+        api_key="key", httpx_client=httpx.AsyncClient(transport=httpx.MockTransport(handler.handle_async))
+    )
+
+    seen: typing.List[int] = []
+    start = time.monotonic()
+    with pytest.raises(PaymentRequiredError):
+        async for result in client.browse_many(["0:a", "0.1:pay", "5:slow", "0:b", "5:slow", "0:c"], concurrency=3):
+            seen.append(result.index)
+
+    assert seen == [0, 3]
+    # The slow commands were cancelled rather than awaited, and "c" was never started.
+    assert time.monotonic() - start < 5
+    assert len(handler.requests) == 5
+
+
+def _retrieve_handler(request: httpx.Request) -> httpx.Response:
+    url = json.loads(request.content)["url"]
+    if url.endswith("broken"):
+        return httpx.Response(500, json={"detail": "boom"})
+    return httpx.Response(
+        200, json={"message": "done", "url": url, "status": "DONE", "data": [{"page": url, "row": i} for i in range(3)]}
+    )
+
+
+def test_retrieve_many_yields_rows_tagged_with_their_url() -> None:
+    seen: typing.List[httpx.Request] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        seen.append(request)
+        return _retrieve_handler(request)
+
+    client = ExtendedMultiOn(api_key="key", httpx_client=httpx.Client(transport=httpx.MockTransport(handler)))
+    errors: typing.List[typing.Tuple[str, Exception]] = []
+
+    rows = list(
+        client.retrieve_many(
+            cmd="go",
+            urls=(f"https://example.com/{page}" for page in ["1", "broken", "2"]),
+            fields=["row"],
+            concurrency=1,
+            on_error=lambda url, error: errors.append((url, error)),
+        )
+    )
+
+    assert [(row.index, row.url, row.data["row"]) for row in rows] == [
+        (0, "https://example.com/1", 0),
+        (0, "https://example.com/1", 1),
+        (0, "https://example.com/1", 2),
+        (2, "https://example.com/2", 0),
+        (2, "https://example.com/2", 1),
+        (2, "https://example.com/2", 2),
+    ]
+    assert all(row.data["page"] == row.url for row in rows)
+    assert [url for url, _ in errors] == ["https://example.com/broken"]
+    assert json.loads(seen[0].content)["fields"] == ["row"]
+
+
+def test_retrieve_many_raises_the_first_error_without_on_error() -> None:
+    client = ExtendedMultiOn(api_key="key", httpx_client=httpx.Client(transport=httpx.MockTransport(_retrieve_handler)))
+
+    rows = client.retrieve_many(cmd="go", urls=["https://example.com/broken", "https://example.com/1"], concurrency=1)
+
+    with pytest.raises(ApiError):
+        list(rows)
+
+
+async def test_async_retrieve_many_yields_rows() -> None:
+    async def handler(request: httpx.Request) -> httpx.Response:
+        await request.aread()
+        return _retrieve_handler(request)
+
+    client = AsyncExtendedMultiOn(api_key="key", httpx_client=httpx.AsyncClient(transport=httpx.MockTransport(handler)))
+
+    rows = [row async for row in client.retrieve_many(cmd="go", urls=["https://example.com/1", "https://example.com/2"])]
+
+    assert sorted((row.url, row.data["row"]) for row in rows) == [
+        ("https://example.com/1", 0),
+        ("https://example.com/1", 1),
+        ("https://example.com/1", 2),
+        ("https://example.com/2", 0),
+        ("https://example.com/2", 1),
+        ("https://example.com/2", 2),
+    ]
@@ -0,0 +1,97 @@
+import asyncio
+import time
+
+import httpx
+import pytest
+
+from multion.core.api_error import ApiError
+from multion.errors import UnprocessableEntityError
+from multion.extended_client import AsyncExtendedMultiOn, ExtendedMultiOn
+
+from .sessions_api import SessionsApi
+
+
+class SlowSessionsApi(SessionsApi):
+    """
+    Closes sessions after a delay, recording how many are being closed at once.
+    """
+
+    def __init__(self, delay: float) -> None:
+        super().__init__()
+        self.delay = delay
+        self.in_flight = 0
+        self.peak = 0
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        if request.method != "DELETE":
+            return super().__call__(request)
+        with self.lock:
+            self.in_flight += 1
+            self.peak = max(self.peak, self.in_flight)
+        time.sleep(self.delay)
+        with self.lock:
+            self.in_flight -= 1
+        return super().__call__(request)
+
+    async def handle_async(self, request: httpx.Request) -> httpx.Response:
+        if request.method == "DELETE":
+            self.in_flight += 1
+            self.peak = max(self.peak, self.in_flight)
+            await asyncio.sleep(self.delay)
+            self.in_flight -= 1
+        return super().__call__(request)
+
+
+def test_close_many_closes_sessions_concurrently() -> None:
+    api = SlowSessionsApi(delay=0.05)
+    api.active.extend(f"session-{i}" for i in range(20))
+    client = ExtendedMultiOn(api_key="key", httpx_client=httpx.Client(transport=httpx.MockTransport(api)))
+
+    start = time.monotonic()
+    results = client.sessions.close_many([f"session-{i}" for i in range(20)] + ["unknown"], concurrency=10)
+
+    assert time.monotonic() - start < 0.05 * 20 / 2
+    assert api.peak == 10
+    assert list(results)[:3] == ["session-0", "session-1", "session-2"]
+    assert results["session-7"].result().session_id == "session-7"
+    assert isinstance(results["unknown"].error, UnprocessableEntityError)
+    assert api.active == []
+
+
+def test_close_all_closes_the_listed_sessions() -> None:
+    api = SessionsApi()
+    api.active.extend(["a", "b", "c"])
+    client = ExtendedMultiOn(
+        api_key="key", httpx_client=httpx.Client(transport=httpx.MockTransport(api)), response_mode="view"
+    )
+
+    results = client.sessions.close_all()
+
+    assert sorted(results) == ["a", "b", "c"] and all(result.ok for result in results.values())
+    assert api.active == []
+
+
+def test_close_many_only_raises_fatal_errors() -> None:
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(401, json={"detail": "unauthorized"})
+
+    client = ExtendedMultiOn(api_key="key", httpx_client=httpx.Client(transport=httpx.MockTransport(handler)))
+
+    assert all(result.error.status_code == 401 for result in client.sessions.close_many(["a", "b"]).values())  # type: ignore
+    with pytest.raises(ApiError):
+        client.sessions.close_many(["a", "b"], fatal_errors=(ApiError,))
+
+
+async def test_async_close_many_and_close_all() -> None:
+    api = SlowSessionsApi(delay=0.01)
+    api.active.extend(f"session-{i}" for i in range(10))
+    client = AsyncExtendedMultiOn(
+        api_key="key", httpx_client=httpx.AsyncClient(transport=httpx.MockTransport(api.handle_async))
+    )
+
+    results = await client.sessions.close_many(["session-0", "session-1"])
+    assert [result.ok for result in results.values()] == [True, True]
+
+    results = await client.sessions.close_all(concurrency=4)
+    assert len(results) == 8 and api.peak == 4
+    assert api.active == []
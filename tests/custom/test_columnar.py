@@ -0,0 +1,92 @@
+import typing
+
+import httpx
+import pytest
+
+from multion import columnar
+from multion.core.decoders import decode
+from multion.extended_client import ExtendedMultiOn
+from multion.extended_types import ExtendedRetrieveOutput
+
+ROWS: typing.List[typing.Dict[str, typing.Any]] = [
+    {"name": "a", "price": 1, "rating": 4.5, "in_stock": True, "tags": ["x"]},
+    {"name": "b", "price": 2.5, "in_stock": False},
+    {"name": "c", "price": None, "rating": 3, "in_stock": True, "tags": ["y", "z"]},
+]
+
+
+def _output(rows: typing.List[typing.Dict[str, typing.Any]]) -> ExtendedRetrieveOutput:
+    return decode(type_=ExtendedRetrieveOutput, object_={"message": "", "url": "url", "status": "DONE", "data": rows})
+
+
+def test_to_columns_pivots_rows_by_field() -> None:
+    assert _output(ROWS).to_columns(["name", "price", "missing"]) == {
+        "name": ["a", "b", "c"],
+        "price": [1, 2.5, None],
+        "missing": [None, None, None],
+    }
+    assert list(_output(ROWS).to_columns()) == ["name", "price", "rating", "in_stock", "tags"]
+
+
+def test_retrieve_returns_outputs_with_the_export_methods() -> None:
+    response = {"message": "", "url": "url", "status": "DONE", "data": ROWS}
+    transport = httpx.MockTransport(lambda request: httpx.Response(200, json=response))
+    client = ExtendedMultiOn(api_key="key", httpx_client=httpx.Client(transport=transport))
+
+    output = client.retrieve(cmd="go", url="url")
+
+    assert isinstance(output, ExtendedRetrieveOutput)
+    assert output.to_columns(["name"]) == {"name": ["a", "b", "c"]}
+
+
+def test_infer_column_type_unifies_values() -> None:
+    assert columnar.infer_column_type([1, None, 2]) == "int"
+    assert columnar.infer_column_type([1, 2.5]) == "float"
+    assert columnar.infer_column_type(["1", 2]) == "str"
+    assert columnar.infer_column_type([None]) == "null"
+    assert columnar.infer_column_type([["x"], "y"]) == "object"
+
+
+def test_to_numpy_types_arrays_after_their_values() -> None:
+    np = pytest.importorskip("numpy")
+
+    arrays = _output(ROWS).to_numpy()
+
+    assert arrays["in_stock"].dtype == np.bool_
+    assert arrays["price"].dtype == np.float64 and np.isnan(arrays["price"][2])
+    assert arrays["name"].dtype == object
+
+
+def test_to_arrow_infers_a_schema() -> None:
+    pa = pytest.importorskip("pyarrow")
+
+    table = _output(ROWS).to_arrow()
+
+    assert table.schema.field("price").type == pa.float64()
+    assert table.schema.field("in_stock").type == pa.bool_()
+    assert table.column("tags").to_pylist() == ['["x"]', None, '["y", "z"]']
+
+
+def test_parquet_writer_writes_many_outputs_in_batches(tmp_path: typing.Any) -> None:
+    pa = pytest.importorskip("pyarrow")
+    pq = pytest.importorskip("pyarrow.parquet")
+    path = tmp_path / "rows.parquet"
+    schema = pa.schema([("name", pa.string()), ("price", pa.float64()), ("note", pa.string())])
+
+    with columnar.ParquetWriter(path, schema=schema, batch_size=2) as writer:
+        for page in range(3):
+            writer.write_output(_output([{"name": f"{page}-{i}", "price": i} for i in range(3)]))
+            writer.write_output({"data": [{"name": f"{page}-raw", "price": 0.5, "note": "raw"}]})
+
+    table = pq.read_table(path)
+    assert writer.rows_written == table.num_rows == 12
+    assert table.column_names == ["name", "price", "note"]
+    assert table.column("note").to_pylist().count("raw") == 3
+    assert pq.ParquetFile(path).metadata.num_row_groups == 6
+
+
+def test_to_arrow_refuses_lossy_conversions() -> None:
+    pa = pytest.importorskip("pyarrow")
+
+    with pytest.raises(pa.ArrowInvalid):
+        columnar.to_arrow([{"price": 1.5}], schema=pa.schema([("price", pa.int64())]))
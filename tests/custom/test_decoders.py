@@ -0,0 +1,65 @@
+import typing
+
+from multion.core.decoders import _get_decoder, decode
+from multion.types import (
+    BrowseOutput,
+    Metadata,
+    RetrieveOutput,
+    SessionStepStreamChunk,
+    SessionStepStreamChunk_Event,
+    SessionStepStreamChunk_FinalEvent,
+)
+
+
+def test_decode_decodes_discriminated_unions() -> None:
+    event = decode(
+        type_=SessionStepStreamChunk,  # type: ignore
+        object_={"type": "event", "data": {"delta": {"content": "a", "url": "url"}}},
+    )
+    final_event = decode(
+        type_=SessionStepStreamChunk,  # type: ignore
+        object_={"type": "final_event", "data": {"delta": {"content": "b", "url": "url", "status": "DONE"}}},
+    )
+
+    assert isinstance(event, SessionStepStreamChunk_Event)
+    assert event.data.delta.content == "a"
+    assert isinstance(final_event, SessionStepStreamChunk_FinalEvent)
+    assert final_event.data.delta.status == "DONE"
+
+
+def test_decode_decodes_nested_models_and_keeps_extras() -> None:
+    output = decode(
+        type_=BrowseOutput,
+        object_={
+            "message": "done",
+            "status": "DONE",
+            "url": "url",
+            "screenshot": "",
+            "session_id": "session-1",
+            "metadata": {"step_count": 2},
+            "unknown": 1,
+        },
+    )
+
+    assert isinstance(output.metadata, Metadata)
+    assert output.metadata.step_count == 2
+    assert output.unknown == 1
+
+
+def test_decode_copies_json_containers() -> None:
+    rows = [{"title": "a"}, {"title": "b"}]
+    output = decode(type_=RetrieveOutput, object_={"message": "", "url": "", "status": "", "data": rows})
+
+    assert output.data == rows
+    assert output.data is not rows and output.data[0] is not rows[0]
+
+
+def test_decoders_are_compiled_once_per_type() -> None:
+    assert _get_decoder(typing.List[BrowseOutput]) is _get_decoder(typing.List[BrowseOutput])
+
+
+def test_decode_constructs_the_first_member_for_unknown_discriminants() -> None:
+    chunk = decode(type_=SessionStepStreamChunk, object_={"type": "heartbeat", "data": {}})  # type: ignore
+
+    assert isinstance(chunk, SessionStepStreamChunk_Event)
+    assert chunk.type == "heartbeat"
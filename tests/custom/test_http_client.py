@@ -0,0 +1,117 @@
+import json
+import typing
+
+import httpx
+import pytest
+
+from multion.core.extended_http_client import ExtendedAsyncHttpClient, ExtendedHttpClient, RetryBudget, RetryPolicy
+
+from .sse_server import SseServer
+
+
+class NoBackoffRetryPolicy(RetryPolicy):
+    def retry_timeout(self, response: httpx.Response, retries: int) -> float:
+        return 0
+
+
+def _failing_handler(statuses: typing.List[int], seen: typing.List[httpx.Request]):
+    def handler(request: httpx.Request) -> httpx.Response:
+        seen.append(request)
+        status = statuses[len(seen) - 1] if len(seen) <= len(statuses) else 200
+        return httpx.Response(status, json={"attempt": len(seen)})
+
+    return handler
+
+
+def test_request_replays_the_same_body_on_retry() -> None:
+    seen: typing.List[httpx.Request] = []
+    client = ExtendedHttpClient(
+        httpx_client=httpx.Client(transport=httpx.MockTransport(_failing_handler([503, 429], seen))),
+        base_timeout=None,
+        base_headers={},
+        base_url="https://example.com",
+        retry_policy=NoBackoffRetryPolicy(),
+    )
+
+    response = client.request(
+        "browse", method="POST", json={"cmd": "go"}, request_options={"max_retries": 3}
+    )
+
+    assert response.status_code == 200
+    assert len(seen) == 3
+    assert all(json.loads(request.content) == {"cmd": "go"} for request in seen)
+
+
+def test_request_stops_retrying_when_the_budget_is_exhausted() -> None:
+    seen: typing.List[httpx.Request] = []
+    budget = RetryBudget(ratio=0, max_tokens=1)
+    client = ExtendedHttpClient(
+        httpx_client=httpx.Client(transport=httpx.MockTransport(_failing_handler([500] * 10, seen))),
+        base_timeout=None,
+        base_headers={},
+        base_url="https://example.com",
+        retry_policy=NoBackoffRetryPolicy(),
+        retry_budget=budget,
+    )
+
+    first = client.request("sessions", method="GET", request_options={"max_retries": 5})
+    second = client.request("sessions", method="GET", request_options={"max_retries": 5})
+
+    assert first.status_code == 500 and second.status_code == 500
+    # One retry was paid for by the initial token, every later attempt was refused by the budget.
+    assert len(seen) == 3
+    assert budget.tokens == 0
+
+
+def test_requests_refuse_both_a_json_body_and_content() -> None:
+    client = ExtendedHttpClient(
+        httpx_client=httpx.Client(), base_timeout=None, base_headers={}, base_url="https://example.com"
+    )
+    async_client = ExtendedAsyncHttpClient(
+        httpx_client=httpx.AsyncClient(), base_timeout=None, base_headers={}, base_url="https://example.com"
+    )
+
+    for http_client in (client, async_client):
+        with pytest.raises(ValueError):
+            http_client.build_request("browse", method="POST", json={"cmd": "go"}, content=b"{}")
+    assert client.build_request("browse", method="POST", content=b"{}", request_options={}).content == b"{}"
+
+
+@pytest.mark.asyncio
+async def test_async_request_replays_the_same_body_on_retry() -> None:
+    seen: typing.List[httpx.Request] = []
+    client = ExtendedAsyncHttpClient(
+        httpx_client=httpx.AsyncClient(transport=httpx.MockTransport(_failing_handler([502], seen))),
+        base_timeout=None,
+        base_headers={},
+        base_url="https://example.com",
+        retry_policy=NoBackoffRetryPolicy(),
+    )
+
+    response = await client.request(
+        "retrieve", method="POST", json={"cmd": "go"}, request_options={"max_retries": 1}
+    )
+
+    assert response.status_code == 200
+    assert [json.loads(request.content) for request in seen] == [{"cmd": "go"}, {"cmd": "go"}]
+
+
+def test_warm_up_opens_the_requested_number_of_connections(sse_server: SseServer) -> None:
+    httpx_client = httpx.Client(limits=httpx.Limits(max_connections=3))
+    client = ExtendedHttpClient(httpx_client=httpx_client, base_timeout=None, base_headers={}, base_url=sse_server.url)
+
+    assert client.warm_up(connections=2) == 2
+    assert len(httpx_client._transport._pool.connections) == 2  # type: ignore[attr-defined]
+    # No more connections are requested than the pool allows.
+    assert client.warm_up(connections=5) == 3
+    assert len(httpx_client._transport._pool.connections) == 3  # type: ignore[attr-defined]
+
+
+async def test_async_warm_up_opens_the_requested_number_of_connections(sse_server: SseServer) -> None:
+    httpx_client = httpx.AsyncClient(limits=httpx.Limits(max_connections=3))
+    client = ExtendedAsyncHttpClient(
+        httpx_client=httpx_client, base_timeout=None, base_headers={}, base_url=sse_server.url
+    )
+
+    assert await client.warm_up(connections=5) == 3
+    assert len(httpx_client._transport._pool.connections) == 3  # type: ignore[attr-defined]
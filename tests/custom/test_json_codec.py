@@ -0,0 +1,95 @@
+import json
+import sys
+import typing
+from json.decoder import JSONDecodeError
+
+import httpx
+import pytest
+
+from multion.core.api_error import ApiError
+from multion.core.json_codec import JsonCodec, MsgspecCodec, OrjsonCodec, auto_codec
+from multion.extended_client import ExtendedMultiOn
+from multion.types import RetrieveOutput
+
+RETRIEVE_OUTPUT = {"message": "done", "url": "url", "status": "DONE", "data": [{"title": "é"}]}
+
+
+class RecordingCodec(JsonCodec):
+    def __init__(self) -> None:
+        self.calls: typing.List[str] = []
+
+    def dumps(self, obj: typing.Any) -> bytes:
+        self.calls.append("dumps")
+        return super().dumps(obj)
+
+    def loads(self, data: typing.Union[bytes, str]) -> typing.Any:
+        self.calls.append("loads")
+        return super().loads(data)
+
+
+def _codecs() -> typing.List[JsonCodec]:
+    codecs: typing.List[JsonCodec] = [JsonCodec()]
+    for codec_class in (OrjsonCodec, MsgspecCodec):
+        try:
+            codecs.append(codec_class())
+        except ImportError:
+            pass
+    return codecs
+
+
+@pytest.mark.parametrize("codec", _codecs(), ids=lambda codec: codec.name)
+def test_codecs_round_trip_and_raise_json_decode_errors(codec: JsonCodec) -> None:
+    encoded = codec.dumps(RETRIEVE_OUTPUT)
+
+    assert isinstance(encoded, bytes)
+    assert json.loads(encoded) == RETRIEVE_OUTPUT
+    assert codec.loads(encoded) == RETRIEVE_OUTPUT
+    assert codec.loads(encoded.decode("utf-8")) == RETRIEVE_OUTPUT
+    with pytest.raises(JSONDecodeError):
+        codec.loads(b"{not json")
+
+
+def test_clients_use_the_standard_library_by_default() -> None:
+    client = ExtendedMultiOn(api_key="key")
+
+    assert type(client._client_wrapper.json_codec) is JsonCodec
+    assert type(client._client_wrapper.httpx_client.json_codec) is JsonCodec
+
+
+def test_auto_codec_prefers_the_installed_fast_libraries(monkeypatch: pytest.MonkeyPatch) -> None:
+    # The installed fast codecs are listed after the standard library one, in the order auto_codec tries them.
+    fast_codecs = _codecs()[1:]
+    assert type(auto_codec()) is type(fast_codecs[0] if fast_codecs else JsonCodec())
+
+    monkeypatch.setitem(sys.modules, "orjson", None)
+    monkeypatch.setitem(sys.modules, "msgspec", None)
+    assert type(auto_codec()) is JsonCodec
+
+
+def test_client_encodes_and_decodes_bodies_with_its_codec() -> None:
+    seen: typing.List[httpx.Request] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        seen.append(request)
+        return httpx.Response(200, json=RETRIEVE_OUTPUT)
+
+    codec = RecordingCodec()
+    client = ExtendedMultiOn(
+        api_key="key", httpx_client=httpx.Client(transport=httpx.MockTransport(handler)), json_codec=codec
+    )
+
+    output = client.retrieve(cmd="go", fields=["title"])
+
+    assert isinstance(output, RetrieveOutput) and output.data == [{"title": "é"}]
+    assert codec.calls == ["dumps", "loads"]
+    assert seen[0].headers["Content-Type"] == "application/json"
+    assert json.loads(seen[0].content) == {"cmd": "go", "fields": ["title"]}
+
+
+def test_client_reports_malformed_responses_as_api_errors() -> None:
+    transport = httpx.MockTransport(lambda request: httpx.Response(200, content=b"<html>"))
+    client = ExtendedMultiOn(api_key="key", httpx_client=httpx.Client(transport=transport))
+
+    with pytest.raises(ApiError) as exc_info:
+        client.browse(cmd="go")
+    assert exc_info.value.body == "<html>"
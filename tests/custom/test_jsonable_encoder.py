@@ -0,0 +1,49 @@
+import datetime as dt
+import enum
+import typing
+
+from multion.core.extended_http_client import encode_request_body, maybe_filter_request_body
+from multion.core.jsonable_encoder import jsonable_encoder
+from multion.sessions import SessionsStepRequestBrowserParams
+
+OMIT = typing.cast(typing.Any, ...)
+
+
+class Color(str, enum.Enum):
+    RED = "red"
+
+
+def test_encode_request_body_matches_jsonable_encoder() -> None:
+    body = {
+        "cmd": "go",
+        "max_steps": 3,
+        "temperature": 0.2,
+        "local": False,
+        "session_id": None,
+        "fields": ["title", {"nested": dt.date(2024, 1, 2)}],
+        "browser_params": SessionsStepRequestBrowserParams(height=1.5, width=2.5),
+        "color": Color.RED,
+        "at": dt.datetime(2024, 1, 2, 3, 4, 5, tzinfo=dt.timezone.utc),
+        "ids": ("a", "b"),
+    }
+
+    encoded = encode_request_body(body)
+
+    assert encoded == jsonable_encoder(body)
+    assert type(encoded["color"]) is str
+
+
+def test_encode_request_body_drops_omitted_values_only() -> None:
+    encoded = encode_request_body({"cmd": "go", "url": OMIT, "session_id": None}, OMIT)
+
+    assert encoded == {"cmd": "go", "session_id": None}
+
+
+def test_maybe_filter_request_body_merges_additional_body_parameters() -> None:
+    encoded = maybe_filter_request_body(
+        {"cmd": "go", "url": OMIT},
+        {"additional_body_parameters": {"cmd": "override", "extra": Color.RED}},
+        OMIT,
+    )
+
+    assert encoded == {"cmd": "override", "extra": "red"}
@@ -0,0 +1,56 @@
+import json
+import subprocess
+import sys
+
+import pytest
+
+import multion
+import multion.errors
+import multion.sessions.types
+import multion.types
+
+
+def test_importing_the_package_defers_building_models() -> None:
+    code = "import sys, multion; print(sorted(name for name in sys.modules if name.startswith('multion.')))"
+
+    output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout
+
+    assert output.strip() == "['multion.lazy_import', 'multion.version']"
+
+
+def test_models_are_only_built_when_first_accessed() -> None:
+    code = (
+        "import json, sys, multion.errors, multion.sessions.types, multion.types; before = set(sys.modules); "
+        "multion.types.BrowseOutput; print(json.dumps([sorted(before), sorted(set(sys.modules) - before)]))"
+    )
+
+    output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout
+    before, imported = json.loads(output)
+
+    assert [name for name in before if name.startswith("multion.")] == [
+        "multion.errors",
+        "multion.lazy_import",
+        "multion.sessions",
+        "multion.sessions.types",
+        "multion.types",
+        "multion.version",
+    ]
+    assert "multion.types.browse_output" in imported and "multion.types.retrieve_output" not in imported
+
+
+def test_public_names_resolve_lazily() -> None:
+    from multion.types.browse_output import BrowseOutput
+
+    assert multion.BrowseOutput is BrowseOutput
+    assert multion.types.BrowseOutput is BrowseOutput
+    assert multion.sessions.SessionsListResponse is multion.sessions.types.SessionsListResponse
+    assert issubclass(multion.UnauthorizedError, Exception)
+    assert multion.errors.UnauthorizedError is multion.UnauthorizedError
+    for package in (multion, multion.types, multion.errors, multion.sessions.types):
+        assert all(hasattr(package, name) for name in package.__all__)
+        assert set(package.__all__) <= set(dir(package))
+
+
+def test_unknown_names_raise_attribute_errors() -> None:
+    with pytest.raises(AttributeError, match="Missing"):
+        multion.types.Missing
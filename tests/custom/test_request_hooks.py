@@ -0,0 +1,124 @@
+import typing
+
+import httpx
+import pytest
+
+from multion.core.hooks import RequestContext, RequestHook
+from multion.core.metrics import LatencyHistogram, MetricsCollector
+from multion.extended_client import AsyncExtendedMultiOn, ExtendedMultiOn
+
+from .test_http_client import NoBackoffRetryPolicy
+
+SESSION_STEP_SUCCESS = {"message": "done", "status": "DONE", "url": "url", "screenshot": "", "session_id": "session-1"}
+
+
+class RecordingHook(RequestHook):
+    def __init__(self) -> None:
+        self.calls: typing.List[typing.Tuple[str, str, int, typing.Any]] = []
+
+    def before_send(self, context: RequestContext) -> None:
+        context.request.headers["X-Attempt"] = str(context.attempt)
+        self.calls.append(("before_send", context.endpoint, context.attempt, None))
+
+    def after_response(self, context: RequestContext, response: httpx.Response) -> None:
+        self.calls.append(("after_response", context.endpoint, context.attempt, response.status_code))
+
+    def on_retry(self, context: RequestContext, response: httpx.Response, delay: float) -> None:
+        self.calls.append(("on_retry", context.endpoint, context.attempt, delay))
+
+    def on_error(self, context: RequestContext, exception: Exception) -> None:
+        self.calls.append(("on_error", context.endpoint, context.attempt, type(exception)))
+
+
+def _handler(statuses: typing.List[int], seen: typing.List[str]):
+    def handler(request: httpx.Request) -> httpx.Response:
+        seen.append(request.headers.get("X-Attempt", ""))
+        status = statuses.pop(0) if statuses else 200
+        if status == 0:
+            raise httpx.ConnectError("connection refused", request=request)
+        return httpx.Response(status, json=SESSION_STEP_SUCCESS)
+
+    return handler
+
+
+def test_hooks_are_called_for_each_attempt() -> None:
+    seen: typing.List[str] = []
+    hook = RecordingHook()
+    client = ExtendedMultiOn(
+        api_key="key",
+        httpx_client=httpx.Client(transport=httpx.MockTransport(_handler([503], seen))),
+        retry_policy=NoBackoffRetryPolicy(),
+        hooks=[hook],
+    )
+
+    client.sessions.step("session-1", cmd="go", request_options={"max_retries": 1})
+
+    assert hook.calls == [
+        ("before_send", "sessions.step", 0, None),
+        ("after_response", "sessions.step", 0, 503),
+        ("on_retry", "sessions.step", 0, 0),
+        ("before_send", "sessions.step", 1, None),
+        ("after_response", "sessions.step", 1, 200),
+    ]
+    assert seen == ["0", "1"]
+
+
+def test_hooks_see_errors_and_can_abort_requests() -> None:
+    hook = RecordingHook()
+    client = ExtendedMultiOn(
+        api_key="key",
+        httpx_client=httpx.Client(transport=httpx.MockTransport(_handler([0], []))),
+        hooks=[hook],
+    )
+
+    with pytest.raises(httpx.ConnectError):
+        client.sessions.close("session-1")
+    assert hook.calls[-1] == ("on_error", "sessions.close", 0, httpx.ConnectError)
+
+    class Abort(RequestHook):
+        def before_send(self, context: RequestContext) -> None:
+            raise PermissionError(context.endpoint)
+
+    client = ExtendedMultiOn(api_key="key", httpx_client=httpx.Client(), hooks=[Abort()])
+    with pytest.raises(PermissionError, match="browse"):
+        client.browse(cmd="go")
+
+
+def test_histograms_are_accurate_within_their_precision() -> None:
+    histogram = LatencyHistogram()
+    for i in range(1, 1001):
+        histogram.record(i / 100)
+
+    assert (histogram.count, histogram.min, histogram.max) == (1000, 0.01, 10.0)
+    for percentile, expected in [(50, 5.0), (90, 9.0), (99, 9.9), (100, 10.0)]:
+        assert histogram.percentile(percentile) == pytest.approx(expected, rel=2**-7)
+    assert histogram.cumulative_counts([0.1, 1.0, 60.0]) == [10, 100, 1000]
+    assert len(histogram._counts) < 1000
+
+
+async def test_metrics_collector_counts_and_exports() -> None:
+    metrics = MetricsCollector()
+    client = AsyncExtendedMultiOn(
+        api_key="key",
+        httpx_client=httpx.AsyncClient(transport=httpx.MockTransport(_handler([429, 200, 0], []))),
+        retry_policy=NoBackoffRetryPolicy(),
+        hooks=[metrics],
+    )
+
+    await client.sessions.step("session-1", cmd="go", request_options={"max_retries": 1})
+    with pytest.raises(httpx.ConnectError):
+        await client.sessions.step("session-1", cmd="go")
+    await client.sessions.step("session-1", cmd="go")
+
+    step = metrics.to_dict()["sessions.step"]
+    assert (step["requests"], step["retries"], step["errors"], step["status_codes"]) == (4, 1, 1, {200: 2, 429: 1})
+    assert step["latency"]["count"] == 4 and step["latency"]["p50"] is not None
+
+    text = metrics.to_prometheus()
+    assert 'multion_request_duration_seconds_bucket{endpoint="sessions.step",le="+Inf"} 4' in text
+    assert 'multion_responses_total{endpoint="sessions.step",status="429"} 1' in text
+    assert 'multion_retries_total{endpoint="sessions.step"} 1' in text
+    assert 'multion_errors_total{endpoint="sessions.step"} 1' in text
+
+    metrics.reset()
+    assert metrics.to_dict() == {}
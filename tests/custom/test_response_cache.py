@@ -0,0 +1,141 @@
+import json
+import multiprocessing
+import pathlib
+import typing
+
+import httpx
+import pytest
+
+from multion.core.extended_request_options import ExtendedRequestOptions
+from multion.core.response_cache import MemoryCache, SQLiteCache, get_cache_key
+from multion.extended_client import AsyncExtendedMultiOn, ExtendedMultiOn
+
+
+def _retrieve_handler(requests: typing.List[httpx.Request]) -> typing.Callable[[httpx.Request], httpx.Response]:
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        body = json.loads(request.content)
+        if body["url"].endswith("broken"):
+            return httpx.Response(500, json={"detail": "boom"})
+        return httpx.Response(200, json={"message": "done", "url": body["url"], "status": "DONE", "data": [{"n": 1}]})
+
+    return handler
+
+
+def _client(requests: typing.List[httpx.Request], cache: MemoryCache, api_key: str = "key") -> ExtendedMultiOn:
+    return ExtendedMultiOn(
+        api_key=api_key,
+        httpx_client=httpx.Client(transport=httpx.MockTransport(_retrieve_handler(requests))),
+        response_cache=cache,
+    )
+
+
+def test_retrieve_is_answered_from_the_cache() -> None:
+    requests: typing.List[httpx.Request] = []
+    cache = MemoryCache()
+    client = _client(requests, cache)
+
+    first = client.retrieve(cmd="go", url="https://example.com", fields=["n"])
+    second = client.retrieve(fields=["n"], url="https://example.com", cmd="go")
+
+    assert len(requests) == 1
+    assert first == second and second.data == [{"n": 1}]
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_retrieve_does_not_cache_errors_sessions_or_other_accounts() -> None:
+    requests: typing.List[httpx.Request] = []
+    cache = MemoryCache()
+    client = _client(requests, cache)
+
+    for _ in range(2):
+        with pytest.raises(Exception):
+            client.retrieve(cmd="go", url="https://example.com/broken")
+        client.retrieve(cmd="go", url="https://example.com", session_id="session")
+    client.retrieve(cmd="go", url="https://example.com")
+    _client(requests, cache, api_key="other").retrieve(cmd="go", url="https://example.com")
+
+    assert len(requests) == 6
+    assert len(cache) == 2
+
+
+def test_browse_is_never_cached() -> None:
+    requests: typing.List[httpx.Request] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        return httpx.Response(200, json={"message": "m", "status": "DONE", "url": "u", "screenshot": "", "session_id": "s"})
+
+    client = ExtendedMultiOn(
+        api_key="key", httpx_client=httpx.Client(transport=httpx.MockTransport(handler)), response_cache=MemoryCache()
+    )
+    client.browse(cmd="go")
+    client.browse(cmd="go")
+
+    assert len(requests) == 2
+
+
+async def test_async_retrieve_is_answered_from_the_cache() -> None:
+    requests: typing.List[httpx.Request] = []
+    handler = _retrieve_handler(requests)
+
+    async def handle_async(request: httpx.Request) -> httpx.Response:
+        await request.aread()
+        return handler(request)
+
+    client = AsyncExtendedMultiOn(
+        api_key="key",
+        httpx_client=httpx.AsyncClient(transport=httpx.MockTransport(handle_async)),
+        response_cache=MemoryCache(),
+    )
+
+    await client.retrieve(cmd="go", url="https://example.com")
+    output = await client.retrieve(
+        cmd="go", url="https://example.com", request_options=ExtendedRequestOptions(response_mode="raw")
+    )
+
+    assert len(requests) == 1
+    assert output["data"] == [{"n": 1}]  # type: ignore
+
+
+def test_memory_cache_evicts_least_recently_used_and_expired_entries(monkeypatch: pytest.MonkeyPatch) -> None:
+    now = [1000.0]
+    monkeypatch.setattr("multion.core.response_cache.time.time", lambda: now[0])
+    cache = MemoryCache(max_entries=2, ttl=10)
+
+    cache.set("a", b"1")
+    cache.set("b", b"2")
+    assert cache.get("a") == b"1"
+    cache.set("c", b"3")
+    assert cache.get("b") is None
+    assert cache.get("a") == b"1"
+
+    now[0] += 10
+    assert cache.get("a") is None and cache.get("c") is None
+    assert len(cache) == 0
+
+
+def _fill_cache(path: str) -> None:
+    SQLiteCache(path).set("key", b"from another process")
+
+
+def test_sqlite_cache_is_shared_between_processes(tmp_path: pathlib.Path) -> None:
+    path = str(tmp_path / "cache.db")
+    cache = SQLiteCache(path, max_entries=1)
+    process = multiprocessing.get_context("spawn").Process(target=_fill_cache, args=(path,))
+    process.start()
+    process.join()
+
+    assert cache.get("key") == b"from another process"
+    cache.set("other", b"value")
+    assert cache.get("key") is None
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_cache_key_ignores_the_order_of_body_keys() -> None:
+    first = httpx.Request("POST", "https://example.com", content=b'{"a": 1, "b": [1, 2]}')
+    second = httpx.Request("POST", "https://example.com", content=b'{"b":[1,2],"a":1}')
+    third = httpx.Request("POST", "https://example.com", content=b'{"b":[2,1],"a":1}')
+
+    assert get_cache_key(first) == get_cache_key(second)
+    assert get_cache_key(first) != get_cache_key(third)
@@ -0,0 +1,79 @@
+import typing
+
+import httpx
+import pytest
+
+from multion.core.extended_request_options import ExtendedRequestOptions
+from multion.core.response_view import ResponseView, construct_response
+from multion.extended_client import ExtendedMultiOn
+from multion.types import BrowseOutput, SessionStepStreamChunk
+
+from .sse_server import SseScript, SseServer, chunk_event, final_event, sse_event
+
+BROWSE_OUTPUT = {
+    "message": "done",
+    "status": "DONE",
+    "url": "url",
+    "screenshot": "",
+    "session_id": "session-1",
+    "metadata": {"step_count": 2},
+    "unknown": 1,
+}
+
+
+def _client(**kwargs: typing.Any) -> ExtendedMultiOn:
+    transport = httpx.MockTransport(lambda request: httpx.Response(200, json=BROWSE_OUTPUT))
+    return ExtendedMultiOn(api_key="key", httpx_client=httpx.Client(transport=transport), **kwargs)
+
+
+def test_raw_mode_returns_the_decoded_json() -> None:
+    output = _client(response_mode="raw").browse(cmd="go")
+
+    assert output == BROWSE_OUTPUT
+
+
+def test_request_options_override_the_client_response_mode() -> None:
+    client = _client(response_mode="raw")
+
+    output = client.browse(cmd="go", request_options=ExtendedRequestOptions(response_mode="model"))
+
+    assert isinstance(output, BrowseOutput)
+    assert output.metadata is not None and output.metadata.step_count == 2
+
+
+def test_view_mode_exposes_fields_as_attributes() -> None:
+    output = typing.cast(ResponseView, _client(response_mode="view").browse(cmd="go"))
+
+    assert isinstance(output, ResponseView)
+    assert type(output).__name__ == "BrowseOutputView"
+    assert output.message == "done"
+    assert output.metadata.step_count == 2
+    assert output.metadata.temperature is None
+    assert output.unknown == 1
+    assert output.dict() is not None and output.dict()["session_id"] == "session-1"
+    with pytest.raises(AttributeError):
+        output.missing
+    with pytest.raises(TypeError):
+        output.message = "changed"
+    assert {output, _client(response_mode="view").browse(cmd="go")} == {output}
+
+
+def test_view_mode_dispatches_discriminated_unions() -> None:
+    event = construct_response(type_=SessionStepStreamChunk, object_=chunk_event("a"), response_mode="view")
+    final = construct_response(type_=SessionStepStreamChunk, object_=final_event("b"), response_mode="view")
+
+    assert type(event).__name__ == "SessionStepStreamChunk_EventView"
+    assert event.data.delta.content == "a"
+    assert type(final).__name__ == "SessionStepStreamChunk_FinalEventView"
+    assert final.data.delta.status == "DONE"
+    assert final.screenshot is None
+
+
+def test_step_stream_decodes_chunks_in_the_requested_mode(sse_server: SseServer) -> None:
+    sse_server.scripts = [SseScript([(0, sse_event(chunk_event("a"))), (0, sse_event(final_event("b")))])]
+    client = ExtendedMultiOn(api_key="key", base_url=sse_server.url)
+
+    raw = ExtendedRequestOptions(response_mode="raw")
+    chunks = list(client.sessions.step_stream("session-1", cmd="go", request_options=raw))
+
+    assert chunks == [chunk_event("a"), final_event("b")]
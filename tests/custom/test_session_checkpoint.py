@@ -0,0 +1,117 @@
+import pathlib
+import typing
+
+import httpx
+import pytest
+
+from multion.extended_client import AsyncExtendedMultiOn, ExtendedMultiOn
+from multion.sessions.checkpoint import CheckpointStore, FileCheckpointStore, SQLiteCheckpointStore
+
+from .sessions_api import SessionsApi
+
+
+@pytest.fixture(params=["file", "sqlite"])
+def store(request: pytest.FixtureRequest, tmp_path: pathlib.Path) -> CheckpointStore:
+    if request.param == "file":
+        return FileCheckpointStore(str(tmp_path / "checkpoints"))
+    return SQLiteCheckpointStore(str(tmp_path / "checkpoints.db"))
+
+
+def _client(api: SessionsApi) -> ExtendedMultiOn:
+    return ExtendedMultiOn(api_key="key", httpx_client=httpx.Client(transport=httpx.MockTransport(api)))
+
+
+def test_runs_are_resumed_on_their_session(store: CheckpointStore) -> None:
+    api = SessionsApi()
+    api.active.append("session-0")
+    client = _client(api)
+
+    def crash(step: typing.Any) -> None:
+        if step.index == 1:
+            raise RuntimeError("worker died")
+
+    with pytest.raises(RuntimeError):
+        client.sessions.run(
+            "session-0", cmd="search", url="https://example.com", mode="fast", checkpoint=store, on_step=crash
+        )
+
+    saved = store.load("session-0")
+    assert saved is not None and not saved.finished
+    assert (saved.session_id, saved.cmd, saved.status, saved.steps) == ("session-0", "search", "CONTINUE", 2)
+    assert saved.params == {"mode": "fast"} and saved.output["message"] == "continue: search"  # type: ignore
+    assert store.checkpoints() == [saved]
+
+    api.step_statuses = ["CONTINUE", "DONE"]
+    result = client.sessions.resume("session-0", checkpoint=store, max_steps=5)
+
+    assert (result.reason, result.status) == ("done", "DONE")
+    assert [step.index for step in result.steps] == [2, 3]
+    assert api.list_calls == 1
+    assert api.steps[2:] == [("session-0", {"cmd": "search", "mode": "fast", "stream": False})] * 2
+    finished = store.load("session-0")
+    assert finished is not None and finished.finished and finished.cmd is None and finished.steps == 4
+
+    # Finished runs are returned as they are, without any request.
+    again = client.sessions.resume("session-0", checkpoint=store)
+    assert (again.reason, again.steps, again.output.message) == ("done", [], "done: search")
+    assert len(api.steps) == 4 and api.list_calls == 1
+
+    store.delete("session-0")
+    assert store.load("session-0") is None and store.checkpoints() == []
+
+
+def test_resume_answers_pending_questions(store: CheckpointStore) -> None:
+    api = SessionsApi()
+    api.active.append("session-0")
+    client = _client(api)
+    api.step_statuses = ["ASK_USER"]
+    client.sessions.run("session-0", cmd="book", checkpoint=store, checkpoint_key="job")
+
+    saved = store.load("job")
+    assert saved is not None and (saved.cmd, saved.status) == (None, "ASK_USER")
+    assert {saved, store.load("job")} == {saved}
+    assert client.sessions.resume("job", checkpoint=store).reason == "ask_user"
+
+    api.step_statuses = ["DONE"]
+    questions: typing.List[str] = []
+
+    def on_ask_user(output: typing.Any) -> str:
+        questions.append(output.message)
+        return "the blue one"
+
+    result = client.sessions.resume("job", checkpoint=store, on_ask_user=on_ask_user)
+
+    assert questions == ["ask_user: book"]
+    assert result.reason == "done" and result.steps[0].cmd == "the blue one"
+
+
+def test_resume_requires_a_live_session(store: CheckpointStore) -> None:
+    api = SessionsApi()
+    api.active.append("session-0")
+    client = _client(api)
+    client.sessions.run("session-0", cmd="search", max_steps=1, checkpoint=store)
+    api.expire("session-0")
+
+    with pytest.raises(LookupError, match="no longer active"):
+        client.sessions.resume("session-0", checkpoint=store)
+    with pytest.raises(LookupError, match="No checkpoint"):
+        client.sessions.resume("unknown", checkpoint=store)
+
+
+async def test_async_resume(tmp_path: pathlib.Path) -> None:
+    api = SessionsApi()
+    api.active.append("session-0")
+    store = FileCheckpointStore(str(tmp_path))
+    client = AsyncExtendedMultiOn(
+        api_key="key", httpx_client=httpx.AsyncClient(transport=httpx.MockTransport(api.handle_async))
+    )
+    api.step_statuses = ["ASK_USER", "DONE"]
+
+    result = await client.sessions.run("session-0", cmd="book", checkpoint=store)
+    assert result.reason == "ask_user"
+
+    async def on_ask_user(output: typing.Any) -> str:
+        return "yes"
+
+    result = await client.sessions.resume("session-0", checkpoint=store, on_ask_user=on_ask_user)
+    assert result.reason == "done" and [step.index for step in result.steps] == [1]
@@ -0,0 +1,146 @@
+import asyncio
+import time
+import typing
+
+import httpx
+import pytest
+
+from multion.extended_client import AsyncExtendedMultiOn, ExtendedMultiOn
+from multion.sessions import CreateSessionInputBrowserParams
+from multion.sessions.pool import AsyncSessionPool, SessionPool
+
+from .sessions_api import SessionsApi
+
+
+def _client(api: SessionsApi) -> ExtendedMultiOn:
+    return ExtendedMultiOn(api_key="key", httpx_client=httpx.Client(transport=httpx.MockTransport(api)))
+
+
+def test_sessions_are_created_ahead_of_time_and_reused() -> None:
+    api = SessionsApi()
+    client = _client(api)
+
+    with SessionPool(client.sessions, size=2) as pool:
+        pool.warm(url="https://example.com", mode="fast", wait=True)
+        assert len(api.created) == 2 and pool.idle == 2
+
+        with pool.session(url="https://example.com", mode="fast") as session:
+            output = session.step(cmd="search")
+        with pool.session(url="https://example.com", mode="fast") as again:
+            pass
+
+        assert output.session_id == session.session_id
+        assert again.session_id == session.session_id
+        assert api.created[0] == {"url": "https://example.com", "mode": "fast"}
+
+    # Sessions created to refill the pool are closed along with the others.
+    assert sorted(api.closed) == sorted(f"session-{i}" for i in range(len(api.created)))
+    assert api.active == []
+
+
+def test_sessions_are_only_shared_between_identical_parameters() -> None:
+    api = SessionsApi()
+    client = _client(api)
+
+    with SessionPool(client.sessions, size=1, health_check=False) as pool:
+        with pool.session(url="https://example.com", browser_params=CreateSessionInputBrowserParams(width=800, height=600)) as first:
+            pass
+        with pool.session(url="https://example.com", browser_params=CreateSessionInputBrowserParams(height=600, width=800)) as second:
+            pass
+        with pool.session(url="https://example.com", use_proxy=True) as third:
+            pass
+
+    assert first.session_id == second.session_id != third.session_id
+
+
+def test_sessions_are_recycled_after_max_steps_and_failures() -> None:
+    api = SessionsApi()
+    client = _client(api)
+
+    with SessionPool(client.sessions, size=1, max_steps=2) as pool:
+        pool.warm(url="https://example.com", wait=True)
+        with pool.session(url="https://example.com") as session:
+            session.step(cmd="one")
+            session.step(cmd="two")
+        with pytest.raises(RuntimeError):
+            with pool.session(url="https://example.com") as failed:
+                raise RuntimeError("boom")
+        with pool.session(url="https://example.com") as fresh:
+            pass
+
+    assert len({session.session_id, failed.session_id, fresh.session_id}) == 3
+    assert api.closed.index(session.session_id) < api.closed.index(fresh.session_id)
+    assert api.closed.index(failed.session_id) < api.closed.index(fresh.session_id)
+
+
+def test_sessions_idle_for_a_while_are_health_checked() -> None:
+    api = SessionsApi()
+    client = _client(api)
+
+    with SessionPool(client.sessions, size=1, health_check_after=0.1) as pool:
+        pool.warm(url="https://example.com", wait=True)
+        with pool.session(url="https://example.com") as fresh:
+            pass
+        assert api.list_calls == 0
+
+        time.sleep(0.1)
+        api.expire(fresh.session_id)
+        with pool.session(url="https://example.com") as session:
+            pass
+
+    assert session.session_id != fresh.session_id
+    assert api.list_calls == 1
+
+
+def test_closed_pools_cannot_hand_out_sessions() -> None:
+    pool = SessionPool(_client(SessionsApi()).sessions)
+    pool.close()
+
+    with pytest.raises(RuntimeError):
+        with pool.session(url="https://example.com"):
+            pass
+
+
+async def test_async_pool_reuses_sessions_and_closes_leftovers() -> None:
+    api = SessionsApi()
+    client = AsyncExtendedMultiOn(
+        api_key="key", httpx_client=httpx.AsyncClient(transport=httpx.MockTransport(api.handle_async))
+    )
+
+    async with AsyncSessionPool(client.sessions, size=2, max_steps=1) as pool:
+        await pool.warm(url="https://example.com", wait=True)
+        async with pool.session(url="https://example.com") as session:
+            await session.step(cmd="search")
+        async with pool.session(url="https://example.com") as other:
+            pass
+
+        assert other.session_id != session.session_id
+
+    assert api.active == []
+
+
+async def test_async_pool_refills_again_after_a_cancelled_creation() -> None:
+    api = SessionsApi()
+    client = AsyncExtendedMultiOn(
+        api_key="key", httpx_client=httpx.AsyncClient(transport=httpx.MockTransport(api.handle_async))
+    )
+
+    async with AsyncSessionPool(client.sessions, size=1) as pool:
+        create = pool._create
+
+        async def hang(key: typing.Any) -> typing.Any:
+            await asyncio.Event().wait()
+
+        pool._create = hang  # type: ignore[method-assign]
+        await pool.warm(url="https://example.com")
+        await asyncio.sleep(0)
+        tasks = list(pool._tasks)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+        pool._create = create  # type: ignore[method-assign]
+        await pool.warm(url="https://example.com", wait=True)
+        assert pool.idle == 1 and len(api.created) == 1
+
+    assert api.active == []
@@ -0,0 +1,157 @@
+import time
+import typing
+
+import httpx
+import pytest
+
+from multion.core.api_error import ApiError
+from multion.extended_client import AsyncExtendedMultiOn, ExtendedMultiOn
+from multion.sessions.runner import StepRecord
+
+from .sessions_api import SessionsApi
+from .sse_server import SseScript, SseServer, chunk_event, sse_event
+
+
+def _client(api: typing.Callable[[httpx.Request], httpx.Response], **kwargs: typing.Any) -> ExtendedMultiOn:
+    return ExtendedMultiOn(api_key="key", httpx_client=httpx.Client(transport=httpx.MockTransport(api)), **kwargs)
+
+
+def _final_event(status: str) -> typing.Dict[str, typing.Any]:
+    return {
+        "type": "final_event",
+        "session_id": "session-1",
+        "data": {"delta": {"content": status.lower(), "url": "url", "status": status}},
+    }
+
+
+def test_run_steps_until_done() -> None:
+    api = SessionsApi()
+    api.step_statuses = ["CONTINUE", "CONTINUE", "DONE"]
+    steps: typing.List[StepRecord] = []
+
+    result = _client(api).sessions.run(
+        "session-0", cmd="search", url="https://example.com", mode="fast", on_step=steps.append
+    )
+
+    assert (result.reason, result.status, result.done) == ("done", "DONE", True)
+    assert result.output.message == "done: search"
+    assert steps == result.steps and [step.index for step in steps] == [0, 1, 2]
+    assert all(step.duration >= 0 and step.first_chunk_after is None for step in steps)
+    # The url is only sent with the first step, and nothing but steps is requested.
+    assert [body.get("url") for _, body in api.steps] == ["https://example.com", None, None]
+    assert all(body["mode"] == "fast" for _, body in api.steps)
+
+
+def test_run_stops_at_the_step_budget() -> None:
+    api = SessionsApi()
+
+    result = _client(api).sessions.run("session-0", cmd="search", max_steps=2)
+
+    assert (result.reason, result.status) == ("max_steps", "CONTINUE")
+    assert len(api.steps) == 2
+
+
+def test_run_answers_or_stops_on_ask_user() -> None:
+    api = SessionsApi()
+    client = _client(api, response_mode="raw")
+    asked: typing.List[str] = []
+
+    def on_ask_user(output: typing.Any) -> str:
+        asked.append(output["message"])
+        return "the blue one"
+
+    api.step_statuses = ["ASK_USER", "DONE"]
+    result = client.sessions.run("session-0", cmd="book", on_ask_user=on_ask_user)
+    assert result.reason == "done"
+    assert asked == ["ask_user: book"]
+    assert [step.cmd for step in result.steps] == ["book", "the blue one"]
+
+    api.step_statuses = ["ASK_USER"]
+    result = client.sessions.run("session-0", cmd="book")
+    assert (result.reason, result.status, len(result.steps)) == ("ask_user", "ASK_USER", 1)
+
+
+def test_run_stops_at_the_deadline() -> None:
+    api = SessionsApi()
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        time.sleep(0.06)
+        return api(request)
+
+    result = _client(handler).sessions.run("session-0", cmd="search", timeout=0.1)
+
+    assert result.reason == "deadline"
+    assert len(result.steps) == 2
+
+
+def test_run_cuts_the_last_step_short_at_the_deadline(sse_server: SseServer) -> None:
+    sse_server.scripts = [SseScript([(1, sse_event(_final_event("DONE")))])]
+    client = ExtendedMultiOn(api_key="key", base_url=sse_server.url)
+
+    start = time.monotonic()
+    result = client.sessions.run("session-1", cmd="search", stream=True, timeout=0.2)
+
+    assert time.monotonic() - start < 0.9
+    assert (result.reason, result.steps) == ("deadline", [])
+
+
+def test_run_stops_streams_that_keep_going_past_the_deadline(sse_server: SseServer) -> None:
+    # Every chunk arrives well within the request timeout, only checking the deadline between chunks stops the step.
+    sse_server.scripts = [SseScript([(0.05, sse_event(chunk_event(str(i)))) for i in range(20)])]
+    client = ExtendedMultiOn(api_key="key", base_url=sse_server.url)
+    chunks: typing.List[typing.Any] = []
+
+    start = time.monotonic()
+    result = client.sessions.run("session-1", cmd="search", stream=True, timeout=0.2, on_chunk=chunks.append)
+
+    assert time.monotonic() - start < 0.5
+    assert (result.reason, result.steps) == ("deadline", [])
+    assert 0 < len(chunks) < 20
+
+
+def test_run_does_not_retry_past_the_deadline() -> None:
+    requests: typing.List[httpx.Request] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        return httpx.Response(503, headers={"Retry-After": "1"}, json={})
+
+    start = time.monotonic()
+    with pytest.raises(ApiError):
+        _client(handler).sessions.run("session-0", cmd="search", timeout=0.3, request_options={"max_retries": 3})
+
+    assert time.monotonic() - start < 0.5
+    assert len(requests) == 1
+
+
+def test_run_streams_each_step(sse_server: SseServer) -> None:
+    sse_server.scripts = [
+        SseScript([(0, sse_event(chunk_event("a"))), (0, sse_event(_final_event("CONTINUE")))]),
+        SseScript([(0, sse_event(chunk_event("b"))), (0, sse_event(_final_event("DONE")))]),
+    ]
+    client = ExtendedMultiOn(api_key="key", base_url=sse_server.url)
+    chunks: typing.List[typing.Any] = []
+
+    result = client.sessions.run("session-1", cmd="search", stream=True, on_chunk=chunks.append)
+
+    assert result.reason == "done"
+    assert [chunk.type for chunk in chunks] == ["event", "final_event"] * 2
+    assert result.output.data.delta.content == "done"
+    assert all(step.first_chunk_after is not None for step in result.steps)
+    assert [request["body"]["stream"] for request in sse_server.requests] == [True, True]
+
+
+async def test_async_run_awaits_callbacks() -> None:
+    api = SessionsApi()
+    api.step_statuses = ["CONTINUE", "ASK_USER", "DONE"]
+    client = AsyncExtendedMultiOn(
+        api_key="key", httpx_client=httpx.AsyncClient(transport=httpx.MockTransport(api.handle_async))
+    )
+
+    async def on_ask_user(output: typing.Any) -> str:
+        return "yes"
+
+    result = await client.sessions.run("session-0", cmd="search", on_ask_user=on_ask_user)
+
+    assert result.reason == "done"
+    assert [body["cmd"] for _, body in api.steps] == ["search", "search", "yes"]
@@ -0,0 +1,116 @@
+import typing
+import weakref
+
+import httpx
+import pytest
+
+from multion.core.extended_request_options import ExtendedRequestOptions
+from multion.extended_client import AsyncExtendedMultiOn, ExtendedMultiOn
+from multion.sessions.tracker import SessionTracker, _close_at_exit
+
+from .sessions_api import SessionsApi
+
+
+def _client(api: SessionsApi, **kwargs: typing.Any) -> ExtendedMultiOn:
+    return ExtendedMultiOn(api_key="key", httpx_client=httpx.Client(transport=httpx.MockTransport(api)), **kwargs)
+
+
+def _browse_api(api: SessionsApi) -> typing.Callable[[httpx.Request], httpx.Response]:
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.path.endswith("/browse"):
+            return httpx.Response(
+                200, json={"message": "", "status": "DONE", "url": "", "screenshot": "", "session_id": "browsed"}
+            )
+        return api(request)
+
+    return handler
+
+
+def test_sessions_are_tracked_until_closed() -> None:
+    api = SessionsApi()
+    client = ExtendedMultiOn(
+        api_key="key", httpx_client=httpx.Client(transport=httpx.MockTransport(_browse_api(api))), track_sessions=True
+    )
+    tracker = typing.cast(SessionTracker, client.session_tracker)
+
+    first = client.sessions.create(url="https://example.com")
+    client.sessions.create(url="https://example.com", request_options=ExtendedRequestOptions(response_mode="view"))
+    client.browse(cmd="go")
+    client.sessions.close(first.session_id)
+
+    assert tracker.session_ids == ["session-1", "browsed"]
+    api.active.append("browsed")
+    assert tracker.close_all() == {}
+    assert tracker.session_ids == []
+    assert api.active == []
+
+
+def test_sessions_are_not_tracked_by_default() -> None:
+    client = _client(SessionsApi())
+    client.sessions.create(url="https://example.com")
+
+    assert client.session_tracker is None
+
+
+def test_session_blocks_close_their_session() -> None:
+    api = SessionsApi()
+    client = _client(api, track_sessions=True)
+    tracker = typing.cast(SessionTracker, client.session_tracker)
+
+    with pytest.raises(RuntimeError):
+        with tracker.session(url="https://example.com") as session:
+            assert tracker.session_ids == [session.session_id]
+            raise RuntimeError("boom")
+
+    assert api.closed == [session.session_id]
+    assert tracker.session_ids == []
+
+
+def test_reconcile_and_reap_against_the_active_sessions() -> None:
+    api = SessionsApi()
+    client = _client(api, track_sessions=True)
+    tracker = typing.cast(SessionTracker, client.session_tracker)
+    expired = client.sessions.create(url="https://example.com")
+    api.expire(expired.session_id)
+    api.active.extend(["leaked-1", "leaked-2", "kept"])
+
+    assert tracker.reconcile() == [expired.session_id]
+    with tracker.session(url="https://example.com") as session:
+        reaped = tracker.reap(keep=["kept"])
+
+    assert reaped == {"leaked-1": None, "leaked-2": None}
+    assert api.active == ["kept"]
+    assert session.session_id in api.closed
+
+
+def test_sessions_left_open_are_closed_at_exit(monkeypatch: pytest.MonkeyPatch) -> None:
+    api = SessionsApi()
+    client = _client(api, track_sessions=True)
+    client.sessions.create(url="https://example.com")
+    # The exit handler opens a client of its own, which is routed to the fake API here.
+    client_class = httpx.Client
+    monkeypatch.setattr(httpx, "Client", lambda **kwargs: client_class(transport=httpx.MockTransport(api), **kwargs))
+
+    with pytest.warns(ResourceWarning, match="session-0"):
+        _close_at_exit(weakref.ref(client.session_tracker))  # type: ignore
+
+    assert api.active == []
+
+
+async def test_async_tracker_closes_tracked_sessions() -> None:
+    api = SessionsApi()
+    client = AsyncExtendedMultiOn(
+        api_key="key",
+        httpx_client=httpx.AsyncClient(transport=httpx.MockTransport(api.handle_async)),
+        track_sessions=True,
+    )
+    tracker = client.session_tracker
+    assert tracker is not None
+
+    for _ in range(3):
+        await client.sessions.create(url="https://example.com")
+    async with tracker.session(url="https://example.com"):
+        assert len(tracker.session_ids) == 4
+
+    assert await tracker.close_all() == {}
+    assert api.active == [] and tracker.session_ids == []
@@ -0,0 +1,122 @@
+import asyncio
+import threading
+import typing
+
+import httpx
+import pytest
+
+from multion.core.api_error import ApiError
+from multion.core.extended_request_options import ExtendedRequestOptions
+from multion.extended_client import AsyncExtendedMultiOn, ExtendedMultiOn
+
+SCREENSHOT = {"screenshot": "https://example.com/screenshot.png"}
+
+
+class SlowHandler:
+    """
+    Answers requests once `release` is set, so that tests control how many requests are in flight together.
+    """
+
+    def __init__(self, status_code: int = 200) -> None:
+        self.status_code = status_code
+        self.release = threading.Event()
+        self.async_release = asyncio.Event()
+        self.paths: typing.List[str] = []
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        self.paths.append(request.url.path)
+        self.release.wait(5)
+        return httpx.Response(self.status_code, json=SCREENSHOT)
+
+    async def handle_async(self, request: httpx.Request) -> httpx.Response:
+        self.paths.append(request.url.path)
+        await self.async_release.wait()
+        return httpx.Response(self.status_code, json=SCREENSHOT)
+
+
+async def test_concurrent_identical_requests_share_one_call() -> None:
+    handler = SlowHandler()
+    client = AsyncExtendedMultiOn(
+        api_key="key",
+        httpx_client=httpx.AsyncClient(transport=httpx.MockTransport(handler.handle_async)),
+        coalesce_endpoints=["sessions.screenshot"],
+    )
+
+    calls = [asyncio.ensure_future(client.sessions.screenshot(session_id=session_id)) for session_id in "aaab"]
+    await asyncio.sleep(0.05)
+    handler.async_release.set()
+    outputs = await asyncio.gather(*calls)
+
+    assert sorted(handler.paths) == ["/v1/web/screenshot/a", "/v1/web/screenshot/b"]
+    assert all(output.screenshot == SCREENSHOT["screenshot"] for output in outputs)
+    assert client._client_wrapper.httpx_client.single_flight.shared == 2
+
+    # Once the call completed, the next identical request goes over the wire again.
+    await client.sessions.screenshot(session_id="a")
+    assert len(handler.paths) == 3
+
+
+async def test_cancelling_one_waiter_does_not_cancel_the_others() -> None:
+    handler = SlowHandler()
+    client = AsyncExtendedMultiOn(
+        api_key="key",
+        httpx_client=httpx.AsyncClient(transport=httpx.MockTransport(handler.handle_async)),
+        coalesce_endpoints=["sessions.list"],
+    )
+
+    first = asyncio.ensure_future(client.sessions.list(request_options=ExtendedRequestOptions(response_mode="raw")))
+    second = asyncio.ensure_future(client.sessions.list(request_options=ExtendedRequestOptions(response_mode="raw")))
+    await asyncio.sleep(0.05)
+    first.cancel()
+    handler.async_release.set()
+
+    assert await second == SCREENSHOT
+    assert first.cancelled()
+    assert len(handler.paths) == 1
+
+
+async def test_endpoints_are_not_coalesced_unless_opted_in() -> None:
+    handler = SlowHandler()
+    client = AsyncExtendedMultiOn(
+        api_key="key", httpx_client=httpx.AsyncClient(transport=httpx.MockTransport(handler.handle_async))
+    )
+
+    calls = [asyncio.ensure_future(client.sessions.screenshot(session_id="a")) for _ in range(3)]
+    await asyncio.sleep(0.05)
+    handler.async_release.set()
+    await asyncio.gather(*calls)
+
+    assert len(handler.paths) == 3
+
+
+def test_threads_share_errors_of_the_call() -> None:
+    handler = SlowHandler(status_code=500)
+    client = ExtendedMultiOn(
+        api_key="key",
+        httpx_client=httpx.Client(transport=httpx.MockTransport(handler)),
+        coalesce_endpoints=["sessions.screenshot"],
+    )
+    errors: typing.List[ApiError] = []
+
+    def screenshot() -> None:
+        try:
+            client.sessions.screenshot(session_id="a")
+        except ApiError as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=screenshot) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    while len(handler.paths) < 1 or client._client_wrapper.httpx_client.single_flight.shared < 3:
+        threading.Event().wait(0.01)
+    handler.release.set()
+    for thread in threads:
+        thread.join()
+
+    assert len(handler.paths) == 1
+    assert [error.status_code for error in errors] == [500] * 4
+
+
+def test_only_idempotent_endpoints_can_be_coalesced() -> None:
+    with pytest.raises(ValueError):
+        ExtendedMultiOn(api_key="key", coalesce_endpoints=["browse"])
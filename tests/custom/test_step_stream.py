@@ -0,0 +1,86 @@
+import typing
+
+import httpx
+import pytest
+
+from multion.core.extended_http_client import RetryPolicy
+from multion.extended_client import AsyncExtendedMultiOn, ExtendedMultiOn
+
+from .sse_server import SseScript, SseServer, chunk_event, final_event, sse_event
+
+
+class ImmediateRetryPolicy(RetryPolicy):
+    def retry_timeout(self, response: typing.Any, retries: int) -> float:
+        return 0
+
+    def reconnect_timeout(self, retries: int) -> float:
+        return 0
+
+
+def _contents(chunks: typing.List[typing.Any]) -> typing.List[str]:
+    return [chunk.data.delta.content for chunk in chunks]
+
+
+def test_step_stream_resumes_from_the_last_event_id(sse_server: SseServer) -> None:
+    sse_server.scripts = [
+        SseScript([(0, sse_event(chunk_event("a"), event_id="1")), (0, sse_event(chunk_event("b"), event_id="2"))], drop=True),
+        # A server honoring Last-Event-ID would only send event 3, this one replays the whole step.
+        SseScript(
+            [
+                (0, sse_event(chunk_event("a"), event_id="1")),
+                (0, sse_event(chunk_event("b"), event_id="2")),
+                (0, sse_event(final_event("c"), event_id="3")),
+            ]
+        ),
+    ]
+    client = ExtendedMultiOn(api_key="key", base_url=sse_server.url, retry_policy=ImmediateRetryPolicy())
+
+    stream = client.sessions.step_stream("session-1", cmd="go", request_options={"max_retries": 2})
+    chunks = list(stream)
+
+    assert _contents(chunks) == ["a", "b", "c"]
+    assert chunks[-1].type == "final_event"
+    assert stream.reconnects == 1
+    assert stream.last_event_id == "3"
+    assert sse_server.requests[1]["headers"]["Last-Event-ID"] == "2"
+    assert sse_server.requests[1]["body"] == sse_server.requests[0]["body"]
+
+
+def test_step_stream_is_not_resumed_without_event_ids(sse_server: SseServer) -> None:
+    sse_server.scripts = [
+        SseScript([(0, sse_event(chunk_event("a")))], drop=True),
+        SseScript([(0, sse_event(chunk_event("a"))), (0, sse_event(final_event("b")))]),
+    ]
+    client = ExtendedMultiOn(api_key="key", base_url=sse_server.url, retry_policy=ImmediateRetryPolicy())
+    stream = client.sessions.step_stream("session-1", cmd="go", request_options={"max_retries": 1})
+    chunks: typing.List[typing.Any] = []
+
+    with pytest.raises(httpx.TransportError):
+        for chunk in stream:
+            chunks.append(chunk)
+
+    assert _contents(chunks) == ["a"]
+    assert stream.reconnects == 0 and len(sse_server.requests) == 1
+
+
+def test_step_stream_does_not_reconnect_by_default(sse_server: SseServer) -> None:
+    sse_server.scripts = [SseScript([(0, sse_event(chunk_event("a")))], drop=True)]
+    client = ExtendedMultiOn(api_key="key", base_url=sse_server.url)
+
+    with pytest.raises(Exception):
+        list(client.sessions.step_stream("session-1", cmd="go"))
+    assert len(sse_server.requests) == 1
+
+
+async def test_async_step_stream_retries_retriable_statuses(sse_server: SseServer) -> None:
+    sse_server.scripts = [
+        SseScript([], status_code=503),
+        SseScript([(0, sse_event(chunk_event("a"))), (0, sse_event(final_event("b")))]),
+    ]
+    client = AsyncExtendedMultiOn(api_key="key", base_url=sse_server.url, retry_policy=ImmediateRetryPolicy())
+
+    stream = client.sessions.step_stream("session-1", cmd="go", request_options={"max_retries": 1})
+    chunks = [chunk async for chunk in stream]
+
+    assert _contents(chunks) == ["a", "b"]
+    assert stream.reconnects == 1
@@ -0,0 +1,76 @@
+import typing
+
+import pytest
+
+from multion.core.api_error import ApiError
+from multion.core.event_stream import StreamMetrics
+from multion.extended_client import AsyncExtendedMultiOn, ExtendedMultiOn
+
+from .sse_server import SseScript, SseServer, chunk_event, final_event, sse_event
+from .test_step_stream import ImmediateRetryPolicy
+
+
+def test_stream_timings_and_counts(sse_server: SseServer) -> None:
+    events = [(0.2, sse_event(chunk_event("a"))), (0.3, sse_event(chunk_event("b"))), (0, sse_event(final_event("c")))]
+    sse_server.scripts = [SseScript(events)]
+    reported: typing.List[StreamMetrics] = []
+    client = ExtendedMultiOn(api_key="key", base_url=sse_server.url, stream_metrics_sink=reported.append)
+
+    stream = client.sessions.step_stream("session-1", cmd="go")
+    assert list(stream) and reported == [stream.metrics]
+
+    metrics = stream.metrics
+    assert metrics.connect_time is not None and metrics.headers_time is not None
+    assert metrics.connect_time <= metrics.headers_time < 0.2 <= typing.cast(float, metrics.first_event_time)
+    assert len(metrics.event_gaps) == 2 and metrics.max_event_gap == metrics.event_gaps[0] >= 0.3
+    assert (metrics.events, metrics.skipped_events, metrics.reconnects, metrics.error) == (3, 0, 0, None)
+    assert metrics.bytes == sum(len(event.encode()) for _, event in events)
+    assert typing.cast(float, metrics.duration) >= 0.5
+    assert metrics.to_dict()["max_event_gap"] == metrics.max_event_gap
+
+
+def test_replayed_events_are_counted_as_skipped(sse_server: SseServer) -> None:
+    sse_server.scripts = [
+        SseScript([(0, sse_event(chunk_event("a"), event_id="1"))], drop=True),
+        SseScript([(0, sse_event(chunk_event("a"), event_id="1")), (0, sse_event(final_event("b"), event_id="2"))]),
+    ]
+    client = ExtendedMultiOn(api_key="key", base_url=sse_server.url, retry_policy=ImmediateRetryPolicy())
+
+    stream = client.sessions.step_stream("session-1", cmd="go", request_options={"max_retries": 1})
+    list(stream)
+
+    assert (stream.metrics.events, stream.metrics.skipped_events, stream.metrics.reconnects) == (2, 1, 1)
+
+
+async def test_async_metrics_are_reported_when_streams_fail_or_close_early(sse_server: SseServer) -> None:
+    sse_server.scripts = [
+        SseScript([], status_code=500),
+        SseScript([(0, sse_event(chunk_event("a"))), (0, sse_event(final_event("b")))]),
+    ]
+    reported: typing.List[StreamMetrics] = []
+    client = AsyncExtendedMultiOn(api_key="key", base_url=sse_server.url, stream_metrics_sink=reported.append)
+
+    with pytest.raises(ApiError):
+        async for _ in client.sessions.step_stream("session-1", cmd="go"):
+            pass
+    async with client.sessions.step_stream("session-1", cmd="go") as stream:
+        async for _ in stream:
+            break
+
+    failed, closed = reported
+    assert isinstance(failed.error, ApiError) and failed.events == 0 and failed.headers_time is not None
+    assert closed is stream.metrics and closed.error is None and closed.events == 1
+    # The second stream reuses the kept-alive connection of the first one.
+    assert failed.connect_time is not None and closed.connect_time is None
+
+
+def test_sink_errors_are_turned_into_warnings(sse_server: SseServer) -> None:
+    sse_server.scripts = [SseScript([(0, sse_event(final_event("a")))])]
+
+    def sink(metrics: StreamMetrics) -> None:
+        raise ValueError("sink is down")
+
+    client = ExtendedMultiOn(api_key="key", base_url=sse_server.url, stream_metrics_sink=sink)
+
+    with pytest.warns(RuntimeWarning, match="sink is down"):
+        assert len(list(client.sessions.step_stream("session-1", cmd="go"))) == 1
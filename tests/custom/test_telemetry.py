@@ -0,0 +1,111 @@
+import threading
+import time
+import typing
+
+import httpx
+
+from multion.client import AsyncMultiOn, MultiOn
+from multion.telemetry import AsyncTelemetryQueue, TelemetryQueue
+
+from .fake_agentops import SlowAgentOps
+
+SESSION_STEP_SUCCESS = {"message": "done", "status": "DONE", "url": "url", "screenshot": "", "session_id": "session-1"}
+
+
+def test_calls_run_in_order_on_a_background_thread() -> None:
+    queue = TelemetryQueue(flush_interval=0.01)
+    calls: typing.List[typing.Tuple[int, threading.Thread]] = []
+
+    for i in range(100):
+        queue.submit(lambda i: calls.append((i, threading.current_thread())), i)
+
+    assert queue.flush(timeout=5)
+    assert [i for i, _ in calls] == list(range(100))
+    assert {thread for _, thread in calls} == {queue._thread}
+    assert (queue.queued, queue.sent, queue.pending) == (100, 100, 0)
+    queue.close()
+
+
+def test_the_oldest_calls_are_dropped_when_full() -> None:
+    queue = TelemetryQueue(max_size=3, batch_size=100, flush_interval=60)
+    calls: typing.List[int] = []
+
+    for i in range(5):
+        queue.submit(calls.append, i)
+
+    assert queue.flush(timeout=5)
+    assert calls == [2, 3, 4]
+    assert (queue.queued, queue.dropped) == (5, 2)
+    queue.close()
+    assert not queue.submit(calls.append, 5) and queue.dropped == 3
+
+
+def test_calls_that_are_not_sampled_are_never_dropped() -> None:
+    queue = TelemetryQueue(max_size=2, batch_size=100, flush_interval=60)
+    calls: typing.List[str] = []
+
+    queue.submit(calls.append, "start", sample=False)
+    queue.submit(calls.append, "a")
+    queue.submit(calls.append, "b")
+    queue.submit(calls.append, "end", sample=False)
+    assert not queue.submit(calls.append, "c")
+
+    assert queue.flush(timeout=5)
+    assert calls == ["start", "end"]
+    assert (queue.queued, queue.dropped) == (4, 3)
+    queue.close()
+
+
+def test_sampling_and_failures_are_counted() -> None:
+    queue = TelemetryQueue(sample_rate=0, flush_interval=60)
+    calls: typing.List[str] = []
+
+    assert not queue.submit(calls.append, "sampled out")
+    assert queue.submit(calls.append, "always", sample=False)
+    queue.submit(lambda: 1 / 0, sample=False)
+    queue.close()
+
+    assert calls == ["always"]
+    assert (queue.sampled_out, queue.sent, queue.failed) == (1, 1, 1)
+    assert isinstance(queue.last_error, ZeroDivisionError)
+
+
+def test_agentops_calls_are_made_off_the_request_path(agentops: SlowAgentOps) -> None:
+    transport = httpx.MockTransport(lambda request: httpx.Response(200, json=SESSION_STEP_SUCCESS))
+    client = MultiOn(api_key="key", agentops_api_key="agentops-key", httpx_client=httpx.Client(transport=transport))
+
+    start = time.monotonic()
+    client.browse(cmd="go")
+    client.sessions.step("session-1", cmd="go")
+    client.sessions.close("session-1")
+    assert time.monotonic() - start < agentops.delay
+
+    telemetry = typing.cast(TelemetryQueue, client.telemetry)
+    assert client.sessions.telemetry is telemetry
+    assert telemetry.flush(timeout=5)
+    assert [name for name, _ in agentops.calls] == ["start_session", "record", "record", "record", "end_session"]
+    browse_event = agentops.calls[1][1]
+    assert browse_event.action_type == "browse" and browse_event.returns.message == "done"
+    assert browse_event.end_timestamp.endswith("Z")
+    assert agentops.calls[2][1].prompt == "done"
+    assert threading.current_thread() not in agentops.threads
+
+
+async def test_async_queue_runs_calls_in_an_executor(agentops: SlowAgentOps) -> None:
+    transport = httpx.MockTransport(lambda request: httpx.Response(200, json=SESSION_STEP_SUCCESS))
+    client = AsyncMultiOn(
+        api_key="key",
+        agentops_api_key="agentops-key",
+        httpx_client=httpx.AsyncClient(transport=transport),
+        telemetry=AsyncTelemetryQueue(flush_interval=0.01),
+    )
+
+    start = time.monotonic()
+    await client.sessions.step("session-1", cmd="go")
+    assert time.monotonic() - start < agentops.delay
+
+    telemetry = typing.cast(AsyncTelemetryQueue, client.telemetry)
+    await telemetry.aclose()
+    assert [type(event).__name__ for _, event in agentops.calls] == ["Event", "Event"]
+    assert threading.current_thread() not in agentops.threads
+    assert telemetry.sent == 2
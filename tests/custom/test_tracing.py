@@ -0,0 +1,151 @@
+import asyncio
+import json
+import typing
+
+import httpx
+import pytest
+
+from multion.core.api_error import ApiError
+from multion.core.response_cache import MemoryCache
+from multion.core.tracing import Tracing
+from multion.extended_client import AsyncExtendedMultiOn, ExtendedMultiOn
+
+from .sse_server import SseScript, SseServer, chunk_event, final_event, sse_event
+from .test_http_client import NoBackoffRetryPolicy
+
+sdk_trace = pytest.importorskip("opentelemetry.sdk.trace")
+in_memory_span_exporter = pytest.importorskip("opentelemetry.sdk.trace.export.in_memory_span_exporter")
+export = pytest.importorskip("opentelemetry.sdk.trace.export")
+
+BROWSE_OUTPUT = {
+    "message": "done",
+    "status": "DONE",
+    "url": "url",
+    "screenshot": "",
+    "session_id": "session-1",
+    "metadata": {"step_count": 3, "processing_time": 12},
+}
+
+
+@pytest.fixture
+def exporter() -> typing.Any:
+    return in_memory_span_exporter.InMemorySpanExporter()
+
+
+@pytest.fixture
+def tracing(exporter: typing.Any) -> Tracing:
+    provider = sdk_trace.TracerProvider()
+    provider.add_span_processor(export.SimpleSpanProcessor(exporter))
+    return Tracing(tracer_provider=provider)
+
+
+def _traceparent(span: typing.Any) -> str:
+    return f"00-{span.context.trace_id:032x}-{span.context.span_id:016x}-{span.context.trace_flags:02x}"
+
+
+def test_calls_are_traced_with_their_results(tracing: Tracing, exporter: typing.Any) -> None:
+    statuses = [503, 200, 500]
+    headers: typing.List[str] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        headers.append(request.headers["traceparent"])
+        return httpx.Response(statuses.pop(0), json=BROWSE_OUTPUT)
+
+    client = ExtendedMultiOn(
+        api_key="key",
+        httpx_client=httpx.Client(transport=httpx.MockTransport(handler)),
+        retry_policy=NoBackoffRetryPolicy(),
+        tracing=tracing,
+    )
+
+    client.browse(cmd="go", mode="fast", request_options={"max_retries": 1})
+    with pytest.raises(ApiError):
+        client.sessions.step("session-1", cmd="go")
+
+    browse, step = exporter.get_finished_spans()
+    assert browse.name == "multion.browse" and step.name == "multion.sessions.step"
+    assert dict(browse.attributes) == {
+        "multion.endpoint": "browse",
+        "multion.mode": "fast",
+        "http.response.status_code": 200,
+        "multion.session_id": "session-1",
+        "multion.status": "DONE",
+        "multion.step_count": 3,
+        "multion.processing_time": 12,
+    }
+    (retry,) = browse.events
+    assert retry.name == "retry" and retry.attributes["http.response.status_code"] == 503
+    assert headers == [_traceparent(browse), _traceparent(browse), _traceparent(step)]
+
+    assert step.attributes["multion.session_id"] == "session-1"
+    assert step.attributes["http.response.status_code"] == 500
+    assert not step.status.is_ok and step.events[0].name == "exception"
+
+
+async def test_streams_are_traced_until_they_end(
+    tracing: Tracing, exporter: typing.Any, sse_server: SseServer
+) -> None:
+    sse_server.scripts = [SseScript([(0, sse_event(chunk_event("a"))), (0, sse_event(final_event("b")))])]
+    client = AsyncExtendedMultiOn(api_key="key", base_url=sse_server.url, tracing=tracing)
+
+    stream = client.sessions.step_stream("session-1", cmd="go")
+    assert exporter.get_finished_spans() == ()
+    assert len([chunk async for chunk in stream]) == 2
+
+    (span,) = exporter.get_finished_spans()
+    assert span.name == "multion.sessions.step_stream" and span.attributes["multion.events"] == 2
+    assert span.attributes["multion.session_id"] == "session-1"
+    assert sse_server.requests[0]["headers"]["traceparent"] == _traceparent(span)
+
+
+def test_trace_context_propagation_can_be_disabled(exporter: typing.Any) -> None:
+    provider = sdk_trace.TracerProvider()
+    provider.add_span_processor(export.SimpleSpanProcessor(exporter))
+    seen: typing.List[httpx.Request] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        seen.append(request)
+        return httpx.Response(200, json={})
+
+    client = ExtendedMultiOn(
+        api_key="key",
+        httpx_client=httpx.Client(transport=httpx.MockTransport(handler)),
+        tracing=Tracing(tracer_provider=provider, propagate=False),
+    )
+
+    client.sessions.list()
+
+    assert "traceparent" not in seen[0].headers
+    assert [span.name for span in exporter.get_finished_spans()] == ["multion.sessions.list"]
+
+
+async def test_traced_requests_are_still_cached_and_coalesced(tracing: Tracing, exporter: typing.Any) -> None:
+    release = asyncio.Event()
+    requests: typing.List[httpx.Request] = []
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        await release.wait()
+        url = json.loads(request.content)["url"]
+        return httpx.Response(200, json={"message": "done", "url": url, "status": "DONE", "data": [{"n": 1}]})
+
+    cache = MemoryCache()
+    client = AsyncExtendedMultiOn(
+        api_key="key",
+        httpx_client=httpx.AsyncClient(transport=httpx.MockTransport(handler)),
+        response_cache=cache,
+        coalesce_endpoints=["retrieve"],
+        tracing=tracing,
+    )
+
+    calls = [asyncio.ensure_future(client.retrieve(cmd="go", url="https://example.com")) for _ in range(3)]
+    await asyncio.sleep(0.05)
+    release.set()
+    await asyncio.gather(*calls)
+    await client.retrieve(cmd="go", url="https://example.com")
+
+    # Each call has its own span, and so its own traceparent, yet they all share the one request sent.
+    assert len(requests) == 1 and "traceparent" in requests[0].headers
+    assert len({span.context.span_id for span in exporter.get_finished_spans()}) == 4
+    assert client._client_wrapper.httpx_client.single_flight.shared == 2
+    assert cache.hits == 1
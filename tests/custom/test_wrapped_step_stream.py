@@ -0,0 +1,88 @@
+import time
+import typing
+
+import pytest
+
+from multion.client import AsyncMultiOn, MultiOn
+from multion.core.api_error import ApiError
+from multion.core.extended_request_options import ExtendedRequestOptions
+from multion.telemetry import AsyncTelemetryQueue, TelemetryQueue
+
+from .fake_agentops import SlowAgentOps
+from .sse_server import SseScript, SseServer, chunk_event, final_event, sse_event
+
+
+def _slow_step() -> SseScript:
+    return SseScript(
+        [(0, sse_event(chunk_event("a"))), (0.5, sse_event(chunk_event("b"))), (0, sse_event(final_event("c")))]
+    )
+
+
+async def test_async_chunks_are_yielded_as_they_arrive(sse_server: SseServer, agentops: SlowAgentOps) -> None:
+    sse_server.scripts = [_slow_step()]
+    client = AsyncMultiOn(
+        api_key="key",
+        base_url=sse_server.url,
+        agentops_api_key="agentops-key",
+        telemetry=AsyncTelemetryQueue(flush_interval=0.01),
+    )
+
+    start = time.monotonic()
+    stream = client.sessions.step_stream("session-1", cmd="go")
+    arrivals: typing.List[float] = []
+    contents: typing.List[str] = []
+    async for chunk in stream:
+        arrivals.append(time.monotonic() - start)
+        contents.append(chunk.data.delta.content)
+
+    assert contents == ["a", "b", "c"]
+    assert arrivals[0] < 0.4 <= arrivals[1]
+    assert stream.reconnects == 0
+
+    await typing.cast(AsyncTelemetryQueue, client.telemetry).aclose()
+    (_, action_event), (_, llm_event) = agentops.calls
+    assert (action_event.action_type, action_event.returns, llm_event.prompt) == ("step_stream", "abc", "abc")
+    assert action_event.params == {"cmd": "go"}
+
+
+def test_sync_chunks_are_yielded_as_they_arrive(sse_server: SseServer, agentops: SlowAgentOps) -> None:
+    sse_server.scripts = [_slow_step()]
+    client = MultiOn(api_key="key", base_url=sse_server.url, agentops_api_key="agentops-key")
+
+    start = time.monotonic()
+    raw = ExtendedRequestOptions(response_mode="raw")
+    with client.sessions.step_stream("session-1", cmd="go", request_options=raw) as stream:
+        first = next(stream)
+        time_to_first_chunk = time.monotonic() - start
+        rest = list(stream)
+
+    assert time_to_first_chunk < 0.4
+    chunks = typing.cast(typing.List[typing.Dict[str, typing.Any]], [first, *rest])
+    assert [chunk["data"]["delta"]["content"] for chunk in chunks] == ["a", "b", "c"]
+
+    assert typing.cast(TelemetryQueue, client.telemetry).flush(timeout=5)
+    assert [event.returns for _, event in agentops.calls] == ["abc", None]
+
+
+async def test_async_stream_errors_are_recorded(sse_server: SseServer, agentops: SlowAgentOps) -> None:
+    sse_server.scripts = [SseScript([], status_code=500)]
+    client = AsyncMultiOn(api_key="key", base_url=sse_server.url, agentops_api_key="agentops-key")
+
+    with pytest.raises(ApiError):
+        async for _ in client.sessions.step_stream("session-1", cmd="go"):
+            pass
+
+    await typing.cast(AsyncTelemetryQueue, client.telemetry).aclose()
+    (_, error_event), = agentops.calls
+    assert isinstance(error_event.exception, ApiError) and error_event.trigger_event.action_type == "step_stream"
+
+
+async def test_async_streams_without_agentops(sse_server: SseServer) -> None:
+    sse_server.scripts = [_slow_step(), SseScript([(0, sse_event(final_event("done")))])]
+    client = AsyncMultiOn(api_key="key", base_url=sse_server.url, agentops_api_key=None)
+
+    chunks = [chunk async for chunk in client.sessions.step_stream("session-1", cmd="go")]
+    result = await client.sessions.run("session-1", cmd="go", stream=True)
+
+    assert len(chunks) == 3
+    assert (result.reason, result.output.data.delta.content) == ("done", "done")